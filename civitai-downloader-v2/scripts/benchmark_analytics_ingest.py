@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark the caller-side cost of recording analytics events.
+Records events from several threads while the background writer drains the
+queue into SQLite, and reports per-event latency of record_event() in
+microseconds together with how many events were written, sampled out or
+dropped under backpressure.
+"""
+
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from core.analytics.collector import AnalyticsCollector, EventType
+
+
+def run_benchmark(events: int = 100000, threads: int = 4, max_pending: int = 50000) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        events: Events recorded per thread
+        threads: Recording threads
+        max_pending: Collector backpressure limit
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        collector = AnalyticsCollector(db_path=str(Path(temp_dir) / "analytics.db"),
+                                       max_pending=max_pending)
+        timings = [[] for _ in range(threads)]
+
+        def produce(worker: int) -> None:
+            record = collector.record_event
+            samples = timings[worker]
+            for i in range(events):
+                t0 = time.perf_counter()
+                record(EventType.API_RESPONSE, {'request_id': f'req_{worker}_{i}', 'status_code': 200,
+                                                'response_time': 0.05, 'response_size': 2048})
+                samples.append(time.perf_counter() - t0)
+
+        workers = [threading.Thread(target=produce, args=(w,)) for w in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        recorded = time.perf_counter() - started
+
+        collector.stop()
+        drained = time.perf_counter() - started
+
+        all_times = sorted(t for samples in timings for t in samples)
+        stats = collector.get_ingest_statistics()
+        print(f"threads: {threads}, events: {len(all_times)}")
+        print(f"record_event p50: {statistics.median(all_times) * 1e6:.2f}us, "
+              f"p99: {all_times[int(len(all_times) * 0.99)] * 1e6:.2f}us, "
+              f"max: {all_times[-1] * 1e6:.1f}us")
+        print(f"recording took {recorded:.2f}s, written after {drained:.2f}s "
+              f"({stats['written'] / drained:.0f} events/s)")
+        print(f"written: {stats['written']}, sampled out: {stats['sampled_out']}, "
+              f"dropped: {stats['dropped']}")
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark analytics event ingest cost')
+    parser.add_argument('--events', type=int, default=100000, help='Events recorded per thread')
+    parser.add_argument('--threads', type=int, default=4, help='Recording threads')
+    parser.add_argument('--max-pending', type=int, default=50000, help='Backpressure limit')
+    args = parser.parse_args()
+
+    run_benchmark(args.events, args.threads, args.max_pending)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark ResponseCache store/get latency as the cache grows.
+Fills the cache with API-shaped responses under memory pressure and reports
+per-operation latency for each block of entries; with O(1) size accounting
+the numbers stay flat as the entry count grows.
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from api.cache import ResponseCache, LRUConfig
+
+
+def make_response(index: int, items: int) -> dict:
+    """Build a /models-like response page."""
+    return {
+        'items': [
+            {
+                'id': index * items + i,
+                'name': f'Model {index}-{i}',
+                'type': 'LORA',
+                'tags': ['style', 'anime', 'character'],
+                'stats': {'downloadCount': i * 10, 'rating': 4.5},
+                'modelVersions': [{
+                    'id': i,
+                    'baseModel': 'Illustrious',
+                    'files': [{'name': f'model_{i}.safetensors', 'sizeKB': 144000.5,
+                               'hashes': {'SHA256': 'A' * 64, 'AutoV2': 'A' * 10}}]
+                }]
+            }
+            for i in range(items)
+        ],
+        'metadata': {'nextCursor': str(index + 1), 'pageSize': items}
+    }
+
+
+def run_benchmark(entries: int = 10000, block: int = 1000, items: int = 20,
+                  memory_mb: int = 32) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        entries: Number of distinct responses stored
+        block: Entries per reported block
+        items: Models per response page
+        memory_mb: Memory threshold (small enough to force pressure eviction)
+    """
+    cache = ResponseCache(ttl_seconds=3600, lru_config=LRUConfig(
+        max_size=entries, memory_threshold=memory_mb * 1024 * 1024
+    ))
+    responses = [make_response(i, items) for i in range(block)]
+
+    print(f"{'entries':>8} {'store p50':>10} {'store p99':>10} {'get p50':>10} {'get p99':>10} {'cached':>8}")
+    for start in range(0, entries, block):
+        store_times = []
+        get_times = []
+        for i in range(start, start + block):
+            key = f"models:{i}"
+            data = responses[i % block]
+
+            t0 = time.perf_counter()
+            cache.store(key, data)
+            store_times.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            cache.get(key)
+            get_times.append(time.perf_counter() - t0)
+
+        store_times.sort()
+        get_times.sort()
+        print(f"{start + block:>8} "
+              f"{statistics.median(store_times) * 1e6:>8.1f}us "
+              f"{store_times[int(len(store_times) * 0.99)] * 1e6:>8.1f}us "
+              f"{statistics.median(get_times) * 1e6:>8.1f}us "
+              f"{get_times[int(len(get_times) * 0.99)] * 1e6:>8.1f}us "
+              f"{cache.get_cache_size():>8}")
+
+    stats = cache.get_statistics()
+    print(f"\nmemory usage: {stats['memory_usage'] / (1024 * 1024):.1f} MB, "
+          f"pressure evictions: {stats['memory_pressure_evictions']}")
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark ResponseCache store/get latency')
+    parser.add_argument('--entries', type=int, default=10000, help='Number of responses stored')
+    parser.add_argument('--block', type=int, default=1000, help='Entries per reported block')
+    parser.add_argument('--items', type=int, default=20, help='Models per response page')
+    parser.add_argument('--memory-mb', type=int, default=32, help='Cache memory threshold in MB')
+    args = parser.parse_args()
+
+    run_benchmark(args.entries, args.block, args.items, args.memory_mb)
+
+
+if __name__ == "__main__":
+    main()
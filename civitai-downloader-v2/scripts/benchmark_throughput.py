@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end throughput against a local fake CivitAI server.
+Starts the fake server (core.performance.fake_civitai) in a child process and
+runs DownloadManager, BulkDownloadManager and StreamingSearchEngine against
+it. Each scenario reports MB/s, API requests/s, CPU time and RSS of this
+process, plus the server-side counters (429s served, dropped connections,
+range requests). The result is one JSON document for regression tracking.
+
+Faults are opt-in: --rate-limit-every answers every Nth API request with 429
+and Retry-After, --slow-every throttles every Nth file and --flaky-every
+drops every Nth file's first download halfway, which exercises the retry and
+Range resume paths.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import psutil
+import yaml
+
+# Add the repository root to path (src modules use package-relative imports)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# Logging is set up below, inside the benchmark's work directory
+os.environ.setdefault('CIVITAI_AUTO_LOGGING', 'false')
+
+from src.api.client import CivitaiAPIClient
+from src.core.bulk.download_manager import BulkDownloadManager, BulkStatus
+from src.core.config.system_config import SystemConfig
+from src.core.download.manager import DownloadManager, DownloadStatus, create_file_info_from_api
+from src.core.logging_config import setup_logging, shutdown_async_logging
+from src.core.performance.fake_civitai import (
+    FakeCivitaiConfig, MB, build_model, config_dict, serve_in_process
+)
+from src.core.search.advanced_search import AdvancedSearchParams
+from src.core.search.search_engine import AdvancedSearchEngine
+from src.core.stream.intermediate_file_manager import IntermediateFileManager
+from src.core.stream.streaming_search_engine import StreamingSearchEngine
+from src.data.model_store import ModelStore
+
+SCENARIOS = ('download', 'bulk', 'search')
+TERMINAL_STATUSES = (DownloadStatus.COMPLETED, DownloadStatus.FAILED, DownloadStatus.CANCELLED)
+BULK_TERMINAL_STATUSES = (BulkStatus.COMPLETED, BulkStatus.FAILED, BulkStatus.CANCELLED)
+
+
+class ResourceMonitor:
+    """Wall time, CPU time and peak RSS of this process over a block."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.elapsed = 0.0
+        self.cpu_seconds = 0.0
+        self.rss_start = 0
+        self.rss_peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.rss_peak = max(self.rss_peak, self.process.memory_info().rss)
+
+    def __enter__(self) -> 'ResourceMonitor':
+        self.rss_start = self.rss_peak = self.process.memory_info().rss
+        cpu = self.process.cpu_times()
+        self._cpu_start = cpu.user + cpu.system
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name='benchmark-rss', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.elapsed = time.perf_counter() - self._start
+        cpu = self.process.cpu_times()
+        self.cpu_seconds = cpu.user + cpu.system - self._cpu_start
+        self._stop.set()
+        self._thread.join()
+        self.rss_peak = max(self.rss_peak, self.process.memory_info().rss)
+        return False
+
+    def results(self) -> Dict[str, float]:
+        return {
+            'elapsed_seconds': round(self.elapsed, 3),
+            'cpu_seconds': round(self.cpu_seconds, 3),
+            'cpu_percent': round(self.cpu_seconds / self.elapsed * 100, 1) if self.elapsed else 0.0,
+            'rss_start_mb': round(self.rss_start / MB, 1),
+            'rss_peak_mb': round(self.rss_peak / MB, 1),
+        }
+
+
+class ServerProcess:
+    """Fake CivitAI server in a child process, so its CPU time is not measured."""
+
+    def __init__(self, config: FakeCivitaiConfig):
+        self.config = config
+        self.base_url = ''
+        self._conn = None
+        self._process = None
+
+    @property
+    def api_url(self) -> str:
+        return f'{self.base_url}/api/v1'
+
+    def stats(self) -> Dict[str, int]:
+        with urllib.request.urlopen(f'{self.base_url}/__stats', timeout=10) as response:
+            return json.loads(response.read())
+
+    def __enter__(self) -> 'ServerProcess':
+        context = multiprocessing.get_context('spawn')
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=serve_in_process, args=(config_dict(self.config), child_conn),
+                                        name='fake-civitai', daemon=True)
+        self._process.start()
+        if not self._conn.poll(60):
+            self._process.terminate()
+            raise RuntimeError("Fake CivitAI server did not start")
+        self.base_url = self._conn.recv()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self._conn.send('stop')
+        except OSError:
+            pass
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.terminate()
+        return False
+
+
+def make_config(workdir: Path, chunk_size: int, batch_size: int) -> SystemConfig:
+    """System configuration writing downloads into the work directory."""
+    workdir.mkdir(parents=True, exist_ok=True)
+    path = workdir / 'config.yaml'
+    path.write_text(yaml.safe_dump({
+        'download': {
+            'chunk_size': chunk_size,
+            'paths': {'models': str(workdir / 'downloads'), 'temp': str(workdir / 'temp')}
+        },
+        'bulk': {'batch_size': batch_size}
+    }), encoding='utf-8')
+    return SystemConfig(str(path))
+
+
+def catalog(server: ServerProcess, count: int) -> List[Dict[str, Any]]:
+    """The first ``count`` models the server lists."""
+    return [build_model(model_id, server.base_url, server.config) for model_id in range(1, count + 1)]
+
+
+async def wait_for_tasks(manager: DownloadManager, task_ids: List[str], deadline: float) -> bool:
+    """Wait until every task reached a terminal status (retries run as new asyncio tasks)."""
+    while time.monotonic() < deadline:
+        if all(manager.tasks[task_id].status in TERMINAL_STATUSES
+               for task_id in task_ids if task_id in manager.tasks):
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+def scenario_result(name: str, monitor: ResourceMonitor, before: Dict[str, int], after: Dict[str, int],
+                    tasks: List[Any] = (), files: int = 0, errors: List[str] = (),
+                    **extra: Any) -> Dict[str, Any]:
+    """Build the JSON result of one scenario."""
+    server = {key: value - before.get(key, 0) for key, value in after.items()}
+    completed = [task for task in tasks if task.status == DownloadStatus.COMPLETED]
+    transferred = sum(task.downloaded_bytes for task in completed)
+    elapsed = monitor.elapsed or float('inf')
+    result = {
+        'scenario': name,
+        **monitor.results(),
+        'files_completed': len(completed),
+        'files_failed': max(0, files - len(completed)),
+        'bytes': transferred,
+        'mb_per_second': round(transferred / MB / elapsed, 2),
+        'api_requests': server.get('api_requests', 0),
+        'requests_per_second': round(server.get('api_requests', 0) / elapsed, 2),
+        'retries': sum(getattr(task, 'retry_count', 0) for task in tasks),
+        'server': server,
+    }
+    result.update(extra)
+    result['errors'] = sorted(set(errors))[:5]
+    return result
+
+
+async def bench_download(server: ServerProcess, args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    """Sequential DownloadManager downloads of ``args.files`` files."""
+    manager = DownloadManager(config=make_config(workdir / 'download', args.chunk_size, args.batch_size))
+    files = [create_file_info_from_api(model['modelVersions'][0]['files'][0])
+             for model in catalog(server, args.files)]
+    task_ids = []
+    before = server.stats()
+    with ResourceMonitor() as monitor:
+        deadline = time.monotonic() + args.timeout
+        for file_info in files:
+            task_id = manager.create_download_task(file_info)
+            task_ids.append(task_id)
+            await manager.start_download(task_id)
+            await wait_for_tasks(manager, [task_id], deadline)
+    after = server.stats()
+    await manager.close()
+
+    tasks = [manager.tasks[task_id] for task_id in task_ids]
+    # Errors of downloads that later succeeded on retry only show up as 'retries'
+    return scenario_result('download', monitor, before, after, tasks, len(files),
+                           [task.error_message for task in tasks
+                            if task.error_message and task.status != DownloadStatus.COMPLETED])
+
+
+async def bench_bulk(server: ServerProcess, args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    """One BulkDownloadManager job over ``args.files`` models."""
+    config = make_config(workdir / 'bulk', args.chunk_size, args.batch_size)
+    download_manager = DownloadManager(config=config)
+    bulk = BulkDownloadManager(download_manager=download_manager, config=config)
+    # The bulk manager reads versions as objects holding the API file dicts
+    results = [SimpleNamespace(id=model['id'], name=model['name'],
+                               model_versions=[SimpleNamespace(id=v['id'], name=v['name'], files=v['files'])
+                                               for v in model['modelVersions']])
+               for model in catalog(server, args.files)]
+    before = server.stats()
+    with ResourceMonitor() as monitor:
+        deadline = time.monotonic() + args.timeout
+        job_id = bulk.create_bulk_job(results, name='benchmark')
+        job = bulk.jobs[job_id]
+        while job.status not in BULK_TERMINAL_STATUSES and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+    after = server.stats()
+    await bulk.stop()
+    await download_manager.close()
+
+    tasks = [download_manager.tasks[task_id] for task_id in job.download_tasks.values()
+             if task_id in download_manager.tasks]
+    errors = [str(error.get('error')) for error in job.errors]
+    errors += [task.error_message for task in tasks
+               if task.error_message and task.status != DownloadStatus.COMPLETED]
+    return scenario_result('bulk', monitor, before, after, tasks, job.total_files, errors,
+                           job_status=job.status.value)
+
+
+async def bench_search(server: ServerProcess, args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    """StreamingSearchEngine run over ``args.models`` models."""
+    search_dir = workdir / 'search'
+    client = CivitaiAPIClient(base_url=server.api_url, requests_per_second=args.api_rps)
+    engine = AdvancedSearchEngine(api_client=client, model_store=ModelStore(db_path=search_dir / 'models.db'))
+    streaming = StreamingSearchEngine(engine, IntermediateFileManager(cache_dir=str(search_dir / 'intermediate')))
+    params = AdvancedSearchParams(limit=args.models)
+    summary: Dict[str, Any] = {}
+    errors = []
+    before = server.stats()
+    with ResourceMonitor() as monitor:
+        try:
+            _, summary = await asyncio.wait_for(
+                streaming.streaming_search_with_recovery(params, batch_size=args.page_size, force_refresh=True),
+                timeout=args.timeout)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+    after = server.stats()
+    await client.close()
+
+    models = summary.get('raw_models', 0)
+    return scenario_result('search', monitor, before, after, errors=errors,
+                           models_fetched=models,
+                           models_processed=summary.get('processed_models', 0),
+                           models_per_second=round(models / monitor.elapsed, 1) if monitor.elapsed else 0.0)
+
+
+BENCHMARKS = {'download': bench_download, 'bulk': bench_bulk, 'search': bench_search}
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run the selected scenarios.
+
+    Args:
+        args: Parsed command line
+
+    Returns:
+        JSON-serializable benchmark result
+    """
+    server_config = FakeCivitaiConfig(
+        models=max(args.models, args.files),
+        file_size=args.file_size_mb * MB,
+        api_latency=args.api_latency_ms / 1000,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+        slow_every=args.slow_every,
+        slow_bytes_per_second=int(args.slow_mbps * MB),
+        flaky_every=args.flaky_every,
+    )
+    results = []
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix='civitai-bench-') as temp_dir:
+        workdir = Path(temp_dir)
+        setup_logging(log_dir=workdir / 'logs', async_mode=args.async_logging,
+                      json_format=args.log_format == 'json', rate_limit=0)
+        # Components fall back to relative default paths; keep them in the work directory
+        os.chdir(workdir)
+        try:
+            with ServerProcess(server_config) as server:
+                for name in args.scenarios:
+                    result = asyncio.run(BENCHMARKS[name](server, args, workdir))
+                    results.append(result)
+                    print(f"{name}: {result['mb_per_second']} MB/s, {result['requests_per_second']} req/s, "
+                          f"{result['elapsed_seconds']}s, cpu {result['cpu_percent']}%, "
+                          f"rss peak {result['rss_peak_mb']} MB", file=sys.stderr)
+        finally:
+            os.chdir(cwd)
+            shutdown_async_logging()
+
+    return {
+        'benchmark': 'throughput',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'parameters': {
+            'scenarios': list(args.scenarios),
+            'files': args.files,
+            'models': args.models,
+            'page_size': args.page_size,
+            'chunk_size': args.chunk_size,
+            'batch_size': args.batch_size,
+            'api_rps': args.api_rps,
+            'async_logging': args.async_logging,
+            'log_format': args.log_format,
+        },
+        'server': config_dict(server_config),
+        'results': results,
+    }
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark download/search throughput against a fake CivitAI server')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f'Comma-separated scenarios ({", ".join(SCENARIOS)})')
+    parser.add_argument('--files', type=int, default=8, help='Files downloaded by the download and bulk scenarios')
+    parser.add_argument('--file-size-mb', type=int, default=4, help='Size of each served file in MB')
+    parser.add_argument('--models', type=int, default=200, help='Models fetched by the search scenario')
+    parser.add_argument('--page-size', type=int, default=50, help='Search page size')
+    parser.add_argument('--chunk-size', type=int, default=8192, help='download.chunk_size in bytes')
+    parser.add_argument('--batch-size', type=int, default=5, help='bulk.batch_size')
+    parser.add_argument('--api-rps', type=float, default=50.0, help='API client rate limit (requests/s)')
+    parser.add_argument('--api-latency-ms', type=float, default=0.0, help='Latency added to every API response')
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='Answer every Nth API request with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds of the 429 responses')
+    parser.add_argument('--slow-every', type=int, default=0, help='Throttle every Nth file')
+    parser.add_argument('--slow-mbps', type=float, default=1.0, help='Rate of throttled files in MB/s')
+    parser.add_argument('--flaky-every', type=int, default=0, help='Drop every Nth file halfway on first download')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Seconds allowed per scenario')
+    parser.add_argument('--async-logging', action='store_true', help='Log through the queue listener')
+    parser.add_argument('--log-format', choices=['text', 'json'], default='text', help='Log file format')
+    parser.add_argument('--output', '-o', help='Write the JSON result to this file (default: stdout)')
+    args = parser.parse_args()
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in args.scenarios if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    result = json.dumps(run_benchmark(args), indent=2)
+    if args.output:
+        Path(args.output).write_text(result + '\n', encoding='utf-8')
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        # setup_logging() wraps sys.stdout; write the document unfiltered
+        sys.__stdout__.write(result + '\n')
+
+
+if __name__ == "__main__":
+    main()
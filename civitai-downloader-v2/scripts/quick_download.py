@@ -200,6 +200,9 @@ async def quick_selective_download(
         from core.config.system_config import SystemConfig
         from core.download.manager import DownloadManager
         from utils.download_organizer import DownloadOrganizer
+        from api.model_resolver import ModelResolver
+        sys.path.insert(0, str(Path(__file__).parent.parent))
+        from src.data.model_store import ModelStore
         
         config = SystemConfig()
         api_key = config.get('api.api_key')
@@ -207,160 +210,157 @@ async def quick_selective_download(
         # Initialize download manager
         download_manager = DownloadManager()
         
+        # One client for the whole run; model lookups are batched
+        api_client = CivitaiAPIClient(api_key=api_key)
+        resolver = ModelResolver(api_client, ModelStore(db_path))
+        
         downloaded_count = 0
         failed_count = 0
         processed_count = 0  # Actually processed (not skipped) models
         
         # Create overall progress bar
         with tqdm(total=len(models), desc="Downloading models", unit="model") as pbar:
-            for model in models:
-                model_id = model[0]
-                model_name = model[1]
+            # Model data comes from the local store, the cache, or ids= requests of up to 100
+            model_names = {model[0]: model[1] for model in models}
+            async for model_id, model_data in resolver.resolve(list(model_names)):
+                model_name = model_names[model_id]
             
                 # Increment processed count (all models in the list should be downloadable)
                 processed_count += 1
                 logger.info(f"📥 [{processed_count}] Downloading: {model_name}")
             
                 try:
-                    async with CivitaiAPIClient(api_key=api_key) as api_client:
-                        # Get model information from CivitAI API
-                        logger.info(f"🌐 Making API call: get_models({{'ids': '{model_id}', 'limit': 1}})")
-                        model_response = await api_client.get_models({'ids': str(model_id), 'limit': 1})
-                        
-                        logger.info(f"📊 API Response: type={type(model_response)}, keys={list(model_response.keys()) if isinstance(model_response, dict) else 'Not dict'}")
-                        
-                        if not model_response.get('items'):
-                            logger.error(f"❌ Model {model_id} not found on CivitAI")
-                            logger.error(f"📊 Full API response: {model_response}")
-                            failed_count += 1
-                            continue
-                        
-                        model_data = model_response['items'][0]
-                        versions = model_data.get('modelVersions', [])
-                        
-                        if not versions:
-                            logger.error(f"❌ No versions found for model {model_id}")
-                            failed_count += 1
-                            continue
-                        
-                        # Use the latest version
-                        latest_version = versions[0]
-                        version_id = latest_version['id']
-                        download_url = latest_version.get('downloadUrl')
-                        
-                        if not download_url:
-                            download_url = f"https://civitai.com/api/download/models/{version_id}"
-                        
-                        # Set up organized folder structure
-                        organizer = DownloadOrganizer(output_dir)
-                        folder_path, category = organizer.determine_folder_structure(model_data)
+                    if not model_data:
+                        logger.error(f"❌ Model {model_id} not found on CivitAI: "
+                                     f"{resolver.errors.get(model_id, 'Model not found')}")
+                        failed_count += 1
+                        continue
+                    
+                    versions = model_data.get('modelVersions', [])
+                    
+                    if not versions:
+                        logger.error(f"❌ No versions found for model {model_id}")
+                        failed_count += 1
+                        continue
+                    
+                    # Use the latest version
+                    latest_version = versions[0]
+                    version_id = latest_version['id']
+                    download_url = latest_version.get('downloadUrl')
+                    
+                    if not download_url:
+                        download_url = f"https://civitai.com/api/download/models/{version_id}"
+                    
+                    # Set up organized folder structure
+                    organizer = DownloadOrganizer(output_dir)
+                    folder_path, category = organizer.determine_folder_structure(model_data)
+                    
+                    # Get base model abbreviation
+                    base_model = latest_version.get('baseModel', 'Unknown')
+                    base_model_abbr = {
+                        'Illustrious': 'IL',
+                        'NoobAI': 'NAI',
+                        'Flux.1 D': 'FLU',
+                        'Flux.1 S': 'FLS',
+                        'Flux.1': 'FL',
+                        'Pony': 'PO',
+                        'SDXL 1.0': 'XL',
+                        'SD 1.5': 'SD',
+                    }.get(base_model, base_model[:3].upper())
+                    
+                    # Create filename: [ID]ModelName_BaseModel.safetensors
+                    model_name_safe = organizer._sanitize_filename(model_name)
+                    # Limit model name length to avoid too long filenames
+                    if len(model_name_safe) > 40:
+                        model_name_safe = model_name_safe[:40]
+                    filename = f"[{model_id}]{model_name_safe}_{base_model_abbr}.safetensors"
+                    
+                    logger.info(f"📦 Version: {latest_version['name']}")
+                    logger.info(f"📄 Filename: {filename}")
+                    
+                    # Create folder if needed
+                    folder_path.mkdir(parents=True, exist_ok=True)
+                    
+                    logger.info(f"📁 Folder: {folder_path}")
+                    
+                    # Perform actual download
+                    result = await download_manager.download_file(
+                        url=download_url,
+                        output_dir=str(folder_path),
+                        filename=filename
+                    )
+                    
+                    logger.info(f"📊 Download result: success={result.success}, file_path={result.file_path}, error={result.error_message}")
+                    
+                    if result.success:
+                        logger.info(f"✅ Download completed: {result.file_path}")
                         
-                        # Get base model abbreviation
-                        base_model = latest_version.get('baseModel', 'Unknown')
-                        base_model_abbr = {
-                            'Illustrious': 'IL',
-                            'NoobAI': 'NAI',
-                            'Flux.1 D': 'FLU',
-                            'Flux.1 S': 'FLS',
-                            'Flux.1': 'FL',
-                            'Pony': 'PO',
-                            'SDXL 1.0': 'XL',
-                            'SD 1.5': 'SD',
-                        }.get(base_model, base_model[:3].upper())
+                        # Organize downloaded files and create metadata
+                        try:
+                            download_result = {
+                                'file_path': result.file_path,
+                                'success': True
+                            }
+                            organization_result = await organizer.organize_model_download(
+                                model_data, 
+                                download_result,
+                                create_info_files=True,
+                                base_filename=filename
+                            )
+                            logger.info(f"📋 Created metadata files and preview images")
+                        except Exception as e:
+                            logger.warning(f"⚠️  Failed to organize files: {e}")
                         
-                        # Create filename: [ID]ModelName_BaseModel.safetensors
-                        model_name_safe = organizer._sanitize_filename(model_name)
-                        # Limit model name length to avoid too long filenames
-                        if len(model_name_safe) > 40:
-                            model_name_safe = model_name_safe[:40]
-                        filename = f"[{model_id}]{model_name_safe}_{base_model_abbr}.safetensors"
-                        
-                        logger.info(f"📦 Version: {latest_version['name']}")
-                        logger.info(f"📄 Filename: {filename}")
-                        
-                        # Create folder if needed
-                        folder_path.mkdir(parents=True, exist_ok=True)
-                        
-                        logger.info(f"📁 Folder: {folder_path}")
-                        
-                        # Perform actual download
-                        result = await download_manager.download_file(
-                            url=download_url,
-                            output_dir=str(folder_path),
-                            filename=filename
-                        )
-                        
-                        logger.info(f"📊 Download result: success={result.success}, file_path={result.file_path}, error={result.error_message}")
-                        
-                        if result.success:
-                            logger.info(f"✅ Download completed: {result.file_path}")
+                        # Record download in database
+                        try:
+                            import datetime
+                            download_data = {
+                                'model_id': model_id,
+                                'file_id': None,
+                                'file_name': result.file_path.name if hasattr(result.file_path, 'name') else filename,
+                                'file_path': str(result.file_path),
+                                'download_url': download_url,
+                                'file_size': getattr(result, 'file_size', None),
+                                'hash_sha256': getattr(result, 'hash_sha256', None),
+                                'status': 'completed',
+                                'downloaded_at': datetime.datetime.now().isoformat()
+                            }
+                            
+                            # Insert into database
+                            conn_db = sqlite3.connect(db_path)
+                            cursor_db = conn_db.cursor()
+                            
+                            cursor_db.execute('''
+                                INSERT OR REPLACE INTO downloads 
+                                (model_id, file_id, file_name, file_path, download_url, file_size, hash_sha256, status, downloaded_at)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            ''', (
+                                download_data['model_id'],
+                                download_data['file_id'],
+                                download_data['file_name'],
+                                download_data['file_path'],
+                                download_data['download_url'],
+                                download_data['file_size'],
+                                download_data['hash_sha256'],
+                                download_data['status'],
+                                download_data['downloaded_at']
+                            ))
                             
-                            # Organize downloaded files and create metadata
-                            try:
-                                download_result = {
-                                    'file_path': result.file_path,
-                                    'success': True
-                                }
-                                organization_result = await organizer.organize_model_download(
-                                    model_data, 
-                                    download_result,
-                                    create_info_files=True,
-                                    base_filename=filename
-                                )
-                                logger.info(f"📋 Created metadata files and preview images")
-                            except Exception as e:
-                                logger.warning(f"⚠️  Failed to organize files: {e}")
+                            conn_db.commit()
+                            conn_db.close()
                             
-                            # Record download in database
-                            try:
-                                import datetime
-                                download_data = {
-                                    'model_id': model_id,
-                                    'file_id': None,
-                                    'file_name': result.file_path.name if hasattr(result.file_path, 'name') else filename,
-                                    'file_path': str(result.file_path),
-                                    'download_url': download_url,
-                                    'file_size': getattr(result, 'file_size', None),
-                                    'hash_sha256': getattr(result, 'hash_sha256', None),
-                                    'status': 'completed',
-                                    'downloaded_at': datetime.datetime.now().isoformat()
-                                }
-                                
-                                # Insert into database
-                                conn_db = sqlite3.connect(db_path)
-                                cursor_db = conn_db.cursor()
-                                
-                                cursor_db.execute('''
-                                    INSERT OR REPLACE INTO downloads 
-                                    (model_id, file_id, file_name, file_path, download_url, file_size, hash_sha256, status, downloaded_at)
-                                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                ''', (
-                                    download_data['model_id'],
-                                    download_data['file_id'],
-                                    download_data['file_name'],
-                                    download_data['file_path'],
-                                    download_data['download_url'],
-                                    download_data['file_size'],
-                                    download_data['hash_sha256'],
-                                    download_data['status'],
-                                    download_data['downloaded_at']
-                                ))
-                                
-                                conn_db.commit()
-                                conn_db.close()
-                                
-                                logger.info(f"📝 Recorded download in database: {model_id}")
-                                
-                            except Exception as e:
-                                logger.warning(f"⚠️  Failed to record download in database: {e}")
+                            logger.info(f"📝 Recorded download in database: {model_id}")
                             
-                            downloaded_count += 1
-                        else:
-                            error_msg = result.error_message or "Unknown error"
-                            logger.error(f"❌ Download failed: {error_msg}")
-                            logger.error(f"📊 Download result details: {result}")
-                            failed_count += 1
+                        except Exception as e:
+                            logger.warning(f"⚠️  Failed to record download in database: {e}")
                         
+                        downloaded_count += 1
+                    else:
+                        error_msg = result.error_message or "Unknown error"
+                        logger.error(f"❌ Download failed: {error_msg}")
+                        logger.error(f"📊 Download result details: {result}")
+                        failed_count += 1
+                    
                 except Exception as e:
                     failed_count += 1
                     logger.error(f"❌ Error downloading {model_name}: {e}")
@@ -377,8 +377,9 @@ async def quick_selective_download(
         
         logger.info(f"🎉 Download completed! ✅ {downloaded_count} successful, ❌ {failed_count} failed")
         
-        # Close download manager
+        # Close download manager and API client
         await download_manager.close()
+        await api_client.close()
         
         # Close database connection
         conn.close()
@@ -388,12 +389,16 @@ async def quick_selective_download(
         logger.info("💡 Please run from project root or ensure all dependencies are installed")
         if 'download_manager' in locals():
             await download_manager.close()
+        if 'api_client' in locals():
+            await api_client.close()
         if 'conn' in locals():
             conn.close()
     except Exception as e:
         logger.error(f"❌ Unexpected error: {e}")
         if 'download_manager' in locals():
             await download_manager.close()
+        if 'api_client' in locals():
+            await api_client.close()
         if 'conn' in locals():
             conn.close()
         raise
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """
-Restore missing metadata JSON files by fetching from CivitAI API
-using information from existing .civitai.info files
+Restore missing metadata JSON files by fetching from CivitAI API.
+Model ids come from .civitai.info sidecars; model files that lack both their
+.json and a sidecar are identified by content hash through the file inventory,
+which only re-hashes new or changed files.
 """
 
 import asyncio
@@ -10,11 +12,12 @@ import sys
 from pathlib import Path
 import logging
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+# Add the project root to path (one import root: src.*)
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from api.client import CivitaiAPIClient
-from core.config.system_config import SystemConfig
+from src.api.client import CivitaiAPIClient
+from src.core.config.system_config import SystemConfig
+from src.data.file_inventory import FileInventory, MODEL_FILE_EXTENSIONS
 
 # Setup logging
 logging.basicConfig(
@@ -24,45 +27,54 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def restore_metadata_files(base_dir: str = "/Volumes/Create-Images/Civitiai-download"):
+async def restore_metadata_files(base_dir: str = "/Volumes/Create-Images/Civitiai-download",
+                                 hash_workers: int = 4):
     """
     Restore missing metadata JSON files from CivitAI API
     """
     base_path = Path(base_dir)
     
-    # Find all .civitai.info files
-    civitai_info_files = list(base_path.rglob("*.civitai.info"))
-    logger.info(f"Found {len(civitai_info_files)} .civitai.info files")
+    restored_count = 0
+    skipped_count = 0
+    unresolved_count = 0
+    failed_count = 0
+    
+    # Model files missing their JSON, with the model id of their .civitai.info sidecar
+    missing = {}
+    for model_file in sorted(base_path.rglob("*")):
+        if model_file.suffix.lower() not in MODEL_FILE_EXTENSIONS or not model_file.is_file():
+            continue
+        if (model_file.parent / f"{model_file.stem}.json").exists():
+            logger.debug(f"⏭️  JSON already exists for {model_file.name}")
+            skipped_count += 1
+            continue
+        sidecar = FileInventory.read_sidecar(model_file)
+        missing[model_file] = sidecar[0] if sidecar else None
+    logger.info(f"Found {len(missing)} model files without metadata JSON")
+    
+    # Files without a sidecar are identified by content hash (cached in the inventory)
+    unidentified = [model_file for model_file, model_id in missing.items() if not model_id]
+    if unidentified:
+        inventory = FileInventory(hash_workers=hash_workers)
+        scan_result = inventory.scan(base_path, paths=unidentified)
+        logger.info(f"Inventory: {scan_result.hashed} hashed, {scan_result.unchanged} unchanged")
+        resolved = {entry['path']: entry['model_id'] for entry in inventory.entries(base_path)}
+        for model_file in unidentified:
+            missing[model_file] = resolved.get(str(model_file.resolve()))
     
     # Get API key
     config = SystemConfig()
     api_key = config.get('api.api_key')
     
-    restored_count = 0
-    skipped_count = 0
-    failed_count = 0
-    
     async with CivitaiAPIClient(api_key=api_key) as api_client:
-        for info_file in civitai_info_files:
+        for model_file, model_id in missing.items():
             try:
-                # Check if corresponding JSON file exists
-                # Remove .civitai.info and add .json
-                base_name = str(info_file.name).replace('.civitai.info', '')
-                json_file = info_file.parent / f"{base_name}.json"
-                
-                if json_file.exists():
-                    logger.debug(f"⏭️  JSON already exists for {info_file.name}")
-                    skipped_count += 1
-                    continue
-                
-                # Read civitai.info file
-                with open(info_file, 'r', encoding='utf-8') as f:
-                    info_data = json.load(f)
+                base_name = model_file.stem
+                json_file = model_file.parent / f"{base_name}.json"
                 
-                model_id = info_data.get('modelId')
                 if not model_id:
-                    logger.warning(f"⚠️  No modelId in {info_file.name}")
-                    failed_count += 1
+                    logger.debug(f"❔ No sidecar or catalog match for {model_file.name}")
+                    unresolved_count += 1
                     continue
                 
                 logger.info(f"🔄 Restoring metadata for model {model_id}: {base_name}")
@@ -88,12 +100,13 @@ async def restore_metadata_files(base_dir: str = "/Volumes/Create-Images/Civitia
                 await asyncio.sleep(0.5)
                 
             except Exception as e:
-                logger.error(f"❌ Error processing {info_file.name}: {e}")
+                logger.error(f"❌ Error processing {model_file.name}: {e}")
                 failed_count += 1
     
     logger.info(f"\n🎉 Restoration completed!")
     logger.info(f"✅ Restored: {restored_count}")
     logger.info(f"⏭️  Skipped (already exists): {skipped_count}")
+    logger.info(f"❔ Unresolved (no sidecar or catalog match): {unresolved_count}")
     logger.info(f"❌ Failed: {failed_count}")
 
 
@@ -108,6 +121,12 @@ async def main():
         default="/Volumes/Create-Images/Civitiai-download",
         help='Base directory to scan for missing metadata'
     )
+    parser.add_argument(
+        '--hash-workers',
+        type=int,
+        default=4,
+        help='Number of files hashed in parallel when updating the inventory'
+    )
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -120,7 +139,7 @@ async def main():
         logger.info("🔍 DRY RUN MODE - No files will be created")
         # TODO: Implement dry run logic
     else:
-        await restore_metadata_files(args.base_dir)
+        await restore_metadata_files(args.base_dir, args.hash_workers)
 
 
 if __name__ == "__main__":
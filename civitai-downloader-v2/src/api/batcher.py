@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Model request batcher for CivitAI API.
+Merges concurrent single-model lookups into one /models?ids= request so bulk
+operations resolve up to 100 models per API call.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+
+class ModelBatcher:
+    """Collects get_model(id) calls for a short window and fetches them together."""
+
+    def __init__(self, client: Any, max_batch_size: int = 100, batch_window: float = 0.01):
+        """
+        Initialize model batcher.
+
+        Args:
+            client: CivitaiAPIClient used for the batched requests
+            max_batch_size: Maximum ids per request (API page size limit)
+            batch_window: Seconds to wait for more ids before sending a batch
+        """
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.batches_sent = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def cache_key(self, model_id: int) -> str:
+        """Memory cache key of a single resolved model."""
+        return self.client.cache.generate_cache_key("model", {"id": model_id})
+
+    async def get(self, model_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get one model, batched with other concurrent lookups.
+
+        Args:
+            model_id: Model ID
+
+        Returns:
+            Model data or None if the model does not exist
+        """
+        model_id = int(model_id)
+        cached = self.client.cache.get(self.cache_key(model_id))
+        if cached is not None:
+            return cached
+
+        future = self._pending.get(model_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[model_id] = future
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        # Shield so one cancelled caller does not cancel the lookup for the others
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        """Send the pending ids as one request."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: Dict[int, asyncio.Future]) -> None:
+        ids = sorted(batch)
+        self.batches_sent += 1
+        try:
+            response = await self.client.get_models({'ids': ids, 'limit': len(ids)})
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        found = {item.get('id'): item for item in response.get('items', [])}
+        for model_id, future in batch.items():
+            model = found.get(model_id)
+            if model is not None:
+                self.client.cache.store(self.cache_key(model_id), model)
+            if not future.done():
+                future.set_result(model)
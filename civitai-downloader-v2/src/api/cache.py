@@ -4,15 +4,25 @@ Response Cache for CivitAI API requests.
 Implements TTL-based caching with LRU eviction and memory pressure handling.
 """
 
-import hashlib
 import json
 import sys
 import threading
 from collections import OrderedDict
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Any, Dict, Optional
 from dataclasses import dataclass
 
+try:
+    from .query_key import digest_params
+except ImportError:
+    # Loaded outside the package (e.g. by file path)
+    sys.path.insert(0, str(Path(__file__).parent))
+    from query_key import digest_params
+
+# Approximate per-entry bookkeeping overhead (OrderedDict node, entry dict)
+ENTRY_OVERHEAD = 200
+
 
 @dataclass
 class LRUConfig:
@@ -53,6 +63,9 @@ class ResponseCache:
         # Use OrderedDict for LRU tracking
         self.cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
         
+        # Running total of entry sizes, updated on insert/remove
+        self._memory_usage = 0
+        
         # Statistics tracking
         self.hit_count = 0
         self.miss_count = 0
@@ -68,37 +81,32 @@ class ResponseCache:
         
         Args:
             endpoint: API endpoint
-            params: Request parameters
+            params: Request parameters (mapping, parameter dataclass or QueryKey)
             
         Returns:
             Cache key string
         """
-        # Sort parameters for consistent key generation
-        sorted_params = json.dumps(params, sort_keys=True)
-        cache_data = f"{endpoint}:{sorted_params}"
-        
-        # Use hash for shorter keys
-        return hashlib.md5(cache_data.encode()).hexdigest()
+        # Normalized params (sorted lists, unset values dropped) so
+        # equivalent requests share one entry
+        return digest_params(params, endpoint)
     
-    def store(self, cache_key: str, data: Any) -> None:
+    def store(self, cache_key: str, data: Any, size: Optional[int] = None) -> None:
         """
         Store data in cache with timestamp and LRU tracking.
         
         Args:
             cache_key: Cache key
             data: Data to cache
+            size: Size in bytes if already known (e.g. length of the response body)
         """
         def _store():
             # Update existing entry or add new one
-            self.cache[cache_key] = {
+            self._insert(cache_key, {
                 'data': data,
                 'timestamp': datetime.now(),
                 'access_count': 1,
-                'size': self._estimate_size(data)
-            }
-            
-            # Move to end (most recently used)
-            self.cache.move_to_end(cache_key)
+                'size': size if size is not None else self._estimate_size(data)
+            })
             
             # Check for eviction needs
             self._check_eviction_needs()
@@ -129,7 +137,7 @@ class ResponseCache:
             
             if datetime.now() > expiry_time:
                 # Cache expired, remove entry
-                del self.cache[cache_key]
+                self._remove(cache_key)
                 self.miss_count += 1
                 return None
             
@@ -161,6 +169,7 @@ class ResponseCache:
     def clear(self) -> None:
         """Clear all cached data."""
         self.cache.clear()
+        self._memory_usage = 0
     
     def cleanup_expired(self) -> int:
         """
@@ -179,7 +188,7 @@ class ResponseCache:
                     expired_keys.append(key)
             
             for key in expired_keys:
-                del self.cache[key]
+                self._remove(key)
             
             return len(expired_keys)
         
@@ -205,14 +214,8 @@ class ResponseCache:
         Returns:
             Estimated memory usage in bytes
         """
-        total_size = 0
-        for entry in self.cache.values():
-            total_size += entry.get('size', 0)
-        
-        # Add overhead for OrderedDict structure
-        total_size += len(self.cache) * 200  # Approximate overhead per entry
-        
-        return total_size
+        # Running total plus overhead for the OrderedDict structure
+        return self._memory_usage + len(self.cache) * ENTRY_OVERHEAD
     
     def set_memory_threshold(self, threshold_bytes: int) -> None:
         """Set memory threshold for pressure handling."""
@@ -231,22 +234,33 @@ class ResponseCache:
             self.lock = None
         self.lru_config.enable_thread_safety = enabled
     
+    def _insert(self, cache_key: str, entry: Dict[str, Any]) -> None:
+        """Insert or replace an entry as most recently used, keeping the size total."""
+        previous = self.cache.pop(cache_key, None)
+        if previous is not None:
+            self._memory_usage -= previous['size']
+        self.cache[cache_key] = entry
+        self._memory_usage += entry['size']
+    
+    def _remove(self, cache_key: str) -> None:
+        """Remove an entry, keeping the size total."""
+        entry = self.cache.pop(cache_key)
+        self._memory_usage -= entry['size']
+    
     def _estimate_size(self, data: Any) -> int:
-        """Estimate the size of data in bytes."""
+        """
+        Estimate the size of data in bytes.
+        
+        Uses the length of the serialized JSON (what the API sent), which is
+        computed in C instead of walking the structure in Python.
+        """
+        if isinstance(data, (str, bytes)):
+            return len(data)
         try:
-            if isinstance(data, (str, bytes)):
-                return len(data)
-            elif isinstance(data, (int, float)):
-                return sys.getsizeof(data)
-            elif isinstance(data, (list, tuple)):
-                return sum(self._estimate_size(item) for item in data)
-            elif isinstance(data, dict):
-                return sum(self._estimate_size(k) + self._estimate_size(v) for k, v in data.items())
-            else:
-                return sys.getsizeof(data)
-        except:
+            return len(json.dumps(data, separators=(',', ':'), default=str))
+        except (TypeError, ValueError):
             # Fallback estimation
-            return 1000
+            return sys.getsizeof(data)
     
     def _check_eviction_needs(self) -> None:
         """Check if eviction is needed due to size or memory pressure."""
@@ -265,7 +279,8 @@ class ResponseCache:
         """Evict the least recently used item."""
         if self.cache:
             # Remove from beginning (least recently used)
-            self.cache.popitem(last=False)
+            _, entry = self.cache.popitem(last=False)
+            self._memory_usage -= entry['size']
             self.eviction_count += 1
             if memory_pressure:
                 self.memory_pressure_evictions += 1
@@ -309,15 +324,15 @@ class ResponseCache:
     def restore_cache(self, backup_data: Dict[str, Any]) -> None:
         """Restore cache from backup data."""
         def _restore():
-            self.cache.clear()
+            self.clear()
             for key, entry in backup_data.items():
                 try:
-                    self.cache[key] = {
+                    self._insert(key, {
                         'data': entry['data'],
                         'timestamp': datetime.fromisoformat(entry['timestamp']),
                         'access_count': entry.get('access_count', 1),
                         'size': self._estimate_size(entry['data'])
-                    }
+                    })
                 except Exception:
                     continue  # Skip corrupted entries
             
@@ -6,6 +6,7 @@ Unified API client for CivitAI service integration with rate limiting, caching,
 
 import httpx
 import asyncio
+import logging
 from typing import Dict, Any, Optional, AsyncIterator, List
 import sys
 from pathlib import Path
@@ -16,8 +17,22 @@ sys.path.insert(0, str(api_dir))
 
 from rate_limiter import RateLimiter
 from cache import ResponseCache
+from batcher import ModelBatcher
+from disk_cache import DiskResponseCache, DiskCacheEntry
 from params import SearchParams
 
+try:
+    from ..data.model_record import decode_models_page
+    from ..core.performance.metrics import get_metrics_registry, API_REQUEST_SECONDS, API_REQUESTS_TOTAL
+    from ..core.performance.profiler import get_profiler
+except ImportError:
+    sys.path.insert(0, str(api_dir.parent))
+    from data.model_record import decode_models_page
+    from core.performance.metrics import get_metrics_registry, API_REQUEST_SECONDS, API_REQUESTS_TOTAL
+    from core.performance.profiler import get_profiler
+
+logger = logging.getLogger(__name__)
+
 
 class CivitaiAPIClient:
     """Unified API client for CivitAI services."""
@@ -28,7 +43,9 @@ class CivitaiAPIClient:
         base_url: str = "https://civitai.com/api/v1",
         timeout: int = 30,
         requests_per_second: float = 0.5,
-        cache_ttl: int = 300
+        cache_ttl: int = 300,
+        disk_cache_path: Optional[Path] = None,
+        stale_while_revalidate: int = 0
     ):
         """
         Initialize CivitAI API client.
@@ -39,12 +56,22 @@ class CivitaiAPIClient:
             timeout: Request timeout in seconds
             requests_per_second: Rate limit for requests
             cache_ttl: Cache TTL in seconds
+            disk_cache_path: SQLite file for the persistent cache tier (memory only if None)
+            stale_while_revalidate: Seconds after expiry during which cached data is
+                served while a background request revalidates it
         """
         self.api_key = api_key
         self.base_url = base_url
         self.timeout = timeout
         self.rate_limiter = RateLimiter(requests_per_second)
         self.cache = ResponseCache(cache_ttl)
+        self.disk_cache = DiskResponseCache(disk_cache_path) if disk_cache_path else None
+        self.stale_while_revalidate = stale_while_revalidate
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        
+        # Single-flight: in-flight requests by cache key
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.model_batcher = ModelBatcher(self)
         
         # Fallback manager for unofficial API features per design.md
         self.fallback_manager = self._init_fallback_manager()
@@ -73,31 +100,96 @@ class CivitaiAPIClient:
         
         return headers
     
-    async def get_models(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def get_models(self, params: Dict[str, Any], lazy: bool = False) -> Dict[str, Any]:
         """
         Get models from CivitAI API.
         
         Args:
             params: Search parameters
+            lazy: Decode items as compact ModelRecords over their raw JSON
+                (index fields decoded, everything else parsed on demand)
             
         Returns:
             API response with models data
         """
         # Check cache first
         cache_key = self.cache.generate_cache_key("models", params)
-        cached_result = self.cache.get(cache_key)
+        memory_key = self._memory_key(cache_key, lazy)
+        cached_result = self.cache.get(memory_key)
         
         if cached_result is not None:
             return cached_result
         
+        # Concurrent callers with the same key await one in-flight request
+        task = self._inflight.get(memory_key)
+        if task is None:
+            task = asyncio.ensure_future(self._get_models_uncached(dict(params), cache_key, lazy))
+            self._inflight[memory_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(memory_key, None))
+        return await asyncio.shield(task)
+    
+    @staticmethod
+    def _memory_key(cache_key: str, lazy: bool) -> str:
+        """Memory cache key: lazy pages are held apart from fully decoded ones (the disk body is shared)."""
+        return f"{cache_key}:lazy" if lazy else cache_key
+    
+    async def _get_models_uncached(self, params: Dict[str, Any], cache_key: str,
+                                   lazy: bool = False) -> Dict[str, Any]:
+        """Resolve a memory cache miss from the disk tier or the API."""
+        # Second tier: persistent cache
+        disk_entry = None
+        if self.disk_cache:
+            disk_entry = self.disk_cache.get(cache_key, decode_models_page) if lazy else self.disk_cache.get(cache_key)
+        if disk_entry is not None:
+            age = disk_entry.age()
+            if age < self.cache.ttl_seconds:
+                self.cache.store(self._memory_key(cache_key, lazy), disk_entry.data, size=disk_entry.size)
+                return disk_entry.data
+            if age < self.cache.ttl_seconds + self.stale_while_revalidate:
+                # Serve stale data while a refresh runs in the background
+                self._schedule_refresh(cache_key, params, disk_entry, lazy)
+                return disk_entry.data
+        
+        return await self._fetch_models(params, cache_key, disk_entry, lazy)
+    
+    async def _fetch_models(self, params: Dict[str, Any], cache_key: str,
+                            disk_entry: Optional[DiskCacheEntry] = None,
+                            lazy: bool = False) -> Dict[str, Any]:
+        """
+        Request models from the API, revalidating a cached entry if one is given.
+        
+        Args:
+            params: Search parameters
+            cache_key: Cache key of the request
+            disk_entry: Expired disk cache entry whose validators are sent
+            lazy: Decode items as ModelRecords over their raw JSON
+            
+        Returns:
+            API response with models data
+        """
+        profiler = get_profiler()
+        
         # Apply rate limiting
-        await self.rate_limiter.wait()
+        with profiler.span('rate_limit_wait'):
+            await self.rate_limiter.wait()
         
         # Make API request
         url = f"{self.base_url}/models"
         
         try:
-            response = await self._http_client.get(url, params=params)
+            validators = disk_entry.validators() if disk_entry is not None else {}
+            with profiler.span('api_wait'), get_metrics_registry().timer(API_REQUEST_SECONDS, {'endpoint': 'models'}):
+                if validators:
+                    response = await self._http_client.get(url, params=params, headers=validators)
+                else:
+                    response = await self._http_client.get(url, params=params)
+            get_metrics_registry().counter(API_REQUESTS_TOTAL, {'status': response.status_code}).inc()
+            
+            # Not modified: the cached body is still current
+            if response.status_code == 304 and disk_entry is not None:
+                self.disk_cache.touch(cache_key)
+                self.cache.store(self._memory_key(cache_key, lazy), disk_entry.data, size=disk_entry.size)
+                return disk_entry.data
             
             # Handle HTTP errors
             if response.status_code == 404:
@@ -109,10 +201,26 @@ class CivitaiAPIClient:
                 raise Exception(f"API error {response.status_code}: {response.text}")
             
             # Parse response
-            result = response.json()
+            body = getattr(response, 'content', None)
+            with profiler.span('json_decode'):
+                if lazy and isinstance(body, bytes):
+                    result = decode_models_page(body)
+                else:
+                    result = response.json()
             
-            # Cache successful response
-            self.cache.store(cache_key, result)
+            # Cache successful response (body length is the entry size)
+            self.cache.store(self._memory_key(cache_key, lazy), result,
+                             size=len(body) if isinstance(body, (bytes, str)) else None)
+            if self.disk_cache:
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                with profiler.span('cache_write'):
+                    self.disk_cache.store(
+                        cache_key, result,
+                        body=body if isinstance(body, bytes) else None,
+                        etag=etag if isinstance(etag, str) else None,
+                        last_modified=last_modified if isinstance(last_modified, str) else None
+                    )
             
             return result
             
@@ -127,6 +235,20 @@ class CivitaiAPIClient:
             # Wrap other exceptions
             raise Exception(f"API request failed: {str(e)}")
     
+    async def get_model(self, model_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a single model.
+        
+        Concurrent calls are merged into one ids= request of up to 100 ids.
+        
+        Args:
+            model_id: Model ID
+            
+        Returns:
+            Model data or None if not found
+        """
+        return await self.model_batcher.get(model_id)
+    
     async def get_models_paginated(self, params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
         """
         Get models with pagination support.
@@ -161,9 +283,37 @@ class CivitaiAPIClient:
                 # Stop pagination on error
                 break
     
+    def _schedule_refresh(self, cache_key: str, params: Dict[str, Any],
+                          disk_entry: DiskCacheEntry, lazy: bool = False) -> None:
+        """Start a background revalidation unless one is already running for the key."""
+        refresh_key = self._memory_key(cache_key, lazy)
+        task = self._refresh_tasks.get(refresh_key)
+        if task is not None and not task.done():
+            return
+        self._refresh_tasks[refresh_key] = asyncio.create_task(
+            self._refresh(cache_key, dict(params), disk_entry, lazy)
+        )
+    
+    async def _refresh(self, cache_key: str, params: Dict[str, Any],
+                       disk_entry: DiskCacheEntry, lazy: bool = False) -> None:
+        """Background revalidation of a stale entry."""
+        try:
+            await self._fetch_models(params, cache_key, disk_entry, lazy)
+        except Exception as e:
+            logger.debug(f"Background refresh failed for {cache_key}: {e}")
+        finally:
+            self._refresh_tasks.pop(self._memory_key(cache_key, lazy), None)
+    
     async def close(self) -> None:
         """Close the HTTP client."""
+        tasks = list(self._refresh_tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
         await self._http_client.aclose()
+        if self.disk_cache:
+            self.disk_cache.close()
     
     async def __aenter__(self):
         """Async context manager entry."""
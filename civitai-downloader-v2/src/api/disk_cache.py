@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Persistent response cache for CivitAI API requests.
+Second cache tier behind ResponseCache: compressed response bodies are kept in
+SQLite together with their ETag/Last-Modified validators, so later runs can
+answer from disk or revalidate with a conditional request instead of refetching.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DiskCacheEntry:
+    """Cached response read from disk."""
+    cache_key: str
+    data: Any
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    size: Optional[int] = None  # length of the uncompressed body
+
+    def age(self) -> float:
+        """Seconds since the response was fetched or last revalidated."""
+        return time.time() - self.stored_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class DiskResponseCache:
+    """SQLite-backed response cache keyed by ResponseCache.generate_cache_key."""
+
+    def __init__(self, db_path: Path, max_bytes: int = 256 * 1024 * 1024,
+                 max_age: int = 7 * 24 * 3600, compression_level: int = 6):
+        """
+        Initialize disk cache.
+
+        Args:
+            db_path: SQLite database file
+            max_bytes: Compressed size limit; least recently used entries are pruned beyond it
+            max_age: Entries not revalidated for this many seconds are pruned
+            compression_level: zlib compression level for bodies
+        """
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compression_level = compression_level
+        self.hit_count = 0
+        self.miss_count = 0
+        self.revalidated_count = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stores_since_prune = 0
+        # accessed_at of hits, written with the next store/prune/close instead of per read
+        self._pending_access: Dict[str, float] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=30.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS api_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_api_responses_accessed ON api_responses(accessed_at)"
+            )
+            self._conn.commit()
+            self._prune_locked()
+        return self._conn
+
+    def get(self, cache_key: str,
+            decoder: Callable[[bytes], Any] = json.loads) -> Optional[DiskCacheEntry]:
+        """
+        Read a cached response regardless of age.
+
+        Args:
+            cache_key: Cache key
+            decoder: Decodes the stored response body
+
+        Returns:
+            Cache entry or None if not cached
+        """
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute("""
+                    SELECT body, etag, last_modified, stored_at FROM api_responses WHERE cache_key = ?
+                """, (cache_key,)).fetchone()
+                if row is None:
+                    self.miss_count += 1
+                    return None
+                self._pending_access[cache_key] = time.time()
+                body = zlib.decompress(row[0])
+                data = decoder(body)
+            except (sqlite3.Error, zlib.error, ValueError) as e:
+                logger.warning(f"Disk cache read failed for {cache_key}: {e}")
+                self.miss_count += 1
+                return None
+
+        self.hit_count += 1
+        return DiskCacheEntry(cache_key, data, row[1], row[2], row[3], len(body))
+
+    def store(self, cache_key: str, data: Any, body: Optional[bytes] = None,
+              etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Store a response.
+
+        Args:
+            cache_key: Cache key
+            data: Decoded response (serialized if body is not given)
+            body: Raw JSON response body
+            etag: ETag response header
+            last_modified: Last-Modified response header
+        """
+        if body is None:
+            body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        compressed = zlib.compress(body, self.compression_level)
+        now = time.time()
+
+        with self._lock:
+            try:
+                conn = self._connection()
+                self._pending_access.pop(cache_key, None)
+                self._flush_access_locked()
+                conn.execute("""
+                    INSERT OR REPLACE INTO api_responses
+                    (cache_key, body, etag, last_modified, stored_at, accessed_at, size)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (cache_key, compressed, etag, last_modified, now, now, len(compressed)))
+                conn.commit()
+
+                self._stores_since_prune += 1
+                if self._stores_since_prune >= 100:
+                    self._prune_locked()
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache write failed for {cache_key}: {e}")
+
+    def touch(self, cache_key: str) -> None:
+        """Mark an entry fresh after a 304 Not Modified revalidation."""
+        with self._lock:
+            try:
+                now = time.time()
+                conn = self._connection()
+                self._pending_access.pop(cache_key, None)
+                conn.execute("UPDATE api_responses SET stored_at = ?, accessed_at = ? WHERE cache_key = ?",
+                             (now, now, cache_key))
+                conn.commit()
+                self.revalidated_count += 1
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache update failed for {cache_key}: {e}")
+
+    def invalidate(self, cache_key: str) -> None:
+        """Remove an entry."""
+        with self._lock:
+            conn = self._connection()
+            self._pending_access.pop(cache_key, None)
+            conn.execute("DELETE FROM api_responses WHERE cache_key = ?", (cache_key,))
+            conn.commit()
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            conn = self._connection()
+            self._pending_access.clear()
+            conn.execute("DELETE FROM api_responses")
+            conn.commit()
+
+    def prune(self) -> int:
+        """
+        Remove entries older than max_age and least recently used entries beyond max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            self._connection()
+            return self._prune_locked()
+
+    def _flush_access_locked(self) -> None:
+        """Write deferred accessed_at updates; the caller commits."""
+        if self._pending_access:
+            self._conn.executemany("UPDATE api_responses SET accessed_at = ? WHERE cache_key = ?",
+                                   [(accessed, key) for key, accessed in self._pending_access.items()])
+            self._pending_access.clear()
+
+    def _prune_locked(self) -> int:
+        conn = self._conn
+        self._stores_since_prune = 0
+        # LRU order needs the latest access times
+        self._flush_access_locked()
+        removed = conn.execute("DELETE FROM api_responses WHERE stored_at < ?",
+                               (time.time() - self.max_age,)).rowcount
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM api_responses").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            freed = 0
+            victims = []
+            for cache_key, size in conn.execute(
+                "SELECT cache_key, size FROM api_responses ORDER BY accessed_at"
+            ):
+                if freed >= excess:
+                    break
+                victims.append((cache_key,))
+                freed += size
+            conn.executemany("DELETE FROM api_responses WHERE cache_key = ?", victims)
+            removed += len(victims)
+
+        conn.commit()
+        return removed
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get disk cache statistics."""
+        with self._lock:
+            conn = self._connection()
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM api_responses"
+            ).fetchone()
+        return {
+            'entries': entries,
+            'compressed_bytes': size,
+            'max_bytes': self.max_bytes,
+            'hit_count': self.hit_count,
+            'miss_count': self.miss_count,
+            'revalidated_count': self.revalidated_count
+        }
+
+    def close(self) -> None:
+        """Write deferred access times and close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._flush_access_locked()
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Disk cache access time update failed: {e}")
+                self._conn.close()
+                self._conn = None
@@ -12,6 +12,13 @@ from dataclasses import dataclass, field
 from enum import Enum
 import asyncio
 
+try:
+    from ..core.performance.metrics import get_metrics_registry, FEATURE_SECONDS
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core.performance.metrics import get_metrics_registry, FEATURE_SECONDS
+
 
 class RiskLevel(Enum):
     """Risk levels for unofficial features."""
@@ -306,6 +313,7 @@ class FeatureManager:
         stats = self.feature_stats[feature_name]
         stats['total_attempts'] += 1
         stats['total_duration'] += duration
+        get_metrics_registry().histogram(FEATURE_SECONDS, {'feature': feature_name}).record(duration)
         
         if success:
             stats['success_count'] += 1
@@ -388,10 +396,14 @@ class FeatureManager:
         if attempts == 0:
             return None
         
+        # Duration percentiles of this process's calls
+        histogram = get_metrics_registry().histogram(FEATURE_SECONDS, {'feature': feature_name})
+        
         return {
             'usage_count': attempts,
             'success_rate': successes / attempts,
             'average_duration': duration / attempts,
+            'p95_duration': histogram.percentile(95),
             'last_used': stats.get('last_updated', 'Never')
         }
     
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Batched model-by-ID resolver.
+Resolves many model ids for bulk downloads: the local model store is consulted
+first, then the per-model response cache, and only the remaining ids are
+requested from the API in multi-id /models?ids= requests of up to 100 ids.
+Resolved models are yielded as soon as their chunk is available so downloads
+can start before every id is resolved.
+"""
+
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from ..core.performance.profiler import get_profiler
+
+logger = logging.getLogger(__name__)
+
+
+class ModelResolver:
+    """Resolve model ids to CivitAI model data with as few API requests as possible."""
+
+    def __init__(self, client: Any, model_store: Optional[Any] = None, chunk_size: int = 100):
+        """
+        Initialize model resolver.
+
+        Args:
+            client: CivitaiAPIClient used for remote lookups
+            model_store: ModelStore consulted first and updated with fetched models
+            chunk_size: Maximum ids per API request
+        """
+        self.client = client
+        self.model_store = model_store
+        self.chunk_size = chunk_size
+        self.errors: Dict[int, str] = {}
+        self.stats = {'local': 0, 'cached': 0, 'fetched': 0, 'missing': 0, 'requests': 0}
+
+    async def resolve(self, model_ids: Iterable[int]) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """
+        Resolve model ids.
+
+        Args:
+            model_ids: Model IDs (duplicates are resolved once)
+
+        Yields:
+            Tuples of (model_id, model data or None if not found / lookup failed)
+        """
+        pending = list(dict.fromkeys(int(model_id) for model_id in model_ids))
+
+        # 1. Local model store
+        if self.model_store is not None and pending:
+            try:
+                with get_profiler().span('resolve_local'):
+                    local = self.model_store.get_models_by_ids(pending)
+            except Exception as e:
+                logger.warning(f"Local model lookup failed: {e}")
+                local = {}
+            for model_id in pending:
+                if model_id in local:
+                    self.stats['local'] += 1
+                    yield model_id, local[model_id]
+            pending = [model_id for model_id in pending if model_id not in local]
+
+        # 2. Models cached by earlier lookups in this process
+        remaining: List[int] = []
+        for model_id in pending:
+            cached = self.client.cache.get(self.client.model_batcher.cache_key(model_id))
+            if cached is not None:
+                self.stats['cached'] += 1
+                yield model_id, cached
+            else:
+                remaining.append(model_id)
+
+        # 3. API, one multi-id request per chunk
+        for start in range(0, len(remaining), self.chunk_size):
+            chunk = remaining[start:start + self.chunk_size]
+            self.stats['requests'] += 1
+            try:
+                with get_profiler().span('resolve_fetch'):
+                    response = await self.client.get_models({'ids': chunk, 'limit': len(chunk)})
+            except Exception as e:
+                logger.error(f"Model lookup failed for {len(chunk)} ids: {e}")
+                for model_id in chunk:
+                    self.errors[model_id] = str(e)
+                    yield model_id, None
+                continue
+
+            found = {item.get('id'): item for item in response.get('items', [])}
+            if found and self.model_store is not None:
+                try:
+                    self.model_store.store_models(found.values())
+                except Exception as e:
+                    logger.warning(f"Failed to store resolved models: {e}")
+
+            for model_id in chunk:
+                model = found.get(model_id)
+                if model is not None:
+                    self.stats['fetched'] += 1
+                    self.client.cache.store(self.client.model_batcher.cache_key(model_id), model)
+                else:
+                    self.stats['missing'] += 1
+                    self.errors[model_id] = "Model not found"
+                yield model_id, model
@@ -9,6 +9,11 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
+try:
+    from .query_key import QueryKeyMixin
+except ImportError:
+    from query_key import QueryKeyMixin
+
 
 class ModelType(Enum):
     """Model types supported by CivitAI per requirements.md requirement 1.2."""
@@ -28,7 +33,7 @@ class ModelType(Enum):
 
 
 @dataclass
-class SearchParams:
+class SearchParams(QueryKeyMixin):
     """Basic search parameters for CivitAI API."""
     
     query: Optional[str] = None
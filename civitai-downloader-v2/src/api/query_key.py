@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Canonical query keys.
+One normalized, hashable representation of search parameters shared by the
+response cache, the database search cache and intermediate-file session ids.
+Lists are sorted and de-duplicated, enums and dates are reduced to their API
+values, and unset / default values are dropped so equivalent queries map to
+the same key.
+"""
+
+import dataclasses
+import hashlib
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+
+def _normalize(value: Any) -> Any:
+    """Reduce a parameter value to a canonical JSON-compatible value."""
+    if isinstance(value, Enum):
+        return _normalize(value.value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return _normalize_mapping({f.name: getattr(value, f.name) for f in dataclasses.fields(value)})
+    if isinstance(value, Mapping):
+        return _normalize_mapping(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = {_encode(item): item for item in (_normalize(v) for v in value) if not _is_empty(item)}
+        return [items[encoded] for encoded in sorted(items)]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _normalize_mapping(params: Mapping[str, Any], defaults: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    normalized = {}
+    for name, value in params.items():
+        if defaults is not None and name in defaults and value == defaults[name]:
+            continue
+        value = _normalize(value)
+        if not _is_empty(value):
+            normalized[str(name)] = value
+    return dict(sorted(normalized.items()))
+
+
+def _is_empty(value: Any) -> bool:
+    """None and empty containers mean "not set"."""
+    return value is None or (isinstance(value, (list, tuple, set, frozenset, dict)) and not value)
+
+
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def _encode(value: Any) -> str:
+    return _ENCODER.encode(value)
+
+
+class QueryKey:
+    """Immutable canonical form of a set of query parameters."""
+
+    __slots__ = ('params', 'canonical', '_hash', '_derived')
+
+    def __init__(self, params: Mapping[str, Any], defaults: Optional[Mapping[str, Any]] = None):
+        """
+        Initialize query key.
+
+        Args:
+            params: Query parameters (mapping of name to value)
+            defaults: Parameter defaults; parameters equal to their default are dropped
+        """
+        self.params = _normalize_mapping(params, defaults)
+        self.canonical = _encode(self.params)
+        self._hash = hash(self.canonical)
+        self._derived: Dict[Any, Any] = {}
+
+    @classmethod
+    def from_dataclass(cls, obj: Any) -> 'QueryKey':
+        """
+        Build the key of a parameters dataclass, dropping fields left at their default.
+
+        Args:
+            obj: Dataclass instance
+
+        Returns:
+            QueryKey of the instance
+        """
+        params = {}
+        defaults = {}
+        for f in dataclasses.fields(obj):
+            if f.name.startswith('_'):
+                continue
+            params[f.name] = getattr(obj, f.name)
+            if f.default is not dataclasses.MISSING:
+                defaults[f.name] = f.default
+            elif f.default_factory is not dataclasses.MISSING:
+                defaults[f.name] = f.default_factory()
+        return cls(params, defaults)
+
+    @classmethod
+    def of(cls, params: Any) -> 'QueryKey':
+        """
+        Get the key of parameters in any supported form.
+
+        Args:
+            params: QueryKey, object with a memoized query_key(), dataclass or mapping
+
+        Returns:
+            QueryKey of the parameters
+        """
+        if isinstance(params, QueryKey):
+            return params
+        if hasattr(params, 'query_key'):
+            return params.query_key()
+        if dataclasses.is_dataclass(params) and not isinstance(params, type):
+            return cls.from_dataclass(params)
+        return cls(params)
+
+    def digest(self, namespace: str = '') -> str:
+        """
+        Stable hex digest of the key.
+
+        Args:
+            namespace: Prefix mixed into the digest (e.g. the API endpoint)
+
+        Returns:
+            32 character hex digest
+        """
+        digest = self._derived.get(namespace)
+        if digest is None:
+            data = f"{namespace}:{self.canonical}".encode()
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            self._derived[namespace] = digest
+        return digest
+
+    def subset(self, names: Iterable[str]) -> 'QueryKey':
+        """
+        Key restricted to some parameters.
+
+        Args:
+            names: Parameter names to keep
+
+        Returns:
+            QueryKey over the given parameters only
+        """
+        names = tuple(sorted(names))
+        key = self._derived.get(names)
+        if key is None:
+            key = QueryKey({name: self.params[name] for name in names if name in self.params})
+            self._derived[names] = key
+        return key
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, QueryKey) and self.canonical == other.canonical
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"QueryKey({self.canonical})"
+
+
+_SCALAR_TYPES = frozenset((str, int, float, bool))
+
+
+def digest_params(params: Any, namespace: str = '') -> str:
+    """
+    Digest of parameters, equal to QueryKey.of(params).digest(namespace).
+
+    Plain dicts of scalars and string lists (what the API client passes on
+    every request) are encoded directly instead of building a QueryKey.
+
+    Args:
+        params: QueryKey, parameters dataclass or mapping
+        namespace: Prefix mixed into the digest (e.g. the API endpoint)
+
+    Returns:
+        32 character hex digest
+    """
+    if type(params) is not dict:
+        return QueryKey.of(params).digest(namespace)
+
+    normalized = {}
+    for name, value in params.items():
+        if type(name) is not str:
+            return QueryKey(params).digest(namespace)
+        value_type = type(value)
+        if value is None:
+            continue
+        if value_type in _SCALAR_TYPES:
+            normalized[name] = value
+        elif value_type is list and all(type(item) is str for item in value):
+            if value:
+                normalized[name] = value if len(value) == 1 else sorted(set(value), key=_encode)
+        else:
+            return QueryKey(params).digest(namespace)
+
+    data = f"{namespace}:{_encode(normalized)}".encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class QueryKeyMixin:
+    """
+    Memoized query_key() for mutable parameter dataclasses.
+
+    The key is computed on first use and dropped whenever a field is assigned.
+    Lists modified in place are not tracked; assign a new list instead.
+    """
+
+    def query_key(self) -> QueryKey:
+        """Get the canonical query key of these parameters."""
+        key = self.__dict__.get('_query_key')
+        if key is None:
+            key = QueryKey.from_dataclass(self)
+            self.__dict__['_query_key'] = key
+        return key
+
+    def field_values(self) -> Dict[str, Any]:
+        """Get the dataclass field values, without the memoized key."""
+        return {f.name: getattr(self, f.name) for f in dataclasses.fields(self)}
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self.__dict__.pop('_query_key', None)
+        object.__setattr__(self, name, value)
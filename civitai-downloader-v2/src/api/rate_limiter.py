@@ -107,6 +107,18 @@ class RateLimiter:
         """Record a general error for tracking."""
         self.error_count += 1
     
+    def available_tokens(self) -> float:
+        """
+        Requests that would be admitted without waiting right now.
+        
+        The limiter behaves as a token bucket of capacity 1 refilled at the
+        current rate, so this is the refilled fraction of the next slot.
+        """
+        if self.last_request_time is None:
+            return 1.0
+        elapsed = (datetime.now() - self.last_request_time).total_seconds()
+        return min(1.0, max(0.0, elapsed * self.current_rate))
+    
     def get_current_rate(self) -> float:
         """Get the current requests per second rate."""
         return self.current_rate
@@ -5,7 +5,6 @@ Provides memory-efficient streaming search with AsyncIterator functionality.
 """
 
 import asyncio
-import psutil
 from typing import Dict, Any, List, AsyncIterator, Optional, Union
 from dataclasses import dataclass
 import gc
@@ -23,6 +22,15 @@ except ImportError:
     CivitaiAPIClient = None
     SearchParams = None
 
+try:
+    from ..core.memory.batch_budget import get_batch_budget
+    from ..core.memory.memory_monitor import get_memory_monitor
+    from ..core.performance.metrics import get_metrics_registry, SEARCH_PAGE_SECONDS
+except ImportError:
+    from core.memory.batch_budget import get_batch_budget
+    from core.memory.memory_monitor import get_memory_monitor
+    from core.performance.metrics import get_metrics_registry, SEARCH_PAGE_SECONDS
+
 
 @dataclass
 class StreamingConfig:
@@ -48,7 +56,8 @@ class StreamingSearch:
         """
         self.api_client = api_client
         self.config = config or StreamingConfig()
-        self._process = psutil.Process()
+        self._monitor = get_memory_monitor()
+        self._batch_budget = get_batch_budget()
         self._initial_memory = self._get_current_memory()
         self._retry_enabled = False
         self._max_retries = self.config.max_retries
@@ -81,9 +90,9 @@ class StreamingSearch:
         return self._get_current_memory()
     
     def _get_current_memory(self) -> int:
-        """Get current memory usage in bytes."""
+        """Get current memory usage in bytes (latest sample, no system call)."""
         try:
-            return self._process.memory_info().rss
+            return self._monitor.latest().rss_bytes
         except:
             # Fallback to approximate calculation
             return sys.getsizeof(self) * 1000
@@ -185,9 +194,7 @@ class StreamingSearch:
         page_count = 0
         total_processed = 0
         
-        # Prepare parameters with batch size
         params = search_params.copy()
-        params['limit'] = self.config.batch_size
         
         while True:
             try:
@@ -195,8 +202,12 @@ class StreamingSearch:
                 if cursor:
                     params['cursor'] = cursor
                 
+                # Page size follows the memory budget (config.batch_size at most)
+                params['limit'] = self._batch_budget.next_batch_size('streaming_search', self.config.batch_size)
+                
                 # Fetch page with memory management
-                page_data = await self._fetch_page(params)
+                with self._batch_budget.measure('streaming_search', params['limit']):
+                    page_data = await self._fetch_page(params)
                 
                 if not page_data or 'items' not in page_data:
                     break
@@ -248,7 +259,8 @@ class StreamingSearch:
         """
         if self.api_client:
             # Use actual API client
-            return await self.api_client.get_models(params)
+            with get_metrics_registry().timer(SEARCH_PAGE_SECONDS):
+                return await self.api_client.get_models(params)
         else:
             # Mock implementation for testing
             await asyncio.sleep(0.001)  # Simulate network delay
@@ -314,7 +326,8 @@ class StreamingSearch:
             # Force garbage collection
             gc.collect()
             
-            # Additional delay if still under pressure
+            # Additional delay if still under pressure (fresh reading after GC)
+            self._monitor.sample()
             if self.is_memory_pressure():
                 await asyncio.sleep(0.05)
     
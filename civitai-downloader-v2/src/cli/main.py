@@ -11,6 +11,7 @@ import sys
 from pathlib import Path
 from typing import List, Optional
 import logging
+from contextlib import contextmanager
 
 # Import core components
 from ..core.search.search_engine import AdvancedSearchEngine
@@ -20,7 +21,14 @@ from ..core.config.system_config import SystemConfig as ConfigManager
 from ..core.security.scanner import SecurityScanner
 from ..data.database import DatabaseManager
 from ..data.model_storage import ModelStorage
+from ..data.history.manager import HistoryManager
 from ..api.client import CivitaiAPIClient as CivitAIClient
+from ..api.model_resolver import ModelResolver
+from ..core.performance.exporter import MetricsServer, bind_component_gauges, DEFAULT_HOST, QUEUE_DEPTH
+from ..core.performance.metrics import get_metrics_registry
+from ..core.performance.profiler import ProfileSession, get_profiler
+from ..core.memory.memory_monitor import get_memory_monitor
+from ..core.logging_config import setup_logging
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -38,6 +46,8 @@ class CLIContext:
         self.download_manager = None
         self.security_scanner = None
         self.model_storage = None
+        self._history_manager = None
+        self.metrics_server = None
     
     async def initialize(self, config_path: Optional[str] = None):
         """Initialize CLI components."""
@@ -58,12 +68,15 @@ class CLIContext:
             api_key = self.config_manager.get('api.api_key', None)
             self.client = CivitAIClient(
                 base_url=api_base_url,
-                api_key=api_key
+                api_key=api_key,
+                disk_cache_path=Path(self.config_manager.get('api.cache_path', 'data/api_cache.db')),
+                stale_while_revalidate=self.config_manager.get('api.stale_while_revalidate', 0)
             )
             
             # Initialize components
             self.search_engine = AdvancedSearchEngine(
-                api_client=self.client
+                api_client=self.client,
+                model_store=self.db_manager.model_store
             )
             
             self.download_manager = DownloadManager(
@@ -78,6 +91,23 @@ class CLIContext:
         except Exception as e:
             click.echo(f"Error initializing CLI: {e}", err=True)
             sys.exit(1)
+    
+    @property
+    def history_manager(self) -> HistoryManager:
+        """Download history (duplicate index), loaded on first use by the download commands."""
+        if self._history_manager is None:
+            self._history_manager = HistoryManager(self.db_manager)
+        return self._history_manager
+    
+    def start_metrics_server(self, port: int, host: Optional[str] = None) -> MetricsServer:
+        """Serve /metrics for the components of this run."""
+        bind_component_gauges(
+            client=self.client,
+            download_manager=self.download_manager,
+            memory_monitor=get_memory_monitor()
+        )
+        self.metrics_server = MetricsServer(port=port, host=host or DEFAULT_HOST).start()
+        return self.metrics_server
 
 
 # Global context
@@ -96,12 +126,55 @@ def run_async(coro):
         sys.exit(1)
 
 
+def profile_options(command):
+    """Add the --profile options to a pipeline command."""
+    command = click.option('--profile-dir', type=click.Path(file_okay=False),
+                           help='Directory for profile output (default: <reports.dir>/profiles)')(command)
+    command = click.option('--profile-sample-ms', type=click.FloatRange(min=0), default=0,
+                           help='Also sample Python stacks every N milliseconds (0: spans only)')(command)
+    command = click.option('--profile', is_flag=True,
+                           help='Time each pipeline stage and write a stage breakdown and collapsed stacks')(command)
+    return command
+
+
+@contextmanager
+def profiled(name: str, enabled: bool, sample_ms: float = 0, profile_dir: Optional[str] = None):
+    """Profile the enclosed command when --profile is given."""
+    if not enabled:
+        yield
+        return
+    if not profile_dir:
+        profile_dir = Path(cli_context.config_manager.get('reports.dir', 'reports')) / 'profiles'
+    session = ProfileSession(name, Path(profile_dir), sample_interval=sample_ms / 1000 if sample_ms else None)
+    try:
+        with session:
+            yield
+    finally:
+        click.echo("\n" + "="*60, err=True)
+        click.echo(f"PROFILE: {name}", err=True)
+        click.echo("="*60, err=True)
+        click.echo(session.breakdown, err=True)
+        for kind, path in session.files.items():
+            click.echo(f"Profile {kind}: {path}", err=True)
+
+
 @click.group()
 @click.option('--config', help='Configuration file path')
 @click.option('--verbose', '-v', is_flag=True, help='Verbose output')
+@click.option('--metrics-port', type=int, envvar='CIVITAI_METRICS_PORT',
+              help='Serve Prometheus metrics on http://HOST:PORT/metrics while the command runs')
+@click.option('--metrics-host', envvar='CIVITAI_METRICS_HOST',
+              help='Interface for the metrics endpoint (default: 127.0.0.1)')
+@click.option('--log-format', type=click.Choice(['text', 'json']),
+              help='Log file format (json writes JSON lines; default: CIVITAI_LOG_FORMAT or text)')
+@click.option('--async-logging', is_flag=True,
+              help='Write logs from a background thread (default: CIVITAI_LOG_ASYNC)')
 @click.pass_context
-def cli(ctx, config, verbose):
+def cli(ctx, config, verbose, metrics_port, metrics_host, log_format, async_logging):
     """CivitAI Downloader v2 - Download and manage AI models from CivitAI."""
+    if log_format or async_logging:
+        setup_logging(async_mode=async_logging or None,
+                      json_format=(log_format == 'json') if log_format else None)
     if verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
@@ -110,6 +183,17 @@ def cli(ctx, config, verbose):
     
     # Initialize context
     run_async(cli_context.initialize(config))
+    
+    # Optional metrics endpoint for long-running jobs
+    metrics_port = metrics_port or cli_context.config_manager.get('monitoring.metrics_port', None)
+    if metrics_port:
+        metrics_host = metrics_host or cli_context.config_manager.get('monitoring.metrics_host', None)
+        try:
+            server = cli_context.start_metrics_server(int(metrics_port), metrics_host)
+            ctx.call_on_close(server.stop)
+            logger.info(f"Metrics available at {server.url}")
+        except OSError as e:
+            click.echo(f"Metrics endpoint disabled: {e}", err=True)
 
 
 @cli.command('search')
@@ -129,7 +213,9 @@ def cli(ctx, config, verbose):
 @click.option('--stream/--no-stream', default=True, help='Use streaming processing (default: True)')
 @click.option('--refresh', is_flag=True, help='Force refresh cache, ignore existing intermediate files')
 @click.option('--max-age', default='24h', help='Maximum cache age (e.g., 6h, 12h, 24h, 48h)')
-def search_command(query, nsfw, types, sort, limit, output, output_format, categories, tags, base_model, resume, stream, refresh, max_age):
+@profile_options
+def search_command(query, nsfw, types, sort, limit, output, output_format, categories, tags, base_model, resume, stream, refresh, max_age,
+                   profile, profile_sample_ms, profile_dir):
     """Search for models on CivitAI."""
     
     async def run_search():
@@ -260,12 +346,7 @@ def search_command(query, nsfw, types, sort, limit, output, output_format, categ
                 results = search_result.models[:limit]
                 click.echo(f"Final results: {len(results)} items")
             
-            # Store models in database
-            for model in results:
-                try:
-                    cli_context.db_manager.store_model(model)
-                except Exception as e:
-                    logger.warning(f"Failed to store model {model.get('id', 'unknown')} in database: {e}")
+            # Models were already written to the model store by the search engine
             
             # Record search history
             try:
@@ -284,7 +365,7 @@ def search_command(query, nsfw, types, sort, limit, output, output_format, categ
                     'searched_at': datetime.datetime.now().isoformat()
                 }
                 
-                with cli_context.db_manager.get_connection() as conn:
+                with get_profiler().span('history_write'), cli_context.db_manager.get_connection() as conn:
                     cursor = conn.cursor()
                     cursor.execute("""
                         INSERT INTO search_history (query, filters, results_count, searched_at)
@@ -550,7 +631,8 @@ def search_command(query, nsfw, types, sort, limit, output, output_format, categ
                 logger.warning(f"Error closing export files: {e}")
         
     
-    run_async(run_search())
+    with profiled('search', profile, profile_sample_ms, profile_dir):
+        run_async(run_search())
 
 
 @cli.command('download')
@@ -561,7 +643,9 @@ def search_command(query, nsfw, types, sort, limit, output, output_format, categ
 @click.option('--scan-security', is_flag=True, help='Scan file for security threats')
 @click.option('--no-progress', is_flag=True, help='Disable progress bar')
 @click.option('--force', is_flag=True, help='Force download even if already downloaded')
-def download_command(url_or_id, output_dir, filename, verify, scan_security, no_progress, force):
+@profile_options
+def download_command(url_or_id, output_dir, filename, verify, scan_security, no_progress, force,
+                     profile, profile_sample_ms, profile_dir):
     """Download a model by URL or ID."""
     
     async def run_download():
@@ -580,7 +664,7 @@ def download_command(url_or_id, output_dir, filename, verify, scan_security, no_
                     click.echo(f"Looking up model ID: {model_id}")
                     
                     # Check if already downloaded (unless forced)
-                    if not force and cli_context.db_manager.is_downloaded(model_id):
+                    if not force and cli_context.history_manager.prevent_duplicates(model_id, None):
                         click.echo(f"⏭️  Model {model_id} already downloaded, use --force to override")
                         return
                     
@@ -609,10 +693,11 @@ def download_command(url_or_id, output_dir, filename, verify, scan_security, no_
                 # In real implementation, would show progress bar
                 click.echo("⏳ Download in progress...")
             
-            result = await cli_context.download_manager.download_file(
-                url=download_url,
-                **download_options
-            )
+            with get_profiler().span('download'):
+                result = await cli_context.download_manager.download_file(
+                    url=download_url,
+                    **download_options
+                )
             
             if result.success:
                 click.echo(f"✅ Download completed: {result.file_path}")
@@ -631,7 +716,8 @@ def download_command(url_or_id, output_dir, filename, verify, scan_security, no_
                         'status': 'completed',
                         'downloaded_at': datetime.datetime.now().isoformat()
                     }
-                    cli_context.db_manager.record_download(download_data)
+                    with get_profiler().span('history_write'):
+                        cli_context.db_manager.record_download(download_data)
                 except Exception as e:
                     logger.warning(f"Failed to record download in database: {e}")
                 
@@ -675,7 +761,8 @@ def download_command(url_or_id, output_dir, filename, verify, scan_security, no_
             logger.error(f"Download failed: {e}", exc_info=True)
             raise
     
-    run_async(run_download())
+    with profiled('download', profile, profile_sample_ms, profile_dir):
+        run_async(run_download())
 
 
 @cli.command('config')
@@ -745,22 +832,10 @@ def info_command(model_id, versions, files):
             
             # Get model info from API
             try:
-                # Use the API client to get model details
-                api_params = {'limit': 1}  # Only get one model
-                response = await cli_context.client.get_models(api_params)
-                
-                # Search for specific model ID
-                models = response.get('items', [])
-                model_info = None
+                # Use the API client to get model details (ids= lookup)
+                model_info = await cli_context.client.get_model(model_id)
                 
-                # If we found models, look for our specific ID
-                if models:
-                    for model in models:
-                        if model.get('id') == model_id:
-                            model_info = model
-                            break
-                
-                # If not found in general search, try search by query
+                # If not found by id, try search by query
                 if not model_info:
                     # Try to search with model ID as query
                     api_params = {'query': str(model_id), 'limit': 20}
@@ -932,6 +1007,46 @@ def scan_command(file_path, detailed):
     run_async(run_scan())
 
 
+@cli.command('inventory')
+@click.argument('library_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('--workers', default=4, help='Number of files hashed in parallel')
+@click.option('--show-unresolved', is_flag=True, help='List files not matched to a CivitAI model')
+def inventory_command(library_dir, workers, show_unresolved):
+    """Index local model files and match them to CivitAI models by hash."""
+
+    async def run_inventory():
+        try:
+            from ..data.file_inventory import FileInventory
+
+            inventory = FileInventory(cli_context.db_manager.model_store, hash_workers=workers)
+            click.echo(f"Scanning library: {library_dir}")
+            result = inventory.scan(Path(library_dir))
+
+            click.echo("\n📦 Inventory Results:")
+            click.echo(f"   Files: {result.files}")
+            click.echo(f"   Unchanged (cached hash): {result.unchanged}")
+            click.echo(f"   Moved: {result.moved}")
+            click.echo(f"   Hashed: {result.hashed} ({result.bytes_hashed / (1024 ** 3):.2f} GB)")
+            click.echo(f"   Removed: {result.removed}")
+            click.echo(f"   Newly matched: {result.resolved}")
+            click.echo(f"   Time: {result.duration:.1f}s")
+
+            for error in result.errors:
+                click.echo(f"   ⚠️  {error}", err=True)
+
+            if show_unresolved:
+                unresolved = [e for e in inventory.entries(Path(library_dir)) if not e['model_id']]
+                click.echo(f"\n❓ Unmatched files: {len(unresolved)}")
+                for entry in unresolved:
+                    click.echo(f"   {entry['path']} (AutoV2: {entry['autov2']})")
+
+        except Exception as e:
+            click.echo(f"Inventory failed: {e}", err=True)
+            raise
+
+    run_async(run_inventory())
+
+
 @cli.command('bulk-download')
 @click.argument('input_file', type=click.Path(exists=True))
 @click.option('--output-dir', '-o', 
@@ -948,7 +1063,9 @@ def scan_command(file_path, detailed):
               type=click.IntRange(0, 5),
               help='Number of retry attempts (0-5)')
 @click.option('--force', is_flag=True, help='Force download even if already downloaded')
-def bulk_download_command(input_file, output_dir, scan, parallel, retry, force):
+@profile_options
+def bulk_download_command(input_file, output_dir, scan, parallel, retry, force,
+                          profile, profile_sample_ms, profile_dir):
     """Download multiple models from a JSON or CSV file.
     
     The input file should contain model IDs in one of these formats:
@@ -1030,39 +1147,34 @@ def bulk_download_command(input_file, output_dir, scan, parallel, retry, force):
             successful = []
             failed = []
             
+            # Check download history for all models at once
+            already_downloaded = set() if force else cli_context.history_manager.filter_already_downloaded(model_ids)
+            
             # Create semaphore for parallel downloads
             semaphore = asyncio.Semaphore(parallel)
             
-            async def download_with_semaphore(model_id):
+            # Resolve model info in batches (local DB, cache, then ids= requests of up to 100)
+            resolver = ModelResolver(cli_context.client, cli_context.db_manager.model_store)
+            
+            async def download_with_semaphore(model_id, model_info):
                 async with semaphore:
                     try:
                         click.echo(f"[{model_id}] Starting download...")
                         
-                        # Check if already downloaded (unless forced)
-                        if not force and cli_context.db_manager.is_downloaded(model_id, None):
-                            click.echo(f"[{model_id}] ⏭️  Already downloaded, skipping...")
-                            successful.append({
-                                'id': model_id,
-                                'name': f'model_{model_id}',
-                                'path': 'already_downloaded'
-                            })
-                            return
-                        
-                        # Get model info first
-                        model_info = await cli_context.client.get_model(model_id)
                         if not model_info:
-                            raise Exception("Model not found")
+                            raise Exception(resolver.errors.get(model_id, "Model not found"))
                             
                         model_name = model_info.get('name', f'model_{model_id}')
                         click.echo(f"[{model_id}] Model: {model_name}")
                         
                         # Download the model
-                        result = await cli_context.download_manager.download_model(
-                            model_id=model_id,
-                            version_id=None,  # Latest version
-                            output_dir=output_dir,
-                            scan_files=scan
-                        )
+                        with get_profiler().span('download'):
+                            result = await cli_context.download_manager.download_model(
+                                model_id=model_id,
+                                version_id=None,  # Latest version
+                                output_dir=output_dir,
+                                scan_files=scan
+                            )
                         
                         if result:
                             successful.append({
@@ -1090,7 +1202,8 @@ def bulk_download_command(input_file, output_dir, scan, parallel, retry, force):
                                     'status': 'completed',
                                     'downloaded_at': datetime.datetime.now().isoformat()
                                 }
-                                cli_context.db_manager.record_download(download_data)
+                                with get_profiler().span('history_write'):
+                                    cli_context.history_manager.record_download(download_data)
                             except Exception as db_e:
                                 logger.warning(f"Failed to record model {model_id} in database: {db_e}")
                         else:
@@ -1103,10 +1216,34 @@ def bulk_download_command(input_file, output_dir, scan, parallel, retry, force):
                         })
                         click.echo(f"[{model_id}] ✗ Failed: {e}", err=True)
             
-            # Download all models
-            tasks = [download_with_semaphore(model_id) for model_id in model_ids]
+            # Skip already downloaded models without looking them up (unless forced)
+            for model_id in model_ids:
+                if model_id in already_downloaded:
+                    click.echo(f"[{model_id}] ⏭️  Already downloaded, skipping...")
+                    successful.append({
+                        'id': model_id,
+                        'name': f'model_{model_id}',
+                        'path': 'already_downloaded'
+                    })
+            
+            # Downloads start as soon as each chunk of models is resolved
+            tasks = []
+            get_metrics_registry().gauge(QUEUE_DEPTH, {'queue': 'bulk_models'},
+                                         description="Items waiting in the queue").set_function(
+                lambda: sum(1 for task in tasks if not task.done()))
+            to_resolve = [model_id for model_id in model_ids if model_id not in already_downloaded]
+            async for model_id, model_info in resolver.resolve(to_resolve):
+                tasks.append(asyncio.create_task(download_with_semaphore(model_id, model_info)))
             await asyncio.gather(*tasks, return_exceptions=True)
             
+            # Rebuild the catalog snapshot once for the whole run
+            try:
+                cli_context.db_manager.flush_snapshot()
+            except Exception as e:
+                logger.warning(f"Failed to rebuild catalog snapshot: {e}")
+            
+            logger.info(f"Model resolution: {resolver.stats}")
+            
             # Summary
             click.echo("\n" + "="*60)
             click.echo("BULK DOWNLOAD SUMMARY")
@@ -1147,7 +1284,8 @@ def bulk_download_command(input_file, output_dir, scan, parallel, retry, force):
             logger.error(f"Bulk download failed: {e}", exc_info=True)
             raise
     
-    run_async(run_bulk_download())
+    with profiled('bulk-download', profile, profile_sample_ms, profile_dir):
+        run_async(run_bulk_download())
 
 
 @cli.command('save-to-db')
@@ -1202,19 +1340,23 @@ def db_stats_command():
             click.echo(f"   • Total models: {model_count}")
             
             # Get category distribution
+            snapshot = cli_context.model_storage.store.snapshot()
             with cli_context.model_storage._get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Category stats
-                cursor.execute("""
-                    SELECT c.name, COUNT(mc.model_id) as count
-                    FROM categories c
-                    LEFT JOIN model_categories mc ON c.id = mc.category_id
-                    WHERE mc.is_primary = TRUE
-                    GROUP BY c.name
-                    ORDER BY count DESC
-                """)
-                categories = cursor.fetchall()
+                # Category stats (from the catalog snapshot when available)
+                if snapshot is not None:
+                    categories = list(snapshot.primary_category_counts().items())
+                else:
+                    cursor.execute("""
+                        SELECT c.name, COUNT(mc.model_id) as count
+                        FROM categories c
+                        LEFT JOIN model_categories mc ON c.id = mc.category_id
+                        WHERE mc.is_primary = TRUE
+                        GROUP BY c.name
+                        ORDER BY count DESC
+                    """)
+                    categories = cursor.fetchall()
                 
                 if categories:
                     click.echo("   • Categories:")
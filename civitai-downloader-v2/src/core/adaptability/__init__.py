@@ -6,7 +6,7 @@ Implements requirement 15: Future API change adaptation system.
 
 from .api_detector import APIChangeDetector, APICapability
 from .plugin_manager import PluginManager, Plugin, PluginRegistry
-from .migration import DataMigrator, MigrationManager
+from .migration import DataMigrator, MigrationManager, SchemaMigration, SchemaMigrator
 from .dynamic_types import DynamicModelTypeManager
 
 __all__ = [
@@ -17,5 +17,7 @@ __all__ = [
     'MigrationManager',
     'Plugin',
     'PluginManager',
-    'PluginRegistry'
+    'PluginRegistry',
+    'SchemaMigration',
+    'SchemaMigrator'
 ]
\ No newline at end of file
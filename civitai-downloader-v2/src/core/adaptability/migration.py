@@ -8,7 +8,7 @@ import logging
 import json
 import shutil
 from typing import Dict, List, Any, Optional, Callable, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from abc import ABC, abstractmethod
 import sqlite3
@@ -26,6 +26,114 @@ class MigrationVersion:
     rollback_available: bool = False
 
 
+@dataclass
+class SchemaMigration:
+    """A numbered, forward-only SQLite schema change."""
+    version: int
+    description: str
+    statements: List[str] = field(default_factory=list)
+    apply: Optional[Callable[[sqlite3.Connection], None]] = None
+
+
+class SchemaMigrator:
+    """
+    Applies versioned SQLite schema migrations.
+    
+    Applied versions are tracked per schema name in a ``schema_migrations``
+    table, so several stores can share one database file. Each migration runs
+    in its own transaction and is recorded only if it completes.
+    """
+    
+    def __init__(self, schema_name: str, migrations: List[SchemaMigration]):
+        """
+        Initialize schema migrator.
+        
+        Args:
+            schema_name: Name the applied versions are recorded under
+            migrations: Migrations to manage (any order, versions must be unique)
+        """
+        versions = [m.version for m in migrations]
+        if len(versions) != len(set(versions)):
+            raise ValueError(f"Duplicate migration versions for schema {schema_name}")
+        
+        self.schema_name = schema_name
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+    
+    @property
+    def latest_version(self) -> int:
+        """Highest version known to this migrator."""
+        return self.migrations[-1].version if self.migrations else 0
+    
+    def _ensure_version_table(self, conn: sqlite3.Connection) -> None:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                schema_name TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                description TEXT,
+                applied_at TEXT NOT NULL,
+                PRIMARY KEY (schema_name, version)
+            )
+        """)
+    
+    def get_version(self, conn: sqlite3.Connection) -> int:
+        """Get the highest applied version (0 if none)."""
+        self._ensure_version_table(conn)
+        row = conn.execute(
+            "SELECT MAX(version) FROM schema_migrations WHERE schema_name = ?",
+            (self.schema_name,)
+        ).fetchone()
+        return row[0] or 0
+    
+    def pending_migrations(self, conn: sqlite3.Connection) -> List[SchemaMigration]:
+        """Get migrations newer than the applied version."""
+        current = self.get_version(conn)
+        return [m for m in self.migrations if m.version > current]
+    
+    def migrate(self, conn: sqlite3.Connection, target_version: Optional[int] = None) -> int:
+        """
+        Apply pending migrations up to target_version.
+        
+        Args:
+            conn: Open SQLite connection
+            target_version: Version to stop at (latest if None)
+            
+        Returns:
+            Version of the schema after migrating
+        """
+        target = self.latest_version if target_version is None else target_version
+        current = self.get_version(conn)
+        
+        for migration in self.pending_migrations(conn):
+            if migration.version > target:
+                break
+            
+            logger.info(f"Applying {self.schema_name} schema migration "
+                        f"v{migration.version}: {migration.description}")
+            try:
+                if conn.in_transaction:
+                    conn.commit()
+                conn.execute("BEGIN")
+                for statement in migration.statements:
+                    conn.execute(statement)
+                if migration.apply:
+                    migration.apply(conn)
+                conn.execute(
+                    "INSERT INTO schema_migrations (schema_name, version, description, applied_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (self.schema_name, migration.version, migration.description,
+                     datetime.now().isoformat())
+                )
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Schema migration v{migration.version} failed: {e}")
+                raise
+            
+            current = migration.version
+        
+        return current
+
+
 class Migration(ABC):
     """Base class for data migrations."""
     
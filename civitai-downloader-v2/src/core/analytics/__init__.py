@@ -7,6 +7,7 @@ Provides comprehensive tracking, monitoring, and reporting capabilities.
 from .collector import AnalyticsCollector, EventType
 from .analyzer import AnalyticsAnalyzer, AnalysisReport
 from .reporter import ReportGenerator, ReportConfig, ReportFormat
+from .storage import AnalyticsStorage, RollupAccumulator
 
 __all__ = [
     'AnalyticsCollector',
@@ -15,5 +16,7 @@ __all__ = [
     'AnalysisReport',
     'ReportGenerator',
     'ReportConfig',
-    'ReportFormat'
+    'ReportFormat',
+    'AnalyticsStorage',
+    'RollupAccumulator'
 ]
\ No newline at end of file
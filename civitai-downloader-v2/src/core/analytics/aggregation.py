@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+SQL-side aggregation of raw analytics events.
+Computes the statistics of an AnalysisReport with grouped SQLite queries over
+the day partitions of a window instead of loading and parsing every event.
+Fields are extracted from the JSON data with json_extract, each query reads
+only the event types it needs through the partitions' (event_type, timestamp)
+index, and only aggregate rows come back to Python.
+"""
+
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from .storage import AnalyticsStorage
+
+# data.get(field, 'unknown'): missing keys (not JSON nulls) fall back to 'unknown'
+_OR_UNKNOWN = "CASE WHEN json_type(data, '$.{0}') IS NULL THEN 'unknown' ELSE json_extract(data, '$.{0}') END"
+
+# file_name.split('.')[-1].lower(): rtrim() strips the extension, replace() keeps it
+_FILE_EXT = "lower(replace({0}, rtrim({0}, replace({0}, '.', '')), ''))"
+
+_NUMBER = "typeof({0}) IN ('integer', 'real')"
+
+
+def _field(name: str) -> str:
+    return f"json_extract(data, '$.{name}')"
+
+
+class EventAggregator:
+    """
+    Aggregates the raw events of a window into report statistics.
+
+    Results have the shape of the AnalyticsAnalyzer report sections, so the
+    analyzer can build an AnalysisReport from them unchanged.
+    """
+
+    def __init__(self, storage: AnalyticsStorage):
+        """
+        Initialize aggregator.
+
+        Args:
+            storage: Partitioned analytics storage
+        """
+        self.storage = storage
+        self._conn: Optional[sqlite3.Connection] = None
+        self._window: Tuple[float, float] = (0.0, 0.0)
+
+    def aggregate(self, start_time: float, end_time: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute all report sections of a window.
+
+        Args:
+            start_time: Window start timestamp
+            end_time: Window end timestamp
+
+        Returns:
+            Sections keyed summary/api/download/search/cache/performance/errors
+        """
+        conn = self.storage.connect()
+        try:
+            self._conn = conn
+            self._window = (start_time, end_time)
+            counts = self._event_counts()
+            return {
+                'summary': self._summary(counts, start_time, end_time),
+                'api': self._api_statistics(counts),
+                'download': self._download_statistics(counts),
+                'search': self._search_statistics(counts),
+                'cache': self._cache_statistics(counts),
+                'performance': self._performance_metrics(),
+                'errors': self._error_patterns(counts),
+            }
+        finally:
+            self._conn = None
+            conn.close()
+
+    # Query helpers
+
+    def _source(self, event_type: Optional[str] = None, columns: str = "*") -> Tuple[str, List[Any]]:
+        return self.storage.window_source(self._conn, self._window[0], self._window[1],
+                                          event_type, columns)
+
+    def _query(self, sql: str, params: List[Any]) -> List[Tuple]:
+        return self._conn.execute(sql, params).fetchall()
+
+    def _grouped(self, event_type: Optional[str], expression: str, where: str = "",
+                 limit: Optional[int] = None, columns: str = "") -> List[Tuple[Any, int]]:
+        """
+        (value, count) of an expression, most frequent first.
+
+        Ties are ordered by most recent event, matching a Counter filled from
+        newest-first events. ``where`` may refer to value and the extra columns.
+        """
+        extra = f", {columns}" if columns else ""
+        source, params = self._source(event_type, f"{expression} AS value, timestamp{extra}")
+        sql = f"""
+            SELECT value, COUNT(*) AS n FROM ({source}) {where}
+            GROUP BY value ORDER BY n DESC, MAX(timestamp) DESC
+        """
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [(row[0], row[1]) for row in self._query(sql, params)]
+
+    def _numeric(self, event_type: str, field: str, condition: str = "") -> Dict[str, float]:
+        """count/total/max of a numeric field."""
+        source, params = self._source(event_type, f"{_field(field)} AS value")
+        row = self._query(f"""
+            SELECT COUNT(value), TOTAL(value), MAX(value) FROM ({source})
+            WHERE {_NUMBER.format('value')} {condition}
+        """, params)[0]
+        return {'count': row[0], 'total': row[1], 'max': row[2] if row[2] is not None else 0}
+
+    def _median(self, source: str, params: List[Any], count: int) -> float:
+        """Exact median of the 'value' column of a source with count rows."""
+        if not count:
+            return 0
+        rows = self._query(f"SELECT value FROM ({source}) ORDER BY value LIMIT ? OFFSET ?",
+                           params + [2 - count % 2, (count - 1) // 2])
+        values = [row[0] for row in rows]
+        return sum(values) / len(values)
+
+    def _event_counts(self) -> Dict[str, int]:
+        """Events per type, most recently seen type first."""
+        source, params = self._source(columns="event_type, timestamp")
+        return {row[0]: row[1] for row in self._query(f"""
+            SELECT event_type, COUNT(*) FROM ({source})
+            GROUP BY event_type ORDER BY MAX(timestamp) DESC
+        """, params)}
+
+    # Report sections
+
+    def _summary(self, counts: Dict[str, int], start_time: float, end_time: float) -> Dict[str, Any]:
+        duration_hours = (end_time - start_time) / 3600
+        total_events = sum(counts.values())
+        sessions = self._grouped(None, "session_id", "WHERE value IS NOT NULL AND value != ''")
+        return {
+            'analysis_period': {
+                'start_time': start_time,
+                'end_time': end_time,
+                'duration_hours': round(duration_hours, 2)
+            },
+            'total_events': total_events,
+            'unique_sessions': len(sessions),
+            'events_per_hour': round(total_events / duration_hours, 2) if duration_hours > 0 else 0,
+            'event_type_breakdown': counts,
+            'most_active_session': (
+                {'session_id': sessions[0][0], 'event_count': sessions[0][1]} if sessions else None
+            )
+        }
+
+    def _api_statistics(self, counts: Dict[str, int]) -> Dict[str, Any]:
+        # Endpoints of the window's requests in a keyed temp table for the joins
+        # below (inserted oldest first, so the oldest request wins duplicate ids)
+        requests, request_params = self._source(
+            'api_request',
+            f"{_field('request_id')} AS request_id, {_OR_UNKNOWN.format('endpoint')} AS endpoint, timestamp"
+        )
+        self._conn.execute("DROP TABLE IF EXISTS temp.report_requests")
+        self._conn.execute("CREATE TEMP TABLE report_requests (request_id PRIMARY KEY, endpoint) WITHOUT ROWID")
+        self._conn.execute(f"""
+            INSERT OR IGNORE INTO report_requests
+            SELECT request_id, endpoint FROM ({requests})
+            WHERE request_id IS NOT NULL AND request_id != '' ORDER BY timestamp
+        """, request_params)
+
+        # One pass over the responses: status code, response time and the request's endpoint
+        responses, response_params = self._source(
+            'api_response',
+            f"{_field('request_id')} AS request_id, {_field('status_code')} AS status_code, "
+            f"{_field('response_time')} AS value, timestamp"
+        )
+        self._conn.execute("DROP TABLE IF EXISTS temp.report_responses")
+        self._conn.execute(f"""
+            CREATE TEMP TABLE report_responses AS
+            SELECT req.request_id IS NOT NULL AS matched, req.endpoint AS endpoint,
+                   ev.status_code AS status_code, ev.value AS value, ev.timestamp AS timestamp
+            FROM ({responses}) AS ev LEFT JOIN report_requests AS req ON req.request_id = ev.request_id
+        """, response_params)
+        # Only responses to requests in the window are timed
+        timed = f"{_NUMBER.format('value')} AND value > 0"
+
+        endpoint_stats: Dict[str, Dict[str, Any]] = {}
+        total_times = total_time = 0
+        max_time = 0
+        for endpoint, count, timed_count, time_sum, time_max in self._query(f"""
+            SELECT endpoint, COUNT(*), COUNT(*) FILTER (WHERE {timed}),
+                   TOTAL(value) FILTER (WHERE {timed}), MAX(value) FILTER (WHERE {timed})
+            FROM report_responses WHERE matched GROUP BY endpoint ORDER BY MAX(timestamp) DESC
+        """, []):
+            endpoint_stats[endpoint] = {
+                'count': count,
+                'errors': 0,
+                'avg_time': time_sum / timed_count if timed_count else 0
+            }
+            total_times += timed_count
+            total_time += time_sum
+            max_time = max(max_time, time_max or 0)
+
+        errors, error_params = self._source('api_error', f"{_field('request_id')} AS request_id, timestamp")
+        for endpoint, count in self._query(f"""
+            SELECT req.endpoint, COUNT(*) FROM ({errors}) AS ev
+            JOIN report_requests AS req ON req.request_id = ev.request_id
+            GROUP BY req.endpoint ORDER BY MAX(ev.timestamp) DESC
+        """, error_params):
+            stats = endpoint_stats.setdefault(endpoint, {'count': 0, 'errors': 0, 'avg_time': 0})
+            stats['count'] += count
+            stats['errors'] += count
+
+        median = self._median(f"SELECT value FROM report_responses WHERE matched AND {timed}",
+                              [], total_times)
+
+        # Responses without a status code count as successful (status_code defaults to 0)
+        status_codes = [(row[0], row[1]) for row in self._query("""
+            SELECT status_code, COUNT(*) AS n FROM report_responses
+            GROUP BY status_code ORDER BY n DESC, MAX(timestamp) DESC
+        """, [])]
+        successful = sum(count for code, count in status_codes
+                         if code is None or (isinstance(code, (int, float)) and code < 400))
+        self._conn.execute("DROP TABLE temp.report_responses")
+        self._conn.execute("DROP TABLE temp.report_requests")
+        total_requests = counts.get('api_request', 0)
+
+        return {
+            'total_requests': total_requests,
+            'total_responses': counts.get('api_response', 0),
+            'total_errors': counts.get('api_error', 0),
+            'success_rate': round(successful / total_requests * 100, 2) if total_requests > 0 else 0,
+            'avg_response_time': round(total_time / total_times, 3) if total_times else 0,
+            'median_response_time': round(median, 3),
+            'max_response_time': max_time,
+            'status_code_distribution': {code: count for code, count in status_codes if code},
+            'endpoint_statistics': endpoint_stats,
+            'requests_per_endpoint': {
+                endpoint: stats['count']
+                for endpoint, stats in endpoint_stats.items()
+            }
+        }
+
+    def _download_statistics(self, counts: Dict[str, int]) -> Dict[str, Any]:
+        total_downloads = counts.get('download_started', 0)
+        successful_downloads = counts.get('download_completed', 0)
+        sizes = self._numeric('download_completed', 'bytes_downloaded')
+        speeds = self._numeric('download_completed', 'average_speed')
+        durations = self._numeric('download_completed', 'duration')
+        file_types = self._grouped('download_started', _FILE_EXT.format(_field('file_name')),
+                                   "WHERE name IS NOT NULL AND name != ''",
+                                   columns=f"{_field('file_name')} AS name")
+
+        return {
+            'total_downloads': total_downloads,
+            'successful_downloads': successful_downloads,
+            'failed_downloads': counts.get('download_failed', 0),
+            'success_rate': (round(successful_downloads / total_downloads * 100, 2)
+                             if total_downloads > 0 else 0),
+            'avg_file_size_mb': (round(sizes['total'] / sizes['count'] / (1024*1024), 2)
+                                 if sizes['count'] else 0),
+            'total_downloaded_gb': round(sizes['total'] / (1024*1024*1024), 2),
+            'avg_download_speed_mbps': (round(speeds['total'] / speeds['count'] / (1024*1024), 2)
+                                        if speeds['count'] else 0),
+            'avg_download_duration': (round(durations['total'] / durations['count'], 2)
+                                      if durations['count'] else 0),
+            'file_type_distribution': dict(file_types),
+            'largest_file_mb': round(sizes['max'] / (1024*1024), 2)
+        }
+
+    def _search_statistics(self, counts: Dict[str, int]) -> Dict[str, Any]:
+        total_searches = counts.get('search_performed', 0)
+        if not total_searches:
+            return {
+                'total_searches': 0,
+                'avg_response_time': 0,
+                'avg_results_count': 0,
+                'total_results_discovered': 0
+            }
+
+        times = self._numeric('search_performed', 'response_time')
+        results = self._numeric('search_performed', 'results_count')
+        queries = self._grouped('search_performed', _field('query'), "WHERE present IS NOT NULL",
+                                limit=10, columns="json_type(data, '$.query') AS present")
+        source, params = self._source('search_performed', f"{_field('response_time')} AS value")
+        median = self._median(f"SELECT value FROM ({source}) WHERE {_NUMBER.format('value')}",
+                              params, times['count'])
+
+        return {
+            'total_searches': total_searches,
+            'avg_response_time': round(times['total'] / times['count'], 3) if times['count'] else 0,
+            'avg_results_count': round(results['total'] / results['count'], 1) if results['count'] else 0,
+            'total_results_discovered': int(results['total']),
+            'most_common_queries': dict(queries),
+            'median_response_time': round(median, 3)
+        }
+
+    def _cache_statistics(self, counts: Dict[str, int]) -> Dict[str, Any]:
+        hits = counts.get('cache_hit', 0)
+        misses = counts.get('cache_miss', 0)
+        total_cache_requests = hits + misses
+        hit_rate = (hits / total_cache_requests * 100) if total_cache_requests > 0 else 0
+        # Only non-zero ages count
+        ages = self._numeric('cache_hit', 'cache_age', "AND value != 0")
+
+        return {
+            'total_cache_requests': total_cache_requests,
+            'cache_hits': hits,
+            'cache_misses': misses,
+            'hit_rate_percent': round(hit_rate, 2),
+            'avg_cache_age_minutes': round(ages['total'] / ages['count'] / 60, 2) if ages['count'] else 0,
+            'efficiency_score': round(hit_rate, 1)
+        }
+
+    def _performance_metrics(self) -> Dict[str, Any]:
+        source, params = self._source(columns="timestamp")
+        # Newest hour first, so ties resolve to the most recent hour
+        hourly_counts = {row[0]: row[1] for row in self._query(f"""
+            SELECT CAST(timestamp AS INTEGER) / 3600 AS hour, COUNT(*) FROM ({source})
+            GROUP BY hour ORDER BY hour DESC
+        """, params)}
+        if not hourly_counts:
+            return {'events_per_hour': [], 'peak_hour': None, 'quiet_hour': None}
+
+        peak_hour = max(hourly_counts.items(), key=lambda x: x[1])
+        quiet_hour = min(hourly_counts.items(), key=lambda x: x[1])
+        return {
+            'events_per_hour': hourly_counts,
+            'peak_hour': {'hour': peak_hour[0], 'events': peak_hour[1]},
+            'quiet_hour': {'hour': quiet_hour[0], 'events': quiet_hour[1]},
+            'total_active_hours': len(hourly_counts)
+        }
+
+    def _error_patterns(self, counts: Dict[str, int]) -> Dict[str, Any]:
+        api_error_types = self._grouped('api_error', _OR_UNKNOWN.format('error_type'))
+        download_error_types = self._grouped('download_failed', _OR_UNKNOWN.format('error_type'))
+        api_errors = counts.get('api_error', 0)
+        download_errors = counts.get('download_failed', 0)
+
+        return {
+            'total_errors': api_errors + download_errors,
+            'api_errors': api_errors,
+            'download_errors': download_errors,
+            'api_error_types': dict(api_error_types),
+            'download_error_types': dict(download_error_types),
+            'most_common_error': api_error_types[0][0] if api_error_types else None
+        }
@@ -11,7 +11,13 @@ from dataclasses import dataclass
 from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict, Counter
 
+from .aggregation import EventAggregator
 from .collector import AnalyticsCollector, EventType
+from .storage import HOUR_SECONDS, ALL_TYPES, RollupAccumulator
+from ..performance.metrics import MetricsRegistry, get_metrics_registry
+
+# Reports over longer windows read hourly rollups instead of raw events
+ROLLUP_MIN_WINDOW = 24 * 3600
 
 
 @dataclass
@@ -35,13 +41,34 @@ class AnalyticsAnalyzer:
     Provides comprehensive analysis and insights per requirement 13.
     """
     
-    def __init__(self, collector: AnalyticsCollector):
+    def __init__(self, collector: AnalyticsCollector, registry: Optional[MetricsRegistry] = None):
         """Initialize analytics analyzer."""
         self.collector = collector
+        self.registry = registry or get_metrics_registry()
     
-    def generate_report(self, start_time: float, end_time: float) -> AnalysisReport:
-        """Generate comprehensive analytics report."""
-        # Get events for the time period
+    def generate_report(self, start_time: float, end_time: float,
+                        use_rollups: Optional[bool] = None) -> AnalysisReport:
+        """
+        Generate comprehensive analytics report.
+        
+        Statistics are aggregated in SQLite: from hourly rollups for long
+        windows, otherwise with grouped queries over the raw event partitions.
+        
+        Args:
+            start_time: Period start timestamp
+            end_time: Period end timestamp
+            use_rollups: Read hourly rollups (default: windows longer than a day)
+        """
+        if use_rollups is None:
+            use_rollups = end_time - start_time > ROLLUP_MIN_WINDOW
+        if hasattr(self.collector, 'storage'):
+            if use_rollups:
+                rollups = self._load_rollups(start_time, end_time)
+                if rollups is not None:
+                    return self._report_from_rollups(rollups, start_time, end_time)
+            return self._report_from_sql(start_time, end_time)
+        
+        # Collectors without partitioned storage: analyze events in memory
         events = self.collector.get_events(
             start_time=start_time,
             end_time=end_time
@@ -72,6 +99,237 @@ class AnalyticsAnalyzer:
             recommendations=recommendations
         )
     
+    def _load_rollups(self, start_time: float, end_time: float) -> Optional[RollupAccumulator]:
+        """
+        Aggregate a period from hourly rollups.
+        
+        Whole hours come from the rollup table; the partial hours at both ends
+        are aggregated from raw events so results match the exact window.
+        
+        Returns:
+            Merged rollups, or None if the window has no whole hour
+        """
+        first_hour = -int(-start_time // HOUR_SECONDS)
+        last_hour = int(end_time // HOUR_SECONDS)
+        if first_hour >= last_hour:
+            return None
+        
+        rollups = self.collector.storage.load_rollups(first_hour, last_hour, collapse_hours=True)
+        
+        edges = []
+        if start_time < first_hour * HOUR_SECONDS:
+            edges.extend(
+                e for e in self.collector.get_events(start_time=start_time,
+                                                     end_time=first_hour * HOUR_SECONDS)
+                if e['timestamp'] < first_hour * HOUR_SECONDS
+            )
+        edges.extend(self.collector.get_events(start_time=last_hour * HOUR_SECONDS,
+                                               end_time=end_time))
+        
+        endpoints = {
+            e['data']['request_id']: e['data'].get('endpoint')
+            for e in edges
+            if e['event_type'] == 'api_request' and e.get('data', {}).get('request_id')
+        }
+        for event in edges:
+            data = event.get('data', {})
+            rollups.add_event(event['event_type'], event['timestamp'], event.get('session_id'),
+                              data, endpoints.get(data.get('request_id')))
+        return rollups
+    
+    def _report_from_sql(self, start_time: float, end_time: float) -> AnalysisReport:
+        """Build a report from grouped SQL queries over the raw event partitions."""
+        sections = EventAggregator(self.collector.storage).aggregate(start_time, end_time)
+        recommendations = self._generate_recommendations(
+            sections['api'], sections['download'], sections['cache'],
+            sections['performance'], sections['errors']
+        )
+        
+        return AnalysisReport(
+            period_start=start_time,
+            period_end=end_time,
+            summary=sections['summary'],
+            api_statistics=sections['api'],
+            download_statistics=sections['download'],
+            search_statistics=sections['search'],
+            cache_statistics=sections['cache'],
+            performance_metrics=sections['performance'],
+            error_analysis=sections['errors'],
+            recommendations=recommendations
+        )
+    
+    def _report_from_rollups(self, rollups: RollupAccumulator,
+                             start_time: float, end_time: float) -> AnalysisReport:
+        """Build a report from aggregated rollups (medians are histogram estimates)."""
+        duration_hours = (end_time - start_time) / 3600
+        event_counts = rollups.labels_by_type()
+        total_events = sum(event_counts.values())
+        sessions = rollups.labels(ALL_TYPES, 'session')
+        most_active = sessions.most_common(1)
+        
+        summary = {
+            'analysis_period': {
+                'start_time': start_time,
+                'end_time': end_time,
+                'duration_hours': round(duration_hours, 2)
+            },
+            'total_events': total_events,
+            'unique_sessions': len(sessions),
+            'events_per_hour': round(total_events / duration_hours, 2) if duration_hours > 0 else 0,
+            'event_type_breakdown': event_counts,
+            'most_active_session': (
+                {'session_id': most_active[0][0], 'event_count': most_active[0][1]}
+                if most_active else None
+            )
+        }
+        
+        # API statistics
+        total_requests = rollups.count('api_request')
+        status_codes = {
+            int(code) if code.isdigit() else code: count
+            for code, count in rollups.labels('api_response', 'label:status_code').items()
+        }
+        successful = sum(count for code, count in status_codes.items()
+                         if isinstance(code, int) and code < 400)
+        response_time = rollups.summary('api_response', 'response_time')
+        endpoint_stats = defaultdict(lambda: {'count': 0, 'errors': 0, 'avg_time': 0})
+        for endpoint, (count, total) in rollups.label_totals('api_response', 'endpoint_time').items():
+            endpoint_stats[endpoint]['avg_time'] = total / count if count else 0
+        for endpoint, count in rollups.labels('api_response', 'label:endpoint').items():
+            endpoint_stats[endpoint]['count'] += count
+        for endpoint, count in rollups.labels('api_error', 'label:endpoint').items():
+            endpoint_stats[endpoint]['count'] += count
+            endpoint_stats[endpoint]['errors'] += count
+        
+        api_stats = {
+            'total_requests': total_requests,
+            'total_responses': rollups.count('api_response'),
+            'total_errors': rollups.count('api_error'),
+            'success_rate': round(successful / total_requests * 100, 2) if total_requests > 0 else 0,
+            'avg_response_time': (round(response_time['total'] / response_time['count'], 3)
+                                  if response_time['count'] else 0),
+            'median_response_time': round(rollups.median('api_response', 'response_time'), 3),
+            'max_response_time': response_time['max'],
+            'status_code_distribution': status_codes,
+            'endpoint_statistics': dict(endpoint_stats),
+            'requests_per_endpoint': {
+                endpoint: stats['count']
+                for endpoint, stats in endpoint_stats.items()
+            }
+        }
+        
+        # Download statistics
+        total_downloads = rollups.count('download_started')
+        successful_downloads = rollups.count('download_completed')
+        sizes = rollups.summary('download_completed', 'bytes_downloaded')
+        speeds = rollups.summary('download_completed', 'average_speed')
+        durations = rollups.summary('download_completed', 'duration')
+        download_stats = {
+            'total_downloads': total_downloads,
+            'successful_downloads': successful_downloads,
+            'failed_downloads': rollups.count('download_failed'),
+            'success_rate': (round(successful_downloads / total_downloads * 100, 2)
+                             if total_downloads > 0 else 0),
+            'avg_file_size_mb': (round(sizes['total'] / sizes['count'] / (1024*1024), 2)
+                                 if sizes['count'] else 0),
+            'total_downloaded_gb': round(sizes['total'] / (1024*1024*1024), 2),
+            'avg_download_speed_mbps': (round(speeds['total'] / speeds['count'] / (1024*1024), 2)
+                                        if speeds['count'] else 0),
+            'avg_download_duration': (round(durations['total'] / durations['count'], 2)
+                                      if durations['count'] else 0),
+            'file_type_distribution': dict(rollups.labels('download_started', 'label:file_ext')),
+            'largest_file_mb': round(sizes['max'] / (1024*1024), 2)
+        }
+        
+        # Search statistics
+        total_searches = rollups.count('search_performed')
+        if total_searches:
+            search_time = rollups.summary('search_performed', 'response_time')
+            results = rollups.summary('search_performed', 'results_count')
+            search_stats = {
+                'total_searches': total_searches,
+                'avg_response_time': (round(search_time['total'] / search_time['count'], 3)
+                                      if search_time['count'] else 0),
+                'avg_results_count': (round(results['total'] / results['count'], 1)
+                                      if results['count'] else 0),
+                'total_results_discovered': int(results['total']),
+                'most_common_queries': dict(
+                    rollups.labels('search_performed', 'label:query').most_common(10)
+                ),
+                'median_response_time': round(rollups.median('search_performed', 'response_time'), 3)
+            }
+        else:
+            search_stats = {
+                'total_searches': 0,
+                'avg_response_time': 0,
+                'avg_results_count': 0,
+                'total_results_discovered': 0
+            }
+        
+        # Cache statistics
+        hits = rollups.count('cache_hit')
+        misses = rollups.count('cache_miss')
+        total_cache_requests = hits + misses
+        hit_rate = (hits / total_cache_requests * 100) if total_cache_requests > 0 else 0
+        ages = rollups.summary('cache_hit', 'cache_age')
+        cache_stats = {
+            'total_cache_requests': total_cache_requests,
+            'cache_hits': hits,
+            'cache_misses': misses,
+            'hit_rate_percent': round(hit_rate, 2),
+            'avg_cache_age_minutes': round(ages['total'] / ages['count'] / 60, 2) if ages['count'] else 0,
+            'efficiency_score': round(hit_rate, 1)
+        }
+        
+        # Performance metrics
+        # Newest hour first, matching the raw event order used for tie-breaking
+        hourly_counts = dict(sorted(rollups.hourly_counts().items(), reverse=True))
+        if hourly_counts:
+            peak_hour = max(hourly_counts.items(), key=lambda x: x[1])
+            quiet_hour = min(hourly_counts.items(), key=lambda x: x[1])
+            performance = {
+                'events_per_hour': hourly_counts,
+                'peak_hour': {'hour': peak_hour[0], 'events': peak_hour[1]},
+                'quiet_hour': {'hour': quiet_hour[0], 'events': quiet_hour[1]},
+                'total_active_hours': len(hourly_counts)
+            }
+        else:
+            performance = {'events_per_hour': [], 'peak_hour': None, 'quiet_hour': None}
+        
+        # Error patterns
+        api_error_types = rollups.labels('api_error', 'label:error_type')
+        download_error_types = rollups.labels('download_failed', 'label:error_type')
+        api_error_types['unknown'] += rollups.count('api_error') - sum(api_error_types.values())
+        download_error_types['unknown'] += (rollups.count('download_failed')
+                                            - sum(download_error_types.values()))
+        api_error_types = +api_error_types
+        download_error_types = +download_error_types
+        errors = {
+            'total_errors': rollups.count('api_error') + rollups.count('download_failed'),
+            'api_errors': rollups.count('api_error'),
+            'download_errors': rollups.count('download_failed'),
+            'api_error_types': dict(api_error_types),
+            'download_error_types': dict(download_error_types),
+            'most_common_error': api_error_types.most_common(1)[0][0] if api_error_types else None
+        }
+        
+        recommendations = self._generate_recommendations(
+            api_stats, download_stats, cache_stats, performance, errors
+        )
+        
+        return AnalysisReport(
+            period_start=start_time,
+            period_end=end_time,
+            summary=summary,
+            api_statistics=api_stats,
+            download_statistics=download_stats,
+            search_statistics=search_stats,
+            cache_statistics=cache_stats,
+            performance_metrics=performance,
+            error_analysis=errors,
+            recommendations=recommendations
+        )
+    
     def _analyze_summary(self, events: List[Dict[str, Any]], 
                         start_time: float, end_time: float) -> Dict[str, Any]:
         """Analyze overall summary statistics."""
@@ -409,5 +667,19 @@ class AnalyticsAnalyzer:
                 'total_downloads': report.download_statistics['total_downloads'],
                 'total_data_gb': report.download_statistics['total_downloaded_gb']
             },
-            'recommendations': report.recommendations[:3]  # Top 3 recommendations
+            'recommendations': report.recommendations[:3],  # Top 3 recommendations
+            'live_metrics': self.get_live_metrics()
+        }
+    
+    def get_live_metrics(self) -> Dict[str, Any]:
+        """
+        Hot path latency and throughput of this process from the metrics registry.
+        
+        Returns:
+            Histogram summaries (count, mean, p50/p90/p99, ...) and counters by metric key
+        """
+        snapshot = self.registry.snapshot()
+        return {
+            'histograms': {key: summary for key, summary in snapshot['histograms'].items() if summary['count']},
+            'counters': snapshot['counters']
         }
\ No newline at end of file
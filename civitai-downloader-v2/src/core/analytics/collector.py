@@ -2,9 +2,16 @@
 """
 Analytics data collection system.
 Implements requirement 13.1: API call tracking, success rates, response times.
+
+Recording an event only appends a tuple to a lock-free SimpleQueue; a single
+background writer drains the queue in large batches, each written in one
+transaction with executemany. When the writer falls behind, events are sampled
+and finally dropped instead of blocking the caller.
 """
 
 import json
+import logging
+import queue
 import sqlite3
 import threading
 import time
@@ -14,6 +21,26 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 from contextlib import contextmanager
 
+from .storage import AnalyticsStorage
+from ..config.system_config import SystemConfig
+
+logger = logging.getLogger(__name__)
+
+# Pending events that wake the writer before its flush interval
+FLUSH_BATCH_SIZE = 1000
+
+# Most events written in one transaction
+WRITE_BATCH_SIZE = 5000
+
+# Failed writes of a batch before its events are dropped
+MAX_WRITE_ATTEMPTS = 3
+
+# Pending events above which new events are dropped
+DEFAULT_MAX_PENDING = 50000
+
+# Above this fraction of max_pending only every sample_rate-th event is kept
+SAMPLE_ABOVE_FRACTION = 0.5
+
 
 class EventType(Enum):
     """Analytics event types."""
@@ -59,14 +86,40 @@ class AnalyticsCollector:
     Implements comprehensive event tracking per requirement 13.
     """
     
-    def __init__(self, db_path: Optional[str] = None):
-        """Initialize analytics collector."""
+    # Never sampled or dropped: reports pair them per session
+    ESSENTIAL_EVENTS = frozenset({EventType.SESSION_STARTED, EventType.SESSION_ENDED})
+    
+    def __init__(self, db_path: Optional[str] = None, retention_days: Optional[int] = None,
+                 rollup_retention_days: Optional[int] = None,
+                 max_pending: int = DEFAULT_MAX_PENDING, sample_rate: int = 10):
+        """
+        Initialize analytics collector.
+        
+        Args:
+            db_path: Analytics database path
+            retention_days: Days of raw events to keep (None keeps everything)
+            rollup_retention_days: Days of hourly rollups to keep (None keeps everything)
+            max_pending: Unwritten events above which new events are dropped
+            sample_rate: Keep one in this many events while the queue is over half full
+        """
         self.db_path = db_path or "analytics.db"
-        self._event_queue: List[AnalyticsEvent] = []
-        self._lock = threading.Lock()
+        self.storage = AnalyticsStorage(self.db_path, retention_days, rollup_retention_days)
+        # Callers only put; the writer is the only consumer
+        self._event_queue: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
         self._session_id = str(int(time.time()))
         self._flush_interval = 10  # seconds
-        self._max_queue_size = 100
+        self._max_pending = max_pending
+        self._sample_above = int(max_pending * SAMPLE_ABOVE_FRACTION)
+        self._sample_rate = max(1, sample_rate)
+        self._offered = 0
+        self._written = 0
+        self._sampled_out = 0
+        self._dropped = 0
+        # Batch of a failed write, retried first so events stay in order
+        self._retry_batch: List[tuple] = []
+        self._write_failures = 0
         self._running = True
         
         # Initialize database
@@ -83,56 +136,38 @@ class AnalyticsCollector:
         })
     
     def _init_database(self):
-        """Initialize analytics database schema."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS analytics_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    event_type TEXT NOT NULL,
-                    timestamp REAL NOT NULL,
-                    session_id TEXT,
-                    user_id TEXT,
-                    data TEXT,
-                    tags TEXT,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create indexes for performance
-            conn.execute('''
-                CREATE INDEX IF NOT EXISTS idx_event_type_timestamp 
-                ON analytics_events(event_type, timestamp)
-            ''')
-            
-            conn.execute('''
-                CREATE INDEX IF NOT EXISTS idx_session_timestamp 
-                ON analytics_events(session_id, timestamp)
-            ''')
-            
-            conn.commit()
+        """Initialize partitioned analytics storage (migrates a legacy events table)."""
+        self.storage.initialize()
     
     def record_event(self, event_type: EventType, data: Dict[str, Any], 
                     session_id: Optional[str] = None, user_id: Optional[str] = None,
                     tags: Optional[List[str]] = None, timestamp: Optional[float] = None) -> None:
-        """Record analytics event."""
+        """
+        Record analytics event.
+        
+        Never blocks on the database: the event is queued for the writer, or
+        sampled out / dropped when the writer is behind.
+        """
         if not self._running:
             return
         
-        event = AnalyticsEvent(
-            event_type=event_type,
-            timestamp=timestamp or time.time(),
-            data=data,
-            session_id=session_id or self._session_id,
-            user_id=user_id,
-            tags=tags
-        )
+        # Counters are plain ints: under concurrent callers they are approximate
+        self._offered += 1
+        pending = self._event_queue.qsize()
+        if pending >= self._sample_above and event_type not in self.ESSENTIAL_EVENTS:
+            if pending >= self._max_pending:
+                self._dropped += 1
+                return
+            if self._offered % self._sample_rate:
+                self._sampled_out += 1
+                return
         
-        with self._lock:
-            self._event_queue.append(event)
-            
-            # Flush if queue is full
-            if len(self._event_queue) >= self._max_queue_size:
-                self._flush_events()
+        self._event_queue.put((event_type, timestamp or time.time(), data,
+                               session_id or self._session_id, user_id, tags))
+        
+        # Wake the writer early once a full batch is waiting
+        if pending + 1 >= FLUSH_BATCH_SIZE and not self._wakeup.is_set():
+            self._wakeup.set()
     
     def record_api_request(self, endpoint: str, method: str = 'GET', 
                           params: Optional[Dict[str, Any]] = None) -> str:
@@ -229,43 +264,75 @@ class AnalyticsCollector:
             'cache_key': cache_key
         })
     
-    def _flush_events(self) -> None:
-        """Flush queued events to database."""
-        if not self._event_queue:
-            return
+    def _flush_events(self) -> int:
+        """
+        Write all queued events to the database.
         
-        events_to_flush = self._event_queue[:]
-        self._event_queue.clear()
+        Runs in the writer thread, and synchronously from flush()/stop(); the
+        write lock keeps a single writer at a time.
         
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                for event in events_to_flush:
-                    conn.execute('''
-                        INSERT INTO analytics_events 
-                        (event_type, timestamp, session_id, user_id, data, tags)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        event.event_type.value,
-                        event.timestamp,
-                        event.session_id,
-                        event.user_id,
-                        json.dumps(event.data, default=str),
-                        json.dumps(event.tags) if event.tags else None
-                    ))
-                conn.commit()
-        except Exception as e:
-            # In case of error, put events back in queue
-            with self._lock:
-                self._event_queue = events_to_flush + self._event_queue
-            print(f"Analytics flush error: {e}")
+        Returns:
+            Number of events written
+        """
+        written = 0
+        with self._write_lock:
+            while True:
+                batch, self._retry_batch = self._retry_batch, []
+                try:
+                    while len(batch) < WRITE_BATCH_SIZE:
+                        batch.append(self._event_queue.get_nowait())
+                except queue.Empty:
+                    pass
+                if not batch:
+                    break
+                
+                try:
+                    self.storage.write_events([AnalyticsEvent(*item).to_dict() for item in batch])
+                except Exception as e:
+                    self._write_failures += 1
+                    if self._write_failures >= MAX_WRITE_ATTEMPTS:
+                        logger.error(f"Analytics flush failed {self._write_failures} times, "
+                                     f"dropping {len(batch)} events: {e}")
+                        self._dropped += len(batch)
+                        self._write_failures = 0
+                    else:
+                        logger.warning(f"Analytics flush error (attempt {self._write_failures}/"
+                                       f"{MAX_WRITE_ATTEMPTS}): {e}")
+                        self._retry_batch = batch
+                    break
+                self._write_failures = 0
+                written += len(batch)
+                if len(batch) < WRITE_BATCH_SIZE:
+                    break
+            self._written += written
+        return written
     
     def _flush_worker(self) -> None:
-        """Background worker to periodically flush events."""
+        """Background writer: drains the queue every interval or when a batch is waiting."""
         while self._running:
-            time.sleep(self._flush_interval)
-            with self._lock:
-                if self._event_queue:
-                    self._flush_events()
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            if self._running:
+                self._flush_events()
+    
+    def flush(self) -> int:
+        """
+        Write all queued events now.
+        
+        Returns:
+            Number of events written
+        """
+        return self._flush_events()
+    
+    def get_ingest_statistics(self) -> Dict[str, int]:
+        """Queue depth and how many events were written, sampled out and dropped."""
+        return {
+            'offered': self._offered,
+            'pending': self._event_queue.qsize() + len(self._retry_batch),
+            'written': self._written,
+            'sampled_out': self._sampled_out,
+            'dropped': self._dropped
+        }
     
     def stop(self) -> None:
         """Stop analytics collection and flush remaining events."""
@@ -275,12 +342,16 @@ class AnalyticsCollector:
         })
         
         self._running = False
+        self._wakeup.set()
         if hasattr(self, '_flush_thread'):
             self._flush_thread.join(timeout=5)
         
         # Final flush
-        with self._lock:
-            self._flush_events()
+        self._flush_events()
+        
+        if self._dropped or self._sampled_out:
+            logger.warning(f"Analytics backpressure: {self._sampled_out} events sampled out, "
+                           f"{self._dropped} dropped")
     
     @contextmanager
     def get_connection(self):
@@ -297,50 +368,34 @@ class AnalyticsCollector:
                   end_time: Optional[float] = None,
                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Retrieve events from database."""
-        with self.get_connection() as conn:
-            query = "SELECT * FROM analytics_events WHERE 1=1"
-            params = []
-            
-            if event_type:
-                query += " AND event_type = ?"
-                params.append(event_type.value)
-            
-            if start_time:
-                query += " AND timestamp >= ?"
-                params.append(start_time)
-            
-            if end_time:
-                query += " AND timestamp <= ?"
-                params.append(end_time)
-            
-            query += " ORDER BY timestamp DESC"
-            
-            if limit:
-                query += " LIMIT ?"
-                params.append(limit)
-            
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
+        # Only partitions overlapping the time window are read
+        rows = self.storage.select_events(
+            event_type.value if event_type else None, start_time, end_time, limit
+        )
+        
+        events = []
+        for row in rows:
+            event_data = {
+                'id': row['id'],
+                'event_type': row['event_type'],
+                'timestamp': row['timestamp'],
+                'session_id': row['session_id'],
+                'user_id': row['user_id'],
+                'created_at': row['created_at']
+            }
             
-            events = []
-            for row in rows:
-                event_data = {
-                    'id': row['id'],
-                    'event_type': row['event_type'],
-                    'timestamp': row['timestamp'],
-                    'session_id': row['session_id'],
-                    'user_id': row['user_id'],
-                    'created_at': row['created_at']
-                }
-                
-                if row['data']:
-                    event_data['data'] = json.loads(row['data'])
-                if row['tags']:
-                    event_data['tags'] = json.loads(row['tags'])
-                
-                events.append(event_data)
+            if row['data']:
+                event_data['data'] = json.loads(row['data'])
+            if row['tags']:
+                event_data['tags'] = json.loads(row['tags'])
             
-            return events
+            events.append(event_data)
+        
+        return events
+    
+    def apply_retention(self) -> Dict[str, int]:
+        """Drop raw event partitions and rollups older than the retention periods."""
+        return self.storage.prune()
 
 
 # Global analytics collector instance
@@ -351,7 +406,12 @@ def get_analytics_collector() -> AnalyticsCollector:
     """Get global analytics collector instance."""
     global _global_collector
     if _global_collector is None:
-        _global_collector = AnalyticsCollector()
+        # Retention is opt-in; unset keeps every event and rollup
+        config = SystemConfig()
+        _global_collector = AnalyticsCollector(
+            retention_days=config.get('analytics.retention_days'),
+            rollup_retention_days=config.get('analytics.rollup_retention_days')
+        )
     return _global_collector
 
 
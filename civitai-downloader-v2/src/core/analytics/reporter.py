@@ -2,6 +2,10 @@
 """
 Analytics reporting system.
 Implements requirement 13.5: Daily, weekly, monthly reports in multiple formats.
+
+Reports are written section by section to a text file handle, so nothing but
+the current section is held as a string. Weekly and monthly statistics come
+from the analyzer's rollup path, which merges cached per-day partials.
 """
 
 import json
@@ -10,7 +14,7 @@ from datetime import datetime, timedelta
 from enum import Enum
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, TextIO, Union
 
 from .analyzer import AnalyticsAnalyzer, AnalysisReport
 
@@ -69,18 +73,35 @@ class ReportGenerator:
         filename = f"analytics_report_{config.period.value}_{timestamp}.{config.format.value}"
         output_path = output_dir / filename
         
+        # csv.writer expects newline translation to be off
+        newline = '' if config.format == ReportFormat.CSV else None
+        with open(output_path, 'w', encoding='utf-8', newline=newline) as out:
+            self.write_report(report, config, out)
+        
+        return output_path
+    
+    def write_report(self, report: AnalysisReport, config: ReportConfig, out: TextIO) -> None:
+        """
+        Write report in specified format to an open text file handle.
+        
+        Sections are written as they are rendered, so output can go to a
+        file, a pipe or a response stream without building the whole report.
+        
+        Args:
+            report: Analysis report
+            config: Report configuration (format and options)
+            out: Writable text file handle
+        """
         if config.format == ReportFormat.JSON:
-            self._generate_json_report(report, output_path, config)
+            self._generate_json_report(report, out, config)
         elif config.format == ReportFormat.HTML:
-            self._generate_html_report(report, output_path, config)
+            self._generate_html_report(report, out, config)
         elif config.format == ReportFormat.CSV:
-            self._generate_csv_report(report, output_path, config)
+            self._generate_csv_report(report, out, config)
         elif config.format == ReportFormat.MARKDOWN:
-            self._generate_markdown_report(report, output_path, config)
+            self._generate_markdown_report(report, out, config)
         elif config.format == ReportFormat.TEXT:
-            self._generate_text_report(report, output_path, config)
-        
-        return output_path
+            self._generate_text_report(report, out, config)
     
     def generate_daily_report(self, days_back: int = 0, 
                              format: ReportFormat = ReportFormat.JSON) -> Path:
@@ -126,9 +147,9 @@ class ReportGenerator:
         return self.generate_report(report, config)
     
     def _generate_json_report(self, report: AnalysisReport, 
-                             output_path: Path, config: ReportConfig) -> None:
+                             out: TextIO, config: ReportConfig) -> None:
         """Generate JSON format report."""
-        report_data = {
+        sections = {
             'report_metadata': {
                 'generated_at': time.time(),
                 'generated_by': 'CivitAI Downloader Analytics',
@@ -150,6 +171,12 @@ class ReportGenerator:
             'recommendations': report.recommendations
         }
         
+        # Same layout as json.dump(..., indent=2), one top-level section at a time
+        out.write("{")
+        for index, (key, value) in enumerate(sections.items()):
+            out.write(f"{',' if index else ''}\n  {json.dumps(key)}: ")
+            out.write(json.dumps(value, indent=2, default=str).replace("\n", "\n  "))
+        
         if config.include_raw_data:
             # Add raw events for detailed analysis
             events = self.analyzer.collector.get_events(
@@ -157,18 +184,20 @@ class ReportGenerator:
                 end_time=report.period_end,
                 limit=1000  # Limit to prevent huge files
             )
-            report_data['raw_events'] = events
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, default=str)
+            out.write(',\n  "raw_events": [')
+            for index, event in enumerate(events):
+                out.write(f"{',' if index else ''}\n    ")
+                out.write(json.dumps(event, indent=2, default=str).replace("\n", "\n    "))
+            out.write("\n  ]" if events else "]")
+        out.write("\n}")
     
     def _generate_html_report(self, report: AnalysisReport,
-                             output_path: Path, config: ReportConfig) -> None:
+                             out: TextIO, config: ReportConfig) -> None:
         """Generate HTML format report."""
         start_date = datetime.fromtimestamp(report.period_start).strftime("%Y-%m-%d %H:%M")
         end_date = datetime.fromtimestamp(report.period_end).strftime("%Y-%m-%d %H:%M")
         
-        html_content = f"""<!DOCTYPE html>
+        out.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -270,11 +299,11 @@ class ReportGenerator:
                 <div class="metric-label">Total Cache Requests</div>
                 <div class="metric-value">{report.cache_statistics.get('total_cache_requests', 0):,}</div>
             </div>
-        </div>"""
+        </div>""")
         
         # Add error analysis if there are errors
         if report.error_analysis.get('total_errors', 0) > 0:
-            html_content += f"""
+            out.write(f"""
         <h2>Error Analysis</h2>
         <div class="error-section">
             <div class="summary-grid">
@@ -291,75 +320,71 @@ class ReportGenerator:
                     <div class="metric-value">{report.error_analysis.get('download_errors', 0)}</div>
                 </div>
             </div>
-        </div>"""
+        </div>""")
         
         # Add recommendations
         if report.recommendations:
-            html_content += f"""
+            out.write(f"""
         <h2>Recommendations</h2>
         <div class="recommendations">
             <ul>
                 {''.join(f'<li>{rec}</li>' for rec in report.recommendations)}
             </ul>
-        </div>"""
+        </div>""")
         
-        html_content += """
+        out.write("""
     </div>
 </body>
-</html>"""
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+</html>""")
     
     def _generate_csv_report(self, report: AnalysisReport,
-                            output_path: Path, config: ReportConfig) -> None:
+                            out: TextIO, config: ReportConfig) -> None:
         """Generate CSV format report."""
         import csv
         
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Header
-            writer.writerow(['CivitAI Downloader Analytics Report'])
-            writer.writerow(['Generated at', datetime.now().isoformat()])
-            writer.writerow(['Period', f"{datetime.fromtimestamp(report.period_start)} to {datetime.fromtimestamp(report.period_end)}"])
-            writer.writerow([])  # Empty row
-            
-            # Summary metrics
-            writer.writerow(['Summary Metrics'])
-            writer.writerow(['Metric', 'Value'])
-            for key, value in report.summary.items():
-                if isinstance(value, dict):
-                    continue
-                writer.writerow([key.replace('_', ' ').title(), value])
-            
-            writer.writerow([])  # Empty row
-            
-            # API Statistics
-            writer.writerow(['API Statistics'])
-            writer.writerow(['Metric', 'Value'])
-            for key, value in report.api_statistics.items():
-                if isinstance(value, dict):
-                    continue
-                writer.writerow([key.replace('_', ' ').title(), value])
-            
-            writer.writerow([])  # Empty row
-            
-            # Download Statistics
-            writer.writerow(['Download Statistics'])
-            writer.writerow(['Metric', 'Value'])
-            for key, value in report.download_statistics.items():
-                if isinstance(value, dict):
-                    continue
-                writer.writerow([key.replace('_', ' ').title(), value])
+        writer = csv.writer(out)
+        
+        # Header
+        writer.writerow(['CivitAI Downloader Analytics Report'])
+        writer.writerow(['Generated at', datetime.now().isoformat()])
+        writer.writerow(['Period', f"{datetime.fromtimestamp(report.period_start)} to {datetime.fromtimestamp(report.period_end)}"])
+        writer.writerow([])  # Empty row
+        
+        # Summary metrics
+        writer.writerow(['Summary Metrics'])
+        writer.writerow(['Metric', 'Value'])
+        for key, value in report.summary.items():
+            if isinstance(value, dict):
+                continue
+            writer.writerow([key.replace('_', ' ').title(), value])
+        
+        writer.writerow([])  # Empty row
+        
+        # API Statistics
+        writer.writerow(['API Statistics'])
+        writer.writerow(['Metric', 'Value'])
+        for key, value in report.api_statistics.items():
+            if isinstance(value, dict):
+                continue
+            writer.writerow([key.replace('_', ' ').title(), value])
+        
+        writer.writerow([])  # Empty row
+        
+        # Download Statistics
+        writer.writerow(['Download Statistics'])
+        writer.writerow(['Metric', 'Value'])
+        for key, value in report.download_statistics.items():
+            if isinstance(value, dict):
+                continue
+            writer.writerow([key.replace('_', ' ').title(), value])
     
     def _generate_markdown_report(self, report: AnalysisReport,
-                                 output_path: Path, config: ReportConfig) -> None:
+                                 out: TextIO, config: ReportConfig) -> None:
         """Generate Markdown format report."""
         start_date = datetime.fromtimestamp(report.period_start).strftime("%Y-%m-%d %H:%M")
         end_date = datetime.fromtimestamp(report.period_end).strftime("%Y-%m-%d %H:%M")
         
-        md_content = f"""# CivitAI Downloader Analytics Report
+        out.write(f"""# CivitAI Downloader Analytics Report
 
 **Report Period:** {start_date} to {end_date}  
 **Generated:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
@@ -403,11 +428,11 @@ class ReportGenerator:
 | Total Requests | {report.cache_statistics.get('total_cache_requests', 0):,} |
 | Cache Hits | {report.cache_statistics.get('cache_hits', 0):,} |
 | Cache Misses | {report.cache_statistics.get('cache_misses', 0):,} |
-"""
+""")
         
         # Add error analysis if there are errors
         if report.error_analysis.get('total_errors', 0) > 0:
-            md_content += f"""
+            out.write(f"""
 ## Error Analysis
 
 | Metric | Value |
@@ -415,26 +440,23 @@ class ReportGenerator:
 | Total Errors | {report.error_analysis.get('total_errors', 0):,} |
 | API Errors | {report.error_analysis.get('api_errors', 0):,} |
 | Download Errors | {report.error_analysis.get('download_errors', 0):,} |
-"""
+""")
         
         # Add recommendations
         if report.recommendations:
-            md_content += "\n## Recommendations\n\n"
+            out.write("\n## Recommendations\n\n")
             for i, rec in enumerate(report.recommendations, 1):
-                md_content += f"{i}. {rec}\n"
-        
-        md_content += f"\n---\n*Report generated by CivitAI Downloader Analytics System*\n"
+                out.write(f"{i}. {rec}\n")
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+        out.write(f"\n---\n*Report generated by CivitAI Downloader Analytics System*\n")
     
     def _generate_text_report(self, report: AnalysisReport,
-                             output_path: Path, config: ReportConfig) -> None:
+                             out: TextIO, config: ReportConfig) -> None:
         """Generate plain text format report."""
         start_date = datetime.fromtimestamp(report.period_start).strftime("%Y-%m-%d %H:%M")
         end_date = datetime.fromtimestamp(report.period_end).strftime("%Y-%m-%d %H:%M")
         
-        content = f"""CivitAI Downloader Analytics Report
+        out.write(f"""CivitAI Downloader Analytics Report
 {'=' * 50}
 
 Report Period: {start_date} to {end_date}
@@ -463,23 +485,20 @@ CACHE PERFORMANCE
 {'-' * 20}
 Hit Rate: {report.cache_statistics.get('hit_rate_percent', 0):.1f}%
 Total Requests: {report.cache_statistics.get('total_cache_requests', 0):,}
-"""
+""")
         
         # Add error analysis
         if report.error_analysis.get('total_errors', 0) > 0:
-            content += f"""
+            out.write(f"""
 ERROR ANALYSIS
 {'-' * 20}
 Total Errors: {report.error_analysis.get('total_errors', 0):,}
 API Errors: {report.error_analysis.get('api_errors', 0):,}
 Download Errors: {report.error_analysis.get('download_errors', 0):,}
-"""
+""")
         
         # Add recommendations
         if report.recommendations:
-            content += f"\nRECOMMENDATIONS\n{'-' * 20}\n"
+            out.write(f"\nRECOMMENDATIONS\n{'-' * 20}\n")
             for i, rec in enumerate(report.recommendations, 1):
-                content += f"{i}. {rec}\n"
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
\ No newline at end of file
+                out.write(f"{i}. {rec}\n")
\ No newline at end of file
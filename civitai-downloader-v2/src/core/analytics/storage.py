@@ -0,0 +1,703 @@
+#!/usr/bin/env python3
+"""
+Analytics storage with daily partitions, hourly rollups and retention.
+Implements requirement 13.5 storage for long-period reports: raw events are
+written to one table per UTC day, per-hour aggregates are maintained at flush
+time, and retention drops whole partitions instead of deleting rows. Reports
+over several days merge per-day partials of the hourly rollups, cached once a
+day has ended.
+
+The ``analytics_events`` name is kept as a view over the partitions so existing
+queries keep working.
+"""
+
+import json
+import math
+import sqlite3
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..performance.metrics import get_metrics_registry, DB_WRITE_SECONDS
+
+DAY_SECONDS = 24 * 3600
+HOUR_SECONDS = 3600
+PARTITION_PREFIX = "analytics_events_"
+EVENT_VIEW = "analytics_events"
+LEGACY_TABLE = "analytics_events_legacy"
+
+# SQLite limits compound SELECTs to 500 terms; the compatibility view covers the newest partitions
+MAX_VIEW_PARTITIONS = 400
+MAX_TRACKED_REQUESTS = 10000
+
+EVENT_COLUMNS = ("id", "event_type", "timestamp", "session_id", "user_id", "data", "tags", "created_at")
+
+# Per event type: numeric fields summarized (count/sum/min/max), categorical
+# fields counted per value, and numeric fields kept as histograms for medians
+ROLLUP_SPECS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    'api_request': {'labels': ('endpoint',)},
+    'api_response': {'values': ('response_time', 'response_size'),
+                     'labels': ('status_code', 'endpoint'),
+                     'histograms': ('response_time',)},
+    'api_error': {'labels': ('error_type', 'endpoint')},
+    'download_started': {'values': ('file_size',), 'labels': ('file_ext',)},
+    'download_completed': {'values': ('bytes_downloaded', 'average_speed', 'duration')},
+    'download_failed': {'labels': ('error_type',)},
+    'search_performed': {'values': ('response_time', 'results_count'),
+                         'labels': ('query',),
+                         'histograms': ('response_time',)},
+    'cache_hit': {'values': ('cache_age',)},
+}
+
+# Histogram bucket upper bounds (seconds): 10ms doubling up to ~5.5 minutes, then overflow
+HISTOGRAM_BOUNDS = [round(0.01 * 2 ** i, 2) for i in range(16)]
+ALL_TYPES = '*'
+
+
+def partition_day(timestamp: float) -> str:
+    """UTC day key (YYYYMMDD) of a timestamp."""
+    return time.strftime('%Y%m%d', time.gmtime(max(timestamp, 0)))
+
+
+def partition_table(day: str) -> str:
+    """Partition table name for a day key."""
+    return f"{PARTITION_PREFIX}{day}"
+
+
+def _histogram_label(value: float) -> str:
+    for bound in HISTOGRAM_BOUNDS:
+        if value <= bound:
+            return f"{bound:g}"
+    return "inf"
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+class RollupAccumulator:
+    """
+    In-memory hourly rollup cells keyed by (hour, event_type, metric, label).
+
+    Each cell holds [count, total, min, max]. Cells are additive, so rollups
+    from the database and from raw edge events can be merged freely.
+    """
+
+    def __init__(self):
+        self.cells: Dict[Tuple[int, str, str, str], List[float]] = {}
+
+    def _add(self, hour: int, event_type: str, metric: str, label: str,
+             value: Optional[float] = None, count: int = 1) -> None:
+        key = (hour, event_type, metric, label)
+        cell = self.cells.get(key)
+        value = value if value is not None else 0.0
+        if cell is None:
+            self.cells[key] = [count, value, value, value]
+        else:
+            cell[0] += count
+            cell[1] += value
+            cell[2] = min(cell[2], value)
+            cell[3] = max(cell[3], value)
+
+    def add_event(self, event_type: str, timestamp: float, session_id: Optional[str],
+                  data: Dict[str, Any], endpoint: Optional[str] = None) -> None:
+        """Add one raw event."""
+        hour = int(timestamp // HOUR_SECONDS)
+        self._add(hour, event_type, 'events', '')
+        if session_id:
+            self._add(hour, ALL_TYPES, 'session', str(session_id))
+
+        if not isinstance(data, dict):
+            return
+        spec = ROLLUP_SPECS.get(event_type, {})
+
+        for field in spec.get('values', ()):
+            value = data.get(field)
+            if _is_number(value):
+                self._add(hour, event_type, f'value:{field}', '', float(value))
+
+        for field in spec.get('labels', ()):
+            if field == 'endpoint':
+                value = data.get('endpoint') or endpoint
+            elif field == 'file_ext':
+                file_name = data.get('file_name') or ''
+                value = file_name.split('.')[-1].lower() if file_name else None
+            else:
+                value = data.get(field)
+            if value is not None and value != '':
+                self._add(hour, event_type, f'label:{field}', str(value))
+
+        for field in spec.get('histograms', ()):
+            value = data.get(field)
+            if _is_number(value):
+                self._add(hour, event_type, f'hist:{field}', _histogram_label(value))
+
+        if event_type == 'api_response' and endpoint and _is_number(data.get('response_time')):
+            self._add(hour, event_type, 'endpoint_time', endpoint, float(data['response_time']))
+
+    def add_row(self, hour: int, event_type: str, metric: str, label: str,
+                count: int, total: float, min_value: float, max_value: float) -> None:
+        """Merge a stored rollup row."""
+        key = (hour, event_type, metric, label)
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = [count, total, min_value, max_value]
+        else:
+            cell[0] += count
+            cell[1] += total
+            cell[2] = min(cell[2], min_value)
+            cell[3] = max(cell[3], max_value)
+
+    def rows(self) -> List[Tuple[int, str, str, str, int, float, float, float]]:
+        """Cells as rows for upserting."""
+        return [(*key, int(cell[0]), cell[1], cell[2], cell[3]) for key, cell in self.cells.items()]
+
+    # Query helpers used by report generation
+
+    def count(self, event_type: str) -> int:
+        """Number of events of a type."""
+        return int(sum(c[0] for (_, et, metric, _), c in self.cells.items()
+                       if et == event_type and metric == 'events'))
+
+    def labels_by_type(self) -> Dict[str, int]:
+        """Number of events per event type."""
+        counts: Dict[str, int] = defaultdict(int)
+        for (_, et, metric, _), cell in self.cells.items():
+            if metric == 'events':
+                counts[et] += int(cell[0])
+        return dict(counts)
+
+    def summary(self, event_type: str, field: str) -> Dict[str, float]:
+        """count/total/min/max of a numeric field."""
+        result = {'count': 0, 'total': 0.0, 'min': 0.0, 'max': 0.0}
+        first = True
+        for (_, et, metric, _), cell in self.cells.items():
+            if et == event_type and metric == f'value:{field}':
+                result['count'] += int(cell[0])
+                result['total'] += cell[1]
+                result['min'] = cell[2] if first else min(result['min'], cell[2])
+                result['max'] = cell[3] if first else max(result['max'], cell[3])
+                first = False
+        return result
+
+    def labels(self, event_type: str, metric: str) -> Counter:
+        """Event counts per label of a metric."""
+        counts: Counter = Counter()
+        for (_, et, m, label), cell in self.cells.items():
+            if et == event_type and m == metric:
+                counts[label] += int(cell[0])
+        return counts
+
+    def label_totals(self, event_type: str, metric: str) -> Dict[str, Tuple[int, float]]:
+        """(count, total) per label of a metric."""
+        totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+        for (_, et, m, label), cell in self.cells.items():
+            if et == event_type and m == metric:
+                totals[label][0] += int(cell[0])
+                totals[label][1] += cell[1]
+        return {label: (int(v[0]), v[1]) for label, v in totals.items()}
+
+    def hourly_counts(self) -> Dict[int, int]:
+        """Total events per hour."""
+        counts: Dict[int, int] = defaultdict(int)
+        for (hour, _, metric, _), cell in self.cells.items():
+            if metric == 'events':
+                counts[hour] += int(cell[0])
+        return dict(counts)
+
+    def median(self, event_type: str, field: str) -> float:
+        """Median estimate of a histogram field (bucket upper bound, capped at the max)."""
+        buckets = self.labels(event_type, f'hist:{field}')
+        total = sum(buckets.values())
+        if not total:
+            return 0
+        ordered = sorted(buckets.items(), key=lambda item: float(item[0]))
+        cumulative = 0
+        for label, count in ordered:
+            cumulative += count
+            if cumulative * 2 >= total:
+                upper = float(label)
+                return min(upper, self.summary(event_type, field)['max'])
+        return self.summary(event_type, field)['max']
+
+
+class AnalyticsStorage:
+    """
+    Partitioned analytics event storage.
+
+    Tables:
+        analytics_events_YYYYMMDD  raw events of one UTC day
+        analytics_partitions       partition catalog
+        analytics_rollups_hourly   additive hourly aggregates
+        analytics_rollups_daily    hourly aggregates summed per ended UTC day
+                                   (all metrics but the per-hour event counts)
+        analytics_rollup_days      days cached in analytics_rollups_daily
+        analytics_meta             global event id sequence
+    """
+
+    def __init__(self, db_path: str, retention_days: Optional[int] = None,
+                 rollup_retention_days: Optional[int] = None):
+        """
+        Initialize analytics storage.
+
+        Args:
+            db_path: SQLite database path
+            retention_days: Days of raw events to keep (None keeps everything)
+            rollup_retention_days: Days of hourly rollups to keep (None keeps everything)
+        """
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.rollup_retention_days = rollup_retention_days
+        self._request_endpoints: "OrderedDict[str, str]" = OrderedDict()
+        self._last_prune_day: Optional[str] = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection in autocommit mode (transactions are explicit)."""
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        return conn
+
+    def initialize(self) -> None:
+        """Create storage tables, import a legacy events table and apply retention."""
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_partitions (
+                    day TEXT PRIMARY KEY,
+                    table_name TEXT NOT NULL,
+                    event_count INTEGER DEFAULT 0,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_rollups_hourly (
+                    hour INTEGER NOT NULL,
+                    event_type TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    min_value REAL,
+                    max_value REAL,
+                    PRIMARY KEY (hour, event_type, metric, label)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_rollups_daily (
+                    day INTEGER NOT NULL,
+                    event_type TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    min_value REAL,
+                    max_value REAL,
+                    PRIMARY KEY (day, event_type, metric, label)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS analytics_rollup_days (day INTEGER PRIMARY KEY)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+
+            legacy = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (EVENT_VIEW,)
+            ).fetchone()
+            if legacy:
+                conn.execute(f"ALTER TABLE {EVENT_VIEW} RENAME TO {LEGACY_TABLE}")
+                self._import_legacy(conn)
+
+            self._rebuild_view(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        self.prune()
+
+    def _import_legacy(self, conn: sqlite3.Connection) -> None:
+        """Move rows of the former single analytics_events table into partitions."""
+        cursor = conn.execute(f"""
+            SELECT id, event_type, timestamp, session_id, user_id, data, tags, created_at
+            FROM {LEGACY_TABLE} ORDER BY timestamp
+        """)
+        max_id = 0
+        while True:
+            rows = cursor.fetchmany(5000)
+            if not rows:
+                break
+            self._insert_rows(conn, rows)
+            max_id = max(max_id, max(row[0] for row in rows))
+
+        self._set_next_id(conn, max(self._next_id(conn), max_id + 1))
+        conn.execute(f"DROP TABLE {LEGACY_TABLE}")
+
+    def _next_id(self, conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM analytics_meta WHERE key = 'next_event_id'").fetchone()
+        return row[0] if row else 1
+
+    def _set_next_id(self, conn: sqlite3.Connection, value: int) -> None:
+        conn.execute("""
+            INSERT INTO analytics_meta (key, value) VALUES ('next_event_id', ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """, (value,))
+
+    def _partitions(self, conn: sqlite3.Connection) -> List[str]:
+        return [row[0] for row in conn.execute("SELECT day FROM analytics_partitions ORDER BY day")]
+
+    def _ensure_partition(self, conn: sqlite3.Connection, day: str) -> bool:
+        """Create a day partition; returns True if it was new."""
+        if conn.execute("SELECT 1 FROM analytics_partitions WHERE day = ?", (day,)).fetchone():
+            return False
+
+        table = partition_table(day)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
+                event_type TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                session_id TEXT,
+                user_id TEXT,
+                data TEXT,
+                tags TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_type_ts ON {table}(event_type, timestamp)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_session_ts ON {table}(session_id, timestamp)")
+        conn.execute("INSERT INTO analytics_partitions (day, table_name) VALUES (?, ?)", (day, table))
+        return True
+
+    def _rebuild_view(self, conn: sqlite3.Connection) -> None:
+        """Recreate the analytics_events compatibility view over the newest partitions."""
+        days = self._partitions(conn)[-MAX_VIEW_PARTITIONS:]
+        columns = ", ".join(EVENT_COLUMNS)
+        if days:
+            body = " UNION ALL ".join(f"SELECT {columns} FROM {partition_table(day)}" for day in days)
+        else:
+            body = ("SELECT CAST(NULL AS INTEGER) AS id, '' AS event_type, 0.0 AS timestamp, "
+                    "NULL AS session_id, NULL AS user_id, NULL AS data, NULL AS tags, "
+                    "NULL AS created_at LIMIT 0")
+        conn.execute(f"DROP VIEW IF EXISTS {EVENT_VIEW}")
+        conn.execute(f"CREATE VIEW {EVENT_VIEW} AS {body}")
+
+    def _insert_rows(self, conn: sqlite3.Connection, rows: Iterable[Tuple]) -> RollupAccumulator:
+        """Insert complete event rows into their partitions and upsert their rollups."""
+        by_day: Dict[str, List[Tuple]] = defaultdict(list)
+        rollups = RollupAccumulator()
+        for row in rows:
+            event_id, event_type, timestamp, session_id, _, data, _, _ = row
+            by_day[partition_day(timestamp)].append(row)
+
+            try:
+                payload = json.loads(data) if data else {}
+            except (TypeError, ValueError):
+                payload = {}
+            endpoint = None
+            if isinstance(payload, dict):
+                request_id = payload.get('request_id')
+                if event_type == 'api_request' and request_id and payload.get('endpoint'):
+                    self._track_request(str(request_id), str(payload['endpoint']))
+                elif request_id:
+                    endpoint = self._request_endpoints.get(str(request_id))
+            rollups.add_event(event_type, timestamp, session_id, payload, endpoint)
+
+        new_partition = False
+        for day, day_rows in by_day.items():
+            new_partition |= self._ensure_partition(conn, day)
+            conn.executemany(f"""
+                INSERT OR REPLACE INTO {partition_table(day)}
+                (id, event_type, timestamp, session_id, user_id, data, tags, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """, day_rows)
+            conn.execute("UPDATE analytics_partitions SET event_count = event_count + ? WHERE day = ?",
+                         (len(day_rows), day))
+
+        conn.executemany("""
+            INSERT INTO analytics_rollups_hourly
+            (hour, event_type, metric, label, count, total, min_value, max_value)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(hour, event_type, metric, label) DO UPDATE SET
+                count = count + excluded.count,
+                total = total + excluded.total,
+                min_value = MIN(min_value, excluded.min_value),
+                max_value = MAX(max_value, excluded.max_value)
+        """, rollups.rows())
+
+        # Late events invalidate the cached partials of their days
+        days = [(day,) for day in {hour // 24 for hour, *_ in rollups.cells}]
+        conn.executemany("DELETE FROM analytics_rollup_days WHERE day = ?", days)
+        conn.executemany("DELETE FROM analytics_rollups_daily WHERE day = ?", days)
+
+        if new_partition:
+            self._rebuild_view(conn)
+        return rollups
+
+    def _track_request(self, request_id: str, endpoint: str) -> None:
+        self._request_endpoints[request_id] = endpoint
+        if len(self._request_endpoints) > MAX_TRACKED_REQUESTS:
+            self._request_endpoints.popitem(last=False)
+
+    def write_events(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Write a batch of events (dicts from AnalyticsEvent.to_dict) in one transaction.
+
+        Event ids come from a global sequence so they stay unique across partitions.
+        """
+        if not events:
+            return
+
+        conn = self.connect()
+        try:
+            with get_metrics_registry().timer(DB_WRITE_SECONDS, {'table': EVENT_VIEW}):
+                conn.execute("BEGIN IMMEDIATE")
+                next_id = self._next_id(conn)
+                rows = []
+                for offset, event in enumerate(events):
+                    rows.append((
+                        next_id + offset,
+                        event['event_type'],
+                        event['timestamp'],
+                        event.get('session_id'),
+                        event.get('user_id'),
+                        json.dumps(event.get('data'), default=str),
+                        json.dumps(event['tags']) if event.get('tags') else None,
+                        None
+                    ))
+                self._insert_rows(conn, rows)
+                self._set_next_id(conn, next_id + len(rows))
+                conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        if self._last_prune_day != partition_day(time.time()):
+            self.prune()
+
+    def select_events(self, event_type: Optional[str] = None,
+                      start_time: Optional[float] = None,
+                      end_time: Optional[float] = None,
+                      limit: Optional[int] = None) -> List[sqlite3.Row]:
+        """
+        Read raw events newest first, touching only partitions in the time window.
+
+        Partitions cover disjoint days, so reading them newest-first with a
+        per-partition ORDER BY yields globally ordered results.
+        """
+        conn = self.connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            days = self._window_days(conn, start_time, end_time)
+            where, params = self._window_filter(event_type, start_time, end_time)
+
+            rows: List[sqlite3.Row] = []
+            for day in reversed(days):
+                sql = f"SELECT * FROM {partition_table(day)}{where} ORDER BY timestamp DESC"
+                day_params = list(params)
+                if limit:
+                    sql += " LIMIT ?"
+                    day_params.append(limit - len(rows))
+                rows.extend(conn.execute(sql, day_params).fetchall())
+                if limit and len(rows) >= limit:
+                    break
+            return rows
+        finally:
+            conn.close()
+
+    def _window_days(self, conn: sqlite3.Connection, start_time: Optional[float],
+                     end_time: Optional[float]) -> List[str]:
+        """Partitions overlapping a time window, oldest first."""
+        days = self._partitions(conn)
+        if start_time:
+            days = [day for day in days if day >= partition_day(start_time)]
+        if end_time:
+            days = [day for day in days if day <= partition_day(end_time)]
+        return days
+
+    @staticmethod
+    def _window_filter(event_type: Optional[str], start_time: Optional[float],
+                       end_time: Optional[float]) -> Tuple[str, List[Any]]:
+        conditions = []
+        params: List[Any] = []
+        if event_type:
+            conditions.append("event_type = ?")
+            params.append(event_type)
+        if start_time:
+            conditions.append("timestamp >= ?")
+            params.append(start_time)
+        if end_time:
+            conditions.append("timestamp <= ?")
+            params.append(end_time)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def window_source(self, conn: sqlite3.Connection, start_time: Optional[float],
+                      end_time: Optional[float], event_type: Optional[str] = None,
+                      columns: str = "*") -> Tuple[str, List[Any]]:
+        """
+        SQL selecting a window's raw events from only the partitions it overlaps.
+
+        The filters are repeated in each partition's SELECT so every partition
+        uses its (event_type, timestamp) index; the result is meant to be used
+        as a subquery by aggregate queries.
+
+        Args:
+            conn: Connection the SQL will run on
+            start_time: Window start (inclusive)
+            end_time: Window end (inclusive)
+            event_type: Only events of this type
+            columns: Column expressions selected from each partition
+
+        Returns:
+            SQL text and its parameters
+        """
+        where, params = self._window_filter(event_type, start_time, end_time)
+        days = self._window_days(conn, start_time, end_time)
+        if not days:
+            return f"SELECT {columns} FROM {EVENT_VIEW} WHERE 0", []
+        sql = " UNION ALL ".join(f"SELECT {columns} FROM {partition_table(day)}{where}" for day in days)
+        return sql, params * len(days)
+
+    def load_rollups(self, start_hour: int, end_hour: int,
+                     collapse_hours: bool = False) -> RollupAccumulator:
+        """
+        Load hourly rollups for hours in [start_hour, end_hour).
+
+        Args:
+            start_hour: First hour (timestamp // 3600), inclusive
+            end_hour: Last hour, exclusive
+            collapse_hours: Sum all cells but the per-hour event counts across the
+                window in SQL (they are then keyed by start_hour); whole ended
+                days are read from their cached daily partials
+        """
+        if collapse_hours:
+            first_day = -(-start_hour // 24)
+            last_day = min(end_hour // 24, int(time.time() // DAY_SECONDS))
+            if first_day < last_day:
+                self.cache_daily_rollups(first_day, last_day)
+            else:
+                # No whole ended day: every cell comes from the hourly table
+                first_day = last_day = 0
+            sql = """
+                SELECT cell_hour, event_type, metric, label,
+                       SUM(count), SUM(total), MIN(min_value), MAX(max_value)
+                FROM (
+                    SELECT ? AS cell_hour, event_type, metric, label, count, total, min_value, max_value
+                    FROM analytics_rollups_daily WHERE day >= ? AND day < ?
+                    UNION ALL
+                    SELECT CASE WHEN metric = 'events' THEN hour ELSE ? END,
+                           event_type, metric, label, count, total, min_value, max_value
+                    FROM analytics_rollups_hourly
+                    WHERE hour >= ? AND hour < ?
+                      AND (metric = 'events' OR hour < ? OR hour >= ?)
+                )
+                GROUP BY cell_hour, event_type, metric, label
+            """
+            params: Tuple[int, ...] = (start_hour, first_day, last_day,
+                                       start_hour, start_hour, end_hour,
+                                       first_day * 24, last_day * 24)
+        else:
+            sql = """
+                SELECT hour, event_type, metric, label, count, total, min_value, max_value
+                FROM analytics_rollups_hourly WHERE hour >= ? AND hour < ?
+            """
+            params = (start_hour, end_hour)
+
+        rollups = RollupAccumulator()
+        conn = self.connect()
+        try:
+            for row in conn.execute(sql, params):
+                rollups.add_row(*row)
+        finally:
+            conn.close()
+        return rollups
+
+    def cache_daily_rollups(self, first_day: int, last_day: int) -> int:
+        """
+        Sum the hourly rollups of days not cached yet into daily partials.
+
+        Only ended days should be cached; writes to a cached day drop its partials.
+
+        Args:
+            first_day: First day (timestamp // 86400), inclusive
+            last_day: Last day, exclusive
+
+        Returns:
+            Number of days cached
+        """
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cached = {row[0] for row in conn.execute(
+                "SELECT day FROM analytics_rollup_days WHERE day >= ? AND day < ?", (first_day, last_day)
+            )}
+            missing = [day for day in range(first_day, last_day) if day not in cached]
+            for day in missing:
+                conn.execute("""
+                    INSERT INTO analytics_rollups_daily
+                    (day, event_type, metric, label, count, total, min_value, max_value)
+                    SELECT ?, event_type, metric, label,
+                           SUM(count), SUM(total), MIN(min_value), MAX(max_value)
+                    FROM analytics_rollups_hourly
+                    WHERE hour >= ? AND hour < ? AND metric != 'events'
+                    GROUP BY event_type, metric, label
+                """, (day, day * 24, (day + 1) * 24))
+            conn.executemany("INSERT INTO analytics_rollup_days (day) VALUES (?)",
+                             [(day,) for day in missing])
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return len(missing)
+
+    def prune(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Apply retention: drop expired day partitions and old rollups.
+
+        Returns:
+            Number of partitions dropped and rollup rows deleted
+        """
+        now = now or time.time()
+        dropped = deleted = 0
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if self.retention_days is not None:
+                cutoff = partition_day(now - self.retention_days * DAY_SECONDS)
+                expired = [day for day in self._partitions(conn) if day < cutoff]
+                for day in expired:
+                    conn.execute(f"DROP TABLE IF EXISTS {partition_table(day)}")
+                    conn.execute("DELETE FROM analytics_partitions WHERE day = ?", (day,))
+                dropped = len(expired)
+                if expired:
+                    self._rebuild_view(conn)
+
+            if self.rollup_retention_days is not None:
+                cutoff_hour = int((now - self.rollup_retention_days * DAY_SECONDS) // HOUR_SECONDS)
+                deleted = conn.execute("DELETE FROM analytics_rollups_hourly WHERE hour < ?",
+                                       (cutoff_hour,)).rowcount
+                # Partials of days that lost hours are rebuilt from what is left
+                conn.execute("DELETE FROM analytics_rollups_daily WHERE day * 24 < ?", (cutoff_hour,))
+                conn.execute("DELETE FROM analytics_rollup_days WHERE day * 24 < ?", (cutoff_hour,))
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        self._last_prune_day = partition_day(now)
+        return {'partitions_dropped': dropped, 'rollup_rows_deleted': deleted}
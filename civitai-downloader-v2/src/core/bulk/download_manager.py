@@ -17,17 +17,21 @@ import time
 
 try:
     from ...core.download.manager import DownloadManager, DownloadTask, FileInfo, DownloadPriority, DownloadStatus
+    from ...core.download.progress_bus import ProgressBus
     from ...core.search.strategy import SearchResult
     from ...core.security.scanner import SecurityScanner, ScanResult
     from ...core.config.system_config import SystemConfig
+    from ...core.memory.batch_budget import BatchBudget, get_batch_budget
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent.parent))
     from core.download.manager import DownloadManager, DownloadTask, FileInfo, DownloadPriority, DownloadStatus
+    from core.download.progress_bus import ProgressBus
     from core.search.strategy import SearchResult
     from core.security.scanner import SecurityScanner, ScanResult
     from core.config.system_config import SystemConfig
+    from core.memory.batch_budget import BatchBudget, get_batch_budget
 
 
 class BulkStatus(Enum):
@@ -105,7 +109,8 @@ class BulkDownloadManager:
     def __init__(self, 
                  download_manager: Optional[DownloadManager] = None,
                  security_scanner: Optional[SecurityScanner] = None,
-                 config: Optional[SystemConfig] = None):
+                 config: Optional[SystemConfig] = None,
+                 batch_budget: Optional[BatchBudget] = None):
         """
         Initialize bulk download manager.
         
@@ -113,6 +118,7 @@ class BulkDownloadManager:
             download_manager: Download manager instance
             security_scanner: Security scanner instance
             config: System configuration
+            batch_budget: Memory budget deciding batch sizes (defaults to the shared one)
         """
         self.config = config or SystemConfig()
         self.download_manager = download_manager or DownloadManager(config=self.config)
@@ -128,6 +134,7 @@ class BulkDownloadManager:
             pause_between_batches=self.config.get('bulk.pause_between_batches', 0.0),
             priority_boost=self.config.get('bulk.priority_boost', True)
         )
+        self.batch_budget = batch_budget or get_batch_budget()
         
         # Job management
         self.jobs: Dict[str, BulkDownloadJob] = {}
@@ -147,6 +154,8 @@ class BulkDownloadManager:
         # Callbacks
         self.progress_callbacks: List[Callable[[str, Dict[str, Any]], None]] = []
         self.completion_callbacks: List[Callable[[BulkDownloadJob], None]] = []
+        # Batch progress is coalesced per job while the processor runs
+        self.progress_bus = ProgressBus(rate_hz=self.config.get('download.progress_rate_hz', 10.0))
         
         # Thread safety
         self._lock = threading.Lock()
@@ -219,9 +228,11 @@ class BulkDownloadManager:
         self._running = False
         if self._processor_task:
             await self._processor_task
+        await asyncio.to_thread(self.progress_bus.stop)
     
     async def _process_jobs(self):
         """Process bulk download jobs."""
+        self.progress_bus.start()
         while self._running:
             job_id = self._get_next_job()
             if not job_id:
@@ -273,18 +284,25 @@ class BulkDownloadManager:
                 file_infos = self._extract_file_infos(result)
                 all_file_infos.extend(file_infos)
             
-            # Process in batches
-            batches = [all_file_infos[i:i + self.batch_config.batch_size] 
-                      for i in range(0, len(all_file_infos), self.batch_config.batch_size)]
-            
-            for batch_idx, batch in enumerate(batches):
+            # Process in batches sized by the memory budget
+            start = 0
+            batch_idx = 0
+            while start < len(all_file_infos):
                 if job.status == BulkStatus.CANCELLED:
                     break
                 
-                await self._process_batch(job, batch, batch_idx, len(batches))
+                size = self.batch_budget.next_batch_size('bulk_download', self.batch_config.batch_size)
+                batch = all_file_infos[start:start + size]
+                start += len(batch)
+                # Remaining batches are estimated at the current size
+                total_batches = batch_idx + 1 + -(-(len(all_file_infos) - start) // size)
+                
+                with self.batch_budget.measure('bulk_download', len(batch)):
+                    await self._process_batch(job, batch, batch_idx, total_batches)
+                batch_idx += 1
                 
                 # Pause between batches if configured
-                if self.batch_config.pause_between_batches > 0 and batch_idx < len(batches) - 1:
+                if self.batch_config.pause_between_batches > 0 and start < len(all_file_infos):
                     await asyncio.sleep(self.batch_config.pause_between_batches)
             
             # Update final status
@@ -318,29 +336,34 @@ class BulkDownloadManager:
             
             task_id = self.download_manager.create_download_task(
                 file_info=file_info,
-                priority=priority,
-                auto_start=False
+                priority=priority
             )
             
             job.download_tasks[str(file_info.id)] = task_id
             batch_tasks.append(task_id)
         
-        # Start all tasks in batch
-        download_futures = []
+        # Start all tasks in batch as download slots free up
+        started = []
         for task_id in batch_tasks:
-            future = self.download_manager.start_download(task_id)
-            download_futures.append((task_id, future))
+            try:
+                await self.download_manager.wait_for_slot()
+                started.append((task_id, await self.download_manager.start_download(task_id), None))
+            except Exception as e:
+                started.append((task_id, False, e))
         
         # Wait for batch completion
-        for task_id, future in download_futures:
+        for task_id, success, error in started:
             try:
-                success = await future
+                if error is not None:
+                    raise error
+                if success:
+                    await self.download_manager.wait_for_download(task_id)
                 task = self.download_manager.get_task_status(task_id)
                 
                 if success and task:
                     # Perform security scan
-                    if task.status == DownloadStatus.COMPLETED and task.final_path:
-                        scan_report = self.security_scanner.scan_file(task.final_path)
+                    if task.status == DownloadStatus.COMPLETED and task.output_path:
+                        scan_report = self.security_scanner.scan_file(task.output_path)
                         if scan_report.scan_result != ScanResult.SAFE:
                             job.errors.append({
                                 'file_id': task.file_info.id,
@@ -453,11 +476,13 @@ class BulkDownloadManager:
     def add_progress_callback(self, callback: Callable[[str, Dict[str, Any]], None]):
         """Add progress callback."""
         self.progress_callbacks.append(callback)
+        self.progress_bus.subscribe(callback)
     
     def remove_progress_callback(self, callback: Callable[[str, Dict[str, Any]], None]):
         """Remove progress callback."""
         if callback in self.progress_callbacks:
             self.progress_callbacks.remove(callback)
+            self.progress_bus.unsubscribe(callback)
     
     def add_completion_callback(self, callback: Callable[[BulkDownloadJob], None]):
         """Add completion callback."""
@@ -469,12 +494,8 @@ class BulkDownloadManager:
             self.completion_callbacks.remove(callback)
     
     def _notify_progress(self, job_id: str, progress_data: Dict[str, Any]):
-        """Notify progress callbacks."""
-        for callback in self.progress_callbacks:
-            try:
-                callback(job_id, progress_data)
-            except Exception as e:
-                print(f"Error in progress callback: {e}")
+        """Publish job progress to the callbacks (latest state per job wins)."""
+        self.progress_bus.publish(job_id, job_id, progress_data)
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get bulk download statistics."""
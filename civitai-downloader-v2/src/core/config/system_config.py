@@ -67,13 +67,16 @@ class SystemConfig:
                 'base_url': 'https://civitai.com/api/v1',
                 'timeout': 30,
                 'max_retries': 3.0,
-                'api_key': None  # Required, no default
+                'api_key': None,  # Required, no default
+                'cache_path': 'data/api_cache.db',  # Persistent response cache
+                'stale_while_revalidate': 0  # Seconds stale responses are served while refreshing
             },
             'download': {
                 'dir': 'downloads',
                 'temp_dir': 'downloads/temp',
                 'concurrent_downloads': 1,
                 'chunk_size': 8192,
+                'progress_rate_hz': 10.0,  # Progress callback deliveries per second and task
                 'max_file_size_per_download_gb': 10.0,
                 'organize_by_type': True,
                 'organize_by_creator': False
@@ -93,6 +96,10 @@ class SystemConfig:
             },
             'database': {
                 'path': 'data/civitai.db'
+            },
+            'analytics': {
+                'retention_days': None,  # Days of raw events to keep (None keeps everything)
+                'rollup_retention_days': None  # Days of hourly rollups to keep
             }
         }
     
@@ -14,6 +14,7 @@ from .manager import (
     download_model_file,
     create_file_info_from_api
 )
+from .progress_bus import ProgressBus
 
 __all__ = [
     'DownloadManager',
@@ -23,5 +24,6 @@ __all__ = [
     'DownloadStatus',
     'DownloadPriority',
     'download_model_file',
-    'create_file_info_from_api'
+    'create_file_info_from_api',
+    'ProgressBus'
 ]
\ No newline at end of file
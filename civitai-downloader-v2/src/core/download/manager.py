@@ -6,6 +6,7 @@ Provides concurrent downloads with resume capability, progress tracking, and int
 
 import os
 import asyncio
+import logging
 import aiohttp
 import hashlib
 import time
@@ -23,6 +24,11 @@ try:
     from ...api.auth import AuthManager
     from ...core.config.system_config import SystemConfig
     from ...core.search.strategy import SearchResult
+    from ...core.performance.metrics import (
+        get_metrics_registry, DOWNLOAD_BYTES_TOTAL, DOWNLOAD_THROUGHPUT_MBPS, HASH_THROUGHPUT_MBPS
+    )
+    from ...core.performance.profiler import get_profiler
+    from .progress_bus import ProgressBus
 except ImportError:
     import sys
     from pathlib import Path
@@ -30,6 +36,19 @@ except ImportError:
     from api.auth import AuthManager
     from core.config.system_config import SystemConfig
     from core.search.strategy import SearchResult
+    from core.performance.metrics import (
+        get_metrics_registry, DOWNLOAD_BYTES_TOTAL, DOWNLOAD_THROUGHPUT_MBPS, HASH_THROUGHPUT_MBPS
+    )
+    from core.performance.profiler import get_profiler
+    from core.download.progress_bus import ProgressBus
+
+MB = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+_metrics = get_metrics_registry()
+_downloaded_bytes = _metrics.counter(DOWNLOAD_BYTES_TOTAL, description="Bytes written by downloads")
+_profiler = get_profiler()
 
 
 class DownloadStatus(Enum):
@@ -146,6 +165,8 @@ class DownloadManager:
         # Progress tracking
         self.progress_callbacks: List[Callable[[ProgressUpdate], None]] = []
         self.progress_callback = None  # Single callback for test compatibility
+        # Callbacks are fed through the bus: latest update per task, at most progress_rate_hz per second
+        self.progress_bus = ProgressBus(rate_hz=self.config.get('download.progress_rate_hz', 10.0))
         self.stats = {
             'total_downloads': 0,
             'successful_downloads': 0,
@@ -253,6 +274,7 @@ class DownloadManager:
         task.start_time = time.time()
         
         # Notify progress
+        self.progress_bus.start()
         self._notify_progress(task)
         
         return True
@@ -302,9 +324,11 @@ class DownloadManager:
                     leave=False
                 )
                 
-                with open(task.temp_path, mode) as f:
+                with _profiler.span('transfer'), open(task.temp_path, mode) as f:
                     start_time = time.time()
                     speed_samples = []
+                    transfer_start = time.perf_counter()
+                    transfer_initial = task.downloaded_bytes
                     
                     try:
                         async for chunk in response.content.iter_chunked(task.chunk_size):
@@ -316,9 +340,11 @@ class DownloadManager:
                                 continue
                             
                             # Write chunk
-                            f.write(chunk)
+                            with _profiler.span('disk_write'):
+                                f.write(chunk)
                             chunk_size = len(chunk)
                             task.downloaded_bytes += chunk_size
+                            _downloaded_bytes.inc(chunk_size)
                             
                             # Update progress bar
                             progress_bar.update(chunk_size)
@@ -350,20 +376,21 @@ class DownloadManager:
                             await asyncio.sleep(0.001)
                     finally:
                         progress_bar.close()
+                        _metrics.record_throughput(DOWNLOAD_THROUGHPUT_MBPS,
+                                                   (task.downloaded_bytes - transfer_initial) / MB,
+                                                   time.perf_counter() - transfer_start)
             
             # Download completed
             if task.status != DownloadStatus.CANCELLED:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.info(f"🏁 Download content completed, starting finalization for task {task.id}")
+                logger.debug("🏁 Download content completed, starting finalization for task %s", task.id)
                 await self._finalize_download(task)
             
         except Exception as e:
             await self._handle_download_error(task, str(e))
         
         finally:
-            # Clean up
-            if task.id in self.active_downloads:
+            # Clean up (a retry has already registered its own asyncio task)
+            if self.active_downloads.get(task.id) is asyncio.current_task():
                 del self.active_downloads[task.id]
     
     async def _finalize_download(self, task: DownloadTask) -> None:
@@ -373,60 +400,47 @@ class DownloadManager:
         Args:
             task: Download task
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"🔧 _finalize_download() called for task {task.id}")
+        # Per-step traces are DEBUG with %-style arguments so they cost nothing unless enabled
+        logger.debug("🔧 _finalize_download() called for task %s", task.id)
         
         try:
             # Verify file integrity if hash provided
-            logger.info(f"🔍 Checking integrity verification requirement...")
             if task.verify_integrity and task.file_info.hash_sha256:
-                logger.info(f"🔍 Starting integrity verification...")
+                logger.debug("🔍 Starting integrity verification...")
                 if not await self._verify_file_integrity(task):
                     raise Exception("File integrity verification failed")
-                logger.info(f"✅ Integrity verification passed")
+                logger.debug("✅ Integrity verification passed")
             else:
-                logger.info(f"⏭️  Skipping integrity verification (no hash provided)")
+                logger.debug("⏭️  Skipping integrity verification (no hash provided)")
             
             # Move from temp to final location
-            logger.info(f"📁 Moving file from temp to final location...")
-            logger.info(f"   From: {task.temp_path}")
-            logger.info(f"   To: {task.output_path}")
-            
             if task.output_path.exists():
-                logger.info(f"⚠️  Target file already exists, generating unique path...")
                 task.output_path = self._generate_unique_path(task.output_path)
-                logger.info(f"   New path: {task.output_path}")
+                logger.debug("⚠️  Target file already exists, using unique path %s", task.output_path)
             
             # Check if temp file exists
             if not task.temp_path.exists():
                 raise Exception(f"Temp file does not exist: {task.temp_path}")
             
-            logger.info(f"📦 Temp file size: {task.temp_path.stat().st_size} bytes")
+            logger.debug("🚚 Moving %s -> %s", task.temp_path, task.output_path)
             
             # Use shutil.move for cross-device compatibility
-            logger.info(f"🚚 Moving file...")
-            shutil.move(str(task.temp_path), str(task.output_path))
-            logger.info(f"✅ File moved successfully")
+            with _profiler.span('move'):
+                shutil.move(str(task.temp_path), str(task.output_path))
             
             # Update task status
-            logger.info(f"📊 Updating task status to COMPLETED...")
             task.status = DownloadStatus.COMPLETED
             task.end_time = time.time()
-            logger.info(f"✅ Task status updated")
             
             # Update statistics
-            logger.info(f"📊 Updating statistics...")
             with self._lock:
                 self.stats['successful_downloads'] += 1
                 self.stats['total_bytes_downloaded'] += task.downloaded_bytes
                 self.completed_tasks.append(task.id)
-            logger.info(f"✅ Statistics updated")
             
             # Notify completion
-            logger.info(f"📢 Notifying progress...")
             self._notify_progress(task)
-            logger.info(f"✅ Finalization completed successfully")
+            logger.info("✅ Download finalized: %s (%d bytes)", task.output_path, task.downloaded_bytes)
             
         except Exception as e:
             await self._handle_download_error(task, f"Finalization failed: {e}")
@@ -443,10 +457,16 @@ class DownloadManager:
         """
         try:
             hash_sha256 = hashlib.sha256()
+            hashed_bytes = 0
+            hash_start = time.perf_counter()
             
-            with open(task.temp_path, 'rb') as f:
+            with _profiler.span('verify_hash'), open(task.temp_path, 'rb') as f:
                 while chunk := f.read(task.chunk_size):
                     hash_sha256.update(chunk)
+                    hashed_bytes += len(chunk)
+            
+            _metrics.record_throughput(HASH_THROUGHPUT_MBPS, hashed_bytes / MB,
+                                       time.perf_counter() - hash_start)
             
             calculated_hash = hash_sha256.hexdigest().lower()
             expected_hash = task.file_info.hash_sha256.lower()
@@ -494,7 +514,7 @@ class DownloadManager:
             self._notify_progress(task)
     
     def _notify_progress(self, task: DownloadTask) -> None:
-        """Notify progress callbacks."""
+        """Publish the task's progress to the callbacks (coalesced per task while downloading)."""
         progress_percent = 0.0
         if task.total_bytes > 0:
             progress_percent = (task.downloaded_bytes / task.total_bytes) * 100
@@ -515,20 +535,18 @@ class DownloadManager:
             error_message=task.error_message
         )
         
-        for callback in self.progress_callbacks:
-            try:
-                callback(update)
-            except Exception as e:
-                print(f"Progress callback error: {e}")
+        self.progress_bus.publish(task.id, update)
     
     def add_progress_callback(self, callback: Callable[[ProgressUpdate], None]) -> None:
         """Add progress callback."""
         self.progress_callbacks.append(callback)
+        self.progress_bus.subscribe(callback)
     
     def remove_progress_callback(self, callback: Callable[[ProgressUpdate], None]) -> None:
         """Remove progress callback."""
         if callback in self.progress_callbacks:
             self.progress_callbacks.remove(callback)
+            self.progress_bus.unsubscribe(callback)
     
     async def pause_download(self, task_id: str) -> bool:
         """Pause a download task."""
@@ -585,6 +603,29 @@ class DownloadManager:
             else:
                 break
     
+    async def wait_for_slot(self) -> None:
+        """Wait until a download can start without exceeding the concurrent limit."""
+        while len(self.active_downloads) >= self.max_concurrent:
+            await asyncio.wait(list(self.active_downloads.values()),
+                               return_when=asyncio.FIRST_COMPLETED)
+    
+    async def wait_for_download(self, task_id: str) -> Optional[DownloadTask]:
+        """
+        Wait for a started download, including its retries, to finish.
+        
+        Args:
+            task_id: Task ID
+        
+        Returns:
+            The task, or None if unknown
+        """
+        while True:
+            download = self.active_downloads.get(task_id)
+            if download is None:
+                break
+            await asyncio.wait([download])
+        return self.tasks.get(task_id)
+    
     def get_task_status(self, task_id: str) -> Optional[DownloadTask]:
         """Get task status."""
         return self.tasks.get(task_id)
@@ -666,9 +707,6 @@ class DownloadManager:
         Returns:
             DownloadResult with success status and file path
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        
         logger.info(f"🔄 DownloadManager.download_file() called")
         logger.info(f"   URL: {url}")
         logger.info(f"   Output dir: {output_dir}")
@@ -764,6 +802,9 @@ class DownloadManager:
         # Close session
         if self._session and not self._session.closed:
             await self._session.close()
+        
+        # Deliver the final states without blocking the event loop
+        await asyncio.to_thread(self.progress_bus.stop)
 
 
 # Utility functions for easy download operations
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Progress Bus - Coalescing, asynchronous delivery of progress events.
+
+The download loops publish a progress event per chunk or per batch. Calling
+every callback inline made the transfer as slow as the slowest subscriber
+(a terminal UI, an analytics writer). The bus keeps only the latest event
+per key (task or job id) and delivers it from one worker thread per
+subscriber, at most ``rate_hz`` times per second:
+
+- ``publish()`` never blocks on a subscriber; it replaces the pending event
+  of the key and wakes the workers
+- A slow subscriber only sees fewer intermediate states; the final state of
+  every key is always delivered
+- Subscribers are isolated from each other, each has its own worker
+
+Until ``start()`` (and after ``stop()``) events are delivered inline, so
+notifications outside a running transfer behave like plain callbacks.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_HZ = 10.0
+
+
+def _deliver(callback: Callable[..., None], args: Tuple[Any, ...]) -> bool:
+    try:
+        callback(*args)
+        return True
+    except Exception as e:
+        logger.error(f"Progress callback error: {e}")
+        return False
+
+
+class _Subscription:
+    """Pending events and delivery worker of one subscriber."""
+
+    def __init__(self, bus: 'ProgressBus', callback: Callable[..., None]):
+        self.bus = bus
+        self.callback = callback
+        self._pending: Dict[Hashable, Tuple[Any, ...]] = {}
+        self._cond = threading.Condition()
+        self._closed = threading.Event()
+        self._delivering = False
+        self._finished = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._closed.clear()
+        self._finished = False
+        self._thread = threading.Thread(target=self._run, name='progress-bus', daemon=True)
+        self._thread.start()
+
+    def offer(self, key: Hashable, args: Tuple[Any, ...]) -> bool:
+        with self._cond:
+            if self._finished:
+                return False
+            if key in self._pending:
+                self.bus.coalesced += 1
+            wake = not self._pending
+            self._pending[key] = args
+            if wake:
+                self._cond.notify_all()
+            return True
+
+    def _run(self) -> None:
+        interval = self.bus.min_interval
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed.is_set():
+                    self._cond.wait()
+                if not self._pending:
+                    self._finished = True
+                    return
+                batch, self._pending = self._pending, {}
+                self._delivering = True
+            try:
+                for args in batch.values():
+                    if _deliver(self.callback, args):
+                        self.bus.delivered += 1
+            finally:
+                with self._cond:
+                    self._delivering = False
+                    self._cond.notify_all()
+            # Rate cap: events published meanwhile coalesce per key
+            if interval:
+                self._closed.wait(interval)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._delivering, timeout)
+
+    def close(self, flush: bool = True, timeout: Optional[float] = None) -> None:
+        with self._cond:
+            if not flush:
+                self._pending.clear()
+            self._closed.set()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+
+class ProgressBus:
+    """
+    Per-key coalescing event bus for progress callbacks.
+
+    Usage::
+
+        bus = ProgressBus(rate_hz=10)
+        bus.subscribe(render)
+        bus.start()
+        bus.publish(task.id, update)   # render(update), at most 10 times/s per task
+        bus.stop()                     # delivers what is still pending
+    """
+
+    def __init__(self, rate_hz: float = DEFAULT_RATE_HZ):
+        """
+        Initialize progress bus.
+
+        Args:
+            rate_hz: Maximum deliveries per second and subscriber
+                     (0 delivers as fast as the subscriber consumes)
+        """
+        self.min_interval = 1.0 / rate_hz if rate_hz and rate_hz > 0 else 0.0
+        self._subscriptions: List[_Subscription] = []
+        self._lock = threading.Lock()
+        self._running = False
+
+        # Statistics
+        self.published = 0
+        self.delivered = 0
+        self.coalesced = 0
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def subscribe(self, callback: Callable[..., None]) -> None:
+        """
+        Add a subscriber.
+
+        Args:
+            callback: Called with the published arguments
+        """
+        subscription = _Subscription(self, callback)
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+            if self._running:
+                subscription.start()
+
+    def unsubscribe(self, callback: Callable[..., None]) -> None:
+        """
+        Remove a subscriber, dropping its undelivered events.
+
+        Args:
+            callback: Callback given to subscribe()
+        """
+        with self._lock:
+            removed = [s for s in self._subscriptions if s.callback == callback]
+            self._subscriptions = [s for s in self._subscriptions if s.callback != callback]
+        for subscription in removed:
+            subscription.close(flush=False)
+
+    def publish(self, key: Hashable, *args: Any) -> None:
+        """
+        Publish the latest state of ``key``.
+
+        Args:
+            key: Coalescing key (task or job id)
+            *args: Arguments passed to the subscribers
+        """
+        self.published += 1
+        subscriptions = self._subscriptions
+        if not self._running:
+            for subscription in subscriptions:
+                if _deliver(subscription.callback, args):
+                    self.delivered += 1
+            return
+        for subscription in subscriptions:
+            # The bus was stopped meanwhile: its worker is gone
+            if not subscription.offer(key, args) and _deliver(subscription.callback, args):
+                self.delivered += 1
+
+    def start(self) -> None:
+        """Deliver from background workers instead of inline."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for subscription in self._subscriptions:
+                subscription.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """
+        Deliver pending events and return to inline delivery.
+
+        Args:
+            timeout: Seconds to wait for each worker
+        """
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            subscriptions = self._subscriptions
+        for subscription in subscriptions:
+            subscription.close(flush=True, timeout=timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every pending event has been delivered.
+
+        Args:
+            timeout: Seconds to wait per subscriber
+
+        Returns:
+            True if nothing is pending
+        """
+        return all(subscription.flush(timeout) for subscription in self._subscriptions)
@@ -18,6 +18,7 @@ import statistics
 
 from .unified_error_handler import UnifiedErrorHandler, UnifiedError, ErrorCategory, RecoveryStrategy
 from .error_context import ErrorContext
+from ..performance.metrics import get_metrics_registry, OPERATION_SECONDS, RETRIES_TOTAL
 
 
 class LogLevel(Enum):
@@ -101,6 +102,7 @@ class EnhancedErrorHandler(UnifiedErrorHandler):
         
         # Retry and backoff tracking
         self.retry_history: Dict[str, List[RetryMetrics]] = {}
+        self._registry = get_metrics_registry()
         self.adaptive_delays: Dict[str, float] = {}
         
         # Performance and metrics tracking
@@ -391,6 +393,8 @@ class EnhancedErrorHandler(UnifiedErrorHandler):
             self.retry_history[operation_key] = []
         
         self.retry_history[operation_key].append(metric)
+        if attempt > 1:
+            self._registry.counter(RETRIES_TOTAL, {'operation': operation_key}).inc()
         
         # Limit history size
         if len(self.retry_history[operation_key]) > 100:
@@ -407,6 +411,7 @@ class EnhancedErrorHandler(UnifiedErrorHandler):
         if operation_key not in self.metrics.timing_data:
             self.metrics.timing_data[operation_key] = []
         self.metrics.timing_data[operation_key].append(response_time)
+        self._registry.histogram(OPERATION_SECONDS, {'operation': operation_key}).record(response_time)
         
         # Limit timing data size
         if len(self.metrics.timing_data[operation_key]) > 100:
@@ -536,11 +541,14 @@ class EnhancedErrorHandler(UnifiedErrorHandler):
         # Calculate timing statistics
         for operation, times in self.metrics.timing_data.items():
             if times:
+                # Percentiles cover every call, not only the retained samples
+                histogram = self._registry.histogram(OPERATION_SECONDS, {'operation': operation})
                 report["timing_statistics"][operation] = {
                     "avg_response_time": statistics.mean(times),
                     "min_response_time": min(times),
                     "max_response_time": max(times),
                     "median_response_time": statistics.median(times),
+                    "p99_response_time": histogram.percentile(99),
                     "total_calls": len(times)
                 }
         
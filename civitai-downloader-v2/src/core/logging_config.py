@@ -1,16 +1,37 @@
 """
 Centralized logging configuration for CivitAI Downloader v2.
 Provides file-based logging with rotation and proper formatting.
+
+Optional modes (arguments of setup_logging or environment variables read by
+the automatic setup):
+
+- Async (``CIVITAI_LOG_ASYNC=true``): loggers only put records on a queue;
+  a QueueListener thread formats them and writes the rotating files, so
+  download and search loops never wait on file I/O
+- JSON lines (``CIVITAI_LOG_FORMAT=json``): one JSON object per record in
+  ``*.jsonl`` files, cheap to write and easy to aggregate
+- Rate limiting (``CIVITAI_LOG_RATE_LIMIT=<records per minute>``): repetitive
+  records of one call site are dropped once over the limit and the count of
+  dropped records is reported with the next one
 """
 
+import atexit
+import json
 import logging
 import logging.handlers
-from pathlib import Path
+import queue
+import threading
+from pathlib import Path, PurePath
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import sys
 import os
 
+# Arguments that cannot change between the log call and the listener rendering them
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None), PurePath)
+
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
 
 class FileLoggingFilter(logging.Filter):
     """Filter to redirect debug logs to files only."""
@@ -25,11 +46,131 @@ class ConsoleFilter(logging.Filter):
         return record.levelno >= logging.WARNING
 
 
+class RateLimitFilter(logging.Filter):
+    """
+    Drops repetitive records per call site.
+    
+    At most ``burst`` records of one call site (logger, level, file, line)
+    pass per ``period`` seconds. The first record of the next period notes
+    how many were dropped. Records above ``max_level`` always pass.
+    """
+    
+    def __init__(self, burst: int = 60, period: float = 60.0, max_level: int = logging.WARNING):
+        """
+        Initialize rate limit filter.
+        
+        Args:
+            burst: Records passed per call site and period
+            period: Period length in seconds
+            max_level: Highest level that is rate limited
+        """
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.max_level = max_level
+        self._sites: Dict[tuple, List] = {}  # site -> [period start, passed, dropped]
+        self._lock = threading.Lock()
+    
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        # The same record may pass through several handlers sharing this filter
+        decided = getattr(record, '_rate_limited', None)
+        if decided is not None:
+            return not decided
+        
+        site_key = (record.name, record.levelno, record.pathname, record.lineno)
+        with self._lock:
+            site = self._sites.get(site_key)
+            dropped = 0
+            if site is None or record.created - site[0] >= self.period:
+                dropped = site[2] if site else 0
+                site = self._sites[site_key] = [record.created, 0, 0]
+            site[1] += 1
+            limited = site[1] > self.burst
+            if limited:
+                site[2] += 1
+        
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} similar messages suppressed)"
+        record._rate_limited = limited
+        return not limited
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line."""
+    
+    _RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+    
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'location': f"{record.filename}:{record.lineno}",
+            'function': record.funcName,
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        # Fields passed through extra={...}
+        for key, value in record.__dict__.items():
+            if key not in self._RESERVED and not key.startswith('_'):
+                entry[key] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the listener thread.
+    
+    The stdlib handler renders every record in the logging thread so it can
+    be pickled; records here stay in-process, so only messages whose
+    arguments could still change are rendered before queuing.
+    """
+    
+    def prepare(self, record):
+        args = record.args
+        # A mapping argument is the caller's dict itself, so it is always rendered
+        if args and (isinstance(args, dict) or not all(isinstance(value, _IMMUTABLE_ARGS) for value in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def shutdown_async_logging() -> None:
+    """Stop the queue listener after writing every queued record."""
+    global _queue_listener
+    listener, _queue_listener = _queue_listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(shutdown_async_logging)
+
+
 def setup_logging(
     log_dir: Optional[Path] = None,
     console_level: int = logging.INFO,
     file_level: int = logging.DEBUG,
-    log_name: Optional[str] = None
+    log_name: Optional[str] = None,
+    async_mode: Optional[bool] = None,
+    json_format: Optional[bool] = None,
+    rate_limit: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Setup centralized logging configuration with daily rotation.
@@ -39,10 +180,20 @@ def setup_logging(
         console_level: Logging level for console output
         file_level: Logging level for file output
         log_name: Custom log file name prefix
+        async_mode: Write through a queue listener thread (CIVITAI_LOG_ASYNC if None)
+        json_format: Write JSON lines files (CIVITAI_LOG_FORMAT=json if None)
+        rate_limit: Records per minute and call site, 0 for no limit (CIVITAI_LOG_RATE_LIMIT if None)
         
     Returns:
         Dict containing log file paths and logger configuration
     """
+    if async_mode is None:
+        async_mode = _env_flag('CIVITAI_LOG_ASYNC')
+    if json_format is None:
+        json_format = os.environ.get('CIVITAI_LOG_FORMAT', 'text').strip().lower() == 'json'
+    if rate_limit is None:
+        rate_limit = int(os.environ.get('CIVITAI_LOG_RATE_LIMIT', '0') or 0)
+    
     # Set default log directory
     if log_dir is None:
         log_dir = Path("/Users/kuniaki-k/Code/civitiai/civitai-downloader-v2/logs")
@@ -55,10 +206,12 @@ def setup_logging(
     log_prefix = log_name or "civitai"
     
     # Log file paths (base names for rotation)
-    debug_log = log_dir / f"{log_prefix}_debug.log"
-    error_log = log_dir / f"{log_prefix}_error.log"
+    extension = 'jsonl' if json_format else 'log'
+    debug_log = log_dir / f"{log_prefix}_debug.{extension}"
+    error_log = log_dir / f"{log_prefix}_error.{extension}"
     
     # Remove all existing handlers
+    shutdown_async_logging()
     root_logger = logging.getLogger()
     root_logger.handlers.clear()
     
@@ -72,6 +225,7 @@ def setup_logging(
         '%(asctime)s - %(levelname)s - %(message)s',
         datefmt='%H:%M:%S'
     )
+    file_formatter = JsonLinesFormatter() if json_format else detailed_formatter
     
     # Console handler (WARNING and above only)
     console_handler = logging.StreamHandler(sys.stdout)
@@ -88,7 +242,7 @@ def setup_logging(
         encoding='utf-8'
     )
     debug_file_handler.setLevel(file_level)
-    debug_file_handler.setFormatter(detailed_formatter)
+    debug_file_handler.setFormatter(file_formatter)
     debug_file_handler.suffix = "%Y%m%d"  # Add date suffix to rotated files
     
     # Error file handler (ERROR and above) - daily rotation
@@ -100,14 +254,31 @@ def setup_logging(
         encoding='utf-8'
     )
     error_file_handler.setLevel(logging.ERROR)
-    error_file_handler.setFormatter(detailed_formatter)
+    error_file_handler.setFormatter(file_formatter)
     error_file_handler.suffix = "%Y%m%d"  # Add date suffix to rotated files
     
+    handlers = [console_handler, debug_file_handler, error_file_handler]
+    rate_filter = RateLimitFilter(burst=rate_limit, period=60.0) if rate_limit > 0 else None
+    
     # Configure root logger
     root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(debug_file_handler)
-    root_logger.addHandler(error_file_handler)
+    queue_handler = None
+    if async_mode:
+        # Loggers only enqueue; the listener thread formats and writes
+        global _queue_listener
+        queue_handler = LazyQueueHandler(queue.SimpleQueue())
+        if rate_filter:
+            queue_handler.addFilter(rate_filter)
+        _queue_listener = logging.handlers.QueueListener(
+            queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        _queue_listener.start()
+        root_logger.addHandler(queue_handler)
+    else:
+        for handler in handlers:
+            if rate_filter:
+                handler.addFilter(rate_filter)
+            root_logger.addHandler(handler)
     
     # Redirect print statements that look like debug output
     _redirect_debug_prints()
@@ -120,10 +291,13 @@ def setup_logging(
         'debug_log': debug_log,
         'error_log': error_log,
         'log_dir': log_dir,
+        'async': async_mode,
+        'format': 'json' if json_format else 'text',
         'handlers': {
             'console': console_handler,
             'debug_file': debug_file_handler,
-            'error_file': error_file_handler
+            'error_file': error_file_handler,
+            'queue': queue_handler
         }
     }
 
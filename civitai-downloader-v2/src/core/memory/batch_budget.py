@@ -0,0 +1,208 @@
+"""
+BatchBudget - Memory-budgeted batch sizing.
+
+Pipelines ask the shared controller for their next batch size and report what
+each batch cost in bytes. While there is headroom a pipeline runs at its
+configured size; when the projected RSS of the next batch would cross the
+(adaptive) warning threshold or exceed the available memory budget the batch
+shrinks at once, and it grows back gradually once headroom returns. Every
+resize is recorded in MemoryStatistics.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+import sys
+from pathlib import Path
+
+# Add the src directory to the path for importing
+src_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(src_path))
+
+try:
+    from .adaptive_thresholds import AdaptiveThresholds
+    from .memory_monitor import MB, MemoryMonitor, get_memory_monitor
+    from .memory_statistics import MemoryStatistics
+except ImportError:
+    from core.memory.adaptive_thresholds import AdaptiveThresholds
+    from core.memory.memory_monitor import MB, MemoryMonitor, get_memory_monitor
+    from core.memory.memory_statistics import MemoryStatistics
+
+logger = logging.getLogger(__name__)
+
+# Parsed JSON objects take several times the size of their serialized text
+SERIALIZED_EXPANSION = 4.0
+
+# Weight of the newest batch in the bytes-per-record average
+EWMA_ALPHA = 0.3
+
+
+@dataclass
+class PipelineBudget:
+    """Batch sizing state of one pipeline."""
+    size: int
+    bytes_per_record: Optional[float] = None
+    batches: int = 0
+    records: int = 0
+
+
+class BatchBudget:
+    """
+    Decides the next batch size of each pipeline from memory pressure.
+
+    The memory a batch may use is the smaller of the room left below the
+    warning threshold and a fraction of the available memory; the batch size
+    is that budget divided by the pipeline's measured bytes per record.
+    """
+
+    def __init__(self,
+                 monitor: Optional[MemoryMonitor] = None,
+                 thresholds: Optional[AdaptiveThresholds] = None,
+                 statistics: Optional[MemoryStatistics] = None,
+                 headroom_ratio: float = 0.9,
+                 available_fraction: float = 0.5):
+        """
+        Initialize batch budget.
+
+        Args:
+            monitor: Memory monitor (defaults to the shared monitor)
+            thresholds: Adaptive thresholds providing the warning threshold
+            statistics: Statistics receiving the resize decisions
+            headroom_ratio: Fraction of the warning threshold batches may fill
+            available_fraction: Fraction of available memory one batch may use
+        """
+        self.monitor = monitor or get_memory_monitor()
+        self.thresholds = thresholds or AdaptiveThresholds()
+        self.statistics = statistics or MemoryStatistics()
+        self.headroom_ratio = headroom_ratio
+        self.available_fraction = available_fraction
+        self._pipelines: Dict[str, PipelineBudget] = {}
+        self._lock = threading.Lock()
+
+    def budget_bytes(self, pipeline: str = "general") -> int:
+        """
+        Memory the next batch may use.
+
+        Args:
+            pipeline: Pipeline asking (passed to the adaptive thresholds)
+
+        Returns:
+            Budget in bytes (0 when RSS is already at the threshold)
+        """
+        sample = self.monitor.latest()
+        thresholds = self.thresholds.adjust_thresholds(sample.rss_mb, sample.available_mb, pipeline)
+        below_threshold = thresholds.warning_threshold_mb * MB * self.headroom_ratio - sample.rss_bytes
+        return int(max(0, min(below_threshold, sample.available_bytes * self.available_fraction)))
+
+    def next_batch_size(self, pipeline: str, default: int,
+                        minimum: int = 1, maximum: Optional[int] = None) -> int:
+        """
+        Get the size of a pipeline's next batch.
+
+        Args:
+            pipeline: Pipeline name (e.g. 'bulk_download')
+            default: Configured batch size, used while there is headroom
+            minimum: Smallest batch size returned
+            maximum: Largest batch size returned (defaults to default)
+
+        Returns:
+            Batch size
+        """
+        ceiling = max(minimum, maximum or default)
+        budget = self.budget_bytes(pipeline)
+
+        with self._lock:
+            state = self._pipelines.get(pipeline)
+            if state is None:
+                state = self._pipelines[pipeline] = PipelineBudget(size=min(default, ceiling))
+
+            target = ceiling
+            if budget <= 0:
+                target = minimum
+            elif state.bytes_per_record:
+                target = min(ceiling, int(budget // state.bytes_per_record))
+
+            old_size = state.size
+            if target < old_size:
+                # Shrink at once so the next batch stays below the threshold
+                new_size = max(minimum, target)
+                reason = 'pressure'
+            else:
+                # Grow gradually while headroom lasts
+                new_size = min(target, max(minimum, old_size * 2))
+                reason = 'headroom'
+            state.size = new_size
+
+        if new_size != old_size:
+            sample = self.monitor.latest()
+            self.statistics.record_batch_decision(
+                pipeline, old_size, new_size, sample.rss_mb, budget / MB,
+                state.bytes_per_record, reason
+            )
+            logger.debug(f"Batch size of {pipeline}: {old_size} -> {new_size} ({reason})")
+        return new_size
+
+    def record_batch(self, pipeline: str, records: int, nbytes: float,
+                     serialized: bool = False) -> None:
+        """
+        Report the memory cost of a processed batch.
+
+        Args:
+            pipeline: Pipeline name
+            records: Number of records in the batch
+            nbytes: Bytes the batch used
+            serialized: nbytes is the serialized (JSON) size of the records
+        """
+        if records <= 0:
+            return
+        if serialized:
+            nbytes *= SERIALIZED_EXPANSION
+        per_record = nbytes / records
+
+        with self._lock:
+            state = self._pipelines.setdefault(pipeline, PipelineBudget(size=records))
+            if state.bytes_per_record is None:
+                state.bytes_per_record = per_record
+            else:
+                state.bytes_per_record += EWMA_ALPHA * (per_record - state.bytes_per_record)
+            state.batches += 1
+            state.records += records
+
+    @contextmanager
+    def measure(self, pipeline: str, records: int) -> Iterator[None]:
+        """
+        Measure the RSS growth of processing a batch and report it.
+
+        Args:
+            pipeline: Pipeline name
+            records: Number of records in the batch
+        """
+        before = self.monitor.sample().rss_bytes
+        yield
+        self.record_batch(pipeline, records, max(0, self.monitor.sample().rss_bytes - before))
+
+    def get_pipeline(self, pipeline: str) -> Optional[PipelineBudget]:
+        """Sizing state of a pipeline, if it has asked for a batch."""
+        return self._pipelines.get(pipeline)
+
+
+_shared_budget: Optional[BatchBudget] = None
+_shared_lock = threading.Lock()
+
+
+def get_batch_budget() -> BatchBudget:
+    """
+    Get the process-wide batch budget shared by all pipelines.
+
+    Returns:
+        Shared BatchBudget
+    """
+    global _shared_budget
+    if _shared_budget is None:
+        with _shared_lock:
+            if _shared_budget is None:
+                _shared_budget = BatchBudget()
+    return _shared_budget
@@ -6,8 +6,6 @@ for handling large datasets efficiently, especially for 10,000+ model processing
 """
 
 import gc
-import psutil
-import os
 from typing import Dict, Any, Optional, Callable, List
 from dataclasses import dataclass
 
@@ -23,6 +21,12 @@ from core.interfaces.memory_manager import (
     MemoryThresholds, ProcessingRecommendation
 )
 
+# Relative first so the src.* tree shares the monitor that main.py starts
+try:
+    from .memory_monitor import MemoryMonitor, MemorySample, get_memory_monitor
+except ImportError:
+    from core.memory.memory_monitor import MemoryMonitor, MemorySample, get_memory_monitor
+
 
 class MemoryManagerImpl(MemoryManager):
     """
@@ -32,12 +36,14 @@ class MemoryManagerImpl(MemoryManager):
     and optimization strategies to handle 10,000+ model processing efficiently.
     """
     
-    def __init__(self, thresholds: Optional[MemoryThresholds] = None):
+    def __init__(self, thresholds: Optional[MemoryThresholds] = None,
+                 monitor: Optional[MemoryMonitor] = None):
         """
         Initialize memory manager with configurable thresholds.
         
         Args:
             thresholds: Custom memory thresholds, uses defaults if None
+            monitor: Memory sampler, uses the shared process monitor if None
         """
         self._thresholds = thresholds or MemoryThresholds()
         self._callbacks: Dict[MemoryPressure, List[Callable[[], None]]] = {
@@ -45,9 +51,9 @@ class MemoryManagerImpl(MemoryManager):
         }
         self._last_pressure_level = MemoryPressure.LOW
         
-        # Get system memory info once at initialization
-        self._system_memory = psutil.virtual_memory()
-        self._total_memory_mb = self._system_memory.total / (1024 * 1024)
+        # Sampled telemetry: reads are free, limits include cgroup v2
+        self._monitor = monitor or get_memory_monitor()
+        self._total_memory_mb = self._monitor.latest().total_bytes / (1024 * 1024)
     
     def should_use_streaming(self, expected_count: int, estimated_size_mb: Optional[float] = None) -> bool:
         """
@@ -83,34 +89,7 @@ class MemoryManagerImpl(MemoryManager):
             MemoryUsage object with current memory statistics
         """
         try:
-            # Get current process memory info
-            process = psutil.Process(os.getpid())
-            memory_info = process.memory_info()
-            
-            # Get system memory info
-            system_memory = psutil.virtual_memory()
-            
-            current_mb = memory_info.rss / (1024 * 1024)
-            available_mb = system_memory.available / (1024 * 1024)
-            percentage_used = (memory_info.rss / system_memory.total) * 100
-            
-            # Calculate peak memory (use high water mark if available)
-            try:
-                peak_mb = process.memory_info().peak_wset / (1024 * 1024)
-            except AttributeError:
-                # peak_wset not available on this platform, use current as approximation
-                peak_mb = current_mb
-            
-            # Determine pressure level
-            pressure_level = self._calculate_pressure_level(current_mb, available_mb)
-            
-            return MemoryUsage(
-                current_mb=current_mb,
-                peak_mb=peak_mb,
-                available_mb=available_mb,
-                percentage_used=percentage_used,
-                pressure_level=pressure_level
-            )
+            return self._usage_from_sample(self._monitor.latest())
         except Exception as e:
             # Fallback to minimal memory info
             return MemoryUsage(
@@ -121,6 +100,16 @@ class MemoryManagerImpl(MemoryManager):
                 pressure_level=MemoryPressure.LOW
             )
     
+    def _usage_from_sample(self, sample: MemorySample) -> MemoryUsage:
+        """Build MemoryUsage from a monitor sample."""
+        return MemoryUsage(
+            current_mb=sample.rss_mb,
+            peak_mb=max(sample.peak_mb, sample.rss_mb),
+            available_mb=sample.available_mb,
+            percentage_used=sample.percentage_used,
+            pressure_level=self._calculate_pressure_level(sample.rss_mb, sample.available_mb)
+        )
+    
     def optimize_memory(self, force_gc: bool = False) -> bool:
         """
         Optimize memory usage by cleaning up unused objects.
@@ -132,18 +121,16 @@ class MemoryManagerImpl(MemoryManager):
             True if optimization was successful
         """
         try:
-            memory_before = self.get_memory_usage().current_mb
+            memory_before = self._monitor.sample().rss_mb
             
             if force_gc:
-                # Force full garbage collection
-                gc.collect()
-                gc.collect()  # Run twice for thoroughness
+                # One full collection; further passes find nothing new
                 gc.collect()
             else:
-                # Gentle optimization
-                gc.collect()
+                # Gentle optimization: young generations only
+                gc.collect(1)
             
-            memory_after = self.get_memory_usage().current_mb
+            memory_after = self._monitor.sample().rss_mb
             
             # Consider optimization successful if we freed some memory
             return memory_after <= memory_before
@@ -0,0 +1,188 @@
+"""
+MemoryMonitor - Sampled process and container memory telemetry.
+
+A background sampler periodically reads process RSS and available memory into
+an immutable MemorySample. Readers only fetch the latest sample, so memory
+checks in hot loops cost an attribute read instead of several system calls.
+Available memory honours cgroup v2 limits so pressure decisions are correct
+inside containers.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import psutil
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_CGROUP_ROOT = Path("/sys/fs/cgroup")
+MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class MemorySample:
+    """One memory reading."""
+    timestamp: float
+    rss_bytes: int
+    peak_rss_bytes: int
+    available_bytes: int
+    total_bytes: int
+    cgroup_limit_bytes: Optional[int] = None
+
+    @property
+    def rss_mb(self) -> float:
+        return self.rss_bytes / MB
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_rss_bytes / MB
+
+    @property
+    def available_mb(self) -> float:
+        return self.available_bytes / MB
+
+    @property
+    def percentage_used(self) -> float:
+        """Process RSS as a percentage of the effective memory limit."""
+        if self.total_bytes <= 0:
+            return 0.0
+        return min(100.0, self.rss_bytes / self.total_bytes * 100)
+
+
+def read_cgroup_memory(cgroup_root: Path = DEFAULT_CGROUP_ROOT) -> Optional[Tuple[int, int]]:
+    """
+    Read the cgroup v2 memory limit of this process.
+
+    Args:
+        cgroup_root: cgroup v2 mount point
+
+    Returns:
+        Tuple of (limit_bytes, current_bytes), or None without a cgroup v2 limit
+    """
+    try:
+        limit = (cgroup_root / "memory.max").read_text().strip()
+        if limit == "max":
+            return None
+        current = (cgroup_root / "memory.current").read_text().strip()
+        return int(limit), int(current)
+    except (OSError, ValueError):
+        return None
+
+
+class MemoryMonitor:
+    """
+    Keeps the latest memory sample of this process.
+
+    Readers call latest(); the sample is refreshed by the background sampler
+    (start()) or, when no sampler runs, lazily once it is older than interval.
+    """
+
+    def __init__(self, interval: float = 0.25, cgroup_root: Path = DEFAULT_CGROUP_ROOT):
+        """
+        Initialize memory monitor.
+
+        Args:
+            interval: Seconds between samples
+            cgroup_root: cgroup v2 mount point read for container limits
+        """
+        self.interval = interval
+        self.cgroup_root = Path(cgroup_root)
+        self._process = psutil.Process(os.getpid())
+        self._peak_rss = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sample = self.sample()
+
+    def sample(self) -> MemorySample:
+        """Take a fresh reading and publish it as the latest sample."""
+        rss = self._process.memory_info().rss
+        system = psutil.virtual_memory()
+        available = system.available
+        total = system.total
+
+        cgroup = read_cgroup_memory(self.cgroup_root)
+        limit = None
+        if cgroup is not None:
+            limit, current = cgroup
+            available = max(0, min(available, limit - current))
+            total = min(total, limit)
+
+        peak = max(self._peak_rss, rss)
+        if resource is not None:
+            # ru_maxrss is the kernel's high-water mark (KB on Linux)
+            peak = max(peak, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+        self._peak_rss = peak
+
+        sample = MemorySample(
+            timestamp=time.monotonic(),
+            rss_bytes=rss,
+            peak_rss_bytes=peak,
+            available_bytes=available,
+            total_bytes=total,
+            cgroup_limit_bytes=limit
+        )
+        # Single reference assignment: readers never see a partial sample
+        self._sample = sample
+        return sample
+
+    def latest(self) -> MemorySample:
+        """Latest sample (refreshed lazily when no sampler thread runs)."""
+        sample = self._sample
+        if not self.running and time.monotonic() - sample.timestamp > self.interval:
+            sample = self.sample()
+        return sample
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background sampler thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 4)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                # Keep the previous sample if a reading fails
+                pass
+
+
+_shared_monitor: Optional[MemoryMonitor] = None
+_shared_lock = threading.Lock()
+
+
+def get_memory_monitor() -> MemoryMonitor:
+    """
+    Get the process-wide memory monitor, starting its sampler on first use.
+
+    Returns:
+        Shared MemoryMonitor
+    """
+    global _shared_monitor
+    if _shared_monitor is None:
+        with _shared_lock:
+            if _shared_monitor is None:
+                monitor = MemoryMonitor()
+                monitor.start()
+                _shared_monitor = monitor
+    return _shared_monitor
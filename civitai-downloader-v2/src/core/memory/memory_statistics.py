@@ -63,6 +63,7 @@ class MemoryStatistics:
         self._max_history = max_history
         self._memory_events = deque(maxlen=max_history)
         self._pressure_history = deque(maxlen=max_history)
+        self._batch_decisions = deque(maxlen=max_history)
         
         # Performance tracking
         self._operation_stats = defaultdict(list)
@@ -135,6 +136,58 @@ class MemoryStatistics:
         
         self._pressure_history.append(pressure_event)
     
+    def record_batch_decision(self,
+                              pipeline: str,
+                              old_size: int,
+                              new_size: int,
+                              rss_mb: float,
+                              budget_mb: float,
+                              bytes_per_record: Optional[float],
+                              reason: str) -> None:
+        """
+        Record a batch size change made by the batch budget controller.
+        
+        Args:
+            pipeline: Pipeline whose batch size changed
+            old_size: Previous batch size
+            new_size: New batch size
+            rss_mb: Process RSS when the decision was made
+            budget_mb: Memory the next batch may use
+            bytes_per_record: Measured bytes per record, if known
+            reason: 'pressure' (shrink) or 'headroom' (grow)
+        """
+        decision = {
+            'timestamp': time.time(),
+            'pipeline': pipeline,
+            'old_size': old_size,
+            'new_size': new_size,
+            'rss_mb': rss_mb,
+            'budget_mb': budget_mb,
+            'bytes_per_record': bytes_per_record,
+            'reason': reason
+        }
+        self._batch_decisions.append(decision)
+        
+        self.record_memory_event('batch_resize', rss_mb, rss_mb, context={
+            'pipeline': pipeline,
+            'old_size': old_size,
+            'new_size': new_size,
+            'reason': reason
+        })
+    
+    def get_batch_decisions(self, pipeline: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get recorded batch size decisions.
+        
+        Args:
+            pipeline: Only return decisions of this pipeline, or None for all
+            
+        Returns:
+            List of decisions, oldest first
+        """
+        return [decision for decision in self._batch_decisions
+                if pipeline is None or decision['pipeline'] == pipeline]
+    
     def get_recent_statistics(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get recent memory statistics events.
@@ -313,6 +366,7 @@ class MemoryStatistics:
         """Clear all collected statistics."""
         self._memory_events.clear()
         self._pressure_history.clear()
+        self._batch_decisions.clear()
         self._operation_stats.clear()
         self._efficiency_metrics.clear()
         self._cached_aggregation = None
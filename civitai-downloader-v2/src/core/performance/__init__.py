@@ -1,21 +1,21 @@
 #!/usr/bin/env python3
 """
 Performance optimization module for CivitAI Downloader.
-Provides advanced optimization techniques for improved download performance.
+Provides advanced optimization techniques for improved download performance,
+the metrics registry the hot paths record into and the pipeline profiler.
 """
 
-from .optimizer import (
-    PerformanceOptimizer,
-    AdaptiveDownloadManager,
-    OptimizationMode,
-    NetworkCondition,
-    PerformanceMetrics,
-    OptimizationConfig,
-    create_optimized_download_manager,
-    benchmark_download_performance
+from .metrics import (
+    MetricsRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    get_metrics_registry
 )
+from .exporter import MetricsServer, render_metrics, bind_component_gauges
+from .profiler import PipelineProfiler, ProfileSession, get_profiler
 
-__all__ = [
+_OPTIMIZER_NAMES = (
     'PerformanceOptimizer',
     'AdaptiveDownloadManager',
     'OptimizationMode',
@@ -24,4 +24,29 @@ __all__ = [
     'OptimizationConfig',
     'create_optimized_download_manager',
     'benchmark_download_performance'
-]
\ No newline at end of file
+)
+
+
+def __getattr__(name):
+    # The optimizer imports the download manager, which records into the
+    # metrics registry; load it on first use so that import stays acyclic
+    if name in _OPTIMIZER_NAMES:
+        from . import optimizer
+        return getattr(optimizer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    'MetricsRegistry',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'get_metrics_registry',
+    'MetricsServer',
+    'render_metrics',
+    'bind_component_gauges',
+    'PipelineProfiler',
+    'ProfileSession',
+    'get_profiler',
+    *_OPTIMIZER_NAMES
+]
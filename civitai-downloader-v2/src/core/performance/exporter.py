@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Metrics Exporter - Prometheus/OpenMetrics endpoint for long-running jobs.
+
+MetricsServer serves the metrics registry as text on ``/metrics`` from a
+background thread (stdlib http.server, no extra dependency), so bulk
+downloads and streaming crawls can be scraped and alerted on instead of being
+watched through a repainting terminal. Counters are exported as counters,
+gauges as gauges and the HDR histograms as summaries (p50/p90/p99 plus
+_sum/_count).
+
+bind_component_gauges() connects the existing components to gauges that are
+read at scrape time: download speed and queue depth, rate-limiter tokens,
+response cache hit ratio, circuit breaker state and memory pressure.
+Components are held weakly, so binding never keeps them alive.
+"""
+
+import logging
+import math
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterable, List, Optional
+
+from .metrics import (
+    Counter, Gauge, Histogram, MetricsRegistry, get_metrics_registry,
+    DOWNLOAD_SPEED_BYTES
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NAMESPACE = 'civitai'
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 9108
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99)
+
+# Gauge names of the bound components
+QUEUE_DEPTH = 'queue_depth'
+RATE_LIMITER_TOKENS = 'rate_limiter_tokens'
+RATE_LIMITER_RATE = 'rate_limiter_requests_per_second'
+CACHE_HIT_RATIO = 'cache_hit_ratio'
+CIRCUIT_BREAKER_STATE = 'circuit_breaker_state'
+MEMORY_RSS_BYTES = 'memory_rss_bytes'
+MEMORY_AVAILABLE_BYTES = 'memory_available_bytes'
+MEMORY_PRESSURE = 'memory_pressure_ratio'
+
+# circuit_breaker_state values
+CIRCUIT_STATE_VALUES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(pairs: Iterable) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + '}'
+
+
+def render_metrics(registry: Optional[MetricsRegistry] = None,
+                   namespace: str = DEFAULT_NAMESPACE,
+                   openmetrics: bool = False) -> str:
+    """
+    Render the registry in the Prometheus text or OpenMetrics format.
+
+    Args:
+        registry: Registry to export (process-wide registry if None)
+        namespace: Prefix of every metric name
+        openmetrics: Use the OpenMetrics format (ends with ``# EOF``)
+
+    Returns:
+        Exposition text
+    """
+    registry = registry or get_metrics_registry()
+    prefix = f'{namespace}_' if namespace else ''
+    lines: List[str] = []
+    families = {}
+    for metric in registry.metrics():
+        families.setdefault(metric.name, []).append(metric)
+
+    for name, metrics in families.items():
+        kind = metrics[0]
+        family = prefix + name
+        if isinstance(kind, Counter):
+            # Counter samples end in _total; the OpenMetrics family name does not
+            base = family[:-len('_total')] if family.endswith('_total') else family
+            type_name, type_family = 'counter', base if openmetrics else base + '_total'
+        elif isinstance(kind, Gauge):
+            type_name, type_family = 'gauge', family
+        else:
+            type_name, type_family = 'summary', family
+        if kind.description:
+            lines.append(f'# HELP {type_family} {_escape(kind.description)}')
+        lines.append(f'# TYPE {type_family} {type_name}')
+
+        for metric in metrics:
+            if isinstance(metric, Counter):
+                lines.append(f'{base}_total{_labels(metric.labels)} {_format_value(metric.value)}')
+            elif isinstance(metric, Gauge):
+                lines.append(f'{family}{_labels(metric.labels)} {_format_value(metric.value)}')
+            elif isinstance(metric, Histogram):
+                for quantile in SUMMARY_QUANTILES:
+                    labels = _labels(metric.labels + (('quantile', str(quantile)),))
+                    lines.append(f'{family}{labels} {_format_value(metric.percentile(quantile * 100))}')
+                lines.append(f'{family}_sum{_labels(metric.labels)} {_format_value(metric.sum)}')
+                lines.append(f'{family}_count{_labels(metric.labels)} {metric.count}')
+
+    if openmetrics:
+        lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics; everything else is 404."""
+
+    server: '_MetricsHTTPServer'
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+        try:
+            body = render_metrics(self.server.registry, self.server.namespace, openmetrics).encode('utf-8')
+        except Exception as e:
+            logger.error(f"Failed to render metrics: {e}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics: " + format, *args)
+
+
+class _MetricsHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, registry: MetricsRegistry, namespace: str):
+        self.registry = registry
+        self.namespace = namespace
+        super().__init__(address, _MetricsHandler)
+
+
+class MetricsServer:
+    """
+    Optional local HTTP endpoint exposing the metrics registry.
+
+    The server runs in a daemon thread and binds to localhost unless another
+    host is given (``0.0.0.0`` inside containers).
+    """
+
+    def __init__(self, port: int = DEFAULT_PORT, host: str = DEFAULT_HOST,
+                 registry: Optional[MetricsRegistry] = None,
+                 namespace: str = DEFAULT_NAMESPACE):
+        """
+        Initialize metrics server.
+
+        Args:
+            port: Port to listen on (0 picks a free port)
+            host: Interface to bind
+            registry: Registry to export (process-wide registry if None)
+            namespace: Prefix of every metric name
+        """
+        self.host = host
+        self.requested_port = port
+        self.registry = registry or get_metrics_registry()
+        self.namespace = namespace
+        self._server: Optional[_MetricsHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> Optional[int]:
+        """Port actually bound (None until started)."""
+        return self._server.server_address[1] if self._server else None
+
+    @property
+    def url(self) -> Optional[str]:
+        return f"http://{self.host}:{self.port}/metrics" if self._server else None
+
+    def start(self) -> 'MetricsServer':
+        """Start serving in the background."""
+        if self._server is not None:
+            return self
+        self._server = _MetricsHTTPServer((self.host, self.requested_port), self.registry, self.namespace)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics endpoint listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def _weak_reader(component: Any, read: Callable[[Any], float]) -> Callable[[], float]:
+    """Gauge callback reading from component while it is alive (NaN afterwards)."""
+    ref = weakref.ref(component)
+
+    def reader() -> float:
+        target = ref()
+        return math.nan if target is None else read(target)
+
+    return reader
+
+
+def _rate_limiter_tokens(limiter) -> float:
+    available = getattr(limiter, 'available_tokens', None)
+    return available() if callable(available) else math.nan
+
+
+def _cache_hit_ratio(cache) -> float:
+    lookups = cache.hit_count + cache.miss_count
+    return cache.hit_count / lookups if lookups else math.nan
+
+
+def _memory_pressure(monitor) -> float:
+    sample = monitor.latest()
+    limit = sample.rss_bytes + sample.available_bytes
+    return sample.rss_bytes / limit if limit > 0 else math.nan
+
+
+def bind_component_gauges(registry: Optional[MetricsRegistry] = None,
+                          client: Any = None,
+                          download_manager: Any = None,
+                          bulk_manager: Any = None,
+                          circuit_breakers: Iterable[Any] = (),
+                          memory_monitor: Any = None) -> MetricsRegistry:
+    """
+    Expose live component state as gauges read at scrape time.
+
+    Args:
+        registry: Registry to bind into (process-wide registry if None)
+        client: CivitaiAPIClient (rate-limiter tokens/rate, response cache hit ratio)
+        download_manager: DownloadManager (bytes/s of active downloads, queue depth)
+        bulk_manager: BulkDownloadManager (queued jobs)
+        circuit_breakers: CircuitBreakers (0 closed, 1 half-open, 2 open)
+        memory_monitor: MemoryMonitor (RSS, available memory and their ratio)
+
+    Returns:
+        The registry
+    """
+    registry = registry or get_metrics_registry()
+
+    if client is not None:
+        limiter = getattr(client, 'rate_limiter', None)
+        if limiter is not None:
+            registry.gauge(RATE_LIMITER_TOKENS, description="Requests the API rate limiter would admit now").set_function(
+                _weak_reader(limiter, _rate_limiter_tokens))
+            registry.gauge(RATE_LIMITER_RATE, description="Current adaptive API request rate").set_function(
+                _weak_reader(limiter, lambda l: l.current_rate))
+        cache = getattr(client, 'cache', None)
+        if cache is not None:
+            registry.gauge(CACHE_HIT_RATIO, {'cache': 'response'},
+                           description="Hit ratio of the cache").set_function(
+                _weak_reader(cache, _cache_hit_ratio))
+
+    if download_manager is not None:
+        registry.gauge(DOWNLOAD_SPEED_BYTES, description="Current download speed in bytes per second").set_function(
+            _weak_reader(download_manager,
+                         lambda m: sum(task.current_speed for task in m.get_active_downloads())))
+        registry.gauge(QUEUE_DEPTH, {'queue': 'downloads'}, description="Items waiting in the queue").set_function(
+            _weak_reader(download_manager, lambda m: len(m.download_queue)))
+
+    if bulk_manager is not None:
+        registry.gauge(QUEUE_DEPTH, {'queue': 'bulk_jobs'}, description="Items waiting in the queue").set_function(
+            _weak_reader(bulk_manager, lambda m: m.get_statistics()['queued_jobs']))
+
+    for breaker in circuit_breakers:
+        registry.gauge(CIRCUIT_BREAKER_STATE, {'circuit': breaker.name},
+                       description="Circuit breaker state (0 closed, 1 half-open, 2 open)").set_function(
+            _weak_reader(breaker, lambda b: CIRCUIT_STATE_VALUES[b.state.value]))
+
+    if memory_monitor is not None:
+        registry.gauge(MEMORY_RSS_BYTES, description="Process resident memory").set_function(
+            _weak_reader(memory_monitor, lambda m: m.latest().rss_bytes))
+        registry.gauge(MEMORY_AVAILABLE_BYTES, description="Memory still available to the process").set_function(
+            _weak_reader(memory_monitor, lambda m: m.latest().available_bytes))
+        registry.gauge(MEMORY_PRESSURE, description="RSS as a fraction of RSS plus available memory").set_function(
+            _weak_reader(memory_monitor, _memory_pressure))
+
+    return registry
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Fake CivitAI Server - Local stand-in for throughput benchmarks and tests.
+
+Serves a generated catalog with the shapes the client code reads:
+
+- ``/api/v1/models``: pages of models with ``limit``/``page`` and
+  ``cursor``/``nextCursor`` pagination (``ids=`` lookups too)
+- ``/api/v1/models/<id>``: a single model
+- ``/api/download/models/<version id>``: the version's file, with
+  ``Range`` requests answered as 206 partial content
+- ``/__stats``: request and byte counters as JSON
+
+Faults are injected deterministically: every Nth API request answers 429
+with ``Retry-After``, every Nth file is throttled, and every Nth file drops
+the connection halfway through its first full download. All files share one
+generated content block, so their SHA256 is computed once per size.
+"""
+
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+KB = 1024
+MB = 1024 * 1024
+
+MAX_PAGE_SIZE = 100
+BLOCK_SIZE = 64 * KB
+WRITE_SIZE = 64 * KB
+VERSION_ID_OFFSET = 100000
+FILE_ID_OFFSET = 200000
+
+_DOWNLOAD_PATH = re.compile(r'^/api/download/models/(\d+)$')
+_MODEL_PATH = re.compile(r'^/api/v1/models/(\d+)$')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+@dataclass
+class FakeCivitaiConfig:
+    """Catalog size and injected faults of the fake server."""
+    models: int = 200
+    file_size: int = 4 * MB
+    api_latency: float = 0.0            # Seconds added to every API response
+    rate_limit_every: int = 0           # Every Nth API request answers 429 (0: never)
+    retry_after: int = 1                # Retry-After seconds of the 429 responses
+    slow_every: int = 0                 # Every Nth file is throttled (0: none)
+    slow_bytes_per_second: int = 1 * MB
+    flaky_every: int = 0                # Every Nth file drops its first full download halfway (0: none)
+
+    @property
+    def file_size_kb(self) -> float:
+        return self.file_size / KB
+
+
+_content_lock = threading.Lock()
+_content_hashes: Dict[int, str] = {}
+
+
+def content_block() -> bytes:
+    """
+    The pseudo-random block every served file repeats.
+
+    It starts with a minimal safetensors header and uses only bytes 0x80-0xEF,
+    which cannot form the executable/script signatures the security scanner
+    looks for, so served files scan as safe.
+    """
+    header = b'{"__metadata__":{"format":"pt"}}'
+    header += b' ' * (-len(header) % 8)
+    body = bytes(0x80 + b % 0x70 for b in random.Random(0).randbytes(BLOCK_SIZE))
+    return (len(header).to_bytes(8, 'little') + header + body)[:BLOCK_SIZE]
+
+
+_BLOCK = content_block()
+
+
+def file_bytes(start: int, end: int) -> bytes:
+    """
+    Bytes ``start``..``end`` (exclusive) of a served file.
+
+    Args:
+        start: First byte offset
+        end: Offset after the last byte
+    """
+    parts = []
+    position = start
+    while position < end:
+        offset = position % BLOCK_SIZE
+        take = min(BLOCK_SIZE - offset, end - position)
+        parts.append(_BLOCK[offset:offset + take])
+        position += take
+    return b''.join(parts)
+
+
+def file_sha256(size: int) -> str:
+    """SHA256 (upper-case hex, as the API reports it) of a served file of ``size`` bytes."""
+    with _content_lock:
+        digest = _content_hashes.get(size)
+        if digest is None:
+            sha = hashlib.sha256()
+            for start in range(0, size, MB):
+                sha.update(file_bytes(start, min(size, start + MB)))
+            digest = _content_hashes[size] = sha.hexdigest().upper()
+    return digest
+
+
+def build_model(model_id: int, base_url: str, config: FakeCivitaiConfig) -> Dict[str, Any]:
+    """
+    Catalog entry of one model.
+
+    Args:
+        model_id: Model id (1..config.models)
+        base_url: Server root used in download URLs
+        config: Server configuration
+
+    Returns:
+        Model dict in the /api/v1/models item format
+    """
+    version_id = VERSION_ID_OFFSET + model_id
+    created = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(1700000000 + model_id * 3600))
+    return {
+        'id': model_id,
+        'name': f'Bench Model {model_id}',
+        'description': f'<p>Generated model {model_id} for throughput benchmarks.</p>',
+        'type': 'LORA' if model_id % 2 else 'Checkpoint',
+        'nsfw': False,
+        'tags': ['style', 'anime'] if model_id % 3 else ['character', 'concept'],
+        'creator': {'username': f'creator{model_id % 17}'},
+        'stats': {'downloadCount': model_id * 10, 'favoriteCount': model_id, 'commentCount': 0,
+                  'rating': 4.5, 'ratingCount': 3},
+        'createdAt': created,
+        'updatedAt': created,
+        'modelVersions': [{
+            'id': version_id,
+            'modelId': model_id,
+            'name': 'v1.0',
+            'baseModel': 'Illustrious' if model_id % 2 else 'SDXL 1.0',
+            'createdAt': created,
+            'downloadUrl': f'{base_url}/api/download/models/{version_id}',
+            'files': [{
+                'id': FILE_ID_OFFSET + model_id,
+                'name': f'bench_model_{model_id}.safetensors',
+                'type': 'Model',
+                'primary': True,
+                'sizeKB': config.file_size_kb,
+                'downloadUrl': f'{base_url}/api/download/models/{version_id}',
+                'hashes': {'SHA256': file_sha256(config.file_size)},
+                'virusScanResult': 'Success'
+            }]
+        }]
+    }
+
+
+class _FakeCivitaiHandler(BaseHTTPRequestHandler):
+    """Routes the fake API and download endpoints."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+    server: '_FakeCivitaiHTTPServer'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            if url.path == '/api/v1/models':
+                self._api(lambda: self._models_page(parse_qs(url.query)))
+            elif _MODEL_PATH.match(url.path):
+                model_id = int(_MODEL_PATH.match(url.path).group(1))
+                self._api(lambda: self._model(model_id))
+            elif _DOWNLOAD_PATH.match(url.path):
+                self._download(int(_DOWNLOAD_PATH.match(url.path).group(1)) - VERSION_ID_OFFSET)
+            elif url.path == '/__stats':
+                self._json(200, self.server.stats())
+            else:
+                self._json(404, {'error': 'Not found'})
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _api(self, build) -> None:
+        server = self.server
+        config = server.config
+        count = server.count('api_requests')
+        if config.api_latency:
+            time.sleep(config.api_latency)
+        if config.rate_limit_every and count % config.rate_limit_every == 0:
+            server.count('rate_limited')
+            self._json(429, {'error': 'Too Many Requests'}, {'Retry-After': str(config.retry_after)})
+            return
+        status, body = build()
+        self._json(status, body)
+
+    def _models_page(self, query: Dict[str, List[str]]) -> Tuple[int, Dict[str, Any]]:
+        config = self.server.config
+        base_url = self.server.base_url
+        if 'ids' in query:
+            ids = [int(i) for value in query['ids'] for i in value.split(',') if i.strip().isdigit()]
+            items = [build_model(i, base_url, config) for i in ids if 1 <= i <= config.models]
+            return 200, {'items': items, 'metadata': {'totalItems': len(items)}}
+
+        limit = max(1, min(int(query.get('limit', ['100'])[0]), MAX_PAGE_SIZE))
+        cursor = query.get('cursor', [None])[0]
+        if cursor is not None:
+            start = int(cursor)
+        else:
+            start = (max(1, int(query.get('page', ['1'])[0])) - 1) * limit
+        end = min(start + limit, config.models)
+        items = [build_model(i + 1, base_url, config) for i in range(start, end)]
+
+        total_pages = -(-config.models // limit)
+        metadata = {
+            'totalItems': config.models,
+            'currentPage': start // limit + 1,
+            'pageSize': limit,
+            'totalPages': total_pages,
+        }
+        if end < config.models:
+            metadata['nextCursor'] = str(end)
+            metadata['nextPage'] = f'{base_url}/api/v1/models?limit={limit}&cursor={end}'
+        return 200, {'items': items, 'metadata': metadata}
+
+    def _model(self, model_id: int) -> Tuple[int, Dict[str, Any]]:
+        config = self.server.config
+        if not 1 <= model_id <= config.models:
+            return 404, {'error': f'No model with id {model_id}'}
+        return 200, build_model(model_id, self.server.base_url, config)
+
+    def _download(self, model_id: int) -> None:
+        server = self.server
+        config = server.config
+        if not 1 <= model_id <= config.models:
+            self._json(404, {'error': 'File not found'})
+            return
+        server.count('downloads')
+
+        size = config.file_size
+        start, end = 0, size
+        range_header = self.headers.get('Range')
+        match = _RANGE.match(range_header.strip()) if range_header else None
+        if match and (match.group(1) or match.group(2)):
+            server.count('range_requests')
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(size, int(match.group(2)) + 1) if match.group(2) else size
+            else:
+                start = max(0, size - int(match.group(2)))
+            if start >= size or start >= end:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end - 1}/{size}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(end - start))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Disposition', f'attachment; filename="bench_model_{model_id}.safetensors"')
+        self.end_headers()
+
+        # Flaky: the first full download of the file stops halfway
+        drop_at = None
+        if config.flaky_every and model_id % config.flaky_every == 0 and start == 0 \
+                and server.first_attempt(model_id):
+            drop_at = size // 2
+        rate = config.slow_bytes_per_second if config.slow_every and model_id % config.slow_every == 0 else 0
+
+        position = start
+        began = time.monotonic()
+        while position < end:
+            stop = min(end, position + WRITE_SIZE)
+            if drop_at is not None and stop >= drop_at:
+                self.wfile.write(file_bytes(position, drop_at))
+                server.count('bytes_sent', drop_at - position)
+                server.count('dropped_connections')
+                self.close_connection = True
+                return
+            self.wfile.write(file_bytes(position, stop))
+            server.count('bytes_sent', stop - position)
+            position = stop
+            if rate:
+                # Throttle to the configured rate
+                ahead = (position - start) / rate - (time.monotonic() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+    def log_message(self, format, *args):
+        logger.debug("fake civitai: " + format, *args)
+
+
+class _FakeCivitaiHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: FakeCivitaiConfig):
+        self.config = config
+        self._counters: Dict[str, int] = {}
+        self._attempted: set = set()
+        self._lock = threading.Lock()
+        super().__init__(address, _FakeCivitaiHandler)
+        host, port = self.server_address[:2]
+        self.base_url = f'http://{host}:{port}'
+
+    def count(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            value = self._counters[name] = self._counters.get(name, 0) + amount
+        return value
+
+    def first_attempt(self, model_id: int) -> bool:
+        with self._lock:
+            if model_id in self._attempted:
+                return False
+            self._attempted.add(model_id)
+            return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+class FakeCivitaiServer:
+    """
+    Local HTTP server imitating the CivitAI API and file downloads.
+
+    Usage::
+
+        with FakeCivitaiServer(FakeCivitaiConfig(models=50)) as server:
+            client = CivitaiAPIClient(base_url=server.api_url)
+    """
+
+    def __init__(self, config: Optional[FakeCivitaiConfig] = None,
+                 port: int = 0, host: str = '127.0.0.1'):
+        """
+        Initialize fake server.
+
+        Args:
+            config: Catalog and fault configuration
+            port: Port to listen on (0 picks a free port)
+            host: Interface to bind
+        """
+        self.config = config or FakeCivitaiConfig()
+        self.host = host
+        self.requested_port = port
+        self._server: Optional[_FakeCivitaiHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> Optional[str]:
+        return self._server.base_url if self._server else None
+
+    @property
+    def api_url(self) -> Optional[str]:
+        return f'{self.base_url}/api/v1' if self._server else None
+
+    def stats(self) -> Dict[str, int]:
+        """Request and byte counters."""
+        return self._server.stats() if self._server else {}
+
+    def start(self) -> 'FakeCivitaiServer':
+        """Start serving in the background."""
+        if self._server is not None:
+            return self
+        # Hash the shared file content before the first page is requested
+        file_sha256(self.config.file_size)
+        self._server = _FakeCivitaiHTTPServer((self.host, self.requested_port), self.config)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-civitai', daemon=True)
+        self._thread.start()
+        logger.info(f"Fake CivitAI server listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def serve_in_process(config: Dict[str, Any], conn) -> None:
+    """
+    Run a fake server until told to stop (target of a child process).
+
+    The bound base URL is sent on ``conn``; any message received back stops
+    the server. Running the server in its own process keeps its CPU time out
+    of the measured process.
+
+    Args:
+        config: FakeCivitaiConfig fields
+        conn: Pipe connection to the parent
+    """
+    with FakeCivitaiServer(FakeCivitaiConfig(**config)) as server:
+        conn.send(server.base_url)
+        conn.recv()
+
+
+def config_dict(config: FakeCivitaiConfig) -> Dict[str, Any]:
+    """Plain dict of a configuration (for JSON results and child processes)."""
+    return asdict(config)
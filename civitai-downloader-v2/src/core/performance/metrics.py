@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Metrics Registry - Low-overhead hot-path instrumentation.
+
+One process-wide registry holds the counters, gauges and latency/throughput
+histograms of the download, search, storage and filter paths. Histograms are
+HDR-style: values land in log-linear buckets with a fixed relative precision,
+so recording is O(1) with bounded memory no matter how many samples arrive,
+and percentiles are answered from the buckets.
+
+Hot paths fetch their instrument once and call ``record()``/``inc()``; when
+the registry is disabled those calls return after a single attribute check and
+``timer()`` does not even read the clock. The dashboard, analytics and health
+checks read ``snapshot()``.
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sub-buckets per power of two: 2**6 keeps every value within 1/128 (~0.8%)
+DEFAULT_PRECISION_BITS = 6
+
+# Standard metric names of the instrumented paths
+API_REQUEST_SECONDS = 'api_request_seconds'
+API_REQUESTS_TOTAL = 'api_requests_total'
+SEARCH_SECONDS = 'search_seconds'
+SEARCH_PAGE_SECONDS = 'search_page_seconds'
+DOWNLOAD_THROUGHPUT_MBPS = 'download_throughput_mbps'
+DOWNLOAD_BYTES_TOTAL = 'download_bytes_total'
+DOWNLOAD_SPEED_BYTES = 'download_speed_bytes_per_second'
+HASH_THROUGHPUT_MBPS = 'hash_throughput_mbps'
+DB_WRITE_SECONDS = 'db_write_seconds'
+FILTER_RECORDS_PER_SECOND = 'filter_records_per_second'
+CIRCUIT_CALL_SECONDS = 'circuit_call_seconds'
+OPERATION_SECONDS = 'operation_seconds'
+RETRIES_TOTAL = 'retries_total'
+FEATURE_SECONDS = 'feature_seconds'
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    if not labels:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def format_metric_key(name: str, labels: LabelKey) -> str:
+    """Display key of a metric, e.g. ``api_request_seconds{endpoint="models"}``."""
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+class _Metric:
+    """Base of the registry instruments."""
+    __slots__ = ('name', 'labels', 'description', '_registry', '_lock')
+
+    def __init__(self, name: str, labels: LabelKey = (), description: str = "",
+                 registry: Optional['MetricsRegistry'] = None):
+        self.name = name
+        self.labels = labels
+        self.description = description
+        # Instruments outside a registry always record
+        self._registry = registry if registry is not None else _STANDALONE
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> str:
+        return format_metric_key(self.name, self.labels)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    __slots__ = ('_value',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add amount to the counter."""
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = 0.0
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at snapshot time."""
+    __slots__ = ('_value', '_function')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        if not self._registry.enabled:
+            return
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Read the gauge from function whenever it is collected."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception as e:
+                logger.debug(f"Gauge {self.key} callback failed: {e}")
+                return math.nan
+        return self._value
+
+    def reset(self) -> None:
+        self._value = 0.0
+
+
+class Histogram(_Metric):
+    """
+    Log-linear (HDR-style) histogram.
+
+    A positive value v = m * 2**e (0.5 <= m < 1) goes to bucket
+    e * S + floor((m - 0.5) * 2S) with S = 2**precision_bits sub-buckets per
+    power of two, so every bucket spans at most 1/(2S) of its values. Zero and
+    negative values share one bucket.
+    """
+    __slots__ = ('_sub_buckets', '_buckets', '_count', '_sum', '_min', '_max', '_zero')
+
+    def __init__(self, *args, precision_bits: int = DEFAULT_PRECISION_BITS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sub_buckets = 1 << precision_bits
+        self._buckets: Dict[int, int] = {}
+        self._count = 0
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self._zero = 0
+
+    def _index(self, value: float) -> int:
+        mantissa, exponent = math.frexp(value)
+        return exponent * self._sub_buckets + int((mantissa - 0.5) * 2 * self._sub_buckets)
+
+    def _bucket_value(self, index: int) -> float:
+        exponent, sub = divmod(index, self._sub_buckets)
+        # Midpoint of the bucket
+        return math.ldexp(0.5 + (sub + 0.5) / (2 * self._sub_buckets), exponent)
+
+    def _bucket_upper(self, index: int) -> float:
+        exponent, sub = divmod(index + 1, self._sub_buckets)
+        return math.ldexp(0.5 + sub / (2 * self._sub_buckets), exponent)
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Record value (count times)."""
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self._count += count
+            self._sum += value * count
+            if value < self._min:
+                self._min = value
+            if value > self._max:
+                self._max = value
+            if value > 0:
+                index = self._index(value)
+                self._buckets[index] = self._buckets.get(index, 0) + count
+            else:
+                self._zero += count
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Record the seconds spent in the block."""
+        if not self._registry.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    @property
+    def min(self) -> float:
+        return self._min if self._count else 0.0
+
+    @property
+    def max(self) -> float:
+        return self._max if self._count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Value at percent (0-100), within the histogram's relative precision."""
+        with self._lock:
+            if not self._count:
+                return 0.0
+            rank = max(1, math.ceil(self._count * percent / 100.0))
+            seen = self._zero
+            if seen >= rank:
+                return min(self._min, 0.0) if self._min < 0 else 0.0
+            for index in sorted(self._buckets):
+                seen += self._buckets[index]
+                if seen >= rank:
+                    # Clamp the bucket midpoint to the observed range
+                    return min(max(self._bucket_value(index), self._min), self._max)
+            return self._max
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """(upper bound, cumulative count) per non-empty bucket, ascending."""
+        with self._lock:
+            result = []
+            seen = self._zero
+            if self._zero:
+                result.append((0.0, seen))
+            for index in sorted(self._buckets):
+                seen += self._buckets[index]
+                result.append((self._bucket_upper(index), seen))
+            return result
+
+    def merge(self, other: 'Histogram') -> None:
+        """Add other's samples (histograms must share their precision)."""
+        if other._sub_buckets != self._sub_buckets:
+            raise ValueError("Histograms differ in precision")
+        with other._lock:
+            buckets = dict(other._buckets)
+            count, total, low, high, zero = other._count, other._sum, other._min, other._max, other._zero
+        with self._lock:
+            for index, n in buckets.items():
+                self._buckets[index] = self._buckets.get(index, 0) + n
+            self._count += count
+            self._sum += total
+            self._min = min(self._min, low)
+            self._max = max(self._max, high)
+            self._zero += zero
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._count = 0
+            self._sum = 0.0
+            self._min = math.inf
+            self._max = -math.inf
+            self._zero = 0
+
+    def summary(self) -> Dict[str, float]:
+        """Count, sum, mean, min, max and p50/p90/p99."""
+        return {
+            'count': self._count,
+            'sum': self._sum,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+        }
+
+
+class _NullTimer:
+    """Context manager used by timer() while the registry is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._histogram.record(time.perf_counter() - self._start)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Named counters, gauges and histograms (optionally labelled).
+
+    Instruments are created on first request and shared afterwards, so hot
+    paths should look them up once and keep the reference.
+    """
+
+    def __init__(self, enabled: bool = True, precision_bits: int = DEFAULT_PRECISION_BITS):
+        """
+        Initialize registry.
+
+        Args:
+            enabled: Record samples (disabled instruments return immediately)
+            precision_bits: Histogram sub-bucket bits (relative error 2**-(bits+1))
+        """
+        self.enabled = enabled
+        self.precision_bits = precision_bits
+        self._metrics: Dict[Tuple[str, LabelKey], _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls: type, name: str, labels: Optional[Dict[str, Any]], description: str) -> Any:
+        key = (name, _label_key(labels))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    if cls is Histogram:
+                        metric = Histogram(name, key[1], description, self,
+                                           precision_bits=self.precision_bits)
+                    else:
+                        metric = cls(name, key[1], description, self)
+                    self._metrics[key] = metric
+        if not isinstance(metric, cls):
+            raise TypeError(f"Metric {name} is a {type(metric).__name__}, not a {cls.__name__}")
+        return metric
+
+    def counter(self, name: str, labels: Optional[Dict[str, Any]] = None, description: str = "") -> Counter:
+        """Get or create a counter."""
+        return self._get(Counter, name, labels, description)
+
+    def gauge(self, name: str, labels: Optional[Dict[str, Any]] = None, description: str = "") -> Gauge:
+        """Get or create a gauge."""
+        return self._get(Gauge, name, labels, description)
+
+    def histogram(self, name: str, labels: Optional[Dict[str, Any]] = None, description: str = "") -> Histogram:
+        """Get or create a histogram."""
+        return self._get(Histogram, name, labels, description)
+
+    def timer(self, name: str, labels: Optional[Dict[str, Any]] = None):
+        """
+        Context manager recording the block's seconds into histogram name.
+
+        The clock is not read while the registry is disabled.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.histogram(name, labels))
+
+    def record_throughput(self, name: str, amount: float, seconds: float,
+                          labels: Optional[Dict[str, Any]] = None) -> None:
+        """Record amount/seconds into histogram name (ignored for empty intervals)."""
+        if self.enabled and seconds > 0 and amount > 0:
+            self.histogram(name, labels).record(amount / seconds)
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def metrics(self) -> List[_Metric]:
+        """All instruments, ordered by name and labels."""
+        with self._lock:
+            return [self._metrics[key] for key in sorted(self._metrics)]
+
+    def find(self, name: str) -> List[_Metric]:
+        """Instruments named name (one per label set)."""
+        return [metric for metric in self.metrics() if metric.name == name]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Current values of every instrument.
+
+        Returns:
+            {'counters': {key: value}, 'gauges': {key: value},
+             'histograms': {key: summary}}
+        """
+        snapshot: Dict[str, Dict[str, Any]] = {'counters': {}, 'gauges': {}, 'histograms': {}}
+        for metric in self.metrics():
+            if isinstance(metric, Counter):
+                snapshot['counters'][metric.key] = metric.value
+            elif isinstance(metric, Gauge):
+                snapshot['gauges'][metric.key] = metric.value
+            elif isinstance(metric, Histogram):
+                snapshot['histograms'][metric.key] = metric.summary()
+        return snapshot
+
+    def reset(self) -> None:
+        """Clear every instrument's samples (instruments stay registered)."""
+        for metric in self.metrics():
+            metric.reset()
+
+
+_STANDALONE = MetricsRegistry()
+
+_shared_registry: Optional[MetricsRegistry] = None
+_shared_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    global _shared_registry
+    if _shared_registry is None:
+        with _shared_lock:
+            if _shared_registry is None:
+                _shared_registry = MetricsRegistry()
+    return _shared_registry
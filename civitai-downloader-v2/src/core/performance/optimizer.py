@@ -25,6 +25,8 @@ except ImportError:
     from core.config.system_config import SystemConfig
     from core.download.manager import DownloadManager, DownloadTask
 
+from .metrics import get_metrics_registry, DOWNLOAD_SPEED_BYTES
+
 
 class OptimizationMode(Enum):
     """Performance optimization modes."""
@@ -110,6 +112,7 @@ class PerformanceOptimizer:
         self.speed_history: deque = deque(maxlen=60)  # Last 60 speed samples
         self.cpu_history: deque = deque(maxlen=60)    # Last 60 CPU samples
         self.memory_history: deque = deque(maxlen=60) # Last 60 memory samples
+        self._speed_gauge = get_metrics_registry().gauge(DOWNLOAD_SPEED_BYTES)
         
         # Connection management
         self.active_connections: Set[str] = set()
@@ -185,6 +188,7 @@ class PerformanceOptimizer:
         with self._lock:
             self.speed_history.append(speed)
             self.metrics.download_speed = speed
+            self._speed_gauge.set(speed)
             
             # Update average speed
             if self.speed_history:
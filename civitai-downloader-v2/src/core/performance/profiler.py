@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Pipeline Profiler - Named stage spans and an optional stack sampler.
+
+Pipeline stages (API wait, JSON decoding, version filtering, classification,
+intermediate writes, SQLite writes, transfers, hashing) are wrapped in
+``get_profiler().span(name)``. Spans nest per asyncio task / thread through a
+context variable, so concurrent downloads do not interleave their stacks.
+While the profiler is disabled ``span()`` returns a shared no-op context
+manager and never reads the clock.
+
+ProfileSession enables the profiler for one CLI command and at exit writes:
+
+- ``<name>.stages.txt``: per-stage calls, total/self time, share of the run
+  and p95, as an indented stage tree
+- ``<name>.collapsed``: stage paths weighted by self time in microseconds
+- ``<name>.samples.collapsed``: Python stacks taken by the periodic sampler
+  (only when sampling), with the open stages inserted as ``[stage]`` frames
+
+Both collapsed files use the ``frame;frame;frame count`` format read by
+flamegraph.pl, speedscope and inferno.
+"""
+
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter as SampleCounter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_INTERVAL = 0.01  # 10ms
+
+StagePath = Tuple[str, ...]
+
+
+@dataclass
+class StageStats:
+    """Accumulated time of one stage path."""
+    path: StagePath
+    calls: int = 0
+    total_time: float = 0.0
+    self_time: float = 0.0
+    durations: Histogram = field(default_factory=lambda: Histogram('stage_seconds'))
+
+    @property
+    def name(self) -> str:
+        return self.path[-1]
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class _NullSpan:
+    """Context manager returned by span() while profiling is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('_profiler', 'name', 'path', 'parent', 'child_time', '_start', '_token', '_frame_id')
+
+    def __init__(self, profiler: 'PipelineProfiler', name: str):
+        self._profiler = profiler
+        self.name = name
+        self.child_time = 0.0
+        self._frame_id = None
+
+    def __enter__(self):
+        profiler = self._profiler
+        self.parent = profiler._current.get()
+        self.path = self.parent.path + (self.name,) if self.parent is not None else (self.name,)
+        self._token = profiler._current.set(self)
+        if profiler._sampler is not None:
+            # Mark the frame that opened the span so samples can show the stage
+            self._frame_id = id(sys._getframe(1))
+            profiler._frame_spans.setdefault(self._frame_id, []).append(self.name)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        duration = time.perf_counter() - self._start
+        profiler = self._profiler
+        profiler._current.reset(self._token)
+        if self._frame_id is not None:
+            names = profiler._frame_spans.get(self._frame_id)
+            if names:
+                names.pop()
+                if not names:
+                    profiler._frame_spans.pop(self._frame_id, None)
+        if self.parent is not None:
+            self.parent.child_time += duration
+        profiler._record(self.path, duration, max(0.0, duration - self.child_time))
+        return False
+
+
+class _StackSampler(threading.Thread):
+    """Daemon thread sampling the Python stacks of all other threads."""
+
+    def __init__(self, profiler: 'PipelineProfiler', interval: float):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.profiler = profiler
+        self.interval = interval
+        self.samples: SampleCounter = SampleCounter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.samples[self._collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+
+    def _collapse(self, thread_name: str, frame) -> str:
+        frame_spans = self.profiler._frame_spans
+        stack = []
+        while frame is not None:
+            names = frame_spans.get(id(frame))
+            if names:
+                stack.extend(f'[{name}]' for name in reversed(tuple(names)))
+            code = frame.f_code
+            stack.append(f'{getattr(code, "co_qualname", code.co_name)} '
+                         f'({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+            frame = frame.f_back
+        stack.append(thread_name)
+        return ';'.join(reversed(stack))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=5)
+
+
+class PipelineProfiler:
+    """
+    Records named stage spans and, optionally, periodic stack samples.
+
+    Spans are cheap enough to leave in the pipeline permanently; they only
+    measure while the profiler is enabled.
+    """
+
+    def __init__(self, enabled: bool = False):
+        """
+        Initialize profiler.
+
+        Args:
+            enabled: Measure spans from the start
+        """
+        self.enabled = enabled
+        self._current: contextvars.ContextVar = contextvars.ContextVar(f'profile_span_{id(self)}', default=None)
+        self._stages: Dict[StagePath, StageStats] = {}
+        self._lock = threading.Lock()
+        self._frame_spans: Dict[int, List[str]] = {}
+        self._sampler: Optional[_StackSampler] = None
+        self._samples: SampleCounter = SampleCounter()
+
+    def span(self, name: str):
+        """
+        Context manager timing one pipeline stage.
+
+        Args:
+            name: Stage name (nested spans form a path)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def _record(self, path: StagePath, duration: float, self_time: float) -> None:
+        with self._lock:
+            stats = self._stages.get(path)
+            if stats is None:
+                stats = self._stages[path] = StageStats(path)
+            stats.calls += 1
+            stats.total_time += duration
+            stats.self_time += self_time
+            stats.durations.record(duration)
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def start_sampler(self, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        """
+        Start sampling stacks every ``interval`` seconds.
+
+        Args:
+            interval: Sampling period in seconds
+        """
+        if self._sampler is not None:
+            return
+        self._sampler = _StackSampler(self, interval)
+        self._sampler.start()
+
+    def stop_sampler(self) -> None:
+        """Stop the sampler and keep its samples."""
+        sampler, self._sampler = self._sampler, None
+        if sampler is not None:
+            sampler.stop()
+            self._samples.update(sampler.samples)
+        self._frame_spans.clear()
+
+    def stages(self) -> List[StageStats]:
+        """Stage statistics in tree order, siblings by total time."""
+        with self._lock:
+            stages = list(self._stages.values())
+        children: Dict[StagePath, List[StageStats]] = {}
+        for stats in stages:
+            children.setdefault(stats.path[:-1], []).append(stats)
+
+        ordered: List[StageStats] = []
+
+        def visit(parent: StagePath):
+            for stats in sorted(children.get(parent, []), key=lambda s: s.total_time, reverse=True):
+                ordered.append(stats)
+                visit(stats.path)
+
+        visit(())
+        return ordered
+
+    def format_breakdown(self, wall_time: Optional[float] = None) -> str:
+        """
+        Per-stage time breakdown as a text table.
+
+        Args:
+            wall_time: Run duration used for the percentage column
+                       (defaults to the total of the root stages)
+
+        Returns:
+            Table text
+        """
+        stages = self.stages()
+        if wall_time is None:
+            wall_time = sum(stats.total_time for stats in stages if len(stats.path) == 1)
+        lines = [f"{'Stage':<40} {'Calls':>8} {'Total s':>10} {'Self s':>10} {'% run':>7} "
+                 f"{'Mean ms':>10} {'p95 ms':>10}"]
+        for stats in stages:
+            label = '  ' * (len(stats.path) - 1) + stats.name
+            share = stats.total_time / wall_time * 100 if wall_time else 0.0
+            lines.append(f"{label:<40} {stats.calls:>8} {stats.total_time:>10.3f} {stats.self_time:>10.3f} "
+                         f"{share:>6.1f}% {stats.mean_time * 1000:>10.2f} "
+                         f"{stats.durations.percentile(95) * 1000:>10.2f}")
+        return '\n'.join(lines)
+
+    def collapsed_stages(self) -> List[str]:
+        """Stage paths weighted by self time in microseconds (collapsed-stack lines)."""
+        lines = []
+        for stats in self.stages():
+            weight = int(round(stats.self_time * 1_000_000))
+            if weight > 0:
+                lines.append(f"{';'.join(stats.path)} {weight}")
+        return lines
+
+    def collapsed_samples(self) -> List[str]:
+        """Sampled stacks with their sample counts (collapsed-stack lines)."""
+        samples = SampleCounter(self._samples)
+        if self._sampler is not None:
+            samples.update(self._sampler.samples)
+        return [f"{stack} {count}" for stack, count in samples.most_common()]
+
+    def reset(self) -> None:
+        """Drop recorded stages and samples."""
+        with self._lock:
+            self._stages.clear()
+        self._samples.clear()
+
+
+class ProfileSession:
+    """
+    Profiles one run and writes the stage breakdown and collapsed stacks at exit.
+
+    Usage::
+
+        with ProfileSession('search', Path('reports/profiles')) as session:
+            ...
+        print(session.breakdown)
+    """
+
+    def __init__(self, name: str, output_dir: Path,
+                 sample_interval: Optional[float] = None,
+                 profiler: Optional['PipelineProfiler'] = None):
+        """
+        Initialize profile session.
+
+        Args:
+            name: Root stage name and output file prefix
+            output_dir: Directory of the output files
+            sample_interval: Stack sampling period in seconds (None/0 disables sampling)
+            profiler: Profiler to drive (process-wide profiler if None)
+        """
+        self.name = name
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval
+        self.profiler = profiler or get_profiler()
+        self.breakdown = ""
+        self.files: Dict[str, Path] = {}
+        self._root = None
+        self._start = 0.0
+
+    def __enter__(self) -> 'ProfileSession':
+        self.profiler.reset()
+        self.profiler.enable()
+        self._start = time.perf_counter()
+        # Every sample is taken inside the root stage, so it is not marked in the stacks
+        self._root = self.profiler.span(self.name)
+        self._root.__enter__()
+        if self.sample_interval:
+            self.profiler.start_sampler(self.sample_interval)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.profiler.stop_sampler()
+        self._root.__exit__(exc_type, exc_val, exc_tb)
+        wall_time = time.perf_counter() - self._start
+        self.profiler.disable()
+        self.breakdown = self.profiler.format_breakdown(wall_time)
+        try:
+            self.files = self.write(self.breakdown)
+        except OSError as e:
+            logger.error(f"Failed to write profile: {e}")
+        return False
+
+    def write(self, breakdown: str) -> Dict[str, Path]:
+        """
+        Write the profile files.
+
+        Args:
+            breakdown: Stage breakdown text
+
+        Returns:
+            Written file paths by kind
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        base = self.output_dir / f"{self.name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        files = {
+            'stages': base.with_name(base.name + '.stages.txt'),
+            'collapsed': base.with_name(base.name + '.collapsed'),
+        }
+        files['stages'].write_text(breakdown + '\n', encoding='utf-8')
+        files['collapsed'].write_text(''.join(line + '\n' for line in self.profiler.collapsed_stages()),
+                                      encoding='utf-8')
+        samples = self.profiler.collapsed_samples()
+        if samples:
+            files['samples'] = base.with_name(base.name + '.samples.collapsed')
+            files['samples'].write_text(''.join(line + '\n' for line in samples), encoding='utf-8')
+        for kind, path in files.items():
+            logger.info(f"Profile {kind} written to {path}")
+        return files
+
+
+_shared_profiler: Optional[PipelineProfiler] = None
+_shared_lock = threading.Lock()
+
+
+def get_profiler() -> PipelineProfiler:
+    """Get the process-wide pipeline profiler."""
+    global _shared_profiler
+    if _shared_profiler is None:
+        with _shared_lock:
+            if _shared_profiler is None:
+                _shared_profiler = PipelineProfiler()
+    return _shared_profiler
@@ -10,7 +10,14 @@ import time
 from typing import Dict, Any, Optional, Callable, Awaitable
 from dataclasses import dataclass, field
 from enum import Enum
-import statistics
+
+try:
+    from ..performance.metrics import Histogram, get_metrics_registry, CIRCUIT_CALL_SECONDS
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from core.performance.metrics import Histogram, get_metrics_registry, CIRCUIT_CALL_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +37,7 @@ class CircuitMetrics:
     success_requests: int = 0
     last_failure_time: Optional[float] = None
     last_success_time: Optional[float] = None
-    response_times: list = field(default_factory=list)
+    response_time: Histogram = field(default_factory=lambda: Histogram(CIRCUIT_CALL_SECONDS))
     state_changes: list = field(default_factory=list)
     
     @property
@@ -48,9 +55,7 @@ class CircuitMetrics:
     @property
     def average_response_time(self) -> float:
         """Calculate average response time."""
-        if not self.response_times:
-            return 0.0
-        return statistics.mean(self.response_times[-100:])  # Last 100 requests
+        return self.response_time.mean
 
 
 class CircuitBreakerError(Exception):
@@ -92,6 +97,7 @@ class CircuitBreaker:
         
         self.state = CircuitState.CLOSED
         self.metrics = CircuitMetrics()
+        self._call_seconds = get_metrics_registry().histogram(CIRCUIT_CALL_SECONDS, {'circuit': name})
         self.failure_count = 0
         self.success_count = 0
         self.last_failure_time = None
@@ -155,11 +161,8 @@ class CircuitBreaker:
         
         self.metrics.success_requests += 1
         self.metrics.last_success_time = current_time
-        self.metrics.response_times.append(response_time)
-        
-        # Keep only recent response times
-        if len(self.metrics.response_times) > 1000:
-            self.metrics.response_times = self.metrics.response_times[-1000:]
+        self.metrics.response_time.record(response_time)
+        self._call_seconds.record(response_time)
         
         if self.state == CircuitState.HALF_OPEN:
             self.success_count += 1
@@ -277,6 +280,7 @@ class CircuitBreaker:
             'failure_rate': self.metrics.failure_rate,
             'success_rate': self.metrics.success_rate,
             'average_response_time': self.metrics.average_response_time,
+            'p99_response_time': self.metrics.response_time.percentile(99),
             'failure_threshold': self.failure_threshold,
             'recovery_timeout': self.recovery_timeout,
             'current_failure_count': self.failure_count,
@@ -15,6 +15,13 @@ import aiohttp
 from pathlib import Path
 import sqlite3
 
+try:
+    from ..performance.metrics import Histogram, MetricsRegistry, get_metrics_registry, API_REQUEST_SECONDS
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from core.performance.metrics import Histogram, MetricsRegistry, get_metrics_registry, API_REQUEST_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -90,15 +97,17 @@ class HealthChecker:
     Implements requirement 17.2: Health monitoring with thresholds.
     """
     
-    def __init__(self, data_dir: Optional[Path] = None):
+    def __init__(self, data_dir: Optional[Path] = None, registry: Optional[MetricsRegistry] = None):
         """
         Initialize health checker.
         
         Args:
             data_dir: Application data directory
+            registry: Metrics registry of the hot paths (process-wide registry if None)
         """
         self.data_dir = data_dir or Path("./data")
         self.start_time = time.time()
+        self.registry = registry or get_metrics_registry()
         
         # Health thresholds
         self.thresholds = {
@@ -134,6 +143,7 @@ class HealthChecker:
             self._check_memory_usage(),
             self._check_disk_usage(),
             self._check_api_connectivity(),
+            self._check_request_latency(),
             self._check_database_health(),
             self._check_file_permissions(),
             self._check_network_connectivity()
@@ -311,6 +321,39 @@ class HealthChecker:
                 message=f"CRITICAL: API connectivity failed: {e}"
             )
     
+    async def _check_request_latency(self) -> HealthMetric:
+        """Check the p99 latency of the API requests recorded in the metrics registry."""
+        latency = Histogram(API_REQUEST_SECONDS)
+        for histogram in self.registry.find(API_REQUEST_SECONDS):
+            latency.merge(histogram)
+        
+        if not latency.count:
+            return HealthMetric(
+                name="api_request_latency",
+                value=None,
+                status=HealthStatus.HEALTHY,
+                message="No API requests recorded"
+            )
+        
+        p99 = latency.percentile(99)
+        status = HealthStatus.HEALTHY
+        message = f"API request latency p99: {p99:.2f}s over {latency.count} requests"
+        
+        if p99 >= self.thresholds["api_response_time"]["critical"]:
+            status = HealthStatus.CRITICAL
+            message = f"CRITICAL: Slow API requests (p99 {p99:.2f}s)"
+        elif p99 >= self.thresholds["api_response_time"]["warning"]:
+            status = HealthStatus.WARNING
+            message = f"WARNING: Slow API requests (p99 {p99:.2f}s)"
+        
+        return HealthMetric(
+            name="api_request_latency",
+            value=p99,
+            status=status,
+            threshold=self.thresholds["api_response_time"]["warning"],
+            message=message
+        )
+    
     async def _check_database_health(self) -> HealthMetric:
         """Check database health and size."""
         try:
@@ -497,6 +540,7 @@ class HealthChecker:
                 for name in self.metric_history.keys()
             },
             "custom_checks_count": len(self.custom_checks),
+            "hot_path_metrics": self.registry.snapshot(),
             "metric_history_size": {
                 name: len(history)
                 for name, history in self.metric_history.items()
@@ -12,6 +12,14 @@ from enum import Enum
 from typing import Dict, List, Any, Optional, Set, Tuple, Union
 import re
 
+try:
+    from ...api.query_key import QueryKeyMixin
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from api.query_key import QueryKeyMixin
+
 logger = logging.getLogger(__name__)
 
 
@@ -161,7 +169,7 @@ class DownloadRange:
 
 
 @dataclass
-class AdvancedSearchParams:
+class AdvancedSearchParams(QueryKeyMixin):
     """
     Advanced search parameters implementing requirements 10-11.
     Comprehensive filtering and sorting capabilities.
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Semantic search-result cache.
+Every official search crawl is recorded as a segment: its normalized search
+dimensions plus the ids of the models it returned. A later search is answered
+from any fresh segment whose dimensions cover it, filtering the segment
+locally when the search is narrower (e.g. "LORA + Illustrious + style" from a
+"LORA + Illustrious" crawl). Freshness is tracked per segment.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from .advanced_search import AdvancedSearchParams, SortOption
+
+logger = logging.getLogger(__name__)
+
+# Search dimensions that define which models a crawl returns
+SEGMENT_FIELDS = ('query', 'base_model', 'model_types', 'categories', 'tags')
+
+# Dimensions holding OR-sets: an empty set means "any"
+SET_FIELDS = ('model_types', 'categories', 'tags')
+
+
+def search_dimensions(search_params: AdvancedSearchParams) -> Dict[str, Any]:
+    """Normalized segment dimensions of search parameters."""
+    return dict(search_params.query_key().subset(SEGMENT_FIELDS).params)
+
+
+def segment_key(search_params: AdvancedSearchParams) -> str:
+    """Segment key of search parameters."""
+    return search_params.query_key().subset(SEGMENT_FIELDS).digest('segment')
+
+
+def _tag_names(model: Dict[str, Any]) -> Set[str]:
+    names = set()
+    for tag in model.get('tags', []):
+        name = tag.get('name', '') if isinstance(tag, dict) else str(tag)
+        names.add(name.lower())
+    return names
+
+
+@dataclass
+class CacheSegment:
+    """A recorded search crawl."""
+    key: str
+    dimensions: Dict[str, Any]
+    complete: bool
+    model_count: int
+    latest_model_id: Optional[int]
+    fetched_at: float
+    checked_at: float
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'CacheSegment':
+        return cls(
+            key=row['segment_key'],
+            dimensions=row['dimensions'],
+            complete=row['complete'],
+            model_count=row['model_count'],
+            latest_model_id=row['latest_model_id'],
+            fetched_at=row['fetched_at'],
+            checked_at=row['checked_at']
+        )
+
+    def covers(self, dimensions: Dict[str, Any]) -> bool:
+        """
+        Whether every model matching the dimensions is within this segment's filter.
+
+        Args:
+            dimensions: Normalized search dimensions
+
+        Returns:
+            True if the search equals or narrows this segment in every dimension
+        """
+        # A text query cannot be evaluated locally
+        if self.dimensions.get('query') != dimensions.get('query'):
+            return False
+
+        base_model = self.dimensions.get('base_model')
+        if base_model is not None and base_model != dimensions.get('base_model'):
+            return False
+
+        for field in SET_FIELDS:
+            allowed = self.dimensions.get(field)
+            if allowed and not (dimensions.get(field) and set(dimensions[field]) <= set(allowed)):
+                return False
+        return True
+
+    def is_exact(self, dimensions: Dict[str, Any]) -> bool:
+        """Whether the segment was crawled with exactly these dimensions."""
+        return self.dimensions == dimensions
+
+
+@dataclass
+class CacheHit:
+    """Models answered from a cached segment."""
+    segment: CacheSegment
+    models: List[Dict[str, Any]]
+    exact: bool
+
+    @property
+    def latest_model_id(self) -> str:
+        """Id of the newest model in the answer (used for the new-model check)."""
+        return str(self.models[0].get('id', '')) if self.models else ''
+
+
+class SearchResultCache:
+    """Answers searches from recorded crawl segments in the model store."""
+
+    def __init__(self, model_store: Any, max_age_hours: float = 24.0, recheck_hours: float = 6.0):
+        """
+        Initialize search result cache.
+
+        Args:
+            model_store: ModelStore holding the segments and the models
+            max_age_hours: Segments crawled longer ago are not used
+            recheck_hours: Segments verified longer ago need a new-model check
+        """
+        self.model_store = model_store
+        self.max_age_hours = max_age_hours
+        self.recheck_hours = recheck_hours
+        self.stats = {'exact_hits': 0, 'subset_hits': 0, 'misses': 0, 'incremental_crawls': 0}
+
+    @staticmethod
+    def is_cacheable(search_params: AdvancedSearchParams) -> bool:
+        """
+        Whether a crawl for these parameters covers the newest matching models.
+
+        Only first-page crawls in newest-first order form a contiguous segment.
+        """
+        return (search_params.page == 1 and search_params.custom_sort is None
+                and search_params.sort_option in (None, SortOption.NEWEST))
+
+    def _is_fresh(self, segment: CacheSegment, now: float) -> bool:
+        return (now - segment.fetched_at) / 3600 <= self.max_age_hours
+
+    def needs_recheck(self, segment: CacheSegment, now: Optional[float] = None) -> bool:
+        """Whether a segment should be checked for new models before use."""
+        now = time.time() if now is None else now
+        return (now - segment.checked_at) / 3600 > self.recheck_hours
+
+    def segments(self) -> List[CacheSegment]:
+        """All recorded segments."""
+        return [CacheSegment.from_row(row) for row in self.model_store.get_search_segments()]
+
+    def get_segment(self, search_params: AdvancedSearchParams) -> Optional[CacheSegment]:
+        """Fresh segment crawled with exactly these parameters, if any."""
+        if not self.is_cacheable(search_params):
+            return None
+        key = segment_key(search_params)
+        now = time.time()
+        for segment in self.segments():
+            if segment.key == key and self._is_fresh(segment, now):
+                return segment
+        return None
+
+    def segment_models(self, segment: CacheSegment) -> List[Dict[str, Any]]:
+        """Models of a segment, newest first."""
+        from ...data.model_store import ModelQuery
+        return self.model_store.find(ModelQuery(segment=segment.key, order_by='newest'))
+
+    def segment_model_ids(self, segment: CacheSegment) -> Set[int]:
+        """Ids of the models of a segment."""
+        from ...data.model_store import ModelQuery
+        return set(self.model_store.find_ids(ModelQuery(segment=segment.key)))
+
+    def lookup(self, search_params: AdvancedSearchParams, target: int) -> Optional[CacheHit]:
+        """
+        Answer a search from the smallest fresh segment covering it.
+
+        Args:
+            search_params: Search parameters
+            target: Number of models wanted
+
+        Returns:
+            CacheHit, or None if no segment can answer the search
+        """
+        if not self.is_cacheable(search_params):
+            return None
+
+        dimensions = search_dimensions(search_params)
+        now = time.time()
+        candidates = [segment for segment in self.segments()
+                      if self._is_fresh(segment, now) and segment.covers(dimensions)]
+        candidates.sort(key=lambda segment: (not segment.is_exact(dimensions),
+                                             not segment.complete, segment.model_count))
+
+        for segment in candidates:
+            exact = segment.is_exact(dimensions)
+            models = self.segment_models(segment)
+            if not exact:
+                models = self.narrow(models, dimensions)
+            # A partial crawl holds the newest models of its filter, so it answers
+            # a narrower search only when enough of them match
+            if segment.complete or len(models) >= target:
+                self.stats['exact_hits' if exact else 'subset_hits'] += 1
+                return CacheHit(segment, models[:target], exact)
+
+        self.stats['misses'] += 1
+        return None
+
+    @staticmethod
+    def narrow(models: List[Dict[str, Any]], dimensions: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Filter segment models down to narrower search dimensions.
+
+        Uses the same version-level rules as the official search.
+        """
+        from .search_engine import LocalVersionFilter
+
+        filtered, _ = LocalVersionFilter().filter_by_version_criteria(
+            models,
+            base_model=dimensions.get('base_model'),
+            model_types=dimensions.get('model_types'),
+            categories=dimensions.get('categories')
+        )
+        tags = {tag.lower() for tag in dimensions.get('tags', [])}
+        if tags:
+            filtered = [model for model in filtered if tags & _tag_names(model)]
+        return filtered
+
+    def record(self, search_params: AdvancedSearchParams, models: List[Dict[str, Any]],
+               complete: bool, merge: bool = False) -> None:
+        """
+        Record a crawl as the segment of its parameters.
+
+        Args:
+            search_params: Search parameters of the crawl
+            models: Models returned, newest first
+            complete: Whether the crawl reached the end of the result set
+            merge: Add to the existing segment (incremental crawl)
+        """
+        if not self.is_cacheable(search_params):
+            return
+        model_ids = [model['id'] for model in models if model.get('id') is not None]
+        count = self.model_store.save_search_segment(
+            segment_key(search_params), search_dimensions(search_params),
+            model_ids, complete, time.time(), merge=merge
+        )
+        logger.debug(f"Recorded search segment: {count} models, complete={complete}")
+
+    def mark_checked(self, segment: CacheSegment) -> None:
+        """Record that a segment has no new models."""
+        self.model_store.touch_search_segment(segment.key, time.time())
@@ -8,16 +8,26 @@ import asyncio
 import logging
 import time
 from typing import Dict, List, Any, Optional, Tuple, Set, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from .advanced_search import (
     AdvancedSearchParams, BaseModelDetector, UnofficialAPIManager,
     ModelCategory, CustomSortMetric, SortOption, FileFormat, NSFWFilter
 )
+from .result_cache import SearchResultCache
 from ..security.security_scanner import SecurityScanner
 from ..security.license_manager import LicenseManager
 from ..exceptions import SearchError, NetworkError
 from ..logging_config import get_logger
+from ..performance.metrics import (
+    Histogram, get_metrics_registry, SEARCH_SECONDS, SEARCH_PAGE_SECONDS, FILTER_RECORDS_PER_SECOND
+)
+from ..performance.profiler import get_profiler
+
+try:
+    from ...data.model_record import compact_models
+except ImportError:
+    from data.model_record import compact_models
 
 logger = get_logger(__name__)
 
@@ -43,9 +53,11 @@ class AdvancedSearchEngine:
     Provides comprehensive search with filtering, sorting, and fallback mechanisms.
     """
     
-    def __init__(self, api_client=None):
+    def __init__(self, api_client=None, model_store=None):
         """Initialize advanced search engine."""
         self.api_client = api_client
+        self.model_store = model_store
+        self.result_cache: Optional[SearchResultCache] = None
         self.base_model_detector = BaseModelDetector()
         self.unofficial_api_manager = UnofficialAPIManager()
         self.license_manager = LicenseManager()
@@ -57,8 +69,11 @@ class AdvancedSearchEngine:
             'successful_searches': 0,
             'fallback_used': 0,
             'avg_response_time': 0.0,
+            'p95_response_time': 0.0,
             'last_search_time': None
         }
+        self._search_seconds = Histogram(SEARCH_SECONDS)
+        self._metrics = get_metrics_registry()
     
     async def search(self, query_or_params, filters=None):
         """
@@ -205,21 +220,13 @@ class AdvancedSearchEngine:
         
         while has_more and total_yielded < original_limit:
             logger.debug(f"search_streaming loop: page={page}, has_more={has_more}, total_yielded={total_yielded}, original_limit={original_limit}")
-            # Create paginated params (exclude page and limit to avoid conflicts)
-            params_dict = search_params.__dict__.copy()
-            params_dict.pop('page', None)
-            params_dict.pop('limit', None)
-            
             # 残り必要数を計算
             remaining_needed = original_limit - total_yielded
             current_batch_size = min(batch_size, remaining_needed)
             logger.debug(f"search_streaming: remaining_needed={remaining_needed}, current_batch_size={current_batch_size}")
             
-            batch_params = AdvancedSearchParams(
-                **params_dict,
-                page=page,
-                limit=current_batch_size
-            )
+            # Create paginated params (replace() copies fields only, not the memoized key)
+            batch_params = replace(search_params, page=page, limit=current_batch_size)
             
             # Get batch (pass original target for proper filtering)
             logger.debug(f"search_streaming: calling _search_with_target with batch limit={current_batch_size}, target={original_limit}")
@@ -325,12 +332,13 @@ class AdvancedSearchEngine:
     async def _official_search(self, search_params: AdvancedSearchParams, 
                              original_target: Optional[int] = None) -> SearchResult:
         """Perform official search using only documented API features."""
-        logger.debug(f"_official_search: search_params type: {type(search_params)}")
-        logger.debug(f"_official_search: search_params: {search_params}")
+        # %-style arguments: the params are only rendered when DEBUG is enabled
+        logger.debug("_official_search: search_params type: %s", type(search_params))
+        logger.debug("_official_search: search_params: %s", search_params)
         
         # Check database cache first
-        cached_models = await self._check_db_cache(search_params)
-        if cached_models:
+        cached_models = await self._check_db_cache(search_params, original_target)
+        if cached_models is not None:
             logger.debug(f"Using {len(cached_models)} cached models from database")
             return SearchResult(
                 models=cached_models,
@@ -416,6 +424,21 @@ class AdvancedSearchEngine:
         
         logger.debug(f"target_limit = {target_limit}, original_target = {original_target}, search_params.limit = {search_params.limit}")
         
+        # Models already held by this search's cached segment are not fetched again:
+        # newest-first pages are cut at the first known model. Other sorts and
+        # later pages do not continue a segment, so nothing is cut or merged.
+        segment = None
+        known_ids: Set[int] = set()
+        if SearchResultCache.is_cacheable(search_params):
+            try:
+                segment = self._get_result_cache().get_segment(search_params)
+                if segment is not None and (segment.complete or segment.model_count >= target_limit):
+                    known_ids = self._get_result_cache().segment_model_ids(segment)
+            except Exception as e:
+                self.logger.debug(f"Segment lookup failed: {e}")
+        reached_known = False
+        exhausted = False
+        
         # Use cursor-based pagination for queries, page-based for non-queries
         if has_query:
             # Cursor-based pagination for queries
@@ -434,21 +457,29 @@ class AdvancedSearchEngine:
                 logger.debug(f"Fetching with cursor={cursor}, limit={current_api_params['limit']}")
                 
                 response = await self._execute_api_call(current_api_params)
-                page_models = response.get('items', [])
+                # Compact records: only filter/storage fields stay decoded
+                page_models = compact_models(response.get('items', []))
                 
                 if not page_models:
                     logger.debug(f"No more models found with cursor {cursor}")
+                    exhausted = True
                     break
                 
+                page_models, reached_known = self._truncate_at_known(page_models, known_ids)
                 all_models.extend(page_models)
                 logger.debug(f"Got {len(page_models)} models, total: {len(all_models)}")
                 
+                if reached_known:
+                    logger.debug("Reached models of the cached segment")
+                    break
+                
                 # Get next cursor
                 metadata = response.get('metadata', {})
                 cursor = metadata.get('nextCursor')
                 
                 if not cursor:
                     logger.debug("No more cursors available")
+                    exhausted = True
                     break
                 
                 page_count += 1
@@ -471,15 +502,22 @@ class AdvancedSearchEngine:
                     logger.debug(f"Fetching page {search_params.page} with limit {current_api_params['limit']}")
                 
                 response = await self._execute_api_call(current_api_params)
-                page_models = response.get('items', [])
+                # Compact records: only filter/storage fields stay decoded
+                page_models = compact_models(response.get('items', []))
                 
                 if not page_models:
                     logger.debug(f"No more models found with cursor {cursor}")
+                    exhausted = True
                     break
                 
+                page_models, reached_known = self._truncate_at_known(page_models, known_ids)
                 all_models.extend(page_models)
                 logger.debug(f"Got {len(page_models)} models, total: {len(all_models)}")
                 
+                if reached_known:
+                    logger.debug("Reached models of the cached segment")
+                    break
+                
                 # Get next cursor
                 metadata = response.get('metadata', {})
                 next_cursor = metadata.get('nextCursor')
@@ -489,6 +527,7 @@ class AdvancedSearchEngine:
                 
                 if not next_cursor:
                     logger.debug("No more cursors available")
+                    exhausted = True
                     break
                 
                 cursor = next_cursor
@@ -502,16 +541,17 @@ class AdvancedSearchEngine:
         if search_params.base_model or use_local_category_filter:
             filtered_models = []
             # Use the last cursor from pagination (both query and non-query)
-            current_cursor = cursor
+            current_cursor = None if reached_known else cursor
             
             # Process initial batch
             version_filter = LocalVersionFilter()
-            batch_filtered, filter_stats = version_filter.filter_by_version_criteria(
-                all_models, 
-                base_model=search_params.base_model,
-                model_types=search_params.model_types,
-                categories=[cat.value for cat in search_params.categories] if use_local_category_filter else None
-            )
+            with get_profiler().span('version_filter'):
+                batch_filtered, filter_stats = version_filter.filter_by_version_criteria(
+                    all_models, 
+                    base_model=search_params.base_model,
+                    model_types=search_params.model_types,
+                    categories=[cat.value for cat in search_params.categories] if use_local_category_filter else None
+                )
             filtered_models.extend(batch_filtered)
             logger.debug(f"Initial batch filtered: {len(batch_filtered)} from {len(all_models)} models")
             
@@ -532,27 +572,35 @@ class AdvancedSearchEngine:
                 
                 try:
                     additional_response = await self._execute_api_call(additional_params)
-                    additional_models = additional_response.get('items', [])
+                    additional_models = compact_models(additional_response.get('items', []))
                     
                     if not additional_models:
+                        exhausted = True
                         break
                     
+                    additional_models, reached_known = self._truncate_at_known(additional_models, known_ids)
+                    
                     # Filter additional batch
-                    additional_filtered, _ = version_filter.filter_by_version_criteria(
-                        additional_models,
-                        base_model=search_params.base_model,
-                        model_types=search_params.model_types,
-                        categories=[cat.value for cat in search_params.categories] if use_local_category_filter else None
-                    )
+                    with get_profiler().span('version_filter'):
+                        additional_filtered, _ = version_filter.filter_by_version_criteria(
+                            additional_models,
+                            base_model=search_params.base_model,
+                            model_types=search_params.model_types,
+                            categories=[cat.value for cat in search_params.categories] if use_local_category_filter else None
+                        )
                     
                     filtered_models.extend(additional_filtered)
                     logger.debug(f"Batch #{additional_fetches}: +{len(additional_filtered)} filtered (total: {len(filtered_models)})")
                     
+                    if reached_known:
+                        break
+                    
                     # Update cursor
                     additional_metadata = additional_response.get('metadata', {})
                     current_cursor = additional_metadata.get('nextCursor')
                     
                     if not current_cursor:
+                        exhausted = True
                         break
                         
                 except Exception as e:
@@ -567,12 +615,20 @@ class AdvancedSearchEngine:
         # Cache results to database for future use
         self._cache_models_to_db(filtered_models, search_params)
         
-        # Update cache metadata
+        # Record the crawl as this search's segment
         try:
-            from ...data.optimized_schema import OptimizedDatabase
-            db = OptimizedDatabase('data/civitai.db')
-            cache_key = self._generate_cache_key(search_params)
-            self._update_cache_info(db, cache_key, filtered_models)
+            complete = exhausted
+            if reached_known:
+                # Older models come from the previous crawl of this segment
+                new_ids = {model.get('id') for model in filtered_models}
+                filtered_models = filtered_models + [
+                    model for model in self.result_cache.segment_models(segment)
+                    if model.get('id') not in new_ids
+                ]
+                filtered_models = filtered_models[:target_limit]
+                complete = segment.complete
+                self.result_cache.stats['incremental_crawls'] += 1
+            self._get_result_cache().record(search_params, filtered_models, complete, merge=reached_known)
         except Exception as e:
             self.logger.warning(f"Cache metadata update failed: {e}")
         
@@ -607,102 +663,68 @@ class AdvancedSearchEngine:
             }
         )
     
+    def _get_model_store(self):
+        """Get the canonical model store, opening the default one on first use."""
+        if self.model_store is None:
+            # Import database here to avoid circular imports
+            from ...data.model_store import ModelStore
+            self.model_store = ModelStore()
+        return self.model_store
+    
     def _cache_models_to_db(self, models: List[Dict[str, Any]], search_params: AdvancedSearchParams) -> None:
         """Cache retrieved models to database for future use."""
         try:
-            # Import database here to avoid circular imports
-            from ...data.optimized_schema import OptimizedDatabase
-            
-            db = OptimizedDatabase('data/civitai.db')
-            cached_count = 0
-            
-            for model in models:
-                try:
-                    # Store model data in database
-                    db.store_model(model)
-                    cached_count += 1
-                except Exception as e:
-                    self.logger.warning(f"Failed to cache model {model.get('id', 'unknown')}: {e}")
-            
+            cached_count, _ = self._get_model_store().store_models(models)
             logger.debug(f"Cached {cached_count}/{len(models)} models to database")
             
         except Exception as e:
             self.logger.warning(f"Database caching failed: {e}")
     
-    async def _check_db_cache(self, search_params: AdvancedSearchParams) -> Optional[List[Dict[str, Any]]]:
-        """Check if results are available in database cache with freshness validation."""
+    def _get_result_cache(self) -> SearchResultCache:
+        """Get the search result cache over the model store."""
+        if self.result_cache is None:
+            self.result_cache = SearchResultCache(self._get_model_store())
+        return self.result_cache
+    
+    @staticmethod
+    def _truncate_at_known(models: List[Dict[str, Any]], known_ids: Set[int]) -> Tuple[List[Dict[str, Any]], bool]:
+        """Cut a newest-first page at the first model the cached segment already holds."""
+        if known_ids:
+            for index, model in enumerate(models):
+                if model.get('id') in known_ids:
+                    return models[:index], True
+        return models, False
+    
+    async def _check_db_cache(self, search_params: AdvancedSearchParams,
+                              target_limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Answer a search from cached crawl segments.
+        
+        Any fresh segment whose dimensions cover the search is used, filtered
+        locally when the search is narrower. Segments not verified for 6 hours
+        are checked for new models first (1 API request).
+        """
         try:
-            from ...data.optimized_schema import OptimizedDatabase
-            import time
-            
-            db = OptimizedDatabase('data/civitai.db')
-            
-            # Check cache freshness (24 hours)
-            cache_key = self._generate_cache_key(search_params)
-            cache_info = self._get_cache_info(db, cache_key)
-            
-            if cache_info:
-                cache_age_hours = (time.time() - cache_info['timestamp']) / 3600
-                logger.debug(f"Cache found, age: {cache_age_hours:.1f} hours")
-                
-                if cache_age_hours > 24:
-                    logger.debug("Cache expired (>24h), will refresh from API")
-                    return None
-                elif cache_age_hours > 6 and await self._has_new_models_since(search_params, cache_info['latest_model_id']):
+            result_cache = self._get_result_cache()
+            hit = result_cache.lookup(search_params, target_limit or search_params.limit)
+            if hit is None:
+                return None
+            
+            logger.debug(f"Cache segment found ({'exact' if hit.exact else 'covering'}), "
+                         f"{len(hit.models)} models")
+            if result_cache.needs_recheck(hit.segment):
+                if await self._has_new_models_since(search_params, hit.latest_model_id):
                     logger.debug("New models detected, refreshing cache")
                     return None
+                result_cache.mark_checked(hit.segment)
             
-            # Query database for matching models
-            cached_models = db.search_models(
-                base_model=search_params.base_model,
-                model_types=search_params.model_types,
-                categories=[cat.value for cat in search_params.categories] if search_params.categories else None,
-                limit=search_params.limit
-            )
-            
-            if cached_models and len(cached_models) >= search_params.limit:
-                logger.debug(f"Using {len(cached_models)} fresh cached models")
-                return cached_models
-                
-        except Exception as e:
-            self.logger.warning(f"Database cache check failed: {e}")
+            return hit.models
         
-        return None
-    
-    def _generate_cache_key(self, search_params: AdvancedSearchParams) -> str:
-        """Generate unique cache key for search parameters."""
-        key_parts = [
-            search_params.base_model or '',
-            ','.join(search_params.model_types or []),
-            ','.join([cat.value for cat in search_params.categories] if search_params.categories else []),
-            ','.join(search_params.tags or [])
-        ]
-        return '|'.join(key_parts)
-    
-    def _get_cache_info(self, db, cache_key: str) -> Optional[Dict]:
-        """Get cache metadata from database."""
-        try:
-            cursor = db.connection.cursor()
-            cursor.execute("""
-                SELECT timestamp, latest_model_id, model_count 
-                FROM search_cache 
-                WHERE cache_key = ? 
-                ORDER BY timestamp DESC 
-                LIMIT 1
-            """, (cache_key,))
-            
-            row = cursor.fetchone()
-            if row:
-                return {
-                    'timestamp': row[0],
-                    'latest_model_id': row[1],
-                    'model_count': row[2]
-                }
         except Exception as e:
-            self.logger.debug(f"Cache info retrieval failed: {e}")
+            self.logger.warning(f"Database cache check failed: {e}")
         
         return None
-    
+
     async def _has_new_models_since(self, search_params: AdvancedSearchParams, latest_cached_id: str) -> bool:
         """Check if new models exist since last cache update."""
         try:
@@ -733,46 +755,10 @@ class AdvancedSearchEngine:
         
         return False
     
-    def _update_cache_info(self, db, cache_key: str, models: List[Dict[str, Any]]) -> None:
-        """Update cache metadata in database."""
-        try:
-            import time
-            
-            latest_model_id = str(models[0].get('id', '')) if models else ''
-            timestamp = time.time()
-            
-            # Create table if not exists
-            cursor = db.connection.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS search_cache (
-                    cache_key TEXT,
-                    timestamp REAL,
-                    latest_model_id TEXT,
-                    model_count INTEGER,
-                    PRIMARY KEY (cache_key)
-                )
-            """)
-            
-            # Insert or update cache info
-            cursor.execute("""
-                INSERT OR REPLACE INTO search_cache 
-                (cache_key, timestamp, latest_model_id, model_count)
-                VALUES (?, ?, ?, ?)
-            """, (cache_key, timestamp, latest_model_id, len(models)))
-            
-            db.connection.commit()
-            logger.debug(f"Updated cache info for key: {cache_key}")
-            
-        except Exception as e:
-            self.logger.warning(f"Cache info update failed: {e}")
-    
-    
-    
-    
     async def _execute_api_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute API call with error handling and rate limiting."""
-        logger.debug(f"_execute_api_call: params type: {type(params)}")
-        logger.debug(f"_execute_api_call: params: {params}")
+        logger.debug("_execute_api_call: params type: %s", type(params))
+        logger.debug("_execute_api_call: params: %s", params)
         
         if not self.api_client:
             raise ValueError("API client not configured")
@@ -795,7 +781,9 @@ class AdvancedSearchEngine:
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                response = await self.api_client.get_models(params)
+                # Lazy decoding: items arrive as compact records over their raw JSON
+                with self._metrics.timer(SEARCH_PAGE_SECONDS):
+                    response = await self.api_client.get_models(params, lazy=True)
                 
                 # Detect API capabilities if enabled
                 if self.unofficial_api_manager.feature_detection_enabled:
@@ -813,12 +801,10 @@ class AdvancedSearchEngine:
     
     def _update_performance_stats(self, response_time: float) -> None:
         """Update search performance statistics."""
-        total = self.search_stats['total_searches']
-        current_avg = self.search_stats['avg_response_time']
-        
-        # Calculate new average
-        new_avg = ((current_avg * (total - 1)) + response_time) / total
-        self.search_stats['avg_response_time'] = new_avg
+        self._search_seconds.record(response_time)
+        self._metrics.histogram(SEARCH_SECONDS).record(response_time)
+        self.search_stats['avg_response_time'] = self._search_seconds.mean
+        self.search_stats['p95_response_time'] = self._search_seconds.percentile(95)
         self.search_stats['last_search_time'] = time.time()
     
     def get_search_statistics(self) -> Dict[str, Any]:
@@ -929,6 +915,7 @@ class LocalVersionFilter:
             'category_filtered': 0
         }
         
+        start_time = time.perf_counter()
         filtered_models = []
         
         for model in models:
@@ -984,6 +971,8 @@ class LocalVersionFilter:
             else:
                 self.filter_stats['models_removed'] += 1
         
+        get_metrics_registry().record_throughput(FILTER_RECORDS_PER_SECOND, self.filter_stats['models_processed'],
+                                                 time.perf_counter() - start_time)
         return filtered_models, dict(self.filter_stats)
     
     def print_filter_statistics(self, stats: Dict[str, int]) -> None:
@@ -10,7 +10,17 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional, Generator, Tuple
 import logging
 from datetime import datetime
-import hashlib
+
+try:
+    from ...api.query_key import QueryKey
+    from ...data.model_record import ModelRecord, json_default
+    from ..performance.profiler import get_profiler
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from api.query_key import QueryKey
+    from data.model_record import ModelRecord, json_default
+    from core.performance.profiler import get_profiler
 
 logger = logging.getLogger(__name__)
 
@@ -31,19 +41,18 @@ class IntermediateFileManager:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.logger = logging.getLogger(__name__)
         
-    def generate_session_id(self, search_params: Dict[str, Any]) -> str:
+    def generate_session_id(self, search_params: Any) -> str:
         """
         検索パラメータから一意のセッションIDを生成
         
         Args:
-            search_params: 検索パラメータ
+            search_params: 検索パラメータ（AdvancedSearchParams / dict / QueryKey）
             
         Returns:
             セッションID
         """
-        # パラメータをJSON化してハッシュ生成
-        params_str = json.dumps(search_params, sort_keys=True, default=str)
-        params_hash = hashlib.md5(params_str.encode()).hexdigest()[:8]
+        # 正規化済みクエリキーのハッシュ（同じ条件なら同じハッシュ）
+        params_hash = QueryKey.of(search_params).digest('session')[:8]
         
         # タイムスタンプと組み合わせ
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -86,7 +95,7 @@ class IntermediateFileManager:
         progress_data['last_updated'] = time.time()
         
         try:
-            with open(progress_file, 'w', encoding='utf-8') as f:
+            with get_profiler().span('progress_write'), open(progress_file, 'w', encoding='utf-8') as f:
                 json.dump(progress_data, f, indent=2, default=str)
             
             self.logger.debug(f"Progress saved: {progress_data}")
@@ -133,10 +142,10 @@ class IntermediateFileManager:
         file_path = self.get_intermediate_file_path(session_id, suffix)
         
         try:
-            with open(file_path, 'a', encoding='utf-8') as f:
+            with get_profiler().span('intermediate_write'), open(file_path, 'a', encoding='utf-8') as f:
                 for model in models:
                     # JSONL形式で保存（1行1JSON）
-                    f.write(json.dumps(model, ensure_ascii=False, default=str) + '\n')
+                    f.write(json.dumps(model, ensure_ascii=False, default=json_default) + '\n')
             
             self.logger.debug(f"Streamed {len(models)} models to {file_path}")
             return True
@@ -146,14 +155,19 @@ class IntermediateFileManager:
             return False
     
     def stream_read_models(self, session_id: str, suffix: str = "raw", 
-                          batch_size: int = 100) -> Generator[List[Dict[str, Any]], None, None]:
+                          batch_size: int = 100, batch_budget: Optional[Any] = None,
+                          pipeline: str = "intermediate_read",
+                          records: bool = False) -> Generator[List[Dict[str, Any]], None, None]:
         """
         モデルデータをストリーム読み込み
         
         Args:
             session_id: セッションID
             suffix: ファイル接尾辞
-            batch_size: バッチサイズ
+            batch_size: バッチサイズ（batch_budget指定時は上限）
+            batch_budget: BatchBudget（指定時はメモリ状況に応じてバッチサイズを決定）
+            pipeline: BatchBudgetに報告するパイプライン名
+            records: Trueの場合はコンパクトなModelRecordとして返す
             
         Yields:
             モデルデータのバッチ
@@ -166,6 +180,8 @@ class IntermediateFileManager:
         
         try:
             batch = []
+            batch_bytes = 0
+            target = batch_budget.next_batch_size(pipeline, batch_size) if batch_budget else batch_size
             
             with open(file_path, 'r', encoding='utf-8') as f:
                 for line_num, line in enumerate(f, 1):
@@ -175,12 +191,18 @@ class IntermediateFileManager:
                     
                     try:
                         model_data = json.loads(line)
-                        batch.append(model_data)
+                        batch.append(ModelRecord(model_data) if records else model_data)
+                        batch_bytes += len(line)
                         
                         # バッチサイズに達したら yield
-                        if len(batch) >= batch_size:
+                        if len(batch) >= target:
+                            if batch_budget:
+                                batch_budget.record_batch(pipeline, len(batch), batch_bytes, serialized=not records)
                             yield batch
                             batch = []
+                            batch_bytes = 0
+                            if batch_budget:
+                                target = batch_budget.next_batch_size(pipeline, batch_size)
                             
                     except json.JSONDecodeError as e:
                         self.logger.warning(f"Invalid JSON at line {line_num}: {e}")
@@ -188,6 +210,8 @@ class IntermediateFileManager:
             
             # 残りのデータを yield
             if batch:
+                if batch_budget:
+                    batch_budget.record_batch(pipeline, len(batch), batch_bytes, serialized=not records)
                 yield batch
                 
         except Exception as e:
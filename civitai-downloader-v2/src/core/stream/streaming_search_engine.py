@@ -14,6 +14,8 @@ from .intermediate_file_manager import IntermediateFileManager
 from ..search.search_engine import AdvancedSearchEngine
 from ..search.advanced_search import AdvancedSearchParams
 from ..category import CategoryClassifier
+from ..memory.batch_budget import BatchBudget, get_batch_budget
+from ..performance.profiler import get_profiler
 
 logger = logging.getLogger(__name__)
 
@@ -25,16 +27,19 @@ class StreamingSearchEngine:
     """
     
     def __init__(self, search_engine: AdvancedSearchEngine, 
-                 intermediate_manager: Optional[IntermediateFileManager] = None):
+                 intermediate_manager: Optional[IntermediateFileManager] = None,
+                 batch_budget: Optional[BatchBudget] = None):
         """
         初期化
         
         Args:
             search_engine: 基本検索エンジン
             intermediate_manager: 中間ファイルマネージャー
+            batch_budget: バッチサイズを決めるメモリ予算（省略時は共有インスタンス）
         """
         self.search_engine = search_engine
         self.intermediate_manager = intermediate_manager or IntermediateFileManager()
+        self.batch_budget = batch_budget or get_batch_budget()
         self.category_classifier = CategoryClassifier()
         self.logger = logging.getLogger(__name__)
     
@@ -61,7 +66,7 @@ class StreamingSearchEngine:
             session_id = resume_session
             self.logger.info(f"Resuming session: {session_id}")
         else:
-            session_id = self.intermediate_manager.generate_session_id(search_params.__dict__)
+            session_id = self.intermediate_manager.generate_session_id(search_params)
             
             # キャッシュチェック
             if not force_refresh and self.intermediate_manager.is_cache_valid(session_id, max_cache_age_hours):
@@ -77,21 +82,25 @@ class StreamingSearchEngine:
                 if force_refresh:
                     self.logger.info("Force refresh requested, ignoring cache")
         
+        profiler = get_profiler()
         try:
             # Step 1: API検索 → 中間ファイル保存
-            await self._stream_api_to_intermediate(session_id, search_params, batch_size)
+            with profiler.span('fetch'):
+                await self._stream_api_to_intermediate(session_id, search_params, batch_size)
             
             # Step 2: 中間ファイル → フィルタリング → 中間ファイル
-            await self._stream_filter_intermediate(session_id, search_params, batch_size)
+            with profiler.span('filter'):
+                await self._stream_filter_intermediate(session_id, search_params, batch_size)
             
             # Step 3: 最終処理（カテゴリ分類など）
-            await self._stream_final_processing(session_id, batch_size)
+            with profiler.span('process'):
+                await self._stream_final_processing(session_id, batch_size)
             
             # 完了情報を保存
             self.intermediate_manager.save_progress(session_id, {
                 'status': 'completed',
                 'completed_at': time.time(),
-                'search_params': search_params.__dict__
+                'search_params': search_params.field_values()
             })
             
             # セッション概要を返す
@@ -106,7 +115,7 @@ class StreamingSearchEngine:
                 'status': 'error',
                 'error': str(e),
                 'error_at': time.time(),
-                'search_params': search_params.__dict__
+                'search_params': search_params.field_values()
             })
             self.logger.error(f"Search failed: {e}")
             raise
@@ -274,8 +283,11 @@ class StreamingSearchEngine:
         start_time = time.time()
         
         try:
+            # ページサイズはメモリ予算に合わせて開始時に決定
+            page_size = self.batch_budget.next_batch_size('stream_fetch', batch_size)
+            
             # ストリーミング検索を実行
-            async for batch_result in self.search_engine.search_streaming(search_params, batch_size):
+            async for batch_result in self.search_engine.search_streaming(search_params, page_size):
                 if batch_result.models:
                     # 中間ファイルに保存
                     success = self.intermediate_manager.stream_write_models(
@@ -292,7 +304,7 @@ class StreamingSearchEngine:
                         'step': 1,
                         'step1_fetched': total_fetched,
                         'step1_last_batch_time': time.time(),
-                        'search_params': search_params.__dict__
+                        'search_params': search_params.field_values()
                     })
                     
                     self.logger.info(f"Fetched batch: {len(batch_result.models)} models (total: {total_fetched})")
@@ -306,7 +318,7 @@ class StreamingSearchEngine:
                 'step1_completed': True,
                 'step1_total_models': total_fetched,
                 'step1_duration': time.time() - start_time,
-                'search_params': search_params.__dict__
+                'search_params': search_params.field_values()
             })
             
             self.logger.info(f"Step 1 completed: {total_fetched} models fetched in {time.time() - start_time:.1f}s")
@@ -344,14 +356,17 @@ class StreamingSearchEngine:
             version_filter = LocalVersionFilter()
             
             # 中間ファイルをストリーム読み込み
-            for batch in self.intermediate_manager.stream_read_models(session_id, 'raw', batch_size):
+            for batch in self.intermediate_manager.stream_read_models(
+                    session_id, 'raw', batch_size, batch_budget=self.batch_budget, pipeline='stream_filter',
+                    records=True):
                 # フィルタリング実行
-                filtered_models, filter_stats = version_filter.filter_by_version_criteria(
-                    batch,
-                    base_model=search_params.base_model,
-                    model_types=search_params.model_types,
-                    categories=[cat.value for cat in search_params.categories] if search_params.categories else None
-                )
+                with get_profiler().span('version_filter'):
+                    filtered_models, filter_stats = version_filter.filter_by_version_criteria(
+                        batch,
+                        base_model=search_params.base_model,
+                        model_types=search_params.model_types,
+                        categories=[cat.value for cat in search_params.categories] if search_params.categories else None
+                    )
                 
                 if filtered_models:
                     # フィルタリング済みを中間ファイルに保存
@@ -371,7 +386,7 @@ class StreamingSearchEngine:
                     'step2_processed': total_processed,
                     'step2_filtered': total_filtered,
                     'step2_last_batch_time': time.time(),
-                    'search_params': search_params.__dict__
+                    'search_params': search_params.field_values()
                 })
                 
                 self.logger.info(f"Filtered batch: {len(batch)} → {len(filtered_models)} (total: {total_filtered}/{total_processed})")
@@ -383,7 +398,7 @@ class StreamingSearchEngine:
                 'step2_total_processed': total_processed,
                 'step2_total_filtered': total_filtered,
                 'step2_duration': time.time() - start_time,
-                'search_params': search_params.__dict__
+                'search_params': search_params.field_values()
             })
             
             self.logger.info(f"Step 2 completed: {total_filtered}/{total_processed} models filtered in {time.time() - start_time:.1f}s")
@@ -413,22 +428,25 @@ class StreamingSearchEngine:
         
         try:
             # フィルタリング済みファイルをストリーム読み込み
-            for batch in self.intermediate_manager.stream_read_models(session_id, 'filtered', batch_size):
+            for batch in self.intermediate_manager.stream_read_models(
+                    session_id, 'filtered', batch_size, batch_budget=self.batch_budget, pipeline='stream_process',
+                    records=True):
                 processed_models = []
                 
-                for model in batch:
-                    # カテゴリ分類
-                    primary_category, all_categories = self.category_classifier.classify_model(model)
-                    
-                    # 処理済みデータに分類結果を追加
-                    processed_model = model.copy()
-                    processed_model['_processing'] = {
-                        'primary_category': primary_category,
-                        'all_categories': all_categories,
-                        'processed_at': time.time()
-                    }
-                    
-                    processed_models.append(processed_model)
+                with get_profiler().span('classify'):
+                    for model in batch:
+                        # カテゴリ分類
+                        primary_category, all_categories = self.category_classifier.classify_model(model)
+                        
+                        # 処理済みデータに分類結果を追加
+                        processed_model = model.copy()
+                        processed_model['_processing'] = {
+                            'primary_category': primary_category,
+                            'all_categories': all_categories,
+                            'processed_at': time.time()
+                        }
+                        
+                        processed_models.append(processed_model)
                 
                 # 処理済みを中間ファイルに保存
                 success = self.intermediate_manager.stream_write_models(
@@ -476,7 +494,8 @@ class StreamingSearchEngine:
             処理済みモデルのバッチ
         """
         async def _stream():
-            for batch in self.intermediate_manager.stream_read_models(session_id, 'processed', batch_size):
+            for batch in self.intermediate_manager.stream_read_models(
+                    session_id, 'processed', batch_size, batch_budget=self.batch_budget, pipeline='stream_export'):
                 yield batch
         
         return _stream()
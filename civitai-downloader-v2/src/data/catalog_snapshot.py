@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Catalog Snapshot - Read-only, memory-mapped columnar view of the model catalog.
+ModelStore regenerates the snapshot after every write batch so that cold-start
+lookups (model counts, filtered id lists, category stats, hash duplicate checks)
+can be answered from one mmap'd file without opening SQLite.
+
+File layout (little endian, every section 8-byte aligned):
+    header        magic, format version, counts, string table location
+    ids           int64[n]     model ids, ascending
+    downloads     int64[n]     download counts
+    category_bits uint64[n]    bitset over the first 64 categories of the string table
+    type_codes    uint16[n]    index into the type string table
+    primary_codes uint16[n]    primary category index (NO_CODE if none)
+    flags         uint8[n]     FLAG_NSFW
+    base_offsets  uint32[n+1]  CSR offsets into base_codes
+    base_codes    uint16[m]    index into the base model string table
+    hash_digests  bytes[32*h]  SHA256 digests, ascending
+    hash_rows     uint32[h]    row of the owning model
+    hash_file_ids int64[h]     file id
+    strings       JSON         {"types": [...], "base_models": [...], "categories": [...]}
+"""
+
+import bisect
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'CVCATSN1'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIIIQQd')
+NO_CODE = 0xFFFF
+FLAG_NSFW = 0x01
+DIGEST_SIZE = 32
+MAX_CATEGORIES = 64
+
+# Query orders the snapshot can answer (others fall back to SQLite)
+SUPPORTED_ORDERS = ('id', 'downloads')
+
+
+def default_snapshot_path(db_path: Path) -> Path:
+    """Snapshot file that belongs to a database file."""
+    return Path(db_path).with_suffix('.snapshot')
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _section_layout(model_count: int, base_count: int, hash_count: int) -> Dict[str, Tuple[int, int]]:
+    """Compute (offset, byte length) of every column section."""
+    sizes = [
+        ('ids', 8 * model_count),
+        ('downloads', 8 * model_count),
+        ('category_bits', 8 * model_count),
+        ('type_codes', 2 * model_count),
+        ('primary_codes', 2 * model_count),
+        ('flags', model_count),
+        ('base_offsets', 4 * (model_count + 1)),
+        ('base_codes', 2 * base_count),
+        ('hash_digests', DIGEST_SIZE * hash_count),
+        ('hash_rows', 4 * hash_count),
+        ('hash_file_ids', 8 * hash_count),
+    ]
+    layout = {}
+    offset = _align(HEADER.size)
+    for name, size in sizes:
+        layout[name] = (offset, size)
+        offset = _align(offset + size)
+    layout['strings'] = (offset, 0)
+    return layout
+
+
+def build_catalog_snapshot(conn: sqlite3.Connection, path: Path) -> int:
+    """
+    Write a snapshot of the catalog held in a model store database.
+
+    The file is written next to the target and atomically renamed into place,
+    so readers never see a partial snapshot.
+
+    Args:
+        conn: Connection to a migrated model store database
+        path: Snapshot file to (re)generate
+
+    Returns:
+        Number of models in the snapshot
+    """
+    rows = conn.execute("""
+        SELECT m.id, m.type, m.nsfw, COALESCE(s.download_count, 0)
+        FROM models m LEFT JOIN model_stats s ON s.model_id = m.id
+        ORDER BY m.id
+    """).fetchall()
+
+    row_of = {row[0]: index for index, row in enumerate(rows)}
+    types: List[str] = []
+    type_index: Dict[str, int] = {}
+    type_codes = []
+    for _, model_type, _, _ in rows:
+        model_type = model_type or ''
+        if model_type not in type_index:
+            type_index[model_type] = len(types)
+            types.append(model_type)
+        type_codes.append(type_index[model_type])
+
+    # Categories: every category gets a primary code, only the first
+    # MAX_CATEGORIES fit in the per-model bitset
+    categories = [r[0] for r in conn.execute("SELECT name FROM categories ORDER BY id")]
+    if len(categories) >= NO_CODE:
+        raise ValueError(f"Too many categories for a snapshot: {len(categories)}")
+    category_index = {name: i for i, name in enumerate(categories)}
+    category_bits = [0] * len(rows)
+    primary_codes = [NO_CODE] * len(rows)
+    for model_id, name, is_primary in conn.execute("""
+        SELECT mc.model_id, c.name, mc.is_primary
+        FROM model_categories mc JOIN categories c ON c.id = mc.category_id
+    """):
+        row = row_of.get(model_id)
+        bit = category_index.get(name)
+        if row is None or bit is None:
+            continue
+        if bit < MAX_CATEGORIES:
+            category_bits[row] |= 1 << bit
+        if is_primary:
+            primary_codes[row] = bit
+
+    # Base models (a model can have versions on several base models)
+    base_models: List[str] = []
+    base_index: Dict[str, int] = {}
+    per_row: List[List[int]] = [[] for _ in rows]
+    for model_id, base_model in conn.execute("""
+        SELECT DISTINCT model_id, base_model FROM model_versions
+        WHERE base_model IS NOT NULL ORDER BY model_id, base_model
+    """):
+        row = row_of.get(model_id)
+        if row is None:
+            continue
+        if base_model not in base_index:
+            base_index[base_model] = len(base_models)
+            base_models.append(base_model)
+        per_row[row].append(base_index[base_model])
+    base_offsets = [0]
+    base_codes: List[int] = []
+    for codes in per_row:
+        base_codes.extend(codes)
+        base_offsets.append(len(base_codes))
+
+    # File hashes
+    hashes = []
+    for sha256, model_id, file_id in conn.execute("""
+        SELECT sha256, model_id, id FROM model_files WHERE sha256 IS NOT NULL
+    """):
+        row = row_of.get(model_id)
+        if row is None:
+            continue
+        try:
+            digest = bytes.fromhex(sha256)
+        except ValueError:
+            continue
+        if len(digest) == DIGEST_SIZE:
+            hashes.append((digest, row, file_id))
+    hashes.sort()
+
+    strings = json.dumps({
+        'types': types,
+        'base_models': base_models,
+        'categories': categories
+    }, ensure_ascii=False).encode('utf-8')
+
+    layout = _section_layout(len(rows), len(base_codes), len(hashes))
+    strings_offset = layout['strings'][0]
+    buffer = bytearray(strings_offset + len(strings))
+    HEADER.pack_into(buffer, 0, MAGIC, FORMAT_VERSION, len(rows), len(base_codes),
+                     len(hashes), strings_offset, len(strings), time.time())
+
+    def put(section: str, fmt: str, values: List[Any]) -> None:
+        offset, _ = layout[section]
+        struct.pack_into(f'<{len(values)}{fmt}', buffer, offset, *values)
+
+    put('ids', 'q', [r[0] for r in rows])
+    put('downloads', 'q', [int(r[3] or 0) for r in rows])
+    put('category_bits', 'Q', category_bits)
+    put('type_codes', 'H', type_codes)
+    put('primary_codes', 'H', primary_codes)
+    put('flags', 'B', [FLAG_NSFW if r[2] else 0 for r in rows])
+    put('base_offsets', 'I', base_offsets)
+    put('base_codes', 'H', base_codes)
+    offset, size = layout['hash_digests']
+    buffer[offset:offset + size] = b''.join(h[0] for h in hashes)
+    put('hash_rows', 'I', [h[1] for h in hashes])
+    put('hash_file_ids', 'q', [h[2] for h in hashes])
+    buffer[strings_offset:] = strings
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer)
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+class CatalogSnapshot:
+    """
+    Read-only view over a snapshot file.
+
+    Columns are exposed as zero-copy memoryviews over the mapped file; the OS
+    pages in only the parts a query touches.
+    """
+
+    def __init__(self, path: Path, mapped: mmap.mmap):
+        self.path = Path(path)
+        self._mmap = mapped
+        (_, _, self.model_count, base_count, hash_count,
+         strings_offset, strings_length, self.built_at) = HEADER.unpack_from(mapped, 0)
+
+        layout = _section_layout(self.model_count, base_count, hash_count)
+        view = memoryview(mapped)
+
+        def column(section: str, fmt: str) -> memoryview:
+            offset, size = layout[section]
+            return view[offset:offset + size].cast(fmt)
+
+        self.ids = column('ids', 'q')
+        self.downloads = column('downloads', 'q')
+        self.category_bits = column('category_bits', 'Q')
+        self.type_codes = column('type_codes', 'H')
+        self.primary_codes = column('primary_codes', 'H')
+        self.flags = column('flags', 'B')
+        self.base_offsets = column('base_offsets', 'I')
+        self.base_codes = column('base_codes', 'H')
+        self._hash_offset = layout['hash_digests'][0]
+        self.hash_rows = column('hash_rows', 'I')
+        self.hash_file_ids = column('hash_file_ids', 'q')
+        self.hash_count = hash_count
+
+        strings = json.loads(bytes(mapped[strings_offset:strings_offset + strings_length]).decode('utf-8'))
+        self.types: List[str] = strings['types']
+        self.base_models: List[str] = strings['base_models']
+        self.categories: List[str] = strings['categories']
+
+    @classmethod
+    def open(cls, path: Path) -> Optional['CatalogSnapshot']:
+        """
+        Map a snapshot file.
+
+        Returns:
+            Snapshot, or None if the file is missing or not a valid snapshot
+        """
+        try:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            magic, version = struct.unpack_from('<8sI', mapped, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"unsupported snapshot format in {path}")
+            return cls(path, mapped)
+        except (struct.error, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable catalog snapshot: {e}")
+            mapped.close()
+            return None
+
+    def close(self) -> None:
+        """Release the mapping."""
+        for name in ('ids', 'downloads', 'category_bits', 'type_codes', 'primary_codes',
+                     'flags', 'base_offsets', 'base_codes',
+                     'hash_rows', 'hash_file_ids'):
+            getattr(self, name).release()
+        self._mmap.close()
+
+    def __enter__(self) -> 'CatalogSnapshot':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.model_count
+
+    def row_of(self, model_id: int) -> Optional[int]:
+        """Row index of a model id (binary search)."""
+        row = bisect.bisect_left(self.ids, model_id)
+        if row < self.model_count and self.ids[row] == model_id:
+            return row
+        return None
+
+    def __contains__(self, model_id: int) -> bool:
+        return self.row_of(model_id) is not None
+
+    def model_base_models(self, row: int) -> List[str]:
+        """Base models of the model at a row."""
+        start, end = self.base_offsets[row], self.base_offsets[row + 1]
+        return [self.base_models[code] for code in self.base_codes[start:end]]
+
+    def _digest(self, index: int) -> bytes:
+        start = self._hash_offset + index * DIGEST_SIZE
+        return self._mmap[start:start + DIGEST_SIZE]
+
+    def find_file_by_hash(self, sha256: str) -> Optional[Tuple[int, int]]:
+        """
+        Look up a file by SHA256.
+
+        Returns:
+            Tuple of (model_id, file_id), or None if no catalog file has this hash
+        """
+        try:
+            digest = bytes.fromhex(sha256)
+        except (TypeError, ValueError):
+            return None
+        if len(digest) != DIGEST_SIZE:
+            return None
+
+        lo, hi = 0, self.hash_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._digest(mid) < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.hash_count and self._digest(lo) == digest:
+            return self.ids[self.hash_rows[lo]], self.hash_file_ids[lo]
+        return None
+
+    def supports(self, query) -> bool:
+        """Whether a ModelQuery can be answered from the snapshot."""
+        return not query.tags and not query.segment and query.order_by in SUPPORTED_ORDERS
+
+    def _matching_rows(self, query) -> List[int]:
+        if query.model_ids is not None:
+            candidates = sorted({row for row in map(self.row_of, query.model_ids) if row is not None})
+        else:
+            candidates = range(self.model_count)
+
+        type_codes = None
+        if query.model_types:
+            type_codes = {i for i, name in enumerate(self.types) if name in query.model_types}
+            if not type_codes:
+                return []
+
+        base_code = None
+        if query.base_model:
+            if query.base_model not in self.base_models:
+                return []
+            base_code = self.base_models.index(query.base_model)
+
+        primary_code = None
+        if query.primary_category:
+            if query.primary_category not in self.categories:
+                return []
+            primary_code = self.categories.index(query.primary_category)
+
+        matched = []
+        for row in candidates:
+            if type_codes is not None and self.type_codes[row] not in type_codes:
+                continue
+            if primary_code is not None and self.primary_codes[row] != primary_code:
+                continue
+            if query.nsfw is not None and bool(self.flags[row] & FLAG_NSFW) != query.nsfw:
+                continue
+            if base_code is not None:
+                start, end = self.base_offsets[row], self.base_offsets[row + 1]
+                if base_code not in self.base_codes[start:end]:
+                    continue
+            matched.append(row)
+        return matched
+
+    def find_ids(self, query) -> List[int]:
+        """
+        Ids of models matching a ModelQuery (see supports()).
+
+        Returns ids in the same order ModelStore.find_ids would.
+        """
+        rows = self._matching_rows(query)
+        if query.order_by == 'downloads':
+            rows.sort(key=lambda row: (-self.downloads[row], self.ids[row]))
+        if query.limit:
+            rows = rows[:query.limit]
+        return [self.ids[row] for row in rows]
+
+    def count(self, query) -> int:
+        """Count models matching a ModelQuery (see supports())."""
+        if (query.model_ids is None and not query.model_types and not query.base_model
+                and not query.primary_category and query.nsfw is None):
+            return self.model_count
+        return len(self._matching_rows(query))
+
+    def primary_category_counts(self) -> Dict[str, int]:
+        """Number of models per primary category, largest first."""
+        counts: Dict[str, int] = {}
+        for code in self.primary_codes:
+            if code != NO_CODE:
+                name = self.categories[code]
+                counts[name] = counts.get(name, 0) + 1
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
@@ -11,7 +11,7 @@ from typing import Optional, Dict, Any, List
 from contextlib import contextmanager
 import logging
 
-from .schema_manager import initialize_database
+from .model_store import ModelStore
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +35,8 @@ class DatabaseManager:
         # Thread safety
         self._lock = threading.Lock()
         
-        # Initialize database schema using centralized schema manager
-        initialize_database(self.db_path, "main")
+        # Canonical model store owns the schema and its migrations
+        self.model_store = ModelStore(self.db_path)
     
     @contextmanager
     def get_connection(self):
@@ -78,42 +78,16 @@ class DatabaseManager:
         Returns:
             True if stored successfully
         """
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Convert complex types to strings for storage
-                allow_commercial = model_data.get('allowCommercialUse')
-                if isinstance(allow_commercial, list):
-                    allow_commercial = ','.join(allow_commercial)
-                elif allow_commercial is not None:
-                    allow_commercial = str(allow_commercial)
-                
-                cursor.execute("""
-                    INSERT OR REPLACE INTO models (
-                        id, name, type, description, creator_id, creator_username,
-                        nsfw, allowCommercialUse, created_at, updated_at, raw_data
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    model_data.get('id'),
-                    model_data.get('name'),
-                    model_data.get('type'),
-                    model_data.get('description'),
-                    model_data.get('creator', {}).get('id'),
-                    model_data.get('creator', {}).get('username'),
-                    model_data.get('nsfw'),
-                    allow_commercial,
-                    model_data.get('createdAt'),
-                    model_data.get('updatedAt'),
-                    str(model_data)  # Store raw JSON as string
-                ))
-                
-                conn.commit()
-                return True
-                
-        except Exception as e:
-            logger.error(f"Failed to store model {model_data.get('id')}: {e}")
-            return False
+        return self.model_store.store_model(model_data)
+    
+    def flush_snapshot(self) -> bool:
+        """
+        Rebuild the catalog snapshot after a loop of store_model() calls.
+        
+        Returns:
+            True if the snapshot was rebuilt
+        """
+        return self.model_store.flush_snapshot()
     
     def get_model(self, model_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -123,18 +97,10 @@ class DatabaseManager:
             model_id: Model ID
             
         Returns:
-            Model data or None if not found
+            Model data in CivitAI API format or None if not found
         """
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM models WHERE id = ?", (model_id,))
-                row = cursor.fetchone()
-                
-                if row:
-                    return dict(row)
-                return None
-                
+            return self.model_store.get_model(model_id)
         except Exception as e:
             logger.error(f"Failed to get model {model_id}: {e}")
             return None
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+File Inventory - Persistent index of model files in the local download library.
+Stores path, size, mtime and inode with cached SHA256/AutoV2 hashes in the
+model store database. Rescans only re-hash files whose size or mtime changed
+(moved files are recognized by inode), and hashes are reconciled against
+model_files so local files can be mapped back to CivitAI model/version/file ids.
+"""
+
+import hashlib
+import json
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .model_store import ModelStore
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE_EXTENSIONS = {'.safetensors', '.ckpt', '.pt', '.pth', '.bin'}
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+INFO_SUFFIX = '.civitai.info'
+# Hashed files written per transaction, so an interrupted scan keeps its work
+COMMIT_EVERY = 100
+
+
+def hash_file(path: Path) -> Tuple[str, str]:
+    """
+    Compute CivitAI hashes of a file.
+
+    Returns:
+        Tuple of (SHA256, AutoV2), uppercase hex; AutoV2 is the first
+        10 characters of the SHA256
+    """
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            sha256.update(chunk)
+    digest = sha256.hexdigest().upper()
+    return digest, digest[:10]
+
+
+@dataclass
+class InventoryScanResult:
+    """Summary of one inventory scan."""
+    root: str
+    files: int = 0
+    unchanged: int = 0
+    moved: int = 0
+    hashed: int = 0
+    removed: int = 0
+    failed: int = 0
+    bytes_hashed: int = 0
+    resolved: int = 0
+    duration: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+class FileInventory:
+    """
+    Incrementally maintained inventory of local model files.
+    """
+
+    def __init__(self, model_store: Optional[ModelStore] = None,
+                 extensions: Optional[Iterable[str]] = None,
+                 hash_workers: int = 4, commit_every: int = COMMIT_EVERY):
+        """
+        Initialize file inventory.
+
+        Args:
+            model_store: Model store whose database holds the inventory
+            extensions: File extensions to index (model files by default)
+            hash_workers: Number of files hashed in parallel
+            commit_every: Hashed files committed per transaction during a scan
+        """
+        self.model_store = model_store or ModelStore()
+        self.extensions = {e.lower() for e in (extensions or MODEL_FILE_EXTENSIONS)}
+        self.hash_workers = max(1, hash_workers)
+        self.commit_every = max(1, commit_every)
+
+    def _walk(self, root: Path) -> Iterable[Tuple[str, os.stat_result]]:
+        """Yield (path, stat) for indexed files under root using os.scandir."""
+        stack = [str(root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif (entry.is_file(follow_symlinks=False)
+                                  and os.path.splitext(entry.name)[1].lower() in self.extensions):
+                                yield entry.path, entry.stat(follow_symlinks=False)
+                        except OSError as e:
+                            logger.warning(f"Cannot stat {entry.path}: {e}")
+            except OSError as e:
+                logger.warning(f"Cannot read directory {directory}: {e}")
+
+    @staticmethod
+    def _stat_paths(paths: Iterable[Path]) -> Iterable[Tuple[str, os.stat_result]]:
+        """Yield (path, stat) for the given files."""
+        for path in paths:
+            path = str(Path(path).resolve())
+            try:
+                yield path, os.stat(path)
+            except OSError as e:
+                logger.warning(f"Cannot stat {path}: {e}")
+
+    @staticmethod
+    def _prefix_range(root: Path) -> Tuple[str, str]:
+        """Key range covering every path below root (uses the primary key index)."""
+        prefix = str(root).rstrip(os.sep) + os.sep
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+    def scan(self, root: Path, paths: Optional[Iterable[Path]] = None) -> InventoryScanResult:
+        """
+        Bring the inventory for a directory tree up to date.
+
+        Args:
+            root: Library directory to scan
+            paths: Only index these files below root; entries of other files are
+                left as they are (nothing is removed or detected as moved)
+
+        Returns:
+            Scan summary
+        """
+        start_time = time.time()
+        root = Path(root).resolve()
+        result = InventoryScanResult(root=str(root))
+        low, high = self._prefix_range(root)
+
+        with self.model_store.get_connection() as conn:
+            existing = {
+                row['path']: dict(row) for row in conn.execute(
+                    "SELECT * FROM file_inventory WHERE path >= ? AND path < ?", (low, high)
+                )
+            }
+
+        seen = dict(self._walk(root) if paths is None else self._stat_paths(paths))
+        result.files = len(seen)
+
+        # Rows whose file is gone are candidates for move detection
+        vanished = {} if paths is not None else {
+            path: row for path, row in existing.items() if path not in seen
+        }
+        by_inode = {(row['device'], row['inode']): row for row in vanished.values() if row['inode']}
+
+        updates: List[Dict[str, Any]] = []
+        to_hash: List[Tuple[str, os.stat_result]] = []
+        for path, st in seen.items():
+            row = existing.get(path)
+            if row and row['size'] == st.st_size and row['mtime_ns'] == st.st_mtime_ns and row['sha256']:
+                result.unchanged += 1
+                continue
+
+            moved = by_inode.pop((st.st_dev, st.st_ino), None)
+            if (moved and moved['size'] == st.st_size and moved['mtime_ns'] == st.st_mtime_ns
+                    and moved['sha256']):
+                updates.append({**moved, 'path': path})
+                result.moved += 1
+                continue
+
+            to_hash.append((path, st))
+
+        now = time.time()
+        with self.model_store.get_connection() as conn:
+            self._upsert(conn, updates, now)
+            conn.commit()
+
+            if to_hash:
+                pending: List[Dict[str, Any]] = []
+                with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+                    hashes = executor.map(self._hash_entry, [path for path, _ in to_hash])
+                    for (path, st), hashed in zip(to_hash, hashes):
+                        if isinstance(hashed, Exception):
+                            result.failed += 1
+                            result.errors.append(f"{path}: {hashed}")
+                            continue
+                        sha256, autov2 = hashed
+                        pending.append({
+                            'path': path, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                            'device': st.st_dev, 'inode': st.st_ino,
+                            'sha256': sha256, 'autov2': autov2,
+                            'model_id': None, 'version_id': None, 'file_id': None,
+                            'hashed_at': time.time()
+                        })
+                        result.hashed += 1
+                        result.bytes_hashed += st.st_size
+                        if len(pending) >= self.commit_every:
+                            self._upsert(conn, pending, now)
+                            conn.commit()
+                            pending = []
+                self._upsert(conn, pending, now)
+
+            conn.executemany("DELETE FROM file_inventory WHERE path = ?",
+                             [(path,) for path in vanished])
+            result.removed = len(vanished) - result.moved
+
+            result.resolved = self._reconcile(conn, low, high)
+            conn.commit()
+
+        result.duration = time.time() - start_time
+        logger.info(f"Inventory scan of {root}: {result.files} files, {result.hashed} hashed "
+                    f"({result.bytes_hashed / (1024 ** 3):.1f} GB), {result.moved} moved, "
+                    f"{result.removed} removed in {result.duration:.1f}s")
+        return result
+
+    @staticmethod
+    def _upsert(conn, rows: List[Dict[str, Any]], seen_at: float) -> None:
+        """Insert or update inventory rows (not committed)."""
+        if rows:
+            conn.executemany("""
+                INSERT INTO file_inventory (
+                    path, size, mtime_ns, device, inode, sha256, autov2,
+                    model_id, version_id, file_id, hashed_at, seen_at
+                ) VALUES (
+                    :path, :size, :mtime_ns, :device, :inode, :sha256, :autov2,
+                    :model_id, :version_id, :file_id, :hashed_at, :seen_at
+                )
+                ON CONFLICT(path) DO UPDATE SET
+                    size = excluded.size, mtime_ns = excluded.mtime_ns,
+                    device = excluded.device, inode = excluded.inode,
+                    sha256 = excluded.sha256, autov2 = excluded.autov2,
+                    model_id = excluded.model_id, version_id = excluded.version_id,
+                    file_id = excluded.file_id, hashed_at = excluded.hashed_at,
+                    seen_at = excluded.seen_at
+            """, [{**row, 'seen_at': seen_at} for row in rows])
+
+    @staticmethod
+    def _hash_entry(path: str):
+        try:
+            return hash_file(Path(path))
+        except OSError as e:
+            return e
+
+    def _reconcile(self, conn, low: str, high: str) -> int:
+        """
+        Map unresolved files to CivitAI ids.
+
+        Content hashes are matched against model_files first; files the catalog
+        does not know are resolved from a neighbouring .civitai.info sidecar.
+
+        Returns:
+            Number of files resolved
+        """
+        cursor = conn.execute("""
+            UPDATE file_inventory SET
+                file_id = (SELECT mf.id FROM model_files mf WHERE mf.sha256 = file_inventory.sha256 LIMIT 1),
+                version_id = (SELECT mf.version_id FROM model_files mf WHERE mf.sha256 = file_inventory.sha256 LIMIT 1),
+                model_id = (SELECT mf.model_id FROM model_files mf WHERE mf.sha256 = file_inventory.sha256 LIMIT 1)
+            WHERE path >= ? AND path < ? AND model_id IS NULL AND sha256 IS NOT NULL
+              AND EXISTS (SELECT 1 FROM model_files mf WHERE mf.sha256 = file_inventory.sha256)
+        """, (low, high))
+        resolved = cursor.rowcount
+
+        unresolved = conn.execute("""
+            SELECT path FROM file_inventory
+            WHERE path >= ? AND path < ? AND model_id IS NULL
+        """, (low, high)).fetchall()
+        for row in unresolved:
+            ids = self.read_sidecar(Path(row['path']))
+            if ids:
+                conn.execute("""
+                    UPDATE file_inventory SET model_id = ?, version_id = ? WHERE path = ?
+                """, (ids[0], ids[1], row['path']))
+                resolved += 1
+        return resolved
+
+    @staticmethod
+    def read_sidecar(path: Path) -> Optional[Tuple[int, Optional[int]]]:
+        """Read (model_id, version_id) from <stem>.civitai.info if present."""
+        info_file = path.with_name(path.stem + INFO_SUFFIX)
+        try:
+            with open(info_file, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(info, dict) or not info.get('modelId'):
+            return None
+        return info['modelId'], info.get('id')
+
+    def entries(self, root: Optional[Path] = None) -> List[Dict[str, Any]]:
+        """
+        Get inventory entries.
+
+        Args:
+            root: Only entries below this directory (all if None)
+
+        Returns:
+            Inventory rows ordered by path
+        """
+        with self.model_store.get_connection() as conn:
+            if root is None:
+                rows = conn.execute("SELECT * FROM file_inventory ORDER BY path")
+            else:
+                rows = conn.execute("""
+                    SELECT * FROM file_inventory WHERE path >= ? AND path < ? ORDER BY path
+                """, self._prefix_range(Path(root).resolve()))
+            return [dict(row) for row in rows]
+
+    def find_by_hash(self, file_hash: str) -> List[Dict[str, Any]]:
+        """
+        Find local files by SHA256 or AutoV2 hash.
+
+        Args:
+            file_hash: SHA256 (64 hex chars) or AutoV2 (10 hex chars)
+
+        Returns:
+            Matching inventory rows
+        """
+        column = 'autov2' if len(file_hash) == 10 else 'sha256'
+        with self.model_store.get_connection() as conn:
+            rows = conn.execute(f"SELECT * FROM file_inventory WHERE {column} = ?",
+                                (file_hash.upper(),))
+            return [dict(row) for row in rows]
+
+    def resolve_hash(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Reverse lookup from a file hash to CivitAI ids.
+
+        Args:
+            file_hash: SHA256 or AutoV2 hash
+
+        Returns:
+            Dict with model_id, version_id and file_id, or None if unknown
+        """
+        column = 'autov2' if len(file_hash) == 10 else 'sha256'
+        with self.model_store.get_connection() as conn:
+            row = conn.execute(f"""
+                SELECT model_id, version_id, id AS file_id FROM model_files
+                WHERE {column} = ? LIMIT 1
+            """, (file_hash.upper(),)).fetchone()
+            if row is None:
+                row = conn.execute(f"""
+                    SELECT model_id, version_id, file_id FROM file_inventory
+                    WHERE {column} = ? AND model_id IS NOT NULL LIMIT 1
+                """, (file_hash.upper(),)).fetchone()
+            return dict(row) if row else None
+
+    def files_for_model(self, model_id: int) -> List[Dict[str, Any]]:
+        """Local files that belong to a model."""
+        with self.model_store.get_connection() as conn:
+            rows = conn.execute("SELECT * FROM file_inventory WHERE model_id = ? ORDER BY path",
+                                (model_id,))
+            return [dict(row) for row in rows]
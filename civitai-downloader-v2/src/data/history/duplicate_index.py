@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Duplicate Index - Complete duplicate detection over the whole download history.
+Implements requirement 6.2 for every completed download, not just recent ones:
+a persistent bloom filter answers most "not downloaded" checks in memory, and
+the downloads table (indexed on (model_id, file_id) and hash_sha256) is the
+exact set that confirms possible hits.
+"""
+
+import hashlib
+import math
+import os
+import struct
+import threading
+import logging
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SQLite default limit on host parameters is 999
+SQL_CHUNK_SIZE = 500
+
+
+class BloomFilter:
+    """Fixed-size bloom filter using double hashing over a BLAKE2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001,
+                 bit_count: Optional[int] = None, hash_count: Optional[int] = None,
+                 bits: Optional[bytearray] = None):
+        """
+        Initialize bloom filter.
+
+        Args:
+            capacity: Expected number of keys
+            error_rate: Target false positive rate at capacity
+            bit_count: Explicit size in bits (computed from capacity if None)
+            hash_count: Explicit number of hash functions
+            bits: Existing bit array (for deserialization)
+        """
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.bit_count = bit_count or max(
+            8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        )
+        self.hash_count = hash_count or max(
+            1, int(round(self.bit_count / self.capacity * math.log(2)))
+        )
+        self.bits = bits if bits is not None else bytearray((self.bit_count + 7) // 8)
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        return [(h1 + i * h2) % self.bit_count for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        """Add a key."""
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+def _pair_key(model_id: Any, file_id: Any) -> str:
+    return f"p:{model_id}:{file_id}"
+
+
+def _model_key(model_id: Any) -> str:
+    return f"m:{model_id}"
+
+
+def _hash_key(sha256: str) -> str:
+    return f"h:{sha256.upper()}"
+
+
+class DuplicateIndex:
+    """
+    Persistent duplicate index over all completed downloads.
+
+    The bloom filter is saved to disk together with a watermark (the highest
+    downloads.id it covers), so a restart only scans rows recorded since the
+    last save. Rows re-recorded with INSERT OR REPLACE get a new id and are
+    therefore always picked up.
+    """
+
+    MAGIC = b'CVDUPIX1'
+    HEADER = struct.Struct('<8sqqqqd')
+
+    def __init__(self, db_manager, index_path: Optional[Path] = None,
+                 capacity: int = 100_000, error_rate: float = 0.001):
+        """
+        Initialize duplicate index.
+
+        Args:
+            db_manager: DatabaseManager owning the downloads table
+            index_path: Bloom filter file (defaults to <db>.dupbloom)
+            capacity: Initial bloom filter capacity in keys
+            error_rate: Target false positive rate
+        """
+        self.db_manager = db_manager
+        self.index_path = Path(index_path) if index_path else Path(db_manager.db_path).with_suffix('.dupbloom')
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._watermark = 0
+        self._entries = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the bloom filter covers the full history."""
+        return self._loaded
+
+    def __len__(self) -> int:
+        """Number of keys added to the bloom filter."""
+        return self._entries
+
+    def load(self) -> None:
+        """Load the persisted bloom filter and catch up with newer downloads."""
+        with self._lock:
+            max_id = self._max_download_id()
+            if not self._read_file() or self._watermark > max_id:
+                self._reset(self.capacity)
+
+            if self._catch_up() or not self.index_path.exists():
+                self._save()
+            self._loaded = True
+
+    def rebuild(self) -> None:
+        """Rebuild the bloom filter from the full download history."""
+        with self._lock:
+            self._reset(max(self.capacity, self._entries * 2))
+            self._catch_up()
+            self._save()
+            self._loaded = True
+
+    def clear(self) -> None:
+        """Drop the in-memory filter; checks use the database until reloaded."""
+        with self._lock:
+            self._reset(self.capacity)
+            self._loaded = False
+
+    def _reset(self, capacity: int) -> None:
+        self._bloom = BloomFilter(capacity, self.error_rate)
+        self._watermark = 0
+        self._entries = 0
+
+    def _max_download_id(self) -> int:
+        with self.db_manager.get_connection() as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM downloads").fetchone()[0]
+
+    def _catch_up(self) -> int:
+        """Add completed downloads newer than the watermark; returns rows added."""
+        added = 0
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT id, model_id, file_id, hash_sha256 FROM downloads
+                WHERE id > ? AND status = 'completed'
+                ORDER BY id
+            """, (self._watermark,))
+            for row in cursor:
+                self._add_keys(row[1], row[2], row[3])
+                self._watermark = row[0]
+                added += 1
+            self._watermark = max(self._watermark,
+                                  conn.execute("SELECT COALESCE(MAX(id), 0) FROM downloads").fetchone()[0])
+
+        if self._entries > self._bloom.capacity:
+            # Over capacity the false positive rate degrades; grow and rescan
+            logger.info(f"Duplicate index over capacity ({self._entries}), rebuilding")
+            self._reset(self._entries * 2)
+            return self._catch_up() or 1
+        return added
+
+    def _read_file(self) -> bool:
+        try:
+            data = self.index_path.read_bytes()
+            magic, watermark, entries, bit_count, hash_count, error_rate = self.HEADER.unpack_from(data, 0)
+        except (OSError, struct.error):
+            return False
+
+        bits = bytearray(data[self.HEADER.size:])
+        if magic != self.MAGIC or len(bits) != (bit_count + 7) // 8:
+            logger.warning(f"Ignoring invalid duplicate index file: {self.index_path}")
+            return False
+
+        self._bloom = BloomFilter(max(entries, self.capacity), error_rate,
+                                  bit_count=bit_count, hash_count=hash_count, bits=bits)
+        self._watermark = watermark
+        self._entries = entries
+        return True
+
+    def _save(self) -> None:
+        header = self.HEADER.pack(self.MAGIC, self._watermark, self._entries,
+                                  self._bloom.bit_count, self._bloom.hash_count, self._bloom.error_rate)
+        tmp_path = self.index_path.with_name(self.index_path.name + f'.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                f.write(self._bloom.bits)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Failed to save duplicate index: {e}")
+
+    def save(self) -> None:
+        """Persist the bloom filter."""
+        with self._lock:
+            self._save()
+
+    def _add_keys(self, model_id: Any, file_id: Any, sha256: Optional[str]) -> None:
+        self._bloom.add(_model_key(model_id))
+        self._bloom.add(_pair_key(model_id, file_id))
+        self._entries += 2
+        if sha256:
+            self._bloom.add(_hash_key(sha256))
+            self._entries += 1
+
+    def add(self, model_id: int, file_id: Optional[int], sha256: Optional[str] = None) -> None:
+        """
+        Register a completed download.
+
+        Args:
+            model_id: Model ID
+            file_id: File ID
+            sha256: SHA256 hash of the downloaded file
+        """
+        with self._lock:
+            self._add_keys(model_id, file_id, sha256)
+
+    def contains(self, model_id: int, file_id: Optional[int] = None) -> bool:
+        """
+        Check whether a model (or one of its files) has been downloaded.
+
+        Args:
+            model_id: Model ID
+            file_id: File ID (None checks any file of the model)
+
+        Returns:
+            True if already downloaded
+        """
+        key = _model_key(model_id) if file_id is None else _pair_key(model_id, file_id)
+        if self._loaded and key not in self._bloom:
+            return False
+        return self.db_manager.is_downloaded(model_id, file_id)
+
+    def contains_hash(self, sha256: str) -> bool:
+        """
+        Check whether a file with this SHA256 has been downloaded.
+
+        Args:
+            sha256: SHA256 hash (any case)
+
+        Returns:
+            True if a completed download has this hash
+        """
+        if not sha256:
+            return False
+        if self._loaded and _hash_key(sha256) not in self._bloom:
+            return False
+
+        with self.db_manager.get_connection() as conn:
+            row = conn.execute("""
+                SELECT 1 FROM downloads
+                WHERE hash_sha256 IN (?, ?) AND status = 'completed'
+                LIMIT 1
+            """, (sha256.upper(), sha256.lower())).fetchone()
+            return row is not None
+
+    def filter_already_downloaded(self, ids: Iterable[Hashable]) -> Set[Hashable]:
+        """
+        Batch duplicate check for bulk jobs.
+
+        Args:
+            ids: Model ids, or (model_id, file_id) tuples
+
+        Returns:
+            Subset of ids that have already been downloaded
+        """
+        candidates: List[Hashable] = []
+        for item in ids:
+            if isinstance(item, tuple):
+                key = _pair_key(*item) if item[1] is not None else _model_key(item[0])
+            else:
+                key = _model_key(item)
+            if not self._loaded or key in self._bloom:
+                candidates.append(item)
+
+        if not candidates:
+            return set()
+
+        model_ids = list({item[0] if isinstance(item, tuple) else item for item in candidates})
+        downloaded_models: Set[Any] = set()
+        downloaded_pairs: Set[Tuple[Any, Any]] = set()
+        with self.db_manager.get_connection() as conn:
+            for start in range(0, len(model_ids), SQL_CHUNK_SIZE):
+                chunk = model_ids[start:start + SQL_CHUNK_SIZE]
+                placeholders = ','.join('?' for _ in chunk)
+                for model_id, file_id in conn.execute(f"""
+                    SELECT model_id, file_id FROM downloads
+                    WHERE status = 'completed' AND model_id IN ({placeholders})
+                """, chunk):
+                    downloaded_models.add(model_id)
+                    downloaded_pairs.add((model_id, file_id))
+
+        found = set()
+        for item in candidates:
+            if isinstance(item, tuple) and item[1] is not None:
+                if tuple(item[:2]) in downloaded_pairs:
+                    found.add(item)
+            elif (item[0] if isinstance(item, tuple) else item) in downloaded_models:
+                found.add(item)
+        return found
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        return {
+            'entries': self._entries,
+            'capacity': self._bloom.capacity,
+            'bit_count': self._bloom.bit_count,
+            'hash_count': self._bloom.hash_count,
+            'watermark': self._watermark,
+            'loaded': self._loaded
+        }
@@ -5,16 +5,12 @@ Implements requirements 6.1 and 6.2: Download history tracking and duplicate pre
 """
 
 import logging
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, Hashable, Iterable, List, Optional, Set
 from datetime import datetime, timedelta
 from pathlib import Path
-import sys
 
-# Add parent directories to path for imports
-current_dir = Path(__file__).parent
-sys.path.insert(0, str(current_dir.parent))
-
-from database import DatabaseManager
+from ..database import DatabaseManager
+from .duplicate_index import DuplicateIndex
 
 logger = logging.getLogger(__name__)
 
@@ -26,40 +22,36 @@ class HistoryManager:
     Implements requirement 6.2: Duplicate prevention system.
     """
     
-    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+    def __init__(self, db_manager: Optional[DatabaseManager] = None,
+                 index_path: Optional[Path] = None):
         """
         Initialize history manager.
         
         Args:
             db_manager: Database manager instance (creates new if None)
+            index_path: Duplicate index file (defaults to <db>.dupbloom)
         """
         self.db_manager = db_manager or DatabaseManager()
         
-        # In-memory cache for quick duplicate checks
-        self._downloaded_cache: Set[tuple] = set()
-        self._cache_loaded = False
+        # Bloom-filter-backed index over the complete download history
+        self.duplicate_index = DuplicateIndex(self.db_manager, index_path)
         
-        # Load existing downloads into cache
+        # Load persisted index and catch up with new downloads
         self._load_cache()
     
+    @property
+    def _cache_loaded(self) -> bool:
+        return self.duplicate_index.loaded
+    
     def _load_cache(self) -> None:
-        """Load existing downloads into memory cache for fast lookups."""
+        """Load the duplicate index for fast lookups."""
         try:
-            downloads = self.db_manager.get_download_history(limit=10000)  # Load recent downloads
-            
-            self._downloaded_cache = {
-                (download['model_id'], download['file_id'])
-                for download in downloads
-                if download['status'] == 'completed'
-            }
-            
-            self._cache_loaded = True
-            logger.info(f"Loaded {len(self._downloaded_cache)} downloads into cache")
+            self.duplicate_index.load()
+            logger.info(f"Loaded duplicate index ({len(self.duplicate_index)} keys)")
             
         except Exception as e:
-            logger.error(f"Failed to load download cache: {e}")
-            self._downloaded_cache = set()
-            self._cache_loaded = False
+            logger.error(f"Failed to load duplicate index: {e}")
+            self.duplicate_index.clear()
     
     def record_download(self, download_info: Dict[str, Any]) -> bool:
         """
@@ -105,9 +97,9 @@ class HistoryManager:
             success = self.db_manager.record_download(download_data)
             
             if success and download_data['status'] == 'completed':
-                # Update in-memory cache
-                cache_key = (download_data['model_id'], download_data['file_id'])
-                self._downloaded_cache.add(cache_key)
+                # Update duplicate index
+                self.duplicate_index.add(download_data['model_id'], download_data['file_id'],
+                                         download_data['hash_sha256'])
                 
                 logger.info(f"Recorded download: {download_data['file_name']} "
                           f"(Model: {download_data['model_id']}, File: {download_data['file_id']})")
@@ -118,36 +110,24 @@ class HistoryManager:
             logger.error(f"Failed to record download: {e}")
             return False
     
-    def prevent_duplicates(self, model_id: int, file_id: int) -> bool:
+    def prevent_duplicates(self, model_id: int, file_id: Optional[int]) -> bool:
         """
         Check if a download would be a duplicate per requirement 6.2.
         
         Args:
             model_id: Model ID to check
-            file_id: File ID to check
+            file_id: File ID to check (None checks any file of the model)
             
         Returns:
             True if this would be a duplicate (already downloaded)
             False if safe to download
         """
         try:
-            # First check in-memory cache for fast lookup
-            cache_key = (model_id, file_id)
-            if cache_key in self._downloaded_cache:
-                logger.debug(f"Duplicate detected in cache: Model {model_id}, File {file_id}")
-                return True
-            
-            # Fallback to database check if cache not loaded or miss
-            if not self._cache_loaded:
-                is_duplicate = self.db_manager.is_downloaded(model_id, file_id)
-                if is_duplicate:
-                    # Add to cache for future checks
-                    self._downloaded_cache.add(cache_key)
-                    logger.debug(f"Duplicate detected in database: Model {model_id}, File {file_id}")
-                return is_duplicate
-            
-            # Not found in cache and cache is loaded = not a duplicate
-            return False
+            # Bloom filter rules out most new downloads; hits are confirmed in the database
+            is_duplicate = self.duplicate_index.contains(model_id, file_id)
+            if is_duplicate:
+                logger.debug(f"Duplicate detected: Model {model_id}, File {file_id}")
+            return is_duplicate
             
         except Exception as e:
             logger.error(f"Failed to check duplicates for Model {model_id}, File {file_id}: {e}")
@@ -167,6 +147,39 @@ class HistoryManager:
         """
         return self.prevent_duplicates(model_id, file_id)
     
+    def is_hash_downloaded(self, sha256: str) -> bool:
+        """
+        Check if a file with the given SHA256 hash has been downloaded.
+        
+        Args:
+            sha256: SHA256 hash to check
+            
+        Returns:
+            True if already downloaded
+        """
+        try:
+            return self.duplicate_index.contains_hash(sha256)
+        except Exception as e:
+            logger.error(f"Failed to check duplicate hash {sha256}: {e}")
+            return False
+    
+    def filter_already_downloaded(self, ids: Iterable[Hashable]) -> Set[Hashable]:
+        """
+        Batch duplicate check for bulk downloads.
+        
+        Args:
+            ids: Model ids, or (model_id, file_id) tuples
+            
+        Returns:
+            Subset of ids that have already been downloaded
+        """
+        try:
+            return self.duplicate_index.filter_already_downloaded(ids)
+        except Exception as e:
+            logger.error(f"Failed to filter downloaded models: {e}")
+            # On error, assume nothing is downloaded to allow download attempts
+            return set()
+    
     def get_download_history(self, limit: int = 100, model_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get download history with optional filtering.
@@ -235,7 +248,7 @@ class HistoryManager:
                     'total_size_bytes': total_size,
                     'recent_downloads_7d': recent_downloads,
                     'unique_models': unique_models,
-                    'cache_size': len(self._downloaded_cache)
+                    'cache_size': len(self.duplicate_index)
                 }
                 
         except Exception as e:
@@ -245,7 +258,7 @@ class HistoryManager:
                 'total_size_bytes': 0,
                 'recent_downloads_7d': 0,
                 'unique_models': 0,
-                'cache_size': len(self._downloaded_cache)
+                'cache_size': len(self.duplicate_index)
             }
     
     def cleanup_failed_downloads(self, max_age_days: int = 7) -> int:
@@ -279,13 +292,16 @@ class HistoryManager:
             return 0
     
     def refresh_cache(self) -> None:
-        """Refresh the in-memory download cache."""
-        self._load_cache()
+        """Rebuild the duplicate index from the full download history."""
+        try:
+            self.duplicate_index.rebuild()
+        except Exception as e:
+            logger.error(f"Failed to rebuild duplicate index: {e}")
+            self.duplicate_index.clear()
     
     def clear_cache(self) -> None:
-        """Clear the in-memory download cache."""
-        self._downloaded_cache.clear()
-        self._cache_loaded = False
+        """Clear the in-memory duplicate index (checks fall back to the database)."""
+        self.duplicate_index.clear()
 
 
 if __name__ == "__main__":
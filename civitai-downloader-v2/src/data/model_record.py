@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Model Record - Compact in-memory form of CivitAI API models.
+Search pipelines hold thousands of models at once. A record keeps only the
+fields that filtering, classification, download selection and storage read
+in __slots__, and packs every other field (HTML description, image metadata,
+...) into compressed JSON bytes that are decoded only when such a field is
+read. Records are read-only Mappings in API shape, so code written against
+model dicts (``model.get('modelVersions')``) works unchanged.
+
+decode_models_page() builds records straight from an API response body: each
+item keeps its original JSON text as raw bytes (shared with its versions and
+files) instead of being re-encoded, and no item dict outlives its record.
+"""
+
+import json
+import re
+import zlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Packed JSON longer than this is zlib-compressed
+COMPRESS_MIN_BYTES = 256
+
+_MISSING = object()
+
+
+def _pack(data: Dict[str, Any]) -> bytes:
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    if len(raw) > COMPRESS_MIN_BYTES:
+        return zlib.compress(raw, 1)
+    return raw
+
+
+def _unpack(raw: bytes) -> Any:
+    # Plain JSON objects start with '{'; anything else is zlib output
+    if raw[:1] != b'{':
+        raw = zlib.decompress(raw)
+    return json.loads(raw)
+
+
+class CompactRecord(Mapping):
+    """
+    Base of the slotted records.
+
+    Subclasses list their slotted API keys in FIELDS (API key -> slot) and the
+    keys holding lists of nested records in CHILDREN (API key -> record class).
+    
+    Non-slotted fields live in ``_raw``: either the packed remaining fields, or
+    (when built from a response body) the original JSON text of the whole item,
+    shared with the nested records, which find themselves in it by ``_locator``.
+    """
+    __slots__ = ('_raw', '_locator', '_extra')
+    
+    FIELDS: Dict[str, str] = {}
+    CHILDREN: Dict[str, type] = {}
+    
+    def __init__(self, data: Dict[str, Any], raw: Optional[bytes] = None,
+                 locator: Tuple[Tuple[str, int], ...] = ()):
+        """
+        Initialize record.
+        
+        Args:
+            data: API-shaped dict
+            raw: Original JSON text of the item holding data (packed from data if None)
+            locator: (key, index) steps from the item in raw to data
+        """
+        for slot in self.FIELDS.values():
+            setattr(self, slot, _MISSING)
+        rest = {} if raw is None else None
+        for key, value in data.items():
+            slot = self.FIELDS.get(key)
+            if slot is None:
+                if rest is not None:
+                    rest[key] = value
+            else:
+                setattr(self, slot, self._convert(key, value, raw, locator))
+        self._raw = raw if raw is not None else (_pack(rest) if rest else None)
+        self._locator = locator
+        self._extra: Optional[Dict[str, Any]] = None
+    
+    def _convert(self, key: str, value: Any, raw: Optional[bytes] = None,
+                 locator: Tuple[Tuple[str, int], ...] = ()) -> Any:
+        child = self.CHILDREN.get(key)
+        if child is None or not isinstance(value, list):
+            return value
+        if raw is None:
+            return [item if isinstance(item, child) else child(item) for item in value]
+        return [child(item, raw, locator + ((key, index),)) if isinstance(item, dict) else item
+                for index, item in enumerate(value)]
+    
+    def _unpacked(self) -> Dict[str, Any]:
+        if self._raw is None:
+            return {}
+        data = _unpack(self._raw)
+        for key, index in self._locator:
+            data = data[key][index]
+        return data
+
+    def __getitem__(self, key: str) -> Any:
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        slot = self.FIELDS.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        # Non-slotted field: decoded on demand
+        return self._unpacked()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        slot = self.FIELDS.get(key)
+        if slot is not None:
+            setattr(self, slot, self._convert(key, value))
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
+
+    def copy(self) -> 'CompactRecord':
+        """Shallow copy sharing the packed fields."""
+        clone = object.__new__(type(self))
+        for slot in self.FIELDS.values():
+            value = getattr(self, slot)
+            setattr(clone, slot, list(value) if isinstance(value, list) else value)
+        clone._raw = self._raw
+        clone._locator = self._locator
+        clone._extra = dict(self._extra) if self._extra else None
+        return clone
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Full API-shaped dict (decodes the packed fields)."""
+        data = self._unpacked()
+        for key, slot in self.FIELDS.items():
+            value = getattr(self, slot)
+            if value is _MISSING:
+                continue
+            if key in self.CHILDREN and isinstance(value, list):
+                value = [item.to_dict() if isinstance(item, CompactRecord) else item for item in value]
+            data[key] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def to_json(self) -> str:
+        """Serialize as API-shaped JSON."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=str)
+
+    @property
+    def packed_size(self) -> int:
+        """Bytes held by the packed (non-slotted) fields (0 if shared with the parent)."""
+        return len(self._raw) if self._raw is not None and not self._locator else 0
+
+
+class FileRecord(CompactRecord):
+    """Compact model file: what download selection and storage need."""
+    __slots__ = ('id', 'name', 'size_kb', 'type', 'primary', 'download_url', 'hashes', 'metadata')
+
+    FIELDS = {
+        'id': 'id',
+        'name': 'name',
+        'sizeKB': 'size_kb',
+        'type': 'type',
+        'primary': 'primary',
+        'downloadUrl': 'download_url',
+        'hashes': 'hashes',
+        'metadata': 'metadata',
+    }
+
+
+class VersionRecord(CompactRecord):
+    """Compact model version; images and descriptions stay packed."""
+    __slots__ = ('id', 'name', 'base_model', 'download_url', 'created_at', 'files')
+
+    FIELDS = {
+        'id': 'id',
+        'name': 'name',
+        'baseModel': 'base_model',
+        'downloadUrl': 'download_url',
+        'createdAt': 'created_at',
+        'files': 'files',
+    }
+    CHILDREN = {'files': FileRecord}
+
+
+class ModelRecord(CompactRecord):
+    """Compact model; the HTML description and creator details stay packed."""
+    __slots__ = ('id', 'name', 'type', 'nsfw', 'tags', 'created_at', 'stats', 'versions')
+
+    FIELDS = {
+        'id': 'id',
+        'name': 'name',
+        'type': 'type',
+        'nsfw': 'nsfw',
+        'tags': 'tags',
+        'createdAt': 'created_at',
+        'stats': 'stats',
+        'modelVersions': 'versions',
+    }
+    CHILDREN = {'modelVersions': VersionRecord}
+
+
+def compact_models(models: Iterable[Dict[str, Any]]) -> List[ModelRecord]:
+    """
+    Convert API model dicts to ModelRecords (records are kept as they are).
+
+    Args:
+        models: Models in CivitAI API format
+
+    Returns:
+        List of ModelRecords
+    """
+    return [model if isinstance(model, ModelRecord) else ModelRecord(model) for model in models]
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+def _skip(text: str, idx: int) -> int:
+    return _WHITESPACE.match(text, idx).end()
+
+
+def _decode_items(text: str, idx: int) -> Tuple[List[Any], int]:
+    """Decode the items array starting at idx into records over their own JSON text."""
+    items: List[Any] = []
+    idx = _skip(text, idx + 1)
+    if text[idx] == ']':
+        return items, idx + 1
+    while True:
+        item, end = _decoder.raw_decode(text, idx)
+        if isinstance(item, dict):
+            item = ModelRecord(item, raw=text[idx:end].encode('utf-8'))
+        items.append(item)
+        idx = _skip(text, end)
+        if text[idx] == ',':
+            idx = _skip(text, idx + 1)
+        elif text[idx] == ']':
+            return items, idx + 1
+        else:
+            raise ValueError(f"Unexpected character at {idx}")
+
+
+def decode_models_page(body: Union[bytes, str]) -> Dict[str, Any]:
+    """
+    Decode a /models response body with its items as ModelRecords.
+    
+    Each item is decoded once, its slotted fields are kept and its JSON text is
+    retained as the record's raw bytes, so no item dict outlives decoding and
+    nothing is re-encoded.
+    
+    Args:
+        body: Response body
+    
+    Returns:
+        Response dict whose 'items' are ModelRecords
+    """
+    text = body.decode('utf-8') if isinstance(body, bytes) else body
+    try:
+        idx = _skip(text, 0)
+        if text[idx] != '{':
+            raise ValueError("Response is not an object")
+        page: Dict[str, Any] = {}
+        idx = _skip(text, idx + 1)
+        while text[idx] != '}':
+            key, idx = json.decoder.scanstring(text, idx + 1)
+            idx = _skip(text, idx)
+            if text[idx] != ':':
+                raise ValueError(f"Expected ':' at {idx}")
+            idx = _skip(text, idx + 1)
+            if key == 'items' and text[idx] == '[':
+                page[key], idx = _decode_items(text, idx)
+            else:
+                page[key], idx = _decoder.raw_decode(text, idx)
+            idx = _skip(text, idx)
+            if text[idx] == ',':
+                idx = _skip(text, idx + 1)
+        return page
+    except (ValueError, IndexError):
+        # Unexpected layout: decode normally (raises for invalid JSON)
+        return json.loads(text)
+
+
+def json_default(obj: Any) -> Any:
+    """``default`` hook for json.dumps that serializes records as API dicts."""
+    if isinstance(obj, CompactRecord):
+        return obj.to_dict()
+    return str(obj)
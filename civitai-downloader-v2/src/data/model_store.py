@@ -0,0 +1,890 @@
+#!/usr/bin/env python3
+"""
+Model Store - Canonical storage for CivitAI model metadata.
+Every subsystem (CLI, search cache, DB export) writes models through this store
+and reads them back through ModelQuery, so each model is written once, in one
+shape, and every reader uses the same indexes.
+"""
+
+import ast
+import json
+import sqlite3
+import os
+import threading
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .schema_manager import schema_manager
+from .model_record import CompactRecord
+from .catalog_snapshot import CatalogSnapshot, build_catalog_snapshot, default_snapshot_path
+from ..core.adaptability.migration import SchemaMigration, SchemaMigrator
+from ..core.category.category_classifier import CategoryClassifier
+from ..core.performance.metrics import get_metrics_registry, DB_WRITE_SECONDS
+from ..core.performance.profiler import get_profiler
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MODEL_DB_PATH = Path("data/civitai.db")
+
+
+@dataclass
+class ModelQuery:
+    """
+    Filter definition for reading models from the canonical store.
+
+    All filters are optional and combined with AND. ``tags`` uses OR logic and
+    case-insensitive matching, the same semantics as LocalVersionFilter categories.
+    ``segment`` restricts the result to the members of a cached search segment.
+    """
+    model_ids: Optional[List[int]] = None
+    model_types: Optional[List[str]] = None
+    base_model: Optional[str] = None
+    tags: Optional[List[str]] = None
+    primary_category: Optional[str] = None
+    nsfw: Optional[bool] = None
+    segment: Optional[str] = None
+    limit: Optional[int] = None
+    order_by: str = 'id'
+
+    ORDER_CLAUSES = {
+        'id': 'm.id',
+        'newest': 'm.created_at DESC, m.id DESC',
+        'downloads': '(SELECT download_count FROM model_stats WHERE model_id = m.id) DESC, m.id'
+    }
+
+    def where_clause(self, alias: str = 'm') -> Tuple[str, List[Any]]:
+        """
+        Build the WHERE clause for these filters.
+
+        Args:
+            alias: Alias of the models table in the enclosing query
+
+        Returns:
+            Tuple of (clause without the WHERE keyword, parameters); clause is
+            empty when no filters are set
+        """
+        conditions = []
+        params: List[Any] = []
+
+        if self.model_ids is not None:
+            placeholders = ','.join('?' for _ in self.model_ids) or 'NULL'
+            conditions.append(f"{alias}.id IN ({placeholders})")
+            params.extend(self.model_ids)
+
+        if self.model_types:
+            placeholders = ','.join('?' for _ in self.model_types)
+            conditions.append(f"{alias}.type IN ({placeholders})")
+            params.extend(self.model_types)
+
+        if self.base_model:
+            conditions.append(f"""EXISTS (
+                SELECT 1 FROM model_versions mv
+                WHERE mv.model_id = {alias}.id AND mv.base_model = ?
+            )""")
+            params.append(self.base_model)
+
+        if self.tags:
+            placeholders = ','.join('?' for _ in self.tags)
+            conditions.append(f"""EXISTS (
+                SELECT 1 FROM model_tags mt JOIN tags t ON t.id = mt.tag_id
+                WHERE mt.model_id = {alias}.id AND t.name COLLATE NOCASE IN ({placeholders})
+            )""")
+            params.extend(self.tags)
+
+        if self.primary_category:
+            conditions.append(f"""EXISTS (
+                SELECT 1 FROM model_categories mc JOIN categories c ON c.id = mc.category_id
+                WHERE mc.model_id = {alias}.id AND mc.is_primary = TRUE AND c.name = ?
+            )""")
+            params.append(self.primary_category)
+
+        if self.nsfw is not None:
+            conditions.append(f"{alias}.nsfw = ?")
+            params.append(1 if self.nsfw else 0)
+
+        if self.segment:
+            conditions.append(f"""EXISTS (
+                SELECT 1 FROM search_segment_models ssm
+                WHERE ssm.segment_key = ? AND ssm.model_id = {alias}.id
+            )""")
+            params.append(self.segment)
+
+        return " AND ".join(conditions), params
+
+    def to_sql(self, columns: str = 'm.id, m.raw_data') -> Tuple[str, List[Any]]:
+        """Build a complete SELECT over the models table."""
+        if self.order_by not in self.ORDER_CLAUSES:
+            raise ValueError(f"Unknown order: {self.order_by}")
+
+        where, params = self.where_clause('m')
+        sql = f"SELECT {columns} FROM models m"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {self.ORDER_CLAUSES[self.order_by]}"
+        if self.limit:
+            sql += " LIMIT ?"
+            params.append(self.limit)
+        return sql, params
+
+
+def decode_raw_data(raw_data: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Decode a stored raw_data column.
+
+    Older DatabaseManager rows stored ``str(dict)`` instead of JSON, so fall
+    back to a literal parse for those.
+    """
+    if not raw_data:
+        return None
+    try:
+        return json.loads(raw_data)
+    except json.JSONDecodeError:
+        try:
+            value = ast.literal_eval(raw_data)
+            return value if isinstance(value, dict) else None
+        except (ValueError, SyntaxError):
+            return None
+
+
+class _ModelWriter:
+    """Writes API-shaped model dicts into the normalized tables."""
+
+    def __init__(self, description_cleaner: Optional[Callable[[str], str]] = None):
+        self.description_cleaner = description_cleaner
+        self.classifier = CategoryClassifier()
+        self._category_ids: Dict[str, int] = {}
+        self._tag_ids: Dict[str, int] = {}
+
+    def write(self, cursor: sqlite3.Cursor, model: Dict[str, Any]) -> None:
+        model_id = model['id']
+        description = model.get('description') or ''
+        cleaned = self.description_cleaner(description) if self.description_cleaner else None
+        creator = model.get('creator') or {}
+
+        cursor.execute("""
+            INSERT INTO models (
+                id, name, type, description, cleaned_description,
+                creator_id, creator_username, nsfw, allowCommercialUse,
+                created_at, updated_at, raw_data
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name,
+                type = excluded.type,
+                description = excluded.description,
+                cleaned_description = COALESCE(excluded.cleaned_description, models.cleaned_description),
+                creator_id = excluded.creator_id,
+                creator_username = excluded.creator_username,
+                nsfw = excluded.nsfw,
+                allowCommercialUse = excluded.allowCommercialUse,
+                created_at = excluded.created_at,
+                updated_at = excluded.updated_at,
+                raw_data = excluded.raw_data
+        """, (
+            model_id,
+            model.get('name') or '',
+            model.get('type') or '',
+            description,
+            cleaned,
+            creator.get('id'),
+            creator.get('username', ''),
+            bool(model.get('nsfw', False)),
+            json.dumps(model.get('allowCommercialUse', [])),
+            model.get('createdAt', ''),
+            model.get('updatedAt', ''),
+            json.dumps(model, ensure_ascii=False, default=str)
+        ))
+
+        self._write_categories(cursor, model)
+        self._write_tags(cursor, model_id, model.get('tags') or [])
+        self._write_versions(cursor, model_id, model.get('modelVersions') or [])
+        self._write_stats(cursor, model_id, model.get('stats') or {})
+
+    def _category_id(self, cursor: sqlite3.Cursor, name: str) -> int:
+        if name not in self._category_ids:
+            cursor.execute("SELECT id FROM categories WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            if row:
+                self._category_ids[name] = row[0]
+            else:
+                cursor.execute("""
+                    INSERT INTO categories (name, display_name, priority)
+                    VALUES (?, ?, ?)
+                """, (name, name.title(), 999))
+                self._category_ids[name] = cursor.lastrowid
+        return self._category_ids[name]
+
+    def _write_categories(self, cursor: sqlite3.Cursor, model: Dict[str, Any]) -> None:
+        processing = model.get('_processing') or {}
+        if processing.get('primary_category'):
+            primary = processing['primary_category']
+            all_categories = processing.get('all_categories') or [primary]
+        else:
+            primary, all_categories = self.classifier.classify_model(model)
+            all_categories = all_categories or [primary]
+
+        cursor.execute("DELETE FROM model_categories WHERE model_id = ?", (model['id'],))
+        cursor.executemany("""
+            INSERT OR IGNORE INTO model_categories (model_id, category_id, is_primary)
+            VALUES (?, ?, ?)
+        """, [
+            (model['id'], self._category_id(cursor, name), name == primary)
+            for name in all_categories
+        ])
+
+    def _tag_id(self, cursor: sqlite3.Cursor, name: str) -> int:
+        if name not in self._tag_ids:
+            cursor.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (name,))
+            cursor.execute("SELECT id FROM tags WHERE name = ?", (name,))
+            self._tag_ids[name] = cursor.fetchone()[0]
+        return self._tag_ids[name]
+
+    def _write_tags(self, cursor: sqlite3.Cursor, model_id: int, tags: List[Any]) -> None:
+        names = []
+        for tag in tags:
+            name = tag.get('name', '') if isinstance(tag, dict) else str(tag)
+            if name:
+                names.append(name)
+
+        cursor.execute("DELETE FROM model_tags WHERE model_id = ?", (model_id,))
+        cursor.executemany(
+            "INSERT OR IGNORE INTO model_tags (model_id, tag_id) VALUES (?, ?)",
+            [(model_id, self._tag_id(cursor, name)) for name in names]
+        )
+
+    def _write_versions(self, cursor: sqlite3.Cursor, model_id: int,
+                        versions: List[Dict[str, Any]]) -> None:
+        version_rows = []
+        file_rows = []
+        for version in versions:
+            version_id = version.get('id')
+            if not version_id:
+                continue
+            files = version.get('files') or []
+            version_rows.append((
+                version_id,
+                model_id,
+                version.get('name', ''),
+                version.get('baseModel', ''),
+                version.get('downloadUrl', ''),
+                files[0].get('sizeKB') if files else None,
+                version.get('createdAt', ''),
+                version.get('updatedAt', ''),
+                json.dumps(version.get('stats', {})),
+                json.dumps(version, ensure_ascii=False, default=str)
+            ))
+            for file_info in files:
+                if not file_info.get('id'):
+                    continue
+                hashes = file_info.get('hashes') or {}
+                file_rows.append((
+                    file_info['id'],
+                    version_id,
+                    model_id,
+                    file_info.get('name'),
+                    file_info.get('sizeKB'),
+                    file_info.get('type'),
+                    bool(file_info.get('primary', False)),
+                    (hashes.get('SHA256') or '').upper() or None,
+                    (hashes.get('AutoV2') or '').upper() or None,
+                    file_info.get('downloadUrl')
+                ))
+
+        cursor.executemany("""
+            INSERT INTO model_versions (
+                id, model_id, name, base_model, download_url,
+                file_size, created_at, updated_at, stats, raw_data
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                model_id = excluded.model_id,
+                name = excluded.name,
+                base_model = excluded.base_model,
+                download_url = excluded.download_url,
+                file_size = excluded.file_size,
+                created_at = excluded.created_at,
+                updated_at = excluded.updated_at,
+                stats = excluded.stats,
+                raw_data = excluded.raw_data
+        """, version_rows)
+
+        cursor.executemany("""
+            INSERT OR REPLACE INTO model_files (
+                id, version_id, model_id, name, size_kb, file_type,
+                is_primary, sha256, autov2, download_url
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, file_rows)
+
+    def _write_stats(self, cursor: sqlite3.Cursor, model_id: int, stats: Dict[str, Any]) -> None:
+        cursor.execute("""
+            INSERT OR REPLACE INTO model_stats (
+                model_id, download_count, likes_count, rating,
+                view_count, comment_count, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (
+            model_id,
+            stats.get('downloadCount', 0),
+            stats.get('thumbsUpCount', 0),
+            stats.get('rating', 0.0),
+            stats.get('viewCount', 0),
+            stats.get('commentCount', 0)
+        ))
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> Set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _create_baseline_schema(conn: sqlite3.Connection) -> None:
+    """v1: normalized "main" schema, moving an OptimizedDatabase table aside first."""
+    model_columns = _columns(conn, 'models')
+    if 'metadata' in model_columns and 'raw_data' not in model_columns:
+        logger.info("Found OptimizedDatabase models table, renaming for import")
+        # Keep foreign keys in other tables pointing at "models", not the renamed table
+        conn.execute("PRAGMA legacy_alter_table = ON")
+        conn.execute("ALTER TABLE models RENAME TO legacy_optimized_models")
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+
+    schema = schema_manager.get_schema("main")
+    for create_sql in schema.tables.values():
+        conn.execute(create_sql)
+    if schema.setup_func:
+        schema.setup_func(conn)
+
+
+def _import_legacy_rows(conn: sqlite3.Connection) -> None:
+    """v3: fold OptimizedDatabase rows and repr-encoded raw_data into the canonical shape."""
+    writer = _ModelWriter()
+    cursor = conn.cursor()
+
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'legacy_optimized_models' in tables:
+        rows = conn.execute(
+            "SELECT id, name, description, metadata, stats FROM legacy_optimized_models"
+        ).fetchall()
+        for model_id, name, description, metadata, stats in rows:
+            model = {'id': model_id, 'name': name, 'description': description}
+            model.update(decode_raw_data(metadata) or {})
+            model['stats'] = decode_raw_data(stats) or {}
+            writer.write(cursor, model)
+        conn.execute("DROP TABLE legacy_optimized_models")
+        logger.info(f"Imported {len(rows)} models from OptimizedDatabase table")
+
+    for model_id, raw_data in conn.execute("SELECT id, raw_data FROM models").fetchall():
+        if not raw_data:
+            continue
+        try:
+            json.loads(raw_data)
+        except json.JSONDecodeError:
+            model = decode_raw_data(raw_data)
+            if model:
+                model.setdefault('id', model_id)
+                writer.write(cursor, model)
+
+
+MODEL_STORE_MIGRATIONS = [
+    SchemaMigration(
+        version=1,
+        description="Baseline normalized model schema",
+        apply=_create_baseline_schema
+    ),
+    SchemaMigration(
+        version=2,
+        description="Model files, search cache and shared query indexes",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS model_files (
+                id INTEGER PRIMARY KEY,
+                version_id INTEGER NOT NULL,
+                model_id INTEGER NOT NULL,
+                name TEXT,
+                size_kb REAL,
+                file_type TEXT,
+                is_primary BOOLEAN DEFAULT FALSE,
+                sha256 TEXT,
+                autov2 TEXT,
+                download_url TEXT,
+                FOREIGN KEY (version_id) REFERENCES model_versions(id) ON DELETE CASCADE,
+                FOREIGN KEY (model_id) REFERENCES models(id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                cache_key TEXT PRIMARY KEY,
+                timestamp REAL,
+                latest_model_id TEXT,
+                model_count INTEGER
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_model_files_version_id ON model_files(version_id)",
+            "CREATE INDEX IF NOT EXISTS idx_model_files_model_id ON model_files(model_id)",
+            "CREATE INDEX IF NOT EXISTS idx_model_files_sha256 ON model_files(sha256)",
+            "CREATE INDEX IF NOT EXISTS idx_model_files_autov2 ON model_files(autov2)",
+            "CREATE INDEX IF NOT EXISTS idx_models_type ON models(type)",
+            "CREATE INDEX IF NOT EXISTS idx_models_nsfw_type ON models(nsfw, type)",
+            "CREATE INDEX IF NOT EXISTS idx_models_created_at ON models(created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_models_name_nocase ON models(name COLLATE NOCASE)",
+            "CREATE INDEX IF NOT EXISTS idx_tags_name_nocase ON tags(name COLLATE NOCASE)",
+            "CREATE INDEX IF NOT EXISTS idx_model_versions_base_model_model ON model_versions(base_model, model_id)",
+            "CREATE INDEX IF NOT EXISTS idx_downloads_hash_sha256 ON downloads(hash_sha256)"
+        ]
+    ),
+    SchemaMigration(
+        version=3,
+        description="Import legacy OptimizedDatabase and DatabaseManager rows",
+        apply=_import_legacy_rows
+    ),
+    SchemaMigration(
+        version=4,
+        description="Local file inventory",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS file_inventory (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                device INTEGER,
+                inode INTEGER,
+                sha256 TEXT,
+                autov2 TEXT,
+                model_id INTEGER,
+                version_id INTEGER,
+                file_id INTEGER,
+                hashed_at REAL,
+                seen_at REAL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_file_inventory_sha256 ON file_inventory(sha256)",
+            "CREATE INDEX IF NOT EXISTS idx_file_inventory_autov2 ON file_inventory(autov2)",
+            "CREATE INDEX IF NOT EXISTS idx_file_inventory_model_id ON file_inventory(model_id)",
+            "CREATE INDEX IF NOT EXISTS idx_file_inventory_inode ON file_inventory(device, inode)"
+        ]
+    ),
+    SchemaMigration(
+        version=5,
+        description="Search result segments",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS search_segments (
+                segment_key TEXT PRIMARY KEY,
+                dimensions TEXT NOT NULL,
+                complete BOOLEAN NOT NULL DEFAULT FALSE,
+                model_count INTEGER NOT NULL DEFAULT 0,
+                latest_model_id INTEGER,
+                fetched_at REAL NOT NULL,
+                checked_at REAL NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS search_segment_models (
+                segment_key TEXT NOT NULL,
+                model_id INTEGER NOT NULL,
+                PRIMARY KEY (segment_key, model_id)
+            ) WITHOUT ROWID
+            """
+        ]
+    )
+]
+
+
+class ModelStore:
+    """
+    Canonical model store backed by the normalized "main" schema.
+
+    Schema changes are applied through SchemaMigrator the first time a database
+    file is opened in this process. After every write batch the store regenerates
+    a CatalogSnapshot, which answers id/count lookups without opening SQLite.
+    """
+
+    SCHEMA_NAME = "model_store"
+
+    _migrated_paths: Set[str] = set()
+    _migration_lock = threading.Lock()
+
+    def __init__(self, db_path: Optional[Path] = None,
+                 description_cleaner: Optional[Callable[[str], str]] = None,
+                 snapshot_path: Optional[Path] = None):
+        """
+        Initialize model store.
+
+        Args:
+            db_path: Path to SQLite database file
+            description_cleaner: Optional function producing cleaned_description
+            snapshot_path: Catalog snapshot file (defaults to <db>.snapshot)
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_MODEL_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.description_cleaner = description_cleaner
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else default_snapshot_path(self.db_path)
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._snapshot_stamp: Optional[Tuple[int, int]] = None
+        self._snapshot_lock = threading.Lock()
+        self._ensure_migrated()
+
+    def _ensure_migrated(self) -> None:
+        key = str(self.db_path.resolve())
+        with self._migration_lock:
+            if key in self._migrated_paths:
+                return
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+            try:
+                conn.execute("PRAGMA journal_mode = WAL")
+                migrator = SchemaMigrator(self.SCHEMA_NAME, MODEL_STORE_MIGRATIONS)
+                applied = migrator.pending_migrations(conn)
+                migrator.migrate(conn)
+                if applied or not self.snapshot_path.exists():
+                    self._write_snapshot(conn)
+            finally:
+                conn.close()
+            self._migrated_paths.add(key)
+
+    def _write_snapshot(self, conn: sqlite3.Connection) -> None:
+        """Regenerate the catalog snapshot; a failed build removes the stale file."""
+        with self._snapshot_lock:
+            self._close_snapshot()
+            try:
+                build_catalog_snapshot(conn, self.snapshot_path)
+            except Exception as e:
+                logger.warning(f"Failed to write catalog snapshot: {e}")
+                try:
+                    os.remove(self.snapshot_path)
+                except OSError:
+                    pass
+
+    def _invalidate_snapshot(self) -> None:
+        """Drop the snapshot file so readers fall back to SQLite until the next rebuild."""
+        with self._snapshot_lock:
+            self._close_snapshot()
+            try:
+                os.remove(self.snapshot_path)
+            except OSError:
+                pass
+
+    def _close_snapshot(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+            self._snapshot_stamp = None
+
+    def refresh_snapshot(self) -> None:
+        """Regenerate the catalog snapshot from the database."""
+        with self.get_connection() as conn:
+            self._write_snapshot(conn)
+
+    def flush_snapshot(self) -> bool:
+        """
+        Rebuild the catalog snapshot if single-model writes invalidated it.
+
+        Call once after a loop of store_model() calls.
+
+        Returns:
+            True if the snapshot was rebuilt
+        """
+        if self.snapshot_path.exists():
+            return False
+        self.refresh_snapshot()
+        return True
+
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        """
+        Current catalog snapshot, remapped when another writer replaced the file.
+
+        Returns:
+            Snapshot, or None if no valid snapshot file exists
+        """
+        with self._snapshot_lock:
+            try:
+                stat = os.stat(self.snapshot_path)
+            except OSError:
+                self._close_snapshot()
+                return None
+
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if self._snapshot is None or stamp != self._snapshot_stamp:
+                self._close_snapshot()
+                self._snapshot = CatalogSnapshot.open(self.snapshot_path)
+                self._snapshot_stamp = stamp if self._snapshot else None
+            return self._snapshot
+
+    def _snapshot_for(self, query: ModelQuery) -> Optional[CatalogSnapshot]:
+        snapshot = self.snapshot()
+        if snapshot is not None and snapshot.supports(query):
+            return snapshot
+        return None
+
+    @contextmanager
+    def get_connection(self):
+        """
+        Get SQLite database connection with proper resource management.
+
+        Yields:
+            sqlite3.Connection: Database connection
+        """
+        conn = None
+        try:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.row_factory = sqlite3.Row
+            yield conn
+        except Exception:
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if conn:
+                conn.close()
+
+    def store_model(self, model: Dict[str, Any]) -> bool:
+        """
+        Store (insert or update) a single model.
+
+        The catalog snapshot is invalidated rather than rebuilt; call
+        flush_snapshot() after the last write of a loop.
+
+        Args:
+            model: Model data in CivitAI API format
+
+        Returns:
+            True if stored successfully
+        """
+        try:
+            saved, _ = self.store_models([model], refresh_snapshot=False)
+            return saved == 1
+        except Exception as e:
+            logger.error(f"Failed to store model {model.get('id')}: {e}")
+            return False
+
+    def store_models(self, models: Iterable[Dict[str, Any]],
+                     skip_existing: bool = False,
+                     refresh_snapshot: bool = True) -> Tuple[int, int]:
+        """
+        Store models in a single transaction.
+
+        Args:
+            models: Models in CivitAI API format
+            skip_existing: Leave models that are already stored untouched
+            refresh_snapshot: Rebuild the catalog snapshot after the batch
+                (otherwise it is invalidated until flush_snapshot())
+
+        Returns:
+            Tuple of (saved_count, skipped_count)
+        """
+        writer = _ModelWriter(self.description_cleaner)
+        saved = skipped = 0
+        
+        with get_profiler().span('sqlite_write'), \
+                get_metrics_registry().timer(DB_WRITE_SECONDS, {'table': 'models'}), self.get_connection() as conn:
+            cursor = conn.cursor()
+            for model in models:
+                if isinstance(model, CompactRecord):
+                    # Decode packed fields one model at a time
+                    model = model.to_dict()
+                model_id = model.get('id') if isinstance(model, dict) else None
+                if not model_id:
+                    logger.warning("Model missing ID, skipping")
+                    skipped += 1
+                    continue
+
+                if skip_existing:
+                    cursor.execute("SELECT 1 FROM models WHERE id = ?", (model_id,))
+                    if cursor.fetchone():
+                        skipped += 1
+                        continue
+
+                try:
+                    cursor.execute("SAVEPOINT store_model")
+                    writer.write(cursor, model)
+                    cursor.execute("RELEASE SAVEPOINT store_model")
+                    saved += 1
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT store_model")
+                    cursor.execute("RELEASE SAVEPOINT store_model")
+                    logger.error(f"Error saving model {model_id}: {e}")
+                    skipped += 1
+
+            conn.commit()
+            if saved and refresh_snapshot:
+                self._write_snapshot(conn)
+            elif saved:
+                self._invalidate_snapshot()
+
+        return saved, skipped
+
+    def find(self, query: Optional[ModelQuery] = None) -> List[Dict[str, Any]]:
+        """
+        Read models matching a query.
+
+        Args:
+            query: Filters to apply (all models if None)
+
+        Returns:
+            Models in CivitAI API format
+        """
+        sql, params = (query or ModelQuery()).to_sql()
+        with self.get_connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        models = []
+        for row in rows:
+            model = decode_raw_data(row['raw_data'])
+            if model is not None:
+                models.append(model)
+        return models
+
+    def find_ids(self, query: Optional[ModelQuery] = None) -> List[int]:
+        """Read only the ids of models matching a query."""
+        query = query or ModelQuery()
+        snapshot = self._snapshot_for(query)
+        if snapshot is not None:
+            return snapshot.find_ids(query)
+
+        sql, params = query.to_sql(columns='m.id')
+        with self.get_connection() as conn:
+            return [row[0] for row in conn.execute(sql, params)]
+
+    def get_model(self, model_id: int) -> Optional[Dict[str, Any]]:
+        """Get a single model in CivitAI API format."""
+        models = self.find(ModelQuery(model_ids=[model_id], limit=1))
+        return models[0] if models else None
+
+    def get_models_by_ids(self, model_ids: Iterable[int], chunk_size: int = 500) -> Dict[int, Dict[str, Any]]:
+        """
+        Get stored models by id.
+
+        Args:
+            model_ids: Model IDs
+            chunk_size: IDs per query (stays under the SQLite variable limit)
+
+        Returns:
+            Models in CivitAI API format keyed by id; unknown ids are absent
+        """
+        model_ids = list(model_ids)
+        found: Dict[int, Dict[str, Any]] = {}
+        for start in range(0, len(model_ids), chunk_size):
+            for model in self.find(ModelQuery(model_ids=model_ids[start:start + chunk_size])):
+                found[model['id']] = model
+        return found
+
+    def model_exists(self, model_id: int) -> bool:
+        """Check if a model is stored."""
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            return model_id in snapshot
+
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT 1 FROM models WHERE id = ?", (model_id,)).fetchone()
+            return row is not None
+
+    def count_models(self, query: Optional[ModelQuery] = None) -> int:
+        """Count models matching a query."""
+        query = query or ModelQuery()
+        snapshot = self._snapshot_for(query)
+        if snapshot is not None:
+            return snapshot.count(query)
+
+        where, params = query.where_clause('m')
+        sql = "SELECT COUNT(*) FROM models m" + (f" WHERE {where}" if where else "")
+        with self.get_connection() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def get_cache_info(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Get search cache metadata for a cache key."""
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT timestamp, latest_model_id, model_count
+                FROM search_cache WHERE cache_key = ?
+            """, (cache_key,)).fetchone()
+
+        if row:
+            return {
+                'timestamp': row['timestamp'],
+                'latest_model_id': row['latest_model_id'],
+                'model_count': row['model_count']
+            }
+        return None
+
+    def update_cache_info(self, cache_key: str, latest_model_id: str,
+                          model_count: int, timestamp: float) -> None:
+        """Record search cache metadata for a cache key."""
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO search_cache
+                (cache_key, timestamp, latest_model_id, model_count)
+                VALUES (?, ?, ?, ?)
+            """, (cache_key, timestamp, latest_model_id, model_count))
+            conn.commit()
+
+    def get_search_segments(self) -> List[Dict[str, Any]]:
+        """
+        Get all cached search segments.
+
+        Returns:
+            Segment metadata dicts with decoded dimensions
+        """
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT segment_key, dimensions, complete, model_count, latest_model_id,
+                       fetched_at, checked_at
+                FROM search_segments
+            """).fetchall()
+
+        segments = []
+        for row in rows:
+            segment = dict(row)
+            segment['dimensions'] = json.loads(row['dimensions'])
+            segment['complete'] = bool(row['complete'])
+            segments.append(segment)
+        return segments
+
+    def save_search_segment(self, segment_key: str, dimensions: Dict[str, Any],
+                            model_ids: List[int], complete: bool, timestamp: float,
+                            merge: bool = False) -> int:
+        """
+        Record the models returned by a search crawl.
+
+        Args:
+            segment_key: Segment key (digest of the dimensions)
+            dimensions: Normalized search dimensions of the crawl
+            model_ids: Model ids of the crawl, newest first
+            complete: Whether the crawl reached the end of the result set
+            timestamp: Crawl time
+            merge: Add to the existing members instead of replacing them
+
+        Returns:
+            Number of models in the segment
+        """
+        with self.get_connection() as conn:
+            if not merge:
+                conn.execute("DELETE FROM search_segment_models WHERE segment_key = ?", (segment_key,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO search_segment_models (segment_key, model_id) VALUES (?, ?)",
+                [(segment_key, model_id) for model_id in model_ids]
+            )
+            model_count = conn.execute(
+                "SELECT COUNT(*) FROM search_segment_models WHERE segment_key = ?", (segment_key,)
+            ).fetchone()[0]
+            conn.execute("""
+                INSERT INTO search_segments
+                (segment_key, dimensions, complete, model_count, latest_model_id, fetched_at, checked_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(segment_key) DO UPDATE SET
+                    dimensions = excluded.dimensions,
+                    complete = excluded.complete,
+                    model_count = excluded.model_count,
+                    latest_model_id = COALESCE(excluded.latest_model_id, latest_model_id),
+                    fetched_at = excluded.fetched_at,
+                    checked_at = excluded.checked_at
+            """, (segment_key, json.dumps(dimensions, sort_keys=True), bool(complete), model_count,
+                  model_ids[0] if model_ids else None, timestamp, timestamp))
+            conn.commit()
+        return model_count
+
+    def touch_search_segment(self, segment_key: str, checked_at: float) -> None:
+        """Record that a segment was verified to be up to date."""
+        with self.get_connection() as conn:
+            conn.execute("UPDATE search_segments SET checked_at = ? WHERE segment_key = ?",
+                         (checked_at, segment_key))
+            conn.commit()
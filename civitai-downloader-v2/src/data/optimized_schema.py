@@ -3,6 +3,9 @@
 Optimized Database Schema for CivitAI Downloader.
 Implements high-performance SQLite schema with virtual columns, compound indexes,
 and JSON search optimization for handling 10,000+ models efficiently.
+
+Application code stores models through data.model_store.ModelStore; existing
+databases in this JSON-blob layout are imported by its schema migrations.
 """
 
 import sqlite3
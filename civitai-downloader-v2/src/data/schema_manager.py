@@ -50,7 +50,13 @@ class DatabaseSchemaManager:
         """Register a new database schema."""
         self._schemas[schema.name] = schema
         logger.debug(f"Registered database schema: {schema.name}")
-    
+
+    def get_schema(self, schema_name: str) -> SchemaDefinition:
+        """Get a registered schema definition by name."""
+        if schema_name not in self._schemas:
+            raise ValueError(f"Unknown schema: {schema_name}")
+        return self._schemas[schema_name]
+
     def initialize_database(self, db_path: Path, schema_name: str, 
                           additional_config: Optional[Dict] = None) -> None:
         """
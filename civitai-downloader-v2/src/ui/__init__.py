@@ -8,6 +8,7 @@ from .progress import ProgressTracker, ProgressDisplay, ProgressLevel
 from .interactive import InteractiveInterface, UserPrompt, MenuOption
 from .dashboard import Dashboard, DashboardWidget, MetricCard
 from .export import ExportInterface, ExportFormat, ExportOptions
+from .renderer import TerminalRenderer
 
 __all__ = [
     'Dashboard',
@@ -21,5 +22,6 @@ __all__ = [
     'ProgressDisplay', 
     'ProgressLevel',
     'ProgressTracker',
+    'TerminalRenderer',
     'UserPrompt'
 ]
\ No newline at end of file
@@ -13,6 +13,19 @@ from enum import Enum
 import json
 import sys
 from datetime import datetime, timedelta
+from pathlib import Path
+
+from .renderer import TerminalRenderer
+
+try:
+    from ..core.performance.metrics import (
+        MetricsRegistry, get_metrics_registry, DOWNLOAD_BYTES_TOTAL, DOWNLOAD_SPEED_BYTES
+    )
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core.performance.metrics import (
+        MetricsRegistry, get_metrics_registry, DOWNLOAD_BYTES_TOTAL, DOWNLOAD_SPEED_BYTES
+    )
 
 logger = logging.getLogger(__name__)
 
@@ -161,14 +174,17 @@ class Dashboard:
     Implements requirement 20.1: Comprehensive system monitoring dashboard.
     """
     
-    def __init__(self, title: str = "CivitAI Downloader Dashboard"):
+    def __init__(self, title: str = "CivitAI Downloader Dashboard",
+                 registry: Optional[MetricsRegistry] = None):
         """
         Initialize dashboard.
         
         Args:
             title: Dashboard title
+            registry: Metrics registry of the hot paths (process-wide registry if None)
         """
         self.title = title
+        self.registry = registry or get_metrics_registry()
         self.widgets: Dict[str, DashboardWidget] = {}
         self.metrics: Dict[str, MetricCard] = {}
         self.alerts: List[Dict[str, Any]] = []
@@ -183,6 +199,10 @@ class Dashboard:
         self.grid_cols = 80
         self.refresh_interval = 1.0  # seconds
         
+        # Full-screen renderer repainting only changed lines, at most max_fps
+        self.renderer = TerminalRenderer(max_fps=4.0, full_screen=True)
+        self._frame: List[str] = []
+        
         # Color scheme
         self.colors = {
             'border': '\033[94m',      # Blue
@@ -289,6 +309,39 @@ class Dashboard:
         )
         
         self.add_widget(activity_widget)
+        
+        # Hot path latency/throughput widget (filled from the metrics registry)
+        hot_path_widget = DashboardWidget(
+            widget_id="hot_paths",
+            title="Hot Paths",
+            widget_type="table",
+            position=(20, 0),
+            size=(8, 80)
+        )
+        
+        self.add_widget(hot_path_widget)
+    
+    def update_from_registry(self) -> None:
+        """Update download cards and the hot path table from the metrics registry."""
+        snapshot = self.registry.snapshot()
+        
+        speed = snapshot['gauges'].get(DOWNLOAD_SPEED_BYTES)
+        if speed:
+            self.update_metric("download_rate", speed / (1024 * 1024))
+        downloaded = snapshot['counters'].get(DOWNLOAD_BYTES_TOTAL)
+        if downloaded:
+            self.update_metric("total_downloaded", downloaded / (1024 * 1024))
+        
+        rows = [
+            [key, int(summary['count']), f"{summary['p50']:.4g}", f"{summary['p99']:.4g}", f"{summary['max']:.4g}"]
+            for key, summary in snapshot['histograms'].items()
+            if summary['count']
+        ]
+        if rows:
+            self.update_widget_data("hot_paths", {
+                'headers': ['Metric', 'Count', 'p50', 'p99', 'Max'],
+                'rows': rows
+            })
     
     def add_widget(self, widget: DashboardWidget) -> None:
         """Add widget to dashboard."""
@@ -342,6 +395,7 @@ class Dashboard:
             return
         
         self.running = True
+        self.renderer.invalidate()
         self.refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
         self.refresh_thread.start()
         
@@ -367,15 +421,21 @@ class Dashboard:
     
     def _refresh_display(self) -> None:
         """Refresh dashboard display."""
-        # Clear screen
-        print('\033[2J\033[H', end='')
+        if not self.renderer.due():
+            return
+        self.update_from_registry()
         
-        # Render dashboard
+        # Render dashboard into a frame; the renderer writes the changed lines
+        self._frame = []
         self._render_header()
         self._render_widgets()
         self._render_alerts()
         
-        sys.stdout.flush()
+        self.renderer.render(self._frame)
+    
+    def _emit(self, text: str = "") -> None:
+        """Append rendered text to the current frame."""
+        self._frame.extend(text.split('\n'))
     
     def _render_header(self) -> None:
         """Render dashboard header."""
@@ -389,8 +449,8 @@ class Dashboard:
         padding = width - len(title_line) - len(time_line)
         
         header = f"{self.colors['title']}{title_line}{'─' * padding}{time_line}{self.colors['reset']}"
-        print(header)
-        print("─" * width)
+        self._emit(header)
+        self._emit("─" * width)
     
     def _render_widgets(self) -> None:
         """Render all dashboard widgets."""
@@ -425,7 +485,7 @@ class Dashboard:
         
         # Top border with title
         title_line = f"{corner_tl}{horizontal * 2} {widget.title} {horizontal * (width - len(widget.title) - 6)}{corner_tr}"
-        print(f"{self.colors['border']}{title_line}{self.colors['reset']}")
+        self._emit(f"{self.colors['border']}{title_line}{self.colors['reset']}")
         
         # Metrics content
         for metric in widget.metrics:
@@ -458,24 +518,24 @@ class Dashboard:
             padding = width - len(metric_name) - len(value_text) - 4
             
             metric_line = f"{border_char} {metric_name} {'·' * padding} {color}{value_text}{self.colors['reset']} {border_char}"
-            print(metric_line)
+            self._emit(metric_line)
         
         # Fill remaining space if needed
         content_lines = len(widget.metrics) + 2  # +2 for top/bottom borders
         for _ in range(max(0, widget.size[0] - content_lines)):
             empty_line = f"{border_char}{' ' * (width-2)}{border_char}"
-            print(empty_line)
+            self._emit(empty_line)
         
         # Bottom border
         bottom_line = f"{corner_bl}{horizontal * (width-2)}{corner_br}"
-        print(f"{self.colors['border']}{bottom_line}{self.colors['reset']}")
+        self._emit(f"{self.colors['border']}{bottom_line}{self.colors['reset']}")
     
     def _render_status_widget(self, widget: DashboardWidget) -> None:
         """Render status widget."""
         width = widget.size[1]
         
         # Header
-        print(f"{self.colors['border']}┌─ {widget.title} {'─' * (width - len(widget.title) - 4)}┐{self.colors['reset']}")
+        self._emit(f"{self.colors['border']}┌─ {widget.title} {'─' * (width - len(widget.title) - 4)}┐{self.colors['reset']}")
         
         # Status items from widget data
         status_items = widget.data.get('status_items', [])
@@ -513,15 +573,15 @@ class Dashboard:
             details_text = details[:remaining_width] if details else ""
             
             line = f"│ {name} {status_text} {details_text.ljust(remaining_width)} │"
-            print(line)
+            self._emit(line)
         
         # Fill remaining space
         content_lines = len(status_items) + 2
         for _ in range(max(0, widget.size[0] - content_lines)):
-            print(f"│{' ' * (width-2)}│")
+            self._emit(f"│{' ' * (width-2)}│")
         
         # Bottom border
-        print(f"{self.colors['border']}└{'─' * (width-2)}┘{self.colors['reset']}")
+        self._emit(f"{self.colors['border']}└{'─' * (width-2)}┘{self.colors['reset']}")
     
     def _render_log_widget(self, widget: DashboardWidget) -> None:
         """Render log widget."""
@@ -529,7 +589,7 @@ class Dashboard:
         height = widget.size[0]
         
         # Header
-        print(f"{self.colors['border']}┌─ {widget.title} {'─' * (width - len(widget.title) - 4)}┐{self.colors['reset']}")
+        self._emit(f"{self.colors['border']}┌─ {widget.title} {'─' * (width - len(widget.title) - 4)}┐{self.colors['reset']}")
         
         # Log entries from widget data
         log_entries = widget.data.get('log_entries', [])
@@ -563,22 +623,22 @@ class Dashboard:
                 message = message[:max_message_len-3] + "..."
             
             log_line = f"│{time_str} {level_color}{level[:4]:4}{self.colors['reset']} {message.ljust(max_message_len)}│"
-            print(log_line)
+            self._emit(log_line)
         
         # Fill remaining space
         used_lines = len(recent_entries) + 2
         for _ in range(max(0, height - used_lines)):
-            print(f"│{' ' * (width-2)}│")
+            self._emit(f"│{' ' * (width-2)}│")
         
         # Bottom border
-        print(f"{self.colors['border']}└{'─' * (width-2)}┘{self.colors['reset']}")
+        self._emit(f"{self.colors['border']}└{'─' * (width-2)}┘{self.colors['reset']}")
     
     def _render_table_widget(self, widget: DashboardWidget) -> None:
         """Render table widget."""
         width = widget.size[1]
         
         # Header
-        print(f"{self.colors['border']}┌─ {widget.title} {'─' * (width - len(widget.title) - 4)}┐{self.colors['reset']}")
+        self._emit(f"{self.colors['border']}┌─ {widget.title} {'─' * (width - len(widget.title) - 4)}┐{self.colors['reset']}")
         
         # Table data
         headers = widget.data.get('headers', [])
@@ -594,11 +654,11 @@ class Dashboard:
             for header in headers:
                 header_text = str(header)[:col_width-1].ljust(col_width-1)
                 header_line += f"{self.colors['title']}{header_text}{self.colors['reset']}│"
-            print(header_line)
+            self._emit(header_line)
             
             # Separator
             separator = "├" + "┼".join("─" * col_width for _ in headers) + "┤"
-            print(separator)
+            self._emit(separator)
             
             # Data rows
             max_rows = widget.size[0] - 4  # Account for header, separator, borders
@@ -607,26 +667,26 @@ class Dashboard:
                 for i, cell in enumerate(row[:col_count]):
                     cell_text = str(cell)[:col_width-1].ljust(col_width-1)
                     row_line += f"{cell_text}│"
-                print(row_line)
+                self._emit(row_line)
         else:
             # No data message
             no_data_line = f"│{'No data available'.center(width-2)}│"
-            print(no_data_line)
+            self._emit(no_data_line)
         
         # Fill remaining space
         content_height = min(len(rows) + 3, widget.size[0] - 1) if headers and rows else 2
         for _ in range(max(0, widget.size[0] - content_height - 1)):
-            print(f"│{' ' * (width-2)}│")
+            self._emit(f"│{' ' * (width-2)}│")
         
         # Bottom border
-        print(f"{self.colors['border']}└{'─' * (width-2)}┘{self.colors['reset']}")
+        self._emit(f"{self.colors['border']}└{'─' * (width-2)}┘{self.colors['reset']}")
     
     def _render_alerts(self) -> None:
         """Render alerts section."""
         if not self.alerts:
             return
         
-        print("\n" + self.colors['warning'] + "🚨 ALERTS:" + self.colors['reset'])
+        self._emit("\n" + self.colors['warning'] + "🚨 ALERTS:" + self.colors['reset'])
         
         # Show recent alerts (last 5)
         recent_alerts = self.alerts[-5:]
@@ -644,7 +704,7 @@ class Dashboard:
             }
             
             color = level_colors.get(level, self.colors['reset'])
-            print(f"  {color}[{timestamp}] {level.upper()}: {title} - {message}{self.colors['reset']}")
+            self._emit(f"  {color}[{timestamp}] {level.upper()}: {title} - {message}{self.colors['reset']}")
     
     def register_callback(self, metric_id: str, callback: Callable) -> None:
         """Register callback for metric updates."""
@@ -12,8 +12,11 @@ from dataclasses import dataclass, field
 from enum import Enum
 import sys
 import shutil
+from itertools import islice
 from datetime import datetime, timedelta
 
+from .renderer import TerminalRenderer
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,11 +69,14 @@ class ProgressTask:
     parent_id: Optional[str] = None
     children: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Called with (task, old_percentage, old_status) after each change
+    observer: Optional[Callable[['ProgressTask', float, str], None]] = field(default=None, repr=False, compare=False)
     
     def update(self, current: int, total: Optional[int] = None, 
                status: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
         """Update task progress."""
         current_time = time.time()
+        old_percentage, old_status = self.metrics.percentage, self.status
         
         if total is not None:
             self.metrics.total = total
@@ -89,16 +95,26 @@ class ProgressTask:
         
         if metadata:
             self.metadata.update(metadata)
+        
+        self._changed(old_percentage, old_status)
     
     def complete(self) -> None:
         """Mark task as completed."""
+        old_percentage, old_status = self.metrics.percentage, self.status
         self.metrics.current = self.metrics.total
         self.status = "completed"
+        self._changed(old_percentage, old_status)
     
     def fail(self, error: str) -> None:
         """Mark task as failed."""
+        old_percentage, old_status = self.metrics.percentage, self.status
         self.status = "failed"
         self.metadata['error'] = error
+        self._changed(old_percentage, old_status)
+    
+    def _changed(self, old_percentage: float, old_status: str) -> None:
+        if self.observer is not None:
+            self.observer(self, old_percentage, old_status)
 
 
 class ProgressTracker:
@@ -111,13 +127,23 @@ class ProgressTracker:
         """Initialize progress tracker."""
         self.tasks: Dict[str, ProgressTask] = {}
         self.callbacks: Dict[str, List[Callable]] = {}
-        self.lock = threading.Lock()
+        # Reentrant: task observers run inside update_task() etc.
+        self.lock = threading.RLock()
         
         # Global metrics
         self.start_time = time.time()
         self.total_tasks = 0
         self.completed_tasks = 0
         self.failed_tasks = 0
+        
+        # Incremental aggregates, updated by the task observers so readers
+        # never walk every task
+        self._running: Dict[str, ProgressTask] = {}
+        self._running_percentage = 0.0
+        self._child_percentage: Dict[str, float] = {}
+        self._child_count: Dict[str, int] = {}
+        # Incremented on every change; displays skip frames while it is unchanged
+        self.version = 0
     
     def create_task(self, task_id: str, name: str, level: ProgressLevel,
                    total: int = 100, parent_id: Optional[str] = None,
@@ -147,15 +173,23 @@ class ProgressTracker:
                 level=level,
                 metrics=metrics,
                 parent_id=parent_id,
-                metadata=metadata or {}
+                metadata=metadata or {},
+                observer=self._on_task_changed
             )
             
             self.tasks[task_id] = task
             self.total_tasks += 1
+            self._running[task_id] = task
+            self._running_percentage += task.metrics.percentage
             
             # Add to parent's children
             if parent_id and parent_id in self.tasks:
                 self.tasks[parent_id].children.append(task_id)
+                self._child_percentage[parent_id] = self._child_percentage.get(parent_id, 0.0) + task.metrics.percentage
+                self._child_count[parent_id] = self._child_count.get(parent_id, 0) + 1
+                self._update_parent_progress(parent_id)
+            
+            self.version += 1
             
             logger.debug(f"Created progress task: {task_id} - {name}")
             
@@ -184,12 +218,9 @@ class ProgressTracker:
             task = self.tasks[task_id]
             old_percentage = task.metrics.percentage
             
+            # The observer updates the aggregates and the parent progress
             task.update(current, total, status, metadata)
             
-            # Update parent progress if applicable
-            if task.parent_id:
-                self._update_parent_progress(task.parent_id)
-            
             # Notify callbacks if significant change
             if abs(task.metrics.percentage - old_percentage) >= 1.0:
                 self._notify_callbacks(task_id, "updated", task)
@@ -214,10 +245,6 @@ class ProgressTracker:
             
             self.completed_tasks += 1
             
-            # Update parent progress
-            if task.parent_id:
-                self._update_parent_progress(task.parent_id)
-            
             logger.info(f"Task completed: {task_id} - {task.name}")
             
             # Notify callbacks
@@ -265,23 +292,27 @@ class ProgressTracker:
         
         return [self.tasks[child_id] for child_id in parent.children if child_id in self.tasks]
     
+    def get_running_tasks(self, limit: Optional[int] = None) -> List[ProgressTask]:
+        """Get running tasks in start order (only the first ``limit`` if given)."""
+        with self.lock:
+            return list(islice(self._running.values(), limit))
+    
     def get_overall_progress(self) -> Dict[str, Any]:
-        """Get overall system progress."""
+        """Get overall system progress (O(1) from the incremental aggregates)."""
         with self.lock:
-            active_tasks = [task for task in self.tasks.values() if task.status == "running"]
+            active_count = len(self._running)
             
-            if not active_tasks:
+            if not active_count:
                 overall_percentage = 100.0 if self.total_tasks > 0 else 0.0
             else:
-                total_progress = sum(task.metrics.percentage for task in active_tasks)
-                overall_percentage = total_progress / len(active_tasks)
+                overall_percentage = min(100.0, max(0.0, self._running_percentage / active_count))
             
             return {
                 'overall_percentage': overall_percentage,
                 'total_tasks': self.total_tasks,
                 'completed_tasks': self.completed_tasks,
                 'failed_tasks': self.failed_tasks,
-                'active_tasks': len(active_tasks),
+                'active_tasks': active_count,
                 'elapsed_time': time.time() - self.start_time
             }
     
@@ -291,24 +322,46 @@ class ProgressTracker:
             self.callbacks[task_id] = []
         self.callbacks[task_id].append(callback)
     
+    def _on_task_changed(self, task: ProgressTask, old_percentage: float, old_status: str) -> None:
+        """Apply one task change to the aggregates."""
+        with self.lock:
+            if self.tasks.get(task.task_id) is not task:
+                return
+            
+            new_percentage = task.metrics.percentage
+            if old_status == "running":
+                self._running_percentage -= old_percentage
+            if task.status == "running":
+                self._running_percentage += new_percentage
+                self._running[task.task_id] = task
+            elif old_status == "running":
+                del self._running[task.task_id]
+            if not self._running:
+                # Drop accumulated rounding error
+                self._running_percentage = 0.0
+            
+            if task.parent_id in self._child_count and new_percentage != old_percentage:
+                self._child_percentage[task.parent_id] += new_percentage - old_percentage
+                self._update_parent_progress(task.parent_id)
+            
+            self.version += 1
+    
     def _update_parent_progress(self, parent_id: str) -> None:
-        """Update parent task progress based on children."""
+        """Update parent task progress from the children's percentage sum."""
         parent = self.tasks.get(parent_id)
-        if not parent or not parent.children:
-            return
-        
-        children = self.get_child_tasks(parent_id)
-        if not children:
+        child_count = self._child_count.get(parent_id, 0)
+        if not parent or not child_count:
             return
         
-        # Calculate average progress of children
-        total_percentage = sum(child.metrics.percentage for child in children)
-        avg_percentage = total_percentage / len(children)
+        # Average progress of children
+        avg_percentage = self._child_percentage[parent_id] / child_count
         
         # Update parent progress
-        new_current = int((avg_percentage / 100.0) * parent.metrics.total)
-        parent.metrics.current = new_current
+        old_percentage = parent.metrics.percentage
+        parent.metrics.current = int((avg_percentage / 100.0) * parent.metrics.total)
         parent.metrics.last_update = time.time()
+        if parent.status == "running":
+            self._running_percentage += parent.metrics.percentage - old_percentage
     
     def _notify_callbacks(self, task_id: str, event: str, task: ProgressTask) -> None:
         """Notify registered callbacks."""
@@ -332,10 +385,21 @@ class ProgressTracker:
                     to_remove.append(task_id)
             
             for task_id in to_remove:
-                del self.tasks[task_id]
+                task = self.tasks.pop(task_id)
                 if task_id in self.callbacks:
                     del self.callbacks[task_id]
+                self._child_percentage.pop(task_id, None)
+                self._child_count.pop(task_id, None)
+                if task.parent_id in self._child_count:
+                    self._child_percentage[task.parent_id] -= task.metrics.percentage
+                    self._child_count[task.parent_id] -= 1
+                    if self._child_count[task.parent_id] == 0:
+                        del self._child_count[task.parent_id]
+                        del self._child_percentage[task.parent_id]
                 removed_count += 1
+            
+            if removed_count:
+                self.version += 1
         
         if removed_count > 0:
             logger.debug(f"Cleaned up {removed_count} old tasks")
@@ -349,20 +413,27 @@ class ProgressDisplay:
     Implements requirement 19.2: Visual progress indicators.
     """
     
-    def __init__(self, tracker: ProgressTracker, update_interval: float = 0.1):
+    def __init__(self, tracker: ProgressTracker, update_interval: float = 0.1,
+                 max_fps: float = 10.0, max_lines: Optional[int] = None):
         """
         Initialize progress display.
         
         Args:
             tracker: ProgressTracker instance
             update_interval: Display update interval in seconds
+            max_fps: Maximum repaints per second
+            max_lines: Maximum task lines shown (terminal height if None)
         """
         self.tracker = tracker
         self.update_interval = update_interval
-        self.terminal_width = shutil.get_terminal_size().columns
+        terminal_size = shutil.get_terminal_size()
+        self.terminal_width = terminal_size.columns
+        self.max_lines = max_lines or max(1, terminal_size.lines - 2)
+        self.renderer = TerminalRenderer(max_fps=max_fps)
         self.display_thread: Optional[threading.Thread] = None
         self.stop_display = threading.Event()
         self.current_display: Dict[str, str] = {}
+        self._rendered_version: Optional[int] = None
     
     def start_display(self, task_ids: Optional[List[str]] = None) -> None:
         """
@@ -397,32 +468,36 @@ class ProgressDisplay:
                 logger.error(f"Display update error: {e}")
     
     def _update_display(self, task_ids: Optional[List[str]]) -> None:
-        """Update progress display."""
+        """Update progress display, repainting only the lines that changed."""
+        # Nothing changed since the last frame, or the frame cap is reached
+        version = self.tracker.version
+        if version == self._rendered_version or not self.renderer.due():
+            return
+        
         # Determine which tasks to display
+        hidden = 0
         if task_ids:
-            tasks = [self.tracker.get_task(tid) for tid in task_ids]
+            tasks = [self.tracker.get_task(tid) for tid in task_ids[:self.max_lines]]
             tasks = [t for t in tasks if t is not None]
         else:
-            tasks = [task for task in self.tracker.tasks.values() if task.status == "running"]
+            tasks = self.tracker.get_running_tasks(self.max_lines)
+            if len(tasks) == self.max_lines:
+                hidden = self.tracker.get_overall_progress()['active_tasks'] - len(tasks)
         
         if not tasks:
             return
         
-        # Clear previous display
-        if self.current_display:
-            for _ in self.current_display:
-                sys.stdout.write('\033[1A\033[2K')  # Move up and clear line
-        
-        # Generate new display
-        display_lines = []
-        
-        for task in tasks:
-            line = self._format_task_line(task)
-            display_lines.append(line)
-            print(line)
+        # Format only the visible tasks
+        display_lines = [self._format_task_line(task) for task in tasks]
+        if hidden > 0:
+            # Keep the block within the terminal: the last line summarizes the rest
+            overall = self.tracker.get_overall_progress()
+            display_lines[-1] = (f"   … {hidden + 1} more running, "
+                                 f"{overall['overall_percentage']:.1f}% overall")[:self.terminal_width]
         
+        self.renderer.render(display_lines)
         self.current_display = {task.task_id: line for task, line in zip(tasks, display_lines)}
-        sys.stdout.flush()
+        self._rendered_version = version
     
     def _format_task_line(self, task: ProgressTask) -> str:
         """Format a single task progress line."""
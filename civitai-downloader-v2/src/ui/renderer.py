@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Terminal Renderer.
+Repaints a block of terminal lines by rewriting only the lines that changed
+since the previous frame, with a frame-rate cap. Each frame goes out in a
+single write, so a mostly-static progress block or dashboard costs a few
+escape sequences per tick instead of a full-screen redraw.
+"""
+
+import logging
+import shutil
+import sys
+import time
+from typing import List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+CLEAR_LINE = '\033[2K'
+CLEAR_SCREEN = '\033[2J\033[H'
+
+
+class TerminalRenderer:
+    """
+    Diff-based line renderer.
+
+    Inline mode (default) keeps the cursor on the line below the block and
+    moves relative to it, like a progress bar printed into the scrollback.
+    Full-screen mode clears the screen once, addresses rows absolutely and
+    clips the frame to the terminal height.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, max_fps: float = 10.0,
+                 full_screen: bool = False):
+        """
+        Initialize renderer.
+
+        Args:
+            stream: Output stream (sys.stdout at write time if None)
+            max_fps: Maximum frames per second (0 for no cap)
+            full_screen: Own the whole screen instead of an inline block
+        """
+        self.stream = stream
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.full_screen = full_screen
+        self._lines: List[str] = []
+        self._started = False
+        self._last_frame: Optional[float] = None
+
+        # Statistics
+        self.frames = 0
+        self.skipped_frames = 0
+        self.lines_written = 0
+
+    def due(self) -> bool:
+        """Whether the frame-rate cap allows a frame now."""
+        return self._last_frame is None or time.monotonic() - self._last_frame >= self.min_interval
+
+    def render(self, lines: List[str], force: bool = False) -> bool:
+        """
+        Paint a frame.
+
+        Args:
+            lines: Lines of the frame (without newlines)
+            force: Ignore the frame-rate cap
+
+        Returns:
+            True if anything was written
+        """
+        if not force and not self.due():
+            self.skipped_frames += 1
+            return False
+        self._last_frame = time.monotonic()
+
+        if self.full_screen:
+            lines = lines[:max(1, shutil.get_terminal_size().lines - 1)]
+        output = self._diff(list(lines))
+        if not output:
+            return False
+
+        stream = self.stream or sys.stdout
+        stream.write(output)
+        stream.flush()
+        self.frames += 1
+        return True
+
+    def invalidate(self) -> None:
+        """Forget the screen contents so the next frame repaints every line."""
+        self._lines = []
+        self._started = False
+
+    def _diff(self, new: List[str]) -> str:
+        old = self._lines if self._started else []
+        changed = [i for i in range(min(len(old), len(new))) if old[i] != new[i]]
+        added = range(len(old), len(new))
+        stale = range(len(new), len(old))
+        parts: List[str] = []
+
+        if self.full_screen:
+            if not self._started:
+                parts.append(CLEAR_SCREEN)
+            for i in changed + list(added):
+                parts.append(f'\033[{i + 1};1H{CLEAR_LINE}{new[i]}')
+            for i in stale:
+                parts.append(f'\033[{i + 1};1H{CLEAR_LINE}')
+            if parts:
+                parts.append(f'\033[{len(new) + 1};1H')
+        else:
+            # The cursor rests at the start of the line below the block
+            cursor = len(old)
+            for i in changed + list(stale):
+                parts.append(self._move(cursor, i))
+                parts.append(f'\r{CLEAR_LINE}{new[i] if i < len(new) else ""}')
+                cursor = i
+            if added:
+                parts.append(self._move(cursor, len(old)) + '\r')
+                parts.append(''.join(new[i] + '\n' for i in added))
+            elif parts:
+                parts.append(self._move(cursor, len(new)) + '\r')
+
+        self.lines_written += len(changed) + len(added) + len(stale)
+        self._lines = new
+        self._started = True
+        return ''.join(parts)
+
+    @staticmethod
+    def _move(row: int, target: int) -> str:
+        if target < row:
+            return f'\033[{row - target}A'
+        if target > row:
+            return f'\033[{target - row}B'
+        return ''
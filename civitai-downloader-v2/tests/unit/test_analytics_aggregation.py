@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Analytics aggregation tests.
+Tests that reports aggregated in SQL match the in-memory analysis of the raw events.
+"""
+
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.analytics.aggregation import EventAggregator
+from src.core.analytics.analyzer import AnalyticsAnalyzer
+from src.core.analytics.collector import AnalyticsCollector, EventType
+from src.core.analytics.storage import DAY_SECONDS
+
+# Fixed reference point: 2024-05-10 12:00:00 UTC
+BASE_TIME = 1715342400.0
+
+
+class TestEventAggregator(unittest.TestCase):
+    """Test EventAggregator against AnalyticsAnalyzer's in-memory analysis."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.collector = AnalyticsCollector(db_path=str(Path(self.temp_dir.name) / "analytics.db"),
+                                            retention_days=None, rollup_retention_days=None)
+        self.analyzer = AnalyticsAnalyzer(self.collector)
+        self.record_events()
+
+    def tearDown(self):
+        self.collector._running = False
+        self.temp_dir.cleanup()
+
+    def record_events(self):
+        rng = random.Random(42)
+        record = self.collector.record_event
+        # Window spans midnight UTC, so two partitions are read
+        start = BASE_TIME + 10 * 3600
+        for i in range(300):
+            ts = start + i * 11.5
+            session = f's{i % 3}'
+            record(EventType.API_REQUEST, {'request_id': f'r{i}', 'endpoint': f'/e{i % 4}'},
+                   session_id=session, timestamp=ts)
+            if i % 7:
+                record(EventType.API_RESPONSE, {'request_id': f'r{i}', 'status_code': rng.choice([200, 200, 404, 500]),
+                                                'response_time': round(rng.uniform(0, 2), 3)},
+                       session_id=session, timestamp=ts + 0.5)
+            else:
+                data = {'request_id': f'r{i}'}
+                if i % 2:
+                    data['error_type'] = rng.choice(['timeout', 'connection'])
+                record(EventType.API_ERROR, data, session_id=session, timestamp=ts + 0.5)
+            if i % 5 == 0:
+                record(EventType.DOWNLOAD_STARTED, {'file_name': rng.choice(['a.SafeTensors', 'b.ckpt', 'noext', ''])},
+                       session_id=session, timestamp=ts + 1)
+                record(EventType.DOWNLOAD_COMPLETED, {'bytes_downloaded': rng.randint(1, 10**9),
+                                                      'average_speed': rng.uniform(1e5, 1e7), 'duration': 3.5},
+                       session_id=session, timestamp=ts + 2)
+                record(EventType.DOWNLOAD_FAILED, {'error_type': 'disk'}, session_id=session, timestamp=ts + 3)
+            if i % 3 == 0:
+                record(EventType.SEARCH_PERFORMED, {'query': rng.choice(['anime', 'style', None]),
+                                                    'results_count': rng.randint(0, 50),
+                                                    'response_time': rng.uniform(0.1, 1)},
+                       session_id=session, timestamp=ts + 4)
+                record(EventType.CACHE_HIT, {'cache_age': rng.choice([0, 30, 600])},
+                       session_id=session, timestamp=ts + 5)
+                record(EventType.CACHE_MISS, {}, session_id=session, timestamp=ts + 6)
+        self.collector.flush()
+        self.window = (start - 60, start + 300 * 11.5 + 60)
+
+    def test_sections_match_in_memory_analysis(self):
+        """Every section matches the event-by-event analysis (endpoint averages are true means)."""
+        start, end = self.window
+        events = self.collector.get_events(start_time=start, end_time=end)
+        sections = EventAggregator(self.collector.storage).aggregate(start, end)
+
+        self.assertEqual(sections['summary'], self.analyzer._analyze_summary(events, start, end))
+        self.assertEqual(sections['download'], self.analyzer._analyze_download_statistics(events))
+        self.assertEqual(sections['search'], self.analyzer._analyze_search_statistics(events))
+        self.assertEqual(sections['cache'], self.analyzer._analyze_cache_statistics(events))
+        self.assertEqual(sections['performance'], self.analyzer._analyze_performance_metrics(events))
+        self.assertEqual(sections['errors'], self.analyzer._analyze_error_patterns(events))
+
+        api = sections['api']
+        expected = self.analyzer._analyze_api_statistics(events)
+        for key in ('total_requests', 'total_responses', 'total_errors', 'success_rate', 'avg_response_time',
+                    'median_response_time', 'max_response_time', 'status_code_distribution',
+                    'requests_per_endpoint'):
+            self.assertEqual(api[key], expected[key], key)
+        for endpoint, stats in api['endpoint_statistics'].items():
+            self.assertEqual(stats['errors'], expected['endpoint_statistics'][endpoint]['errors'])
+            times = [e['data']['response_time'] for e in events
+                     if e['event_type'] == 'api_response' and e['data']['response_time'] > 0
+                     and f"/e{int(e['data']['request_id'][1:]) % 4}" == endpoint]
+            self.assertAlmostEqual(stats['avg_time'], sum(times) / len(times))
+
+    def test_report_does_not_load_events(self):
+        """Short-window reports are aggregated without reading events into Python."""
+        with patch.object(self.collector, 'get_events', side_effect=AssertionError("events loaded")):
+            report = self.analyzer.generate_report(*self.window)
+        self.assertGreater(report.summary['total_events'], 300)
+        self.assertEqual(set(report.download_statistics['file_type_distribution']),
+                         {'safetensors', 'ckpt', 'noext'})
+
+    def test_empty_window(self):
+        """Windows without partitions produce empty statistics."""
+        start = BASE_TIME - 30 * DAY_SECONDS
+        report = self.analyzer.generate_report(start, start + 3600)
+        self.assertEqual(report.summary['total_events'], 0)
+        self.assertIsNone(report.summary['most_active_session'])
+        self.assertEqual(report.api_statistics['median_response_time'], 0)
+        self.assertIsNone(report.performance_metrics['peak_hour'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Analytics ingest tests.
+Tests the queued ingest path: batched writes, the background writer and backpressure.
+"""
+
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.analytics.collector import AnalyticsCollector, EventType
+
+
+class TestAnalyticsIngest(unittest.TestCase):
+    """Test the AnalyticsCollector ingest path."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "analytics.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_events_written_in_large_transactions(self):
+        """Queued events from several threads land in few write_events calls."""
+        collector = AnalyticsCollector(db_path=self.db_path)
+        with patch.object(collector.storage, 'write_events',
+                          wraps=collector.storage.write_events) as write_events:
+            def produce(worker):
+                for i in range(2000):
+                    collector.record_event(EventType.CACHE_HIT, {'cache_key': f'{worker}:{i}'})
+
+            threads = [threading.Thread(target=produce, args=(w,)) for w in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            collector.stop()
+
+        self.assertEqual(len(collector.get_events(EventType.CACHE_HIT)), 8000)
+        self.assertLessEqual(write_events.call_count, 12)
+        stats = collector.get_ingest_statistics()
+        self.assertEqual((stats['pending'], stats['dropped'], stats['sampled_out']), (0, 0, 0))
+        self.assertEqual(stats['written'], 8002)
+
+    def test_writer_wakes_for_full_batch(self):
+        """The background writer drains a full batch before its interval."""
+        collector = AnalyticsCollector(db_path=self.db_path)
+        written = threading.Event()
+        original = collector.storage.write_events
+
+        def write_events(events):
+            original(events)
+            written.set()
+
+        with patch.object(collector.storage, 'write_events', side_effect=write_events):
+            for i in range(1000):
+                collector.record_event(EventType.CACHE_MISS, {'cache_key': str(i)})
+            self.assertTrue(written.wait(5))
+        collector.stop()
+        self.assertEqual(len(collector.get_events(EventType.CACHE_MISS)), 1000)
+
+    def test_backpressure_samples_then_drops(self):
+        """A stalled writer makes callers sample and then drop instead of blocking."""
+        collector = AnalyticsCollector(db_path=self.db_path, max_pending=100, sample_rate=5)
+        with collector._write_lock:
+            for i in range(500):
+                collector.record_event(EventType.API_REQUEST, {'request_id': str(i)})
+            collector.record_event(EventType.SESSION_ENDED, {'session_id': 'x'})
+            stats = collector.get_ingest_statistics()
+        self.assertEqual(stats['pending'], 101)
+        self.assertGreater(stats['sampled_out'], 0)
+        self.assertGreater(stats['dropped'], 0)
+        self.assertEqual(stats['pending'] + stats['sampled_out'] + stats['dropped'], stats['offered'])
+
+        collector.flush()
+        self.assertEqual(len(collector.get_events(EventType.SESSION_ENDED)), 1)
+        collector.stop()
+
+    def test_failed_write_keeps_events(self):
+        """Events of a failed write stay queued for the next flush."""
+        collector = AnalyticsCollector(db_path=self.db_path)
+        collector.record_event(EventType.CACHE_HIT, {'cache_key': 'a'})
+        with patch.object(collector.storage, 'write_events', side_effect=OSError("disk full")):
+            self.assertEqual(collector.flush(), 0)
+        self.assertEqual(collector.flush(), 2)
+        collector.stop()
+
+    def test_failed_batch_retried_in_order_then_dropped(self):
+        """A failed batch is written before newer events and dropped after repeated failures."""
+        collector = AnalyticsCollector(db_path=self.db_path)
+        collector.record_event(EventType.CACHE_HIT, {'cache_key': 'a'})
+        with patch.object(collector.storage, 'write_events', side_effect=OSError("disk full")):
+            collector.flush()
+        collector.record_event(EventType.CACHE_HIT, {'cache_key': 'b'})
+        with patch.object(collector.storage, 'write_events',
+                          wraps=collector.storage.write_events) as write_events:
+            self.assertEqual(collector.flush(), 3)
+        keys = [event['data'].get('cache_key') for event in write_events.call_args[0][0]]
+        self.assertEqual(keys, [None, 'a', 'b'])
+
+        collector.record_event(EventType.CACHE_MISS, {'cache_key': 'c'})
+        with patch.object(collector.storage, 'write_events', side_effect=OSError("disk full")):
+            for _ in range(3):
+                collector.flush()
+        self.assertEqual(collector.get_ingest_statistics()['pending'], 0)
+        self.assertEqual(collector.get_ingest_statistics()['dropped'], 1)
+        collector.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Analytics reporter tests.
+Tests that reports are streamed to file handles in every format.
+"""
+
+import csv
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.analytics.analyzer import AnalyticsAnalyzer
+from src.core.analytics.collector import AnalyticsCollector, EventType
+from src.core.analytics.reporter import ReportConfig, ReportFormat, ReportGenerator
+
+# Fixed reference point: 2024-05-10 12:00:00 UTC
+BASE_TIME = 1715342400.0
+
+
+class TrackingWriter(io.StringIO):
+    """StringIO counting write calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestReportStreaming(unittest.TestCase):
+    """Test ReportGenerator.write_report."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.collector = AnalyticsCollector(db_path=str(Path(self.temp_dir.name) / "analytics.db"),
+                                            retention_days=None, rollup_retention_days=None)
+        for i in range(20):
+            ts = BASE_TIME + i * 60
+            self.collector.record_event(EventType.API_REQUEST, {'request_id': f'r{i}', 'endpoint': '/models'},
+                                        timestamp=ts)
+            self.collector.record_event(EventType.API_ERROR, {'request_id': f'r{i}', 'error_type': 'timeout'},
+                                        timestamp=ts + 1)
+        self.collector.flush()
+        self.analyzer = AnalyticsAnalyzer(self.collector)
+        self.generator = ReportGenerator(self.analyzer)
+        self.report = self.analyzer.generate_report(BASE_TIME - 60, BASE_TIME + 3600)
+
+    def tearDown(self):
+        self.collector._running = False
+        self.temp_dir.cleanup()
+
+    def test_json_matches_json_dump_layout(self):
+        """Streamed JSON is parseable and laid out like json.dump(indent=2)."""
+        out = TrackingWriter()
+        self.generator.write_report(self.report, ReportConfig(format=ReportFormat.JSON, include_raw_data=True), out)
+
+        data = json.loads(out.getvalue())
+        self.assertEqual(out.getvalue(), json.dumps(data, indent=2))
+        self.assertEqual(data['summary']['total_events'], 40)
+        self.assertEqual(data['error_analysis']['api_error_types'], {'timeout': 20})
+        self.assertEqual(len(data['raw_events']), 40)
+        self.assertGreater(out.writes, 40)
+
+    def test_text_formats_written_by_section(self):
+        """HTML, Markdown and text reports are written in several chunks."""
+        for report_format, marker in ((ReportFormat.HTML, '<h2>Error Analysis</h2>'),
+                                      (ReportFormat.MARKDOWN, '## Error Analysis'),
+                                      (ReportFormat.TEXT, 'ERROR ANALYSIS')):
+            out = TrackingWriter()
+            self.generator.write_report(self.report, ReportConfig(format=report_format), out)
+            self.assertIn(marker, out.getvalue())
+            self.assertGreater(out.writes, 2, report_format)
+
+    def test_csv_file(self):
+        """generate_report writes CSV files without blank lines between rows."""
+        path = self.generator.generate_report(
+            self.report, ReportConfig(format=ReportFormat.CSV, output_dir=Path(self.temp_dir.name))
+        )
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['CivitAI Downloader Analytics Report'])
+        self.assertIn(['Total Requests', '20'], rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Analytics storage tests.
+Tests for daily partitions, retention, hourly rollups and legacy table migration.
+"""
+
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.analytics.analyzer import AnalyticsAnalyzer
+from src.core.analytics.collector import AnalyticsCollector, EventType
+from src.core.analytics.storage import (
+    DAY_SECONDS, HOUR_SECONDS, AnalyticsStorage, partition_day, partition_table
+)
+
+# Fixed reference point: 2024-05-10 12:00:00 UTC
+BASE_TIME = 1715342400.0
+
+
+def event(event_type: str, timestamp: float, session_id: str = 's1', **data):
+    return {'event_type': event_type, 'timestamp': timestamp, 'session_id': session_id,
+            'user_id': None, 'data': data, 'tags': []}
+
+
+class TestAnalyticsStorage(unittest.TestCase):
+    """Test partitioned analytics storage."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "analytics.db")
+        self.storage = AnalyticsStorage(self.db_path, retention_days=None, rollup_retention_days=None)
+        self.storage.initialize()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def tables(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    def test_events_partitioned_by_day(self):
+        """Events land in per-day tables and stay queryable through analytics_events."""
+        self.storage.write_events([
+            event('api_request', BASE_TIME - DAY_SECONDS, request_id='r1'),
+            event('api_request', BASE_TIME, request_id='r2'),
+            event('cache_hit', BASE_TIME + 60, cache_age=30),
+        ])
+
+        self.assertTrue({partition_table('20240509'), partition_table('20240510')} <= self.tables())
+        with sqlite3.connect(self.db_path) as conn:
+            ids = [row[0] for row in conn.execute("SELECT id FROM analytics_events ORDER BY id")]
+        self.assertEqual(ids, [1, 2, 3])
+
+        rows = self.storage.select_events(start_time=BASE_TIME - 3600)
+        self.assertEqual([row['event_type'] for row in rows], ['cache_hit', 'api_request'])
+        rows = self.storage.select_events(limit=2)
+        self.assertEqual([row['id'] for row in rows], [3, 2])
+        self.assertEqual(len(self.storage.select_events(event_type='api_request')), 2)
+
+    def test_retention_drops_partitions(self):
+        """Expired days are dropped as whole tables; rollups outlive raw events."""
+        self.storage.write_events([
+            event('api_request', BASE_TIME - 10 * DAY_SECONDS),
+            event('api_request', BASE_TIME),
+        ])
+        storage = AnalyticsStorage(self.db_path, retention_days=5, rollup_retention_days=30)
+        result = storage.prune(now=BASE_TIME)
+
+        self.assertEqual(result['partitions_dropped'], 1)
+        self.assertNotIn(partition_table(partition_day(BASE_TIME - 10 * DAY_SECONDS)), self.tables())
+        self.assertEqual(len(storage.select_events()), 1)
+
+        first_hour = int((BASE_TIME - 11 * DAY_SECONDS) // HOUR_SECONDS)
+        rollups = storage.load_rollups(first_hour, int(BASE_TIME // HOUR_SECONDS) + 1)
+        self.assertEqual(rollups.count('api_request'), 2)
+
+    def test_default_keeps_everything(self):
+        """Without configured retention, old partitions survive pruning."""
+        self.storage.write_events([event('api_request', BASE_TIME - 400 * DAY_SECONDS)])
+        result = AnalyticsStorage(self.db_path).prune(now=BASE_TIME)
+        self.assertEqual(result['partitions_dropped'], 0)
+        self.assertEqual(len(self.storage.select_events()), 1)
+
+    def test_rollups_accumulate_per_hour(self):
+        """Hourly rollups add up across flushes and attribute responses to endpoints."""
+        self.storage.write_events([
+            event('api_request', BASE_TIME, request_id='r1', endpoint='/models'),
+            event('api_response', BASE_TIME + 1, request_id='r1', status_code=200, response_time=0.5),
+        ])
+        self.storage.write_events([
+            event('api_response', BASE_TIME + 2, request_id='r1', status_code=500, response_time=1.5),
+        ])
+
+        hour = int(BASE_TIME // HOUR_SECONDS)
+        rollups = self.storage.load_rollups(hour, hour + 1)
+        self.assertEqual(rollups.count('api_response'), 2)
+        self.assertEqual(rollups.summary('api_response', 'response_time'),
+                         {'count': 2, 'total': 2.0, 'min': 0.5, 'max': 1.5})
+        self.assertEqual(dict(rollups.labels('api_response', 'label:status_code')), {'200': 1, '500': 1})
+        self.assertEqual(rollups.label_totals('api_response', 'endpoint_time'), {'/models': (2, 2.0)})
+
+    def test_legacy_table_migrated(self):
+        """A pre-partitioning analytics_events table is split into partitions."""
+        legacy_path = str(Path(self.temp_dir.name) / "legacy.db")
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute("""
+                CREATE TABLE analytics_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, event_type TEXT NOT NULL,
+                    timestamp REAL NOT NULL, session_id TEXT, user_id TEXT, data TEXT,
+                    tags TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.executemany(
+                "INSERT INTO analytics_events (event_type, timestamp, session_id, data) VALUES (?, ?, ?, ?)",
+                [('cache_hit', BASE_TIME - DAY_SECONDS, 's1', json.dumps({'cache_age': 10})),
+                 ('cache_miss', BASE_TIME, 's1', json.dumps({}))]
+            )
+
+        storage = AnalyticsStorage(legacy_path, retention_days=None, rollup_retention_days=None)
+        storage.initialize()
+        storage.write_events([event('cache_hit', BASE_TIME + 5)])
+
+        rows = storage.select_events()
+        self.assertEqual([row['id'] for row in rows], [3, 2, 1])
+        with sqlite3.connect(legacy_path) as conn:
+            view = conn.execute("SELECT type FROM sqlite_master WHERE name = 'analytics_events'").fetchone()
+        self.assertEqual(view[0], 'view')
+        hour = int((BASE_TIME - DAY_SECONDS) // HOUR_SECONDS)
+        self.assertEqual(storage.load_rollups(hour, hour + 1).count('cache_hit'), 1)
+
+    def test_daily_partials_cached_and_invalidated(self):
+        """Ended days are merged from cached partials that late events invalidate."""
+        for day in range(3):
+            self.storage.write_events([
+                event('search_performed', BASE_TIME + day * DAY_SECONDS + h * HOUR_SECONDS,
+                      query='anime', response_time=0.1 * (h + 1), results_count=h)
+                for h in range(0, 24, 5)
+            ])
+        # Four whole days starting at the UTC midnight before BASE_TIME
+        start_hour = int(BASE_TIME // HOUR_SECONDS) - 12
+        end_hour = start_hour + 4 * 24
+
+        hourly = self.storage.load_rollups(start_hour, end_hour)
+        merged = self.storage.load_rollups(start_hour, end_hour, collapse_hours=True)
+        with sqlite3.connect(self.db_path) as conn:
+            cached = [row[0] for row in conn.execute("SELECT day FROM analytics_rollup_days ORDER BY day")]
+        first_day = int(BASE_TIME // DAY_SECONDS)
+        self.assertEqual(cached, [first_day, first_day + 1, first_day + 2, first_day + 3])
+        for rollups in (hourly, merged):
+            self.assertEqual(rollups.count('search_performed'), 15)
+        merged_times = merged.summary('search_performed', 'response_time')
+        hourly_times = hourly.summary('search_performed', 'response_time')
+        self.assertAlmostEqual(merged_times.pop('total'), hourly_times.pop('total'))
+        self.assertEqual(merged_times, hourly_times)
+        self.assertEqual(merged.labels('search_performed', 'label:query'), {'anime': 15})
+        self.assertEqual(merged.hourly_counts(), hourly.hourly_counts())
+        self.assertEqual(self.storage.cache_daily_rollups(first_day, first_day + 4), 0)
+
+        # A late event drops its day's partials; the next load rebuilds them
+        self.storage.write_events([event('search_performed', BASE_TIME + DAY_SECONDS + 60,
+                                         query='style', response_time=9.0)])
+        with sqlite3.connect(self.db_path) as conn:
+            cached = [row[0] for row in conn.execute("SELECT day FROM analytics_rollup_days ORDER BY day")]
+        self.assertEqual(cached, [first_day, first_day + 2, first_day + 3])
+        merged = self.storage.load_rollups(start_hour, end_hour, collapse_hours=True)
+        self.assertEqual(merged.labels('search_performed', 'label:query'), {'anime': 15, 'style': 1})
+        self.assertEqual(merged.summary('search_performed', 'response_time')['max'], 9.0)
+
+
+class TestRollupReports(unittest.TestCase):
+    """Test that long-window reports from rollups match raw-event reports."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.collector = AnalyticsCollector(str(Path(self.temp_dir.name) / "analytics.db"),
+                                            retention_days=None, rollup_retention_days=None)
+        self.analyzer = AnalyticsAnalyzer(self.collector)
+
+    def tearDown(self):
+        self.collector._running = False
+        self.temp_dir.cleanup()
+
+    def test_rollup_report_matches_raw(self):
+        start = BASE_TIME - 3 * DAY_SECONDS + 1234
+        for i in range(48):
+            ts = start + i * 4000
+            self.collector.record_event(EventType.API_REQUEST, {'request_id': f'r{i}', 'endpoint': '/models'},
+                                        timestamp=ts)
+            self.collector.record_event(EventType.API_RESPONSE,
+                                        {'request_id': f'r{i}', 'status_code': 200 if i % 4 else 429,
+                                         'response_time': 0.1 * (i % 5 + 1)}, timestamp=ts + 1)
+            self.collector.record_event(EventType.DOWNLOAD_STARTED, {'file_name': f'm{i}.safetensors'},
+                                        timestamp=ts + 2)
+            self.collector.record_event(EventType.DOWNLOAD_COMPLETED,
+                                        {'bytes_downloaded': 1024 * 1024 * (i + 1), 'duration': 2.0,
+                                         'average_speed': 1024 * 1024}, timestamp=ts + 3)
+        self.collector._flush_events()
+
+        end = start + 48 * 4000
+        raw = self.analyzer.generate_report(start, end, use_rollups=False)
+        rolled = self.analyzer.generate_report(start, end, use_rollups=True)
+
+        self.assertEqual(rolled.summary['event_type_breakdown'], raw.summary['event_type_breakdown'])
+        self.assertEqual(rolled.summary['total_events'], raw.summary['total_events'])
+        for key in ('total_requests', 'success_rate', 'avg_response_time', 'status_code_distribution'):
+            self.assertEqual(rolled.api_statistics[key], raw.api_statistics[key], key)
+        self.assertEqual(rolled.download_statistics, raw.download_statistics)
+        self.assertEqual(rolled.performance_metrics, raw.performance_metrics)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Async logging tests.
+Tests the queue listener mode, JSON lines output and call-site rate limiting.
+"""
+
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.logging_config import (
+    setup_logging, shutdown_async_logging, LazyQueueHandler, RateLimitFilter
+)
+
+
+class TestSetupLoggingModes(unittest.TestCase):
+    """Test setup_logging async and JSON modes."""
+
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.saved_handlers = list(self.root.handlers)
+        self.saved_level = self.root.level
+        self.saved_stdout = sys.stdout
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        shutdown_async_logging()
+        for handler in self.root.handlers:
+            handler.close()
+        self.root.handlers[:] = self.saved_handlers
+        self.root.setLevel(self.saved_level)
+        sys.stdout = self.saved_stdout
+        self.temp_dir.cleanup()
+
+    def test_async_json_lines(self):
+        """Records go through the queue listener and land as JSON lines."""
+        config = setup_logging(log_dir=Path(self.temp_dir.name), log_name='test',
+                               async_mode=True, json_format=True, rate_limit=0)
+        self.assertTrue(config['async'])
+        self.assertEqual(self.root.handlers, [config['handlers']['queue']])
+
+        logging.getLogger('test.async').info("downloaded %s in %d ms", 'model.safetensors', 42,
+                                             extra={'task_id': 't1'})
+        shutdown_async_logging()
+
+        entries = [json.loads(line) for line in config['debug_log'].read_text(encoding='utf-8').splitlines()]
+        entry = [e for e in entries if e['logger'] == 'test.async'][0]
+        self.assertEqual(config['debug_log'].suffix, '.jsonl')
+        self.assertEqual(entry['message'], "downloaded model.safetensors in 42 ms")
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['task_id'], 't1')
+
+    def test_rate_limit_in_sync_mode(self):
+        """One call site passes `rate_limit` records per minute across all handlers."""
+        config = setup_logging(log_dir=Path(self.temp_dir.name), log_name='test',
+                               async_mode=False, json_format=False, rate_limit=3)
+        logger = logging.getLogger('test.rate')
+        for i in range(10):
+            logger.info("chunk %d", i)
+        for handler in self.root.handlers:
+            handler.flush()
+
+        lines = [line for line in config['debug_log'].read_text(encoding='utf-8').splitlines()
+                 if 'test.rate' in line]
+        self.assertEqual(len(lines), 3)
+
+
+class TestLazyQueueHandler(unittest.TestCase):
+    """Test LazyQueueHandler."""
+
+    def test_formats_only_mutable_arguments(self):
+        """Immutable arguments stay unformatted; mutable ones are rendered before queuing."""
+        handler = LazyQueueHandler(None)
+        lazy = logging.LogRecord('x', logging.INFO, __file__, 1, "%s of %d", ('part', 3), None)
+        self.assertEqual(handler.prepare(lazy).args, ('part', 3))
+
+        params = {'limit': 100}
+        eager = logging.LogRecord('x', logging.DEBUG, __file__, 1, "params: %s", (params,), None)
+        handler.prepare(eager)
+        params['limit'] = 1
+        self.assertIsNone(eager.args)
+        self.assertEqual(eager.getMessage(), "params: {'limit': 100}")
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    """Test RateLimitFilter."""
+
+    def make_record(self, created, lineno=10, level=logging.INFO):
+        record = logging.LogRecord('x', level, 'mod.py', lineno, "retrying", None, None)
+        record.created = created
+        return record
+
+    def test_reports_dropped_records(self):
+        """Records over the burst are dropped and counted in the next period."""
+        rate_filter = RateLimitFilter(burst=2, period=10.0)
+        passed = [rate_filter.filter(self.make_record(t)) for t in (0, 1, 2, 3)]
+        self.assertEqual(passed, [True, True, False, False])
+        self.assertTrue(rate_filter.filter(self.make_record(5, lineno=11)))
+
+        record = self.make_record(12)
+        self.assertTrue(rate_filter.filter(record))
+        self.assertEqual(record.getMessage(), "retrying (2 similar messages suppressed)")
+        self.assertTrue(rate_filter.filter(self.make_record(13, level=logging.ERROR)))
+
+
+if __name__ == '__main__':
+    unittest.main()
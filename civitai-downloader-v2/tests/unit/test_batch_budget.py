@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Batch budget tests.
+Tests shrinking under memory pressure, regrowth with headroom and the pipelines asking for sizes.
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.interfaces.memory_manager import MemoryThresholds
+from core.memory.adaptive_thresholds import AdaptiveThresholds
+from core.memory.batch_budget import BatchBudget
+from core.memory.memory_monitor import MemorySample
+from core.memory.memory_statistics import MemoryStatistics
+from core.stream.intermediate_file_manager import IntermediateFileManager
+
+MB = 1024 * 1024
+
+
+class FakeMonitor:
+    """Memory monitor returning a settable sample."""
+
+    def __init__(self, rss_mb, available_mb=8000):
+        self.set(rss_mb, available_mb)
+
+    def set(self, rss_mb, available_mb=8000):
+        self._sample = MemorySample(0.0, int(rss_mb * MB), int(rss_mb * MB),
+                                    int(available_mb * MB), 16000 * MB)
+
+    def latest(self):
+        return self._sample
+
+    def sample(self):
+        return self._sample
+
+
+class FixedThresholds(AdaptiveThresholds):
+    """Thresholds that do not adapt, so budgets are predictable."""
+
+    def adjust_thresholds(self, current_memory_mb, available_memory_mb, operation_type="general"):
+        return self.get_current_thresholds()
+
+
+class TestBatchBudget(unittest.TestCase):
+    """Test BatchBudget."""
+
+    def setUp(self):
+        self.monitor = FakeMonitor(rss_mb=100)
+        self.statistics = MemoryStatistics()
+        self.budget = BatchBudget(
+            monitor=self.monitor,
+            thresholds=FixedThresholds(MemoryThresholds(warning_threshold_mb=1000)),
+            statistics=self.statistics,
+            headroom_ratio=1.0
+        )
+
+    def test_default_size_with_headroom(self):
+        """Without pressure pipelines run at their configured size."""
+        self.assertEqual(self.budget.next_batch_size('p', 50), 50)
+        self.budget.record_batch('p', 50, 50 * 1024)
+        self.assertEqual(self.budget.next_batch_size('p', 50), 50)
+        self.assertEqual(self.statistics.get_batch_decisions(), [])
+
+    def test_shrinks_before_threshold_and_regrows(self):
+        """Batches shrink as RSS nears the threshold and double back with headroom."""
+        self.budget.next_batch_size('p', 100)
+        self.budget.record_batch('p', 100, 100 * MB)  # 1MB per record
+
+        # 900MB RSS: only 100MB left below the 1000MB threshold
+        self.monitor.set(rss_mb=900)
+        self.assertEqual(self.budget.next_batch_size('p', 100), 100)
+        self.monitor.set(rss_mb=960)
+        self.assertEqual(self.budget.next_batch_size('p', 100), 40)
+        self.monitor.set(rss_mb=1200)
+        self.assertEqual(self.budget.next_batch_size('p', 100, minimum=2), 2)
+
+        self.monitor.set(rss_mb=100)
+        sizes = [self.budget.next_batch_size('p', 100) for _ in range(4)]
+        self.assertEqual(sizes, [4, 8, 16, 32])
+
+        decisions = self.statistics.get_batch_decisions('p')
+        self.assertEqual([d['reason'] for d in decisions[:2]], ['pressure', 'pressure'])
+        self.assertEqual((decisions[0]['old_size'], decisions[0]['new_size']), (100, 40))
+        self.assertEqual(self.statistics.get_operation_statistics('batch_resize')['total_operations'],
+                         len(decisions))
+
+    def test_bytes_per_record_average(self):
+        """Serialized sizes are expanded and averaged across batches."""
+        self.budget.record_batch('p', 10, 1000, serialized=True)
+        self.assertEqual(self.budget.get_pipeline('p').bytes_per_record, 400)
+        self.budget.record_batch('p', 10, 0)
+        self.assertAlmostEqual(self.budget.get_pipeline('p').bytes_per_record, 280)
+
+    def test_intermediate_reader_uses_budget(self):
+        """Intermediate file batches follow the budget and report their size."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = IntermediateFileManager(temp_dir)
+            models = [{'id': i, 'description': 'x' * 1000} for i in range(30)]
+            manager.stream_write_models('s', models, 'raw')
+
+            self.monitor.set(rss_mb=999.98)
+            batches = list(manager.stream_read_models('s', 'raw', 10, batch_budget=self.budget,
+                                                      pipeline='read'))
+            self.assertEqual(sum(len(batch) for batch in batches), 30)
+            self.assertEqual(len(batches[0]), 10)
+            self.assertLess(len(batches[1]), 10)
+            self.assertGreater(self.budget.get_pipeline('read').bytes_per_record,
+                               len(json.dumps(models[0])))
+
+    def test_src_tree_shares_monitor(self):
+        """Imported through src.*, the budget reads the monitor the CLI and exporter use."""
+        sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+        from src.api import streaming_search
+        from src.core.memory import batch_budget, memory_monitor
+        self.assertIs(batch_budget.get_memory_monitor, memory_monitor.get_memory_monitor)
+        self.assertIs(streaming_search.get_batch_budget, batch_budget.get_batch_budget)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -121,6 +121,8 @@ class TestBulkDownloadManager:
         self.mock_download_manager = Mock()
         self.mock_download_manager.create_download_task = Mock(side_effect=lambda **kwargs: f"task-{uuid.uuid4()}")
         self.mock_download_manager.start_download = AsyncMock(return_value=True)
+        self.mock_download_manager.wait_for_slot = AsyncMock()
+        self.mock_download_manager.wait_for_download = AsyncMock()
         self.mock_download_manager.get_task_status = Mock()
         self.mock_download_manager.pause_download = Mock()
         self.mock_download_manager.resume_download = Mock()
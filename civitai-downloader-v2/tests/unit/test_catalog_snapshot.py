@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Catalog snapshot tests.
+Tests for the memory-mapped columnar catalog written by ModelStore after each write batch.
+"""
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.data.catalog_snapshot import CatalogSnapshot, build_catalog_snapshot
+from src.data.model_storage import ModelStorage
+from src.data.model_store import ModelStore, ModelQuery
+
+
+def make_model(model_id, model_type='LORA', base_models=('Illustrious',), tags=('style',),
+               downloads=0, nsfw=False):
+    """Build a minimal API-shaped model with one version per base model."""
+    return {
+        'id': model_id,
+        'name': f'Model {model_id}',
+        'type': model_type,
+        'nsfw': nsfw,
+        'tags': list(tags),
+        'stats': {'downloadCount': downloads},
+        'modelVersions': [{
+            'id': model_id * 10 + i,
+            'name': f'v{i}',
+            'baseModel': base_model,
+            'files': [{
+                'id': model_id * 100 + i,
+                'name': f'model_{model_id}_{i}.safetensors',
+                'hashes': {'SHA256': f'{model_id * 100 + i:064x}'}
+            }]
+        } for i, base_model in enumerate(base_models)]
+    }
+
+
+class TestCatalogSnapshot(unittest.TestCase):
+    """Test snapshot generation and queries against the SQLite answers."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "civitai.db"
+        self.store = ModelStore(self.db_path)
+        self.store.store_models([
+            make_model(3, tags=('style',), downloads=30),
+            make_model(1, model_type='Checkpoint', base_models=('SDXL 1.0', 'Pony'),
+                       tags=('character',), downloads=100),
+            make_model(2, tags=('concept',), downloads=30, nsfw=True),
+            make_model(4, base_models=('Pony',), tags=('style',), downloads=5)
+        ])
+
+    def tearDown(self):
+        self.store._close_snapshot()
+        self.temp_dir.cleanup()
+
+    def sqlite_ids(self, query):
+        sql, params = query.to_sql(columns='m.id')
+        with self.store.get_connection() as conn:
+            return [row[0] for row in conn.execute(sql, params)]
+
+    def test_snapshot_written_after_batch(self):
+        """A write batch regenerates the snapshot file."""
+        self.assertTrue(self.store.snapshot_path.exists())
+        snapshot = self.store.snapshot()
+        self.assertEqual(len(snapshot), 4)
+        self.assertEqual(list(snapshot.ids), [1, 2, 3, 4])
+
+        self.store.store_models([make_model(9)])
+        snapshot = self.store.snapshot()
+        self.assertEqual(len(snapshot), 5)
+        self.assertIn(9, snapshot)
+
+    def test_single_writes_defer_rebuild(self):
+        """store_model() invalidates the snapshot; flush_snapshot() rebuilds it once."""
+        self.store.snapshot()
+        self.store.store_model(make_model(9))
+        self.store.store_model(make_model(10))
+        self.assertIsNone(self.store.snapshot())
+        self.assertEqual(len(self.store.find(ModelQuery())), 6)
+
+        self.assertTrue(self.store.flush_snapshot())
+        self.assertEqual(list(self.store.snapshot().ids), [1, 2, 3, 4, 9, 10])
+        self.assertFalse(self.store.flush_snapshot())
+
+    def test_queries_match_sqlite(self):
+        """Snapshot answers agree with the SQL query layer."""
+        queries = [
+            ModelQuery(),
+            ModelQuery(model_types=['LORA']),
+            ModelQuery(base_model='Pony'),
+            ModelQuery(primary_category='style'),
+            ModelQuery(nsfw=False, order_by='downloads'),
+            ModelQuery(model_ids=[4, 2, 99], model_types=['LORA']),
+            ModelQuery(base_model='Unknown'),
+            ModelQuery(order_by='downloads', limit=2)
+        ]
+        snapshot = self.store.snapshot()
+        for query in queries:
+            self.assertTrue(snapshot.supports(query))
+            self.assertEqual(snapshot.find_ids(query), self.sqlite_ids(query), query)
+            self.assertEqual(snapshot.count(query), len(self.sqlite_ids(
+                ModelQuery(**{**query.__dict__, 'limit': None}))), query)
+
+    def test_unsupported_query_uses_sqlite(self):
+        """Tag filters are answered by SQLite."""
+        query = ModelQuery(tags=['STYLE'])
+        self.assertFalse(self.store.snapshot().supports(query))
+        self.assertEqual(self.store.find_ids(query), [3, 4])
+
+    def test_hash_lookup(self):
+        """File hashes resolve to (model_id, file_id) for duplicate checks."""
+        snapshot = self.store.snapshot()
+        self.assertEqual(snapshot.find_file_by_hash(f'{101:064x}'), (1, 101))
+        self.assertEqual(snapshot.find_file_by_hash(f'{101:064X}'), (1, 101))
+        self.assertIsNone(snapshot.find_file_by_hash(f'{999:064x}'))
+        self.assertIsNone(snapshot.find_file_by_hash('not-a-hash'))
+
+    def test_category_stats(self):
+        """Primary category counts come from the snapshot."""
+        self.assertEqual(self.store.snapshot().primary_category_counts(),
+                         {'style': 2, 'character': 1, 'concept': 1})
+
+    def test_categories_past_bitset_width(self):
+        """Primary categories beyond the 64-bit category bitset are still answered."""
+        models = []
+        for i in range(70):
+            model = make_model(100 + i)
+            model['_processing'] = {'primary_category': f'extra_{i}'}
+            models.append(model)
+        self.store.store_models(models)
+        snapshot = self.store.snapshot()
+        self.assertGreater(len(snapshot.categories), 64)
+        for name in ('extra_0', 'extra_69', 'style'):
+            query = ModelQuery(primary_category=name)
+            self.assertTrue(snapshot.supports(query))
+            self.assertEqual(snapshot.find_ids(query), self.sqlite_ids(query), name)
+        self.assertEqual(snapshot.find_ids(ModelQuery(primary_category='extra_69')), [169])
+        self.assertEqual(snapshot.primary_category_counts()['extra_69'], 1)
+
+    def test_export_selects_ids_from_snapshot(self):
+        """ModelStorage exports take matching ids from the snapshot and read only those rows."""
+        storage = ModelStorage(self.db_path)
+        with patch.object(CatalogSnapshot, 'find_ids', autospec=True,
+                          side_effect=CatalogSnapshot.find_ids) as find_ids:
+            exported = storage.get_models(base_model='Pony', chunk_size=1)
+        find_ids.assert_called_once()
+        self.assertEqual([m['id'] for m in exported], [1, 4])
+        self.assertEqual(exported[0]['_processing']['primary_category'], 'character')
+        self.assertEqual([m['id'] for m in storage.get_models(category='style', limit=1)], [3])
+        self.assertEqual(storage.get_models(category='unknown'), [])
+        storage.store._close_snapshot()
+
+    def test_store_works_without_snapshot(self):
+        """A missing or corrupt snapshot falls back to SQLite."""
+        self.store._close_snapshot()
+        self.store.snapshot_path.write_bytes(b'garbage')
+        self.assertIsNone(self.store.snapshot())
+        self.assertEqual(self.store.count_models(ModelQuery(model_types=['LORA'])), 3)
+        self.assertTrue(self.store.model_exists(4))
+
+        self.store.snapshot_path.unlink()
+        self.assertIsNone(self.store.snapshot())
+        self.assertEqual(self.store.find_ids(ModelQuery(base_model='Pony')), [1, 4])
+
+        self.store.refresh_snapshot()
+        self.assertEqual(len(self.store.snapshot()), 4)
+
+    def test_empty_catalog(self):
+        """An empty database produces a valid empty snapshot."""
+        path = Path(self.temp_dir.name) / "empty.snapshot"
+        with sqlite3.connect(":memory:") as conn:
+            conn.executescript("""
+                CREATE TABLE models (id INTEGER PRIMARY KEY, type TEXT, nsfw BOOLEAN);
+                CREATE TABLE model_stats (model_id INTEGER PRIMARY KEY, download_count INTEGER);
+                CREATE TABLE categories (id INTEGER PRIMARY KEY, name TEXT);
+                CREATE TABLE model_categories (model_id INTEGER, category_id INTEGER, is_primary BOOLEAN);
+                CREATE TABLE model_versions (id INTEGER PRIMARY KEY, model_id INTEGER, base_model TEXT);
+                CREATE TABLE model_files (id INTEGER PRIMARY KEY, model_id INTEGER, sha256 TEXT);
+            """)
+            self.assertEqual(build_catalog_snapshot(conn, path), 0)
+
+        with CatalogSnapshot.open(path) as snapshot:
+            self.assertEqual(len(snapshot), 0)
+            self.assertNotIn(1, snapshot)
+            self.assertEqual(snapshot.find_ids(ModelQuery()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
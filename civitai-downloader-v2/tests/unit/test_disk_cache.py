@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Persistent response cache tests.
+Tests for the disk cache tier, conditional revalidation and stale-while-revalidate.
+"""
+
+import asyncio
+import json
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.api.cache import ENTRY_OVERHEAD
+from src.api.client import CivitaiAPIClient
+from src.api.disk_cache import DiskResponseCache
+
+PAGE = {"items": [{"id": 1, "name": "Model"}], "metadata": {}}
+
+
+def make_response(status_code=200, data=None, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = data
+    response.content = json.dumps(data).encode() if data is not None else b''
+    response.headers = headers or {}
+    return response
+
+
+class TestDiskResponseCache(unittest.TestCase):
+    """Test the SQLite response cache."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiskResponseCache(Path(self.temp_dir.name) / "api_cache.db")
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_store_and_get(self):
+        """Bodies round-trip compressed together with their validators."""
+        self.cache.store("key", PAGE, body=json.dumps(PAGE).encode(), etag='"v1"',
+                         last_modified='Wed, 01 May 2024 00:00:00 GMT')
+        entry = self.cache.get("key")
+        self.assertEqual(entry.data, PAGE)
+        self.assertEqual(entry.validators(), {'If-None-Match': '"v1"',
+                                              'If-Modified-Since': 'Wed, 01 May 2024 00:00:00 GMT'})
+        self.assertIsNone(self.cache.get("missing"))
+
+        # Survives reopening
+        self.cache.close()
+        reopened = DiskResponseCache(self.cache.db_path)
+        self.assertEqual(reopened.get("key").data, PAGE)
+        reopened.close()
+
+    def test_prune_by_size_and_age(self):
+        """Least recently used entries go first once the size limit is exceeded."""
+        payload = {"blob": "".join(chr(33 + (i * 7919) % 90) for i in range(4000))}
+        for i in range(5):
+            self.cache.store(f"key{i}", payload)
+        self.cache.get("key0")
+
+        size = self.cache.get_statistics()['compressed_bytes'] // 5
+        self.cache.max_bytes = size * 3
+        self.assertEqual(self.cache.prune(), 2)
+        self.assertIsNotNone(self.cache.get("key0"))
+        self.assertIsNone(self.cache.get("key1"))
+
+        self.cache.max_age = 0
+        time.sleep(0.01)
+        self.cache.prune()
+        self.assertEqual(self.cache.get_statistics()['entries'], 0)
+
+    def test_hits_defer_access_time_writes(self):
+        """Reads do not write; access times are written on close."""
+        self.cache.store("key", PAGE)
+        conn = self.cache._conn
+        changes = conn.total_changes
+        for _ in range(10):
+            self.cache.get("key")
+        self.assertEqual(conn.total_changes, changes)
+
+        accessed = self.cache._pending_access["key"]
+        self.cache.close()
+        with sqlite3.connect(str(self.cache.db_path)) as check:
+            row = check.execute("SELECT accessed_at FROM api_responses WHERE cache_key = 'key'").fetchone()
+        self.assertEqual(row[0], accessed)
+
+
+class TestTwoTierClient(unittest.IsolatedAsyncioTestCase):
+    """Test CivitaiAPIClient with the persistent cache tier."""
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self.temp_dir.name) / "api_cache.db"
+
+    async def asyncTearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_client(self, **kwargs):
+        client = CivitaiAPIClient(api_key="test", disk_cache_path=self.cache_path, **kwargs)
+        client.rate_limiter.wait = AsyncMock()
+        return client
+
+    async def test_warm_start_from_disk(self):
+        """A new client answers fresh entries from disk without a request."""
+        client = self.make_client()
+        with patch.object(client, '_http_client') as http:
+            http.get = AsyncMock(return_value=make_response(200, PAGE, {'ETag': '"v1"'}))
+            self.assertEqual(await client.get_models({"limit": 10}), PAGE)
+        client.disk_cache.close()
+
+        client = self.make_client()
+        with patch.object(client, '_http_client') as http:
+            http.get = AsyncMock()
+            self.assertEqual(await client.get_models({"limit": 10}), PAGE)
+            http.get.assert_not_called()
+        client.disk_cache.close()
+
+    async def test_disk_hit_counts_body_size(self):
+        """Lazy pages served from disk are counted at their body size in the memory cache."""
+        page = {"items": [{"id": i, "name": "Model", "description": "x" * 1000} for i in range(20)],
+                "metadata": {}}
+        body = json.dumps(page).encode()
+        client = self.make_client()
+        client.disk_cache.store(client.cache.generate_cache_key("models", {"limit": 20}), page, body=body)
+        with patch.object(client, '_http_client') as http:
+            http.get = AsyncMock()
+            result = await client.get_models({"limit": 20}, lazy=True)
+            http.get.assert_not_called()
+        self.assertEqual(len(result['items']), 20)
+        self.assertEqual(client.cache.get_memory_usage(), len(body) + ENTRY_OVERHEAD)
+        client.disk_cache.close()
+
+    async def test_revalidation_with_etag(self):
+        """Expired entries are revalidated with If-None-Match and kept on 304."""
+        client = self.make_client(cache_ttl=0)
+        with patch.object(client, '_http_client') as http:
+            http.get = AsyncMock(return_value=make_response(200, PAGE, {'ETag': '"v1"'}))
+            await client.get_models({"limit": 10})
+
+            http.get = AsyncMock(return_value=make_response(304))
+            self.assertEqual(await client.get_models({"limit": 10}), PAGE)
+            self.assertEqual(http.get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+        self.assertEqual(client.disk_cache.revalidated_count, 1)
+        client.disk_cache.close()
+
+    async def test_stale_while_revalidate(self):
+        """Stale entries are served immediately while a background refresh updates them."""
+        client = self.make_client(cache_ttl=0, stale_while_revalidate=3600)
+        updated = {"items": [], "metadata": {"updated": True}}
+        with patch.object(client, '_http_client') as http:
+            http.get = AsyncMock(return_value=make_response(200, PAGE, {'ETag': '"v1"'}))
+            await client.get_models({"limit": 10})
+
+            http.get = AsyncMock(return_value=make_response(200, updated, {'ETag': '"v2"'}))
+            self.assertEqual(await client.get_models({"limit": 10}), PAGE)
+            await asyncio.gather(*client._refresh_tasks.values())
+
+            http.get.assert_called_once()
+        self.assertEqual(client.disk_cache.get(client.cache.generate_cache_key("models", {"limit": 10})).etag,
+                         '"v2"')
+        client.disk_cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Duplicate index tests.
+Tests for bloom-filter-backed duplicate detection over the complete download history (requirement 6.2).
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.data.database import DatabaseManager
+from src.data.history.duplicate_index import BloomFilter, DuplicateIndex
+from src.data.history.manager import HistoryManager
+
+
+def download(model_id, file_id, sha256=None, status='completed'):
+    return {
+        'model_id': model_id,
+        'file_id': file_id,
+        'file_name': f'{model_id}_{file_id}.safetensors',
+        'hash_sha256': sha256,
+        'status': status
+    }
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Test the bloom filter."""
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [f"p:{i}:{i * 7}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"m:{i}")
+        false_positives = sum(f"m:{i}" in bloom for i in range(1000, 11000))
+        self.assertLess(false_positives / 10000, 0.03)
+
+
+class TestDuplicateIndex(unittest.TestCase):
+    """Test history-wide duplicate detection."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(Path(self.temp_dir.name) / "history.db")
+        self.add_models(range(25))
+
+    def add_models(self, model_ids):
+        """downloads.model_id references models(id)."""
+        with self.db_manager.get_connection() as conn:
+            conn.executemany("INSERT OR IGNORE INTO models (id, name) VALUES (?, ?)",
+                             [(i, f'Model {i}') for i in model_ids])
+            conn.commit()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_old_downloads_are_detected(self):
+        """Downloads beyond the old 10,000-row cache window are still duplicates."""
+        self.add_models(range(10050))
+        with self.db_manager.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO downloads (model_id, file_id, file_name, status, downloaded_at)
+                VALUES (?, ?, ?, 'completed', ?)
+            """, [(i, i, f'f{i}', f'2024-01-01T00:00:{i % 60:02d}') for i in range(10050)])
+            conn.commit()
+
+        history = HistoryManager(self.db_manager)
+        self.assertTrue(history.prevent_duplicates(0, 0))
+        self.assertTrue(history.prevent_duplicates(10049, 10049))
+        self.assertFalse(history.prevent_duplicates(0, 1))
+
+    def test_negative_answers_skip_database(self):
+        """Bloom filter misses do not query the database."""
+        history = HistoryManager(self.db_manager)
+        history.record_download(download(1, 10))
+
+        with patch.object(self.db_manager, 'is_downloaded', wraps=self.db_manager.is_downloaded) as exact:
+            self.assertFalse(history.prevent_duplicates(2, 20))
+            exact.assert_not_called()
+            self.assertTrue(history.prevent_duplicates(1, 10))
+            exact.assert_called_once_with(1, 10)
+
+    def test_hash_duplicates(self):
+        """Completed downloads are also indexed by SHA256."""
+        history = HistoryManager(self.db_manager)
+        history.record_download(download(1, 10, sha256='ab' * 32))
+        history.record_download(download(2, 20, sha256='cd' * 32, status='failed'))
+
+        self.assertTrue(history.is_hash_downloaded('AB' * 32))
+        self.assertFalse(history.is_hash_downloaded('cd' * 32))
+        self.assertFalse(history.is_hash_downloaded(''))
+
+    def test_filter_already_downloaded(self):
+        """Batch API returns the already downloaded subset."""
+        history = HistoryManager(self.db_manager)
+        history.record_download(download(1, 10))
+        history.record_download(download(3, 30))
+        history.record_download(download(4, 40, status='failed'))
+
+        self.assertEqual(history.filter_already_downloaded([1, 2, 3, 4]), {1, 3})
+        self.assertEqual(history.filter_already_downloaded([(1, 10), (1, 11), (3, None)]),
+                         {(1, 10), (3, None)})
+        self.assertEqual(history.filter_already_downloaded([]), set())
+
+    def test_index_persisted_and_caught_up(self):
+        """A restart loads the saved filter and only adds newer rows."""
+        HistoryManager(self.db_manager).record_download(download(1, 10))
+        index_path = Path(self.temp_dir.name) / "history.dupbloom"
+        self.assertTrue(index_path.exists())
+
+        # Recorded by another process after the index was saved
+        self.db_manager.record_download(download(2, 20))
+
+        history = HistoryManager(self.db_manager)
+        stats = history.duplicate_index.get_stats()
+        self.assertTrue(stats['loaded'])
+        self.assertEqual(stats['watermark'], 2)
+        self.assertTrue(history.prevent_duplicates(1, 10))
+        self.assertTrue(history.prevent_duplicates(2, 20))
+
+    def test_cleared_index_falls_back_to_database(self):
+        """Without a loaded filter every check is exact."""
+        history = HistoryManager(self.db_manager)
+        self.db_manager.record_download(download(5, 50))
+        history.clear_cache()
+        self.assertTrue(history.prevent_duplicates(5, 50))
+
+        history.refresh_cache()
+        self.assertTrue(history.duplicate_index.loaded)
+        self.assertTrue(history.prevent_duplicates(5, 50))
+
+    def test_grows_past_capacity(self):
+        """The filter is rebuilt larger once it exceeds its capacity."""
+        index = DuplicateIndex(self.db_manager, capacity=10)
+        for i in range(20):
+            self.db_manager.record_download(download(i, i))
+        index.load()
+        self.assertGreater(index.get_stats()['capacity'], 10)
+        self.assertEqual(index.filter_already_downloaded(range(25)), set(range(20)))
+
+
+if __name__ == '__main__':
+    unittest.main()
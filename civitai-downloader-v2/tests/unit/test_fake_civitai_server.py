@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Fake CivitAI server tests.
+Tests cursor pagination, Range downloads, injected 429s and dropped connections,
+and a DownloadManager download against the server.
+"""
+
+import asyncio
+import hashlib
+import http.client
+import json
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.api.client import CivitaiAPIClient
+from src.core.download.manager import DownloadManager, DownloadStatus, create_file_info_from_api
+from src.core.performance.fake_civitai import FakeCivitaiConfig, FakeCivitaiServer, MB, file_sha256
+
+
+def fetch(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, response.headers, response.read()
+
+
+class TestFakeCivitaiServer(unittest.TestCase):
+    """Test FakeCivitaiServer endpoints."""
+
+    def test_cursor_pagination(self):
+        """Pages follow nextCursor until the catalog is exhausted."""
+        with FakeCivitaiServer(FakeCivitaiConfig(models=7, file_size=64 * 1024)) as server:
+            ids, url = [], f"{server.api_url}/models?limit=3"
+            while url:
+                _, _, body = fetch(url)
+                page = json.loads(body)
+                ids.extend(model['id'] for model in page['items'])
+                url = page['metadata'].get('nextPage')
+            self.assertEqual(ids, list(range(1, 8)))
+
+            _, _, body = fetch(f"{server.api_url}/models?limit=3&page=2")
+            self.assertEqual([model['id'] for model in json.loads(body)['items']], [4, 5, 6])
+            self.assertEqual(server.stats()['api_requests'], 4)
+
+    def test_range_download(self):
+        """Files match the advertised hash and Range requests get 206 partial content."""
+        with FakeCivitaiServer(FakeCivitaiConfig(models=2, file_size=MB)) as server:
+            _, _, body = fetch(f"{server.api_url}/models?limit=1")
+            file_data = json.loads(body)['items'][0]['modelVersions'][0]['files'][0]
+            self.assertEqual(file_data['sizeKB'], 1024)
+
+            status, _, content = fetch(file_data['downloadUrl'])
+            self.assertEqual(status, 200)
+            self.assertEqual(hashlib.sha256(content).hexdigest().upper(), file_data['hashes']['SHA256'])
+
+            status, headers, tail = fetch(file_data['downloadUrl'], {'Range': 'bytes=1000-'})
+            self.assertEqual(status, 206)
+            self.assertEqual(headers['Content-Range'], f'bytes 1000-{MB - 1}/{MB}')
+            self.assertEqual(tail, content[1000:])
+
+    def test_rate_limit_and_flaky_links(self):
+        """Every Nth API request gets 429 with Retry-After; flaky files drop their first download."""
+        config = FakeCivitaiConfig(models=4, file_size=MB, rate_limit_every=2, retry_after=3, flaky_every=2)
+        with FakeCivitaiServer(config) as server:
+            fetch(f"{server.api_url}/models")
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                fetch(f"{server.api_url}/models")
+            self.assertEqual(context.exception.code, 429)
+            self.assertEqual(context.exception.headers['Retry-After'], '3')
+
+            url = f"{server.base_url}/api/download/models/100002"
+            with self.assertRaises(http.client.IncompleteRead):
+                fetch(url)
+            self.assertEqual(len(fetch(url)[2]), MB)
+            self.assertEqual(server.stats()['dropped_connections'], 1)
+
+
+class TestClientsAgainstFakeServer(unittest.TestCase):
+    """Test the API client and DownloadManager against the fake server."""
+
+    def test_api_client_reports_429(self):
+        """The API client surfaces the Retry-After of a 429."""
+        config = FakeCivitaiConfig(models=3, file_size=64 * 1024, rate_limit_every=1, retry_after=7)
+
+        async def run(api_url):
+            client = CivitaiAPIClient(base_url=api_url, requests_per_second=100)
+            try:
+                await client.get_models({'limit': 1})
+            finally:
+                await client.close()
+
+        with FakeCivitaiServer(config) as server:
+            with self.assertRaisesRegex(Exception, 'Retry after 7'):
+                asyncio.run(run(server.api_url))
+
+    def test_download_manager_download(self):
+        """DownloadManager downloads and verifies a served file."""
+        config = FakeCivitaiConfig(models=1, file_size=MB)
+
+        async def run(base_url, temp_dir):
+            manager = DownloadManager()
+            manager.temp_dir = Path(temp_dir)
+            file_data = {'id': 200001, 'name': 'bench_model_1.safetensors', 'sizeKB': 1024,
+                         'downloadUrl': f'{base_url}/api/download/models/100001',
+                         'hashes': {'SHA256': file_sha256(MB)}}
+            task_id = manager.create_download_task(create_file_info_from_api(file_data),
+                                                   output_path=Path(temp_dir) / 'model.safetensors')
+            await manager.start_download(task_id)
+            task = manager.tasks[task_id]
+            for _ in range(1000):
+                if task.status in (DownloadStatus.COMPLETED, DownloadStatus.FAILED):
+                    break
+                await asyncio.sleep(0.01)
+            await manager.close()
+            return task
+
+        with FakeCivitaiServer(config) as server, tempfile.TemporaryDirectory() as temp_dir:
+            task = asyncio.run(run(server.base_url, temp_dir))
+            self.assertEqual(task.status, DownloadStatus.COMPLETED, task.error_message)
+            self.assertEqual((Path(temp_dir) / 'model.safetensors').stat().st_size, MB)
+            self.assertEqual(server.stats()['bytes_sent'], MB)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+File inventory tests.
+Tests for incremental hashing, move detection and hash-to-model reconciliation of local files.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.data import file_inventory
+from src.data.file_inventory import FileInventory, hash_file
+from src.data.model_store import ModelStore
+
+
+def sha256_of(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest().upper()
+
+
+class TestFileInventory(unittest.TestCase):
+    """Test the local file inventory."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        base = Path(self.temp_dir.name)
+        self.library = base / "library"
+        (self.library / "LORA" / "style").mkdir(parents=True)
+        self.store = ModelStore(base / "civitai.db")
+        self.inventory = FileInventory(self.store, hash_workers=2)
+
+    def tearDown(self):
+        self.store._close_snapshot()
+        self.temp_dir.cleanup()
+
+    def write(self, relative: str, data: bytes) -> Path:
+        path = self.library / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return path
+
+    def test_hash_file(self):
+        """SHA256 and AutoV2 follow the CivitAI format."""
+        path = self.write("a.safetensors", b"weights")
+        sha256, autov2 = hash_file(path)
+        self.assertEqual(sha256, sha256_of(b"weights"))
+        self.assertEqual(autov2, sha256[:10])
+
+    def test_incremental_rescan(self):
+        """Only new or changed files are hashed again."""
+        self.write("LORA/style/a.safetensors", b"a" * 100)
+        self.write("LORA/style/b.safetensors", b"b" * 100)
+        self.write("LORA/style/notes.txt", b"ignored")
+
+        first = self.inventory.scan(self.library)
+        self.assertEqual((first.files, first.hashed), (2, 2))
+
+        changed = self.write("LORA/style/b.safetensors", b"c" * 200)
+        with patch.object(file_inventory, 'hash_file', wraps=hash_file) as hasher:
+            second = self.inventory.scan(self.library)
+        self.assertEqual((second.unchanged, second.hashed), (1, 1))
+        hasher.assert_called_once_with(changed)
+
+        entries = {Path(e['path']).name: e for e in self.inventory.entries(self.library)}
+        self.assertEqual(entries['b.safetensors']['sha256'], sha256_of(b"c" * 200))
+
+    def test_moved_and_removed_files(self):
+        """Renamed files reuse their hash; deleted files leave the index."""
+        moved = self.write("LORA/style/a.safetensors", b"a" * 100)
+        removed = self.write("LORA/style/b.safetensors", b"b" * 100)
+        self.inventory.scan(self.library)
+
+        target = self.library / "LORA" / "archive" / "a.safetensors"
+        target.parent.mkdir()
+        os.rename(moved, target)
+        removed.unlink()
+
+        with patch.object(file_inventory, 'hash_file', wraps=hash_file) as hasher:
+            result = self.inventory.scan(self.library)
+        hasher.assert_not_called()
+        self.assertEqual((result.moved, result.removed, result.hashed), (1, 1, 0))
+        self.assertEqual([e['path'] for e in self.inventory.entries(self.library)], [str(target)])
+
+    def test_interrupted_scan_keeps_committed_hashes(self):
+        """Files hashed before an interruption are not hashed again."""
+        for i in range(5):
+            self.write(f"LORA/style/{i}.safetensors", bytes([i]) * 100)
+        inventory = FileInventory(self.store, hash_workers=1, commit_every=2)
+
+        calls = []
+
+        def interrupted(path):
+            calls.append(path)
+            if len(calls) == 5:
+                raise KeyboardInterrupt
+            return hash_file(path)
+
+        with patch.object(file_inventory, 'hash_file', side_effect=interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                inventory.scan(self.library)
+        self.assertEqual(len(list(inventory.entries(self.library))), 4)
+
+        result = inventory.scan(self.library)
+        self.assertEqual((result.unchanged, result.hashed), (4, 1))
+
+    def test_reconcile_with_catalog_and_sidecar(self):
+        """Hashes map local files to model/version/file ids; sidecars fill the gaps."""
+        known = self.write("LORA/style/known.safetensors", b"known")
+        self.store.store_model({
+            'id': 1, 'name': 'Known', 'type': 'LORA',
+            'modelVersions': [{
+                'id': 10, 'name': 'v1', 'baseModel': 'Illustrious',
+                'files': [{'id': 100, 'name': known.name, 'hashes': {'SHA256': sha256_of(b"known")}}]
+            }]
+        })
+        self.write("LORA/style/other.safetensors", b"other")
+        (self.library / "LORA" / "style" / "other.civitai.info").write_text(
+            json.dumps({'modelId': 2, 'id': 20}), encoding='utf-8')
+        self.write("LORA/style/orphan.safetensors", b"orphan")
+
+        result = self.inventory.scan(self.library)
+        self.assertEqual(result.resolved, 2)
+
+        entries = {Path(e['path']).name: e for e in self.inventory.entries(self.library)}
+        self.assertEqual((entries['known.safetensors']['model_id'],
+                          entries['known.safetensors']['version_id'],
+                          entries['known.safetensors']['file_id']), (1, 10, 100))
+        self.assertEqual((entries['other.safetensors']['model_id'],
+                          entries['other.safetensors']['version_id']), (2, 20))
+        self.assertIsNone(entries['orphan.safetensors']['model_id'])
+
+        self.assertEqual(self.inventory.resolve_hash(sha256_of(b"known")),
+                         {'model_id': 1, 'version_id': 10, 'file_id': 100})
+        self.assertEqual(self.inventory.resolve_hash(sha256_of(b"known")[:10].lower())['file_id'], 100)
+        self.assertEqual(self.inventory.resolve_hash(sha256_of(b"other"))['model_id'], 2)
+        self.assertIsNone(self.inventory.resolve_hash(sha256_of(b"missing")))
+        self.assertEqual([e['path'] for e in self.inventory.find_by_hash(sha256_of(b"known"))], [str(known)])
+        self.assertEqual(len(self.inventory.files_for_model(1)), 1)
+
+    def test_scan_limited_to_root(self):
+        """Scanning one directory leaves entries of sibling directories untouched."""
+        self.write("a.safetensors", b"a")
+        sibling = Path(self.temp_dir.name) / "library2"
+        sibling.mkdir()
+        (sibling / "b.safetensors").write_bytes(b"b")
+
+        self.inventory.scan(sibling)
+        result = self.inventory.scan(self.library)
+        self.assertEqual(result.removed, 0)
+        self.assertEqual(len(self.inventory.entries()), 2)
+
+    def test_scan_selected_paths(self):
+        """A scan limited to some files hashes only those and keeps the other entries."""
+        a = self.write("LORA/style/a.safetensors", b"a")
+        b = self.write("LORA/style/b.safetensors", b"b")
+        self.inventory.scan(self.library)
+        b.unlink()
+        c = self.write("LORA/style/c.safetensors", b"c")
+
+        result = self.inventory.scan(self.library, paths=[c])
+        self.assertEqual((result.files, result.hashed, result.removed), (1, 1, 0))
+        self.assertEqual(len(self.inventory.entries(self.library)), 3)
+
+        with patch.object(file_inventory, 'hash_file', side_effect=AssertionError("rehashed")):
+            result = self.inventory.scan(self.library, paths=[a])
+        self.assertEqual(result.unchanged, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
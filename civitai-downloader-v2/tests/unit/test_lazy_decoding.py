@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Lazy API page decoding tests.
+Tests records built from response bodies and the client's lazy mode with both cache tiers.
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.api.client import CivitaiAPIClient
+from src.data.model_record import ModelRecord, decode_models_page
+
+
+def make_model(model_id):
+    return {
+        'id': model_id,
+        'name': f'Model {model_id}',
+        'type': 'LORA',
+        'tags': ['style'],
+        'description': '<p>ナイスなモデル</p>',
+        'modelVersions': [
+            {'id': model_id * 10, 'baseModel': 'Illustrious',
+             'files': [{'id': model_id * 100, 'sizeKB': 10.0, 'scannedAt': '2025-01-01'}],
+             'images': [{'url': 'https://example.com/a.jpg', 'meta': {'seed': 1}}]},
+            {'id': model_id * 10 + 1, 'baseModel': 'Pony', 'files': []},
+        ],
+    }
+
+
+PAGE = {'items': [make_model(1), make_model(2)], 'metadata': {'nextCursor': 'abc'}}
+
+
+def make_response(data):
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = data
+    response.content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+class TestDecodeModelsPage(unittest.TestCase):
+    """Test decode_models_page."""
+
+    def test_items_become_records_over_raw_json(self):
+        """Items are records whose nested fields are read from the item's own JSON text."""
+        page = decode_models_page(make_response(PAGE).content)
+        self.assertEqual(page['metadata'], {'nextCursor': 'abc'})
+        self.assertTrue(all(isinstance(item, ModelRecord) for item in page['items']))
+        self.assertEqual(page['items'], PAGE['items'])
+
+        record = page['items'][1]
+        version = record['modelVersions'][0]
+        self.assertEqual(version['images'][0]['meta'], {'seed': 1})
+        self.assertEqual(version['files'][0]['scannedAt'], '2025-01-01')
+        self.assertEqual(record['description'], '<p>ナイスなモデル</p>')
+        self.assertEqual(version.packed_size, 0)
+
+        # Filtering versions keeps the untouched fields of the survivors
+        narrowed = record.copy()
+        narrowed['modelVersions'] = [v for v in narrowed['modelVersions'] if v['baseModel'] == 'Pony']
+        self.assertEqual(narrowed.to_dict()['modelVersions'], [make_model(2)['modelVersions'][1]])
+
+    def test_other_layouts_fall_back(self):
+        """Bodies without an items array decode as plain JSON."""
+        self.assertEqual(decode_models_page(b'{"items": [], "metadata": {}}'), {'items': [], 'metadata': {}})
+        self.assertEqual(decode_models_page(b'[1, 2]'), [1, 2])
+        with self.assertRaises(ValueError):
+            decode_models_page(b'{"items": [1,')
+
+
+class TestClientLazyMode(unittest.IsolatedAsyncioTestCase):
+    """Test CivitaiAPIClient.get_models(lazy=True)."""
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self.temp_dir.name) / "api_cache.db"
+
+    async def asyncTearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_client(self):
+        client = CivitaiAPIClient(api_key="test", disk_cache_path=self.cache_path)
+        client.rate_limiter.wait = AsyncMock()
+        return client
+
+    async def test_lazy_and_full_pages(self):
+        """Lazy and full decoding share the disk body but not the memory entry."""
+        client = self.make_client()
+        with patch.object(client, '_http_client') as http:
+            http.get = AsyncMock(return_value=make_response(PAGE))
+            lazy = await client.get_models({'limit': 2}, lazy=True)
+            self.assertIsInstance(lazy['items'][0], ModelRecord)
+            response = http.get.return_value
+            response.json.assert_not_called()
+
+            # Full decoding is answered from the shared disk body
+            full = await client.get_models({'limit': 2})
+            self.assertIsInstance(full['items'][0], dict)
+            self.assertEqual(full, PAGE)
+            self.assertEqual(http.get.call_count, 1)
+        client.disk_cache.close()
+
+        # A new client decodes the disk body lazily without a request
+        client = self.make_client()
+        with patch.object(client, '_http_client') as http:
+            http.get = AsyncMock()
+            page = await client.get_models({'limit': 2}, lazy=True)
+            http.get.assert_not_called()
+        self.assertIsInstance(page['items'][1], ModelRecord)
+        self.assertEqual(page['items'], PAGE['items'])
+        client.disk_cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
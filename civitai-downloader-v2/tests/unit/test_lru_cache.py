@@ -314,4 +314,53 @@ class TestLRUCache:
         
         # Cache size should reflect expired item removal
         if hasattr(cache, 'get_cache_size'):
-            assert cache.get_cache_size() == 0, "Expired items should not count in cache size"
\ No newline at end of file
+            assert cache.get_cache_size() == 0, "Expired items should not count in cache size"
+    
+    def test_memory_usage_running_total(self):
+        """Test that the running size total tracks inserts, replacements and removals."""
+        cache_path = self.api_dir / "cache.py"
+        spec = importlib.util.spec_from_file_location("cache", cache_path)
+        cache_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cache_module)
+        
+        ResponseCache = cache_module.ResponseCache
+        cache = ResponseCache(ttl_seconds=3600, max_size=3)
+        overhead = cache_module.ENTRY_OVERHEAD
+        
+        cache.store("a", {"items": [1, 2, 3]}, size=1000)
+        cache.store("b", "x" * 500)
+        assert cache.get_memory_usage() == 1500 + 2 * overhead
+        
+        # Replacing an entry does not double count
+        cache.store("a", {"items": []}, size=100)
+        assert cache.get_memory_usage() == 600 + 2 * overhead
+        
+        # LRU eviction subtracts the evicted entry
+        cache.store("c", "y" * 10)
+        cache.store("d", "z" * 20)
+        assert cache.get_cache_size() == 3
+        assert cache.get_memory_usage() == 130 + 3 * overhead
+        
+        expected = sum(entry['size'] for entry in cache.cache.values())
+        assert cache.get_memory_usage() == expected + len(cache.cache) * overhead
+        
+        cache.clear()
+        assert cache.get_memory_usage() == 0
+    
+    def test_memory_pressure_eviction_uses_running_total(self):
+        """Test that memory pressure eviction keeps usage under the threshold."""
+        cache_path = self.api_dir / "cache.py"
+        spec = importlib.util.spec_from_file_location("cache", cache_path)
+        cache_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cache_module)
+        
+        ResponseCache = cache_module.ResponseCache
+        cache = ResponseCache(ttl_seconds=3600, max_size=10000, memory_threshold=10 * 1024)
+        
+        for i in range(1000):
+            cache.store(f"key_{i}", {"id": i, "payload": "p" * 100})
+            assert cache.get_memory_usage() <= 10 * 1024
+        
+        assert cache.memory_pressure_evictions > 0
+        assert cache.get("key_999") is not None, "Most recent entry should survive"
+        assert cache.get("key_0") is None, "Oldest entries should be evicted"
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Memory monitor tests.
+Tests sampled memory telemetry, cgroup v2 limits and the sampler thread.
+"""
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.interfaces.memory_manager import MemoryPressure
+from core.memory.memory_manager_impl import MemoryManagerImpl
+from core.memory.memory_monitor import MemoryMonitor, read_cgroup_memory
+
+MB = 1024 * 1024
+
+
+class TestMemoryMonitor(unittest.TestCase):
+    """Test MemoryMonitor."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cgroup_root = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_cgroup(self, limit, current):
+        (self.cgroup_root / "memory.max").write_text(f"{limit}\n")
+        (self.cgroup_root / "memory.current").write_text(f"{current}\n")
+
+    def test_cgroup_v2_limit(self):
+        """Available memory and total are capped by the cgroup v2 limit."""
+        self.assertIsNone(read_cgroup_memory(self.cgroup_root))
+        self.write_cgroup("max", 0)
+        self.assertIsNone(read_cgroup_memory(self.cgroup_root))
+
+        self.write_cgroup(512 * MB, 412 * MB)
+        sample = MemoryMonitor(cgroup_root=self.cgroup_root).latest()
+        self.assertEqual(sample.cgroup_limit_bytes, 512 * MB)
+        self.assertLessEqual(sample.available_bytes, 100 * MB)
+        self.assertLessEqual(sample.total_bytes, 512 * MB)
+
+    def test_pressure_inside_container(self):
+        """A nearly full container is critical even if the host has free memory."""
+        self.write_cgroup(512 * MB, 480 * MB)
+        manager = MemoryManagerImpl(monitor=MemoryMonitor(cgroup_root=self.cgroup_root))
+        self.assertEqual(manager.get_memory_usage().pressure_level, MemoryPressure.CRITICAL)
+
+    def test_readers_use_latest_sample(self):
+        """latest() returns the published sample until the sampler replaces it."""
+        monitor = MemoryMonitor(interval=0.01, cgroup_root=self.cgroup_root)
+        monitor.start()
+        try:
+            first = monitor.latest()
+            self.assertIs(monitor.latest(), first)
+            deadline = time.time() + 2
+            while monitor.latest() is first and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertIsNot(monitor.latest(), first)
+            self.assertGreaterEqual(monitor.latest().peak_rss_bytes, monitor.latest().rss_bytes)
+        finally:
+            monitor.stop()
+        self.assertFalse(monitor.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Metrics exporter tests.
+Tests the Prometheus/OpenMetrics text, the HTTP endpoint and the component gauges.
+"""
+
+import gc
+import math
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.api.cache import ResponseCache
+from src.api.rate_limiter import RateLimiter
+from src.core.memory.memory_monitor import MemorySample
+from src.core.performance.exporter import (
+    MetricsServer, render_metrics, bind_component_gauges,
+    CACHE_HIT_RATIO, CIRCUIT_BREAKER_STATE, MEMORY_PRESSURE, RATE_LIMITER_TOKENS
+)
+from src.core.performance.metrics import MetricsRegistry
+from src.core.reliability.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class FakeClient:
+    def __init__(self):
+        self.rate_limiter = RateLimiter(requests_per_second=0.5)
+        self.cache = ResponseCache()
+
+
+class FakeMonitor:
+    def latest(self):
+        return MemorySample(0.0, 300, 300, 700, 1000)
+
+
+class TestRenderMetrics(unittest.TestCase):
+    """Test render_metrics."""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.counter('download_bytes_total', description="Bytes written").inc(2048)
+        self.registry.gauge('queue_depth', {'queue': 'downloads'}).set(3)
+        histogram = self.registry.histogram('api_request_seconds', {'endpoint': 'models'})
+        for value in (0.1, 0.2, 0.4):
+            histogram.record(value)
+
+    def test_prometheus_text(self):
+        """Counters, gauges and histogram summaries use the Prometheus text format."""
+        text = render_metrics(self.registry)
+        self.assertIn('# HELP civitai_download_bytes_total Bytes written\n', text)
+        self.assertIn('# TYPE civitai_download_bytes_total counter\n', text)
+        self.assertIn('civitai_download_bytes_total 2048\n', text)
+        self.assertIn('civitai_queue_depth{queue="downloads"} 3\n', text)
+        self.assertIn('# TYPE civitai_api_request_seconds summary\n', text)
+        self.assertIn('civitai_api_request_seconds{endpoint="models",quantile="0.5"} 0.2', text)
+        self.assertIn('civitai_api_request_seconds_count{endpoint="models"} 3\n', text)
+        self.assertFalse(text.rstrip().endswith('# EOF'))
+
+    def test_openmetrics_text(self):
+        """OpenMetrics names counter families without _total and ends with EOF."""
+        text = render_metrics(self.registry, openmetrics=True)
+        self.assertIn('# TYPE civitai_download_bytes counter\n', text)
+        self.assertIn('civitai_download_bytes_total 2048\n', text)
+        self.assertTrue(text.endswith('# EOF\n'))
+
+
+class TestMetricsServer(unittest.TestCase):
+    """Test MetricsServer."""
+
+    def test_serves_metrics(self):
+        """The endpoint serves the registry and 404s elsewhere."""
+        registry = MetricsRegistry()
+        registry.gauge('queue_depth').set(5)
+        with MetricsServer(port=0, registry=registry) as server:
+            with urllib.request.urlopen(server.url, timeout=5) as response:
+                body = response.read().decode('utf-8')
+                self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+            self.assertIn('civitai_queue_depth 5\n', body)
+
+            request = urllib.request.Request(server.url, headers={'Accept': 'application/openmetrics-text'})
+            with urllib.request.urlopen(request, timeout=5) as response:
+                self.assertTrue(response.read().endswith(b'# EOF\n'))
+
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(server.url.replace('/metrics', '/other'), timeout=5)
+        self.assertIsNone(server.port)
+
+
+class TestComponentGauges(unittest.TestCase):
+    """Test bind_component_gauges."""
+
+    def test_component_state_read_at_scrape(self):
+        """Gauges follow the components and go NaN once they are gone."""
+        registry = MetricsRegistry()
+        client = FakeClient()
+        breaker = CircuitBreaker('api')
+        monitor = FakeMonitor()
+        bind_component_gauges(registry, client=client, circuit_breakers=[breaker],
+                              memory_monitor=monitor)
+
+        tokens = registry.gauge(RATE_LIMITER_TOKENS)
+        self.assertEqual(tokens.value, 1.0)
+        self.assertTrue(math.isnan(registry.gauge(CACHE_HIT_RATIO, {'cache': 'response'}).value))
+        client.cache.hit_count, client.cache.miss_count = 3, 1
+        self.assertEqual(registry.gauge(CACHE_HIT_RATIO, {'cache': 'response'}).value, 0.75)
+        self.assertAlmostEqual(registry.gauge(MEMORY_PRESSURE).value, 0.3)
+
+        state = registry.gauge(CIRCUIT_BREAKER_STATE, {'circuit': 'api'})
+        self.assertEqual(state.value, 0)
+        breaker.state = CircuitState.OPEN
+        self.assertEqual(state.value, 2)
+
+        del client
+        gc.collect()
+        self.assertTrue(math.isnan(tokens.value))
+        self.assertIn('civitai_rate_limiter_tokens NaN', render_metrics(registry))
+
+
+if __name__ == '__main__':
+    unittest.main()
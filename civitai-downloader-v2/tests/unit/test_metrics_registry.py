@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Metrics registry tests.
+Tests HDR histogram precision, the disabled fast path and the instrumented hot paths.
+"""
+
+import asyncio
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.performance.metrics import (
+    MetricsRegistry, Histogram, get_metrics_registry,
+    DB_WRITE_SECONDS, FILTER_RECORDS_PER_SECOND
+)
+from src.core.reliability.circuit_breaker import CircuitBreaker
+from src.core.reliability.health_check import HealthChecker, HealthStatus
+from src.core.search.search_engine import LocalVersionFilter
+from src.data.model_store import ModelStore
+
+
+class TestHistogram(unittest.TestCase):
+    """Test Histogram."""
+
+    def test_percentiles_within_precision(self):
+        """Percentiles stay within the relative precision over many magnitudes."""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(0, 3) for _ in range(20000)]
+        histogram = Histogram('latency')
+        for value in values:
+            histogram.record(value)
+
+        values.sort()
+        for percent in (1, 50, 90, 99, 99.9):
+            exact = values[max(0, int(len(values) * percent / 100) - 1)]
+            self.assertAlmostEqual(histogram.percentile(percent) / exact, 1.0, delta=0.02)
+        self.assertEqual(histogram.count, 20000)
+        self.assertAlmostEqual(histogram.mean, sum(values) / len(values))
+        self.assertEqual((histogram.min, histogram.max), (values[0], values[-1]))
+        # Bounded memory: one bucket per 1/64 of each power of two at most
+        self.assertLess(len(histogram._buckets), 64 * 40)
+
+    def test_zero_merge_and_buckets(self):
+        """Zeros share a bucket; merged histograms answer as one."""
+        first, second = Histogram('a'), Histogram('b')
+        for value in (0, 0, 1.0, 2.0):
+            first.record(value)
+        second.record(4.0, count=2)
+        first.merge(second)
+
+        self.assertEqual(first.count, 6)
+        self.assertEqual(first.percentile(30), 0.0)
+        self.assertAlmostEqual(first.percentile(100), 4.0)
+        cumulative = [count for _, count in first.buckets()]
+        self.assertEqual(cumulative, [2, 3, 4, 6])
+        self.assertTrue(all(upper >= value for (upper, _), value in zip(first.buckets(), (0, 1, 2, 4))))
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test MetricsRegistry."""
+
+    def test_get_or_create_and_snapshot(self):
+        """Instruments are shared per name and labels and appear in snapshots."""
+        registry = MetricsRegistry()
+        counter = registry.counter('requests', {'status': 200})
+        self.assertIs(registry.counter('requests', {'status': '200'}), counter)
+        counter.inc()
+        registry.gauge('depth').set_function(lambda: 3)
+        with registry.timer('op'):
+            pass
+        registry.record_throughput('mbps', 10, 2)
+
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot['counters'], {'requests{status="200"}': 1})
+        self.assertEqual(snapshot['gauges'], {'depth': 3})
+        self.assertEqual(snapshot['histograms']['op']['count'], 1)
+        self.assertAlmostEqual(snapshot['histograms']['mbps']['max'], 5.0)
+        with self.assertRaises(TypeError):
+            registry.histogram('requests', {'status': 200})
+
+    def test_disabled_registry_records_nothing(self):
+        """Disabled instruments return at once and timer() skips the clock."""
+        registry = MetricsRegistry(enabled=False)
+        histogram = registry.histogram('op')
+        histogram.record(1.0)
+        registry.counter('n').inc()
+        with registry.timer('op'):
+            pass
+        self.assertEqual(histogram.count, 0)
+        self.assertEqual(registry.counter('n').value, 0)
+
+        registry.enable()
+        histogram.record(1.0)
+        self.assertEqual(histogram.count, 1)
+
+
+class TestInstrumentedPaths(unittest.TestCase):
+    """Test that hot paths and readers use the shared registry."""
+
+    def setUp(self):
+        self.registry = get_metrics_registry()
+        self.registry.reset()
+
+    def test_store_and_filter_record(self):
+        """Model writes and local filtering record latency and throughput."""
+        models = [{'id': i, 'name': f'm{i}', 'type': 'LORA',
+                   'modelVersions': [{'id': i * 10, 'baseModel': 'Pony', 'files': []}]}
+                  for i in range(1, 4)]
+        LocalVersionFilter().filter_by_version_criteria(models, base_model='Pony')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ModelStore(Path(temp_dir) / "civitai.db").store_models(models)
+
+        self.assertEqual(self.registry.histogram(DB_WRITE_SECONDS, {'table': 'models'}).count, 1)
+        self.assertEqual(self.registry.histogram(FILTER_RECORDS_PER_SECOND).count, 1)
+
+    def test_circuit_breaker_and_health_check(self):
+        """Circuit call times feed the breaker's average; latency checks read the registry."""
+        breaker = CircuitBreaker('metrics-test')
+
+        async def call():
+            return 1
+
+        asyncio.run(breaker.call(call))
+        self.assertEqual(breaker.metrics.response_time.count, 1)
+        self.assertGreaterEqual(breaker.get_metrics()['average_response_time'], 0.0)
+
+        checker = HealthChecker(registry=MetricsRegistry())
+        metric = asyncio.run(checker._check_request_latency())
+        self.assertIsNone(metric.value)
+
+        checker.registry.histogram('api_request_seconds', {'endpoint': 'models'}).record(12.0)
+        metric = asyncio.run(checker._check_request_latency())
+        self.assertEqual(metric.status, HealthStatus.CRITICAL)
+
+    def test_single_registry_across_import_paths(self):
+        """Modules with a bare-path fallback still record into the src.* registry."""
+        from src.api import client, feature_manager, streaming_search
+        from src.core.download import manager
+        from src.core.reliability import circuit_breaker, health_check
+        from src.ui import dashboard
+        for module in (client, feature_manager, streaming_search, manager,
+                       circuit_breaker, health_check, dashboard):
+            self.assertIs(module.get_metrics_registry, get_metrics_registry, module.__name__)
+
+
+if __name__ == '__main__':
+    unittest.main()
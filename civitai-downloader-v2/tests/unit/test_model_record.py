@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Model record tests.
+Tests the compact slotted model records, their dict compatibility and memory footprint.
+"""
+
+import json
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.search.search_engine import LocalVersionFilter
+from src.core.stream.intermediate_file_manager import IntermediateFileManager
+from src.data.model_record import ModelRecord, VersionRecord, compact_models
+from src.data.model_store import ModelStore
+
+
+def make_model(model_id):
+    """Build an API-shaped model with the bulky fields the API returns."""
+    return {
+        'id': model_id,
+        'name': f'Model {model_id}',
+        'type': 'LORA',
+        'nsfw': False,
+        'tags': ['style', 'anime'],
+        'description': '<p>' + 'A detailed <b>HTML</b> description. ' * 100 + '</p>',
+        'creator': {'username': 'someone', 'image': 'https://example.com/avatar.png'},
+        'stats': {'downloadCount': model_id * 10},
+        'modelVersions': [{
+            'id': model_id * 10 + v,
+            'name': f'v{v}',
+            'baseModel': 'Illustrious' if v == 0 else 'SDXL 1.0',
+            'files': [{
+                'id': model_id * 100 + v,
+                'name': f'model_{model_id}_{v}.safetensors',
+                'sizeKB': 1024.5,
+                'primary': True,
+                'downloadUrl': f'https://civitai.com/api/download/models/{model_id * 10 + v}',
+                'hashes': {'SHA256': 'AB' * 32},
+            }],
+            'images': [{'url': f'https://example.com/{model_id}/{i}.jpg', 'width': 512, 'height': 768,
+                        'meta': {'prompt': 'masterpiece, best quality, ' * 20, 'seed': i}}
+                       for i in range(5)],
+        } for v in range(2)],
+    }
+
+
+class TestModelRecord(unittest.TestCase):
+    """Test ModelRecord."""
+
+    def test_reads_like_api_dict(self):
+        """Slotted and packed fields read through the dict interface."""
+        model = make_model(1)
+        record = ModelRecord(model)
+
+        self.assertEqual(record['id'], 1)
+        self.assertEqual(record.get('type'), 'LORA')
+        self.assertIsInstance(record['modelVersions'][0], VersionRecord)
+        self.assertEqual(record['modelVersions'][0]['files'][0]['hashes']['SHA256'], 'AB' * 32)
+        self.assertEqual(record['description'], model['description'])
+        self.assertEqual(record['modelVersions'][1]['images'][0]['width'], 512)
+        self.assertIsNone(record.get('missing'))
+        self.assertNotIn('missing', record)
+        self.assertEqual(record, model)
+        self.assertEqual(record.to_dict(), model)
+        self.assertEqual(json.loads(record.to_json()), model)
+        self.assertFalse(hasattr(record, '__dict__'))
+
+    def test_copy_and_update(self):
+        """Copies share packed fields; assignments do not touch the original."""
+        record = ModelRecord(make_model(2))
+        clone = record.copy()
+        clone['modelVersions'] = clone['modelVersions'][:1]
+        clone['_processing'] = {'primary_category': 'style'}
+
+        self.assertEqual(len(record['modelVersions']), 2)
+        self.assertNotIn('_processing', record)
+        data = clone.to_dict()
+        self.assertEqual([v['id'] for v in data['modelVersions']], [20])
+        self.assertEqual(data['_processing'], {'primary_category': 'style'})
+        self.assertEqual(data['description'], record['description'])
+
+    def test_version_filter_keeps_records(self):
+        """LocalVersionFilter narrows records without decoding them."""
+        records = compact_models([make_model(1), make_model(2)])
+        filtered, stats = LocalVersionFilter().filter_by_version_criteria(records, base_model='Illustrious')
+        self.assertEqual(stats['versions_removed'], 2)
+        self.assertIsInstance(filtered[0], ModelRecord)
+        self.assertEqual([v['baseModel'] for v in filtered[0]['modelVersions']], ['Illustrious'])
+
+    def test_memory_footprint(self):
+        """Records take a fraction of the memory of the API dicts."""
+        payload = json.dumps([make_model(i) for i in range(300)])
+
+        tracemalloc.start()
+        dicts = json.loads(payload)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        records = compact_models(json.loads(payload))
+        record_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        self.assertEqual(len(records), len(dicts))
+        self.assertLess(record_bytes * 4, dict_bytes)
+
+    def test_storage_and_intermediate_files(self):
+        """The model store and intermediate files accept records."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = ModelStore(Path(temp_dir) / "civitai.db")
+            self.assertEqual(store.store_models(compact_models([make_model(3)])), (1, 0))
+            self.assertEqual(store.get_model(3)['description'], make_model(3)['description'])
+
+            manager = IntermediateFileManager(temp_dir)
+            manager.stream_write_models('s', [ModelRecord(make_model(4))], 'raw')
+            batch = next(manager.stream_read_models('s', 'raw', records=True))
+            self.assertIsInstance(batch[0], ModelRecord)
+            self.assertEqual(batch[0].to_dict(), make_model(4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Model resolver tests.
+Tests for batched model-by-ID resolution through the local store, cache and API.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.api.client import CivitaiAPIClient
+from src.api.model_resolver import ModelResolver
+from src.data.model_store import ModelStore
+
+
+def model(model_id: int) -> dict:
+    return {'id': model_id, 'name': f'Model {model_id}', 'type': 'LORA',
+            'modelVersions': [{'id': model_id * 10, 'name': 'v1', 'baseModel': 'Illustrious', 'files': []}]}
+
+
+class TestModelResolver(unittest.IsolatedAsyncioTestCase):
+    """Test the batched model resolver."""
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = ModelStore(Path(self.temp_dir.name) / "civitai.db")
+        self.store.store_model(model(1))
+        self.client = CivitaiAPIClient(api_key="test")
+        self.client.rate_limiter.wait = AsyncMock()
+        self.requests = []
+
+    async def asyncTearDown(self):
+        self.store._close_snapshot()
+        self.temp_dir.cleanup()
+
+    async def fake_get(self, url, params=None, **kwargs):
+        self.requests.append(list(params['ids']))
+        response = Mock()
+        response.status_code = 200
+        response.json.return_value = {'items': [model(i) for i in params['ids'] if i != 999],
+                                      'metadata': {}}
+        response.content = b'{}'
+        response.headers = {}
+        return response
+
+    async def test_resolves_in_chunks_after_local_lookup(self):
+        """Local models need no request; the rest are fetched 100 ids at a time."""
+        resolver = ModelResolver(self.client, self.store)
+        ids = [1] + list(range(2, 152)) + [999, 2]
+
+        with patch.object(self.client, '_http_client') as http:
+            http.get = AsyncMock(side_effect=self.fake_get)
+            resolved = [(model_id, data) async for model_id, data in resolver.resolve(ids)]
+
+        self.assertEqual([len(chunk) for chunk in self.requests], [100, 51])
+        self.assertNotIn(1, self.requests[0])
+        self.assertEqual(len(resolved), 152)
+        self.assertEqual(resolved[0], (1, self.store.get_model(1)))
+        self.assertEqual(dict(resolved)[999], None)
+        self.assertEqual(resolver.errors, {999: "Model not found"})
+        self.assertEqual(resolver.stats['local'], 1)
+        self.assertEqual(resolver.stats['fetched'], 150)
+
+        # Fetched models were stored locally
+        self.assertEqual(self.store.get_model(151)['name'], 'Model 151')
+
+    async def test_cached_models_skip_requests(self):
+        """Models resolved earlier in the process come from the response cache."""
+        resolver = ModelResolver(self.client)
+        with patch.object(self.client, '_http_client') as http:
+            http.get = AsyncMock(side_effect=self.fake_get)
+            [item async for item in resolver.resolve([5, 6])]
+            resolved = [item async for item in ModelResolver(self.client).resolve([6, 5])]
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual([model_id for model_id, _ in resolved], [6, 5])
+
+    async def test_failed_chunk_is_reported(self):
+        """A failed request marks its ids as unresolved instead of aborting."""
+        resolver = ModelResolver(self.client)
+        with patch.object(self.client, '_http_client') as http:
+            http.get = AsyncMock(side_effect=RuntimeError("boom"))
+            resolved = [item async for item in resolver.resolve([7, 8])]
+
+        self.assertEqual(resolved, [(7, None), (8, None)])
+        self.assertIn("boom", resolver.errors[7])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Canonical model store tests.
+Tests for versioned schema migrations, single-write storage and the shared query layer.
+"""
+
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.adaptability.migration import SchemaMigration, SchemaMigrator
+from src.data.model_store import ModelStore, ModelQuery, MODEL_STORE_MIGRATIONS
+from src.data.optimized_schema import OptimizedDatabase
+from src.data.database import DatabaseManager
+from src.data.model_storage import ModelStorage
+
+
+def make_model(model_id, model_type='LORA', base_model='Illustrious', tags=('style',), downloads=0):
+    """Build a minimal API-shaped model."""
+    return {
+        'id': model_id,
+        'name': f'Model {model_id}',
+        'type': model_type,
+        'nsfw': False,
+        'tags': list(tags),
+        'createdAt': f'2025-01-{model_id % 28 + 1:02d}T00:00:00Z',
+        'creator': {'id': 1, 'username': 'creator'},
+        'stats': {'downloadCount': downloads},
+        'modelVersions': [{
+            'id': model_id * 10,
+            'name': 'v1',
+            'baseModel': base_model,
+            'files': [{
+                'id': model_id * 100,
+                'name': f'model_{model_id}.safetensors',
+                'sizeKB': 1024,
+                'primary': True,
+                'hashes': {'SHA256': f'{model_id:064x}', 'AutoV2': f'{model_id:010x}'}
+            }]
+        }]
+    }
+
+
+class TestSchemaMigrator(unittest.TestCase):
+    """Test versioned schema migrations."""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_applies_pending_migrations_once(self):
+        """Migrations are applied in order and recorded."""
+        migrator = SchemaMigrator("test", [
+            SchemaMigration(2, "add column", ["ALTER TABLE t ADD COLUMN b TEXT"]),
+            SchemaMigration(1, "create table", ["CREATE TABLE t (a INTEGER)"])
+        ])
+
+        self.assertEqual(migrator.migrate(self.conn), 2)
+        self.assertEqual(migrator.get_version(self.conn), 2)
+        self.assertEqual(migrator.pending_migrations(self.conn), [])
+        # Running again is a no-op (ALTER would fail if re-applied)
+        self.assertEqual(migrator.migrate(self.conn), 2)
+
+    def test_failed_migration_is_rolled_back(self):
+        """A failing migration leaves no partial state and no version record."""
+        migrator = SchemaMigrator("test", [
+            SchemaMigration(1, "broken", ["CREATE TABLE t (a INTEGER)", "NOT SQL"])
+        ])
+
+        with self.assertRaises(sqlite3.Error):
+            migrator.migrate(self.conn)
+
+        self.assertEqual(migrator.get_version(self.conn), 0)
+        tables = [r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE name = 't'")]
+        self.assertEqual(tables, [])
+
+    def test_duplicate_versions_rejected(self):
+        """Duplicate version numbers are a programming error."""
+        with self.assertRaises(ValueError):
+            SchemaMigrator("test", [SchemaMigration(1, "a"), SchemaMigration(1, "b")])
+
+
+class TestModelStore(unittest.TestCase):
+    """Test canonical model storage and queries."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "civitai.db"
+        self.store = ModelStore(self.db_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_schema_at_latest_version(self):
+        """Opening a store migrates the database to the latest version."""
+        with self.store.get_connection() as conn:
+            version = SchemaMigrator(ModelStore.SCHEMA_NAME, MODEL_STORE_MIGRATIONS).get_version(conn)
+        self.assertEqual(version, MODEL_STORE_MIGRATIONS[-1].version)
+
+    def test_store_and_query(self):
+        """Models are written once to normalized tables and read back via ModelQuery."""
+        saved, skipped = self.store.store_models([
+            make_model(1, tags=('style', 'anime')),
+            make_model(2, model_type='Checkpoint', base_model='SDXL 1.0', tags=('character',)),
+            make_model(3, tags=('Concept',))
+        ])
+        self.assertEqual((saved, skipped), (3, 0))
+
+        self.assertEqual(self.store.count_models(), 3)
+        self.assertEqual(self.store.find_ids(ModelQuery(model_types=['LORA'])), [1, 3])
+        self.assertEqual(self.store.find_ids(ModelQuery(base_model='SDXL 1.0')), [2])
+        self.assertEqual(self.store.find_ids(ModelQuery(tags=['STYLE', 'concept'])), [1, 3])
+        self.assertEqual(self.store.find_ids(ModelQuery(primary_category='character')), [2])
+        self.assertEqual(self.store.get_model(1)['modelVersions'][0]['baseModel'], 'Illustrious')
+
+        with self.store.get_connection() as conn:
+            files = conn.execute("SELECT model_id, sha256 FROM model_files ORDER BY id").fetchall()
+        self.assertEqual(len(files), 3)
+        self.assertEqual(files[0]['sha256'], f'{1:064x}'.upper())
+
+    def test_update_keeps_child_rows(self):
+        """Re-storing a model updates it in place without dropping its relations."""
+        self.store.store_model(make_model(1, downloads=5))
+        updated = make_model(1, downloads=50)
+        updated['name'] = 'Renamed'
+        self.store.store_model(updated)
+
+        self.assertEqual(self.store.count_models(), 1)
+        self.assertEqual(self.store.get_model(1)['name'], 'Renamed')
+        self.assertEqual(self.store.find_ids(ModelQuery(primary_category='style')), [1])
+        with self.store.get_connection() as conn:
+            downloads = conn.execute("SELECT download_count FROM model_stats WHERE model_id = 1").fetchone()[0]
+        self.assertEqual(downloads, 50)
+
+    def test_skip_existing(self):
+        """skip_existing leaves stored models untouched."""
+        self.store.store_model(make_model(1))
+        saved, skipped = self.store.store_models([make_model(1), make_model(2)], skip_existing=True)
+        self.assertEqual((saved, skipped), (1, 1))
+
+    def test_search_cache_info(self):
+        """Search cache metadata lives in the canonical schema."""
+        self.assertIsNone(self.store.get_cache_info("LORA|style"))
+        self.store.update_cache_info("LORA|style", "42", 10, 1000.0)
+        self.assertEqual(self.store.get_cache_info("LORA|style"),
+                         {'timestamp': 1000.0, 'latest_model_id': '42', 'model_count': 10})
+
+
+class TestLegacyImport(unittest.TestCase):
+    """Test migration of databases written by the previous stores."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "civitai.db"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_optimized_database_rows_imported(self):
+        """OptimizedDatabase JSON-blob rows are folded into the canonical tables."""
+        legacy = OptimizedDatabase(str(self.db_path))
+        legacy.store_model(make_model(7, tags=('style',)))
+        legacy.close()
+
+        store = ModelStore(self.db_path)
+
+        self.assertEqual(store.find_ids(ModelQuery(tags=['style'], base_model='Illustrious')), [7])
+        with store.get_connection() as conn:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertNotIn('legacy_optimized_models', tables)
+
+    def test_repr_raw_data_rewritten_as_json(self):
+        """Rows stored with str(dict) raw_data are rewritten as JSON."""
+        model = make_model(8)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE models (
+                    id INTEGER PRIMARY KEY, name TEXT NOT NULL, type TEXT, description TEXT,
+                    cleaned_description TEXT, creator_id INTEGER, creator_username TEXT,
+                    nsfw BOOLEAN, allowCommercialUse TEXT, created_at TEXT, updated_at TEXT,
+                    raw_data TEXT, UNIQUE(id)
+                )
+            """)
+            conn.execute("INSERT INTO models (id, name, raw_data) VALUES (?, ?, ?)",
+                         (8, model['name'], str(model)))
+
+        store = ModelStore(self.db_path)
+
+        with store.get_connection() as conn:
+            raw = conn.execute("SELECT raw_data FROM models WHERE id = 8").fetchone()[0]
+        self.assertEqual(json.loads(raw)['id'], 8)
+        self.assertEqual(store.find_ids(ModelQuery(model_types=['LORA'])), [8])
+
+
+class TestSingleWritePath(unittest.TestCase):
+    """Test that the legacy entry points share the canonical store."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "civitai.db"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_database_manager_and_model_storage_see_same_rows(self):
+        """A model stored via DatabaseManager is visible to ModelStorage exports."""
+        db_manager = DatabaseManager(self.db_path)
+        self.assertTrue(db_manager.store_model(make_model(5, tags=('style',))))
+
+        storage = ModelStorage(self.db_path)
+        self.assertEqual(storage.get_model_count(), 1)
+        exported = storage.get_models(category='style', base_model='Illustrious')
+        self.assertEqual([m['id'] for m in exported], [5])
+        self.assertEqual(db_manager.get_model(5)['name'], 'Model 5')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Pipeline profiler tests.
+Tests stage spans, the stack sampler and the files written by a profile session.
+"""
+
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.performance.profiler import PipelineProfiler, ProfileSession
+
+
+class TestPipelineProfiler(unittest.TestCase):
+    """Test PipelineProfiler."""
+
+    def test_disabled_spans_record_nothing(self):
+        """Spans are shared no-ops until the profiler is enabled."""
+        profiler = PipelineProfiler()
+        self.assertIs(profiler.span('a'), profiler.span('b'))
+        with profiler.span('a'):
+            pass
+        self.assertEqual(profiler.stages(), [])
+
+    def test_nested_spans_total_and_self_time(self):
+        """Nested spans form paths; the parent's self time excludes its children."""
+        profiler = PipelineProfiler(enabled=True)
+        with profiler.span('search'):
+            for _ in range(2):
+                with profiler.span('api_wait'):
+                    time.sleep(0.02)
+            with profiler.span('version_filter'):
+                pass
+
+        stages = {stats.path: stats for stats in profiler.stages()}
+        self.assertEqual([stats.path for stats in profiler.stages()][0], ('search',))
+        api = stages[('search', 'api_wait')]
+        self.assertEqual(api.calls, 2)
+        self.assertGreaterEqual(api.total_time, 0.04)
+        root = stages[('search',)]
+        self.assertLess(root.self_time, root.total_time - api.total_time + 0.005)
+        self.assertIn('search;api_wait ', '\n'.join(profiler.collapsed_stages()))
+        self.assertIn('  api_wait', profiler.format_breakdown())
+
+    def test_concurrent_tasks_keep_their_own_stack(self):
+        """Spans of concurrent asyncio tasks nest under the stage that spawned them."""
+        profiler = PipelineProfiler(enabled=True)
+
+        async def download(index):
+            with profiler.span('transfer'):
+                await asyncio.sleep(0.01 * index)
+
+        async def run():
+            with profiler.span('bulk'):
+                await asyncio.gather(*(download(i) for i in range(3)))
+
+        asyncio.run(run())
+        paths = {stats.path: stats.calls for stats in profiler.stages()}
+        self.assertEqual(paths, {('bulk',): 1, ('bulk', 'transfer'): 3})
+
+
+class TestProfileSession(unittest.TestCase):
+    """Test ProfileSession."""
+
+    def test_writes_breakdown_and_collapsed_stacks(self):
+        """A sampled session writes the stage table and both collapsed-stack files."""
+        profiler = PipelineProfiler()
+
+        def busy():
+            end = time.perf_counter() + 0.1
+            while time.perf_counter() < end:
+                pass
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with ProfileSession('search', Path(temp_dir), sample_interval=0.002, profiler=profiler) as session:
+                with profiler.span('classify'):
+                    busy()
+
+            self.assertFalse(profiler.enabled)
+            self.assertEqual(set(session.files), {'stages', 'collapsed', 'samples'})
+            self.assertIn('classify', session.files['stages'].read_text(encoding='utf-8'))
+            collapsed = session.files['collapsed'].read_text(encoding='utf-8').splitlines()
+            self.assertTrue(any(line.startswith('search;classify ') for line in collapsed))
+            samples = session.files['samples'].read_text(encoding='utf-8').splitlines()
+            busy_lines = [line for line in samples if 'busy (' in line]
+            self.assertTrue(busy_lines)
+            # The open stage appears as a frame above the sampled function
+            self.assertTrue(all(';[classify];' in line for line in busy_lines))
+            self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in samples))
+
+
+if __name__ == '__main__':
+    unittest.main()
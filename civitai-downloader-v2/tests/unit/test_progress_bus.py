@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Progress bus tests.
+Tests inline delivery, per-key coalescing and isolation from slow subscribers.
+"""
+
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.download.progress_bus import ProgressBus
+
+
+class TestProgressBus(unittest.TestCase):
+    """Test ProgressBus."""
+
+    def test_inline_until_started(self):
+        """A stopped bus calls the subscribers synchronously with every event."""
+        bus = ProgressBus(rate_hz=10)
+        received = []
+        bus.subscribe(lambda key, value: received.append((key, value)))
+        bus.publish('a', 'a', 1)
+        bus.publish('a', 'a', 2)
+        self.assertEqual(received, [('a', 1), ('a', 2)])
+
+    def test_latest_state_wins_per_key(self):
+        """Events of a key published between deliveries collapse to the latest one."""
+        bus = ProgressBus(rate_hz=20)
+        received = []
+        bus.subscribe(lambda key, value: received.append((key, value)))
+        bus.start()
+        try:
+            for value in range(1000):
+                bus.publish('a', 'a', value)
+                bus.publish('b', 'b', -value)
+            self.assertTrue(bus.flush(timeout=5))
+        finally:
+            bus.stop()
+
+        self.assertLess(len(received), 100)
+        self.assertEqual([value for key, value in received if key == 'a'][-1], 999)
+        self.assertEqual([value for key, value in received if key == 'b'][-1], -999)
+        self.assertGreater(bus.coalesced, 1800)
+
+    def test_slow_subscriber_does_not_block_publisher(self):
+        """Publishing returns immediately while a subscriber is stuck; stop() delivers the final state."""
+        bus = ProgressBus(rate_hz=0)
+        release = threading.Event()
+        slow, fast = [], []
+
+        def slow_callback(value):
+            release.wait(5)
+            slow.append(value)
+
+        bus.subscribe(slow_callback)
+        bus.subscribe(fast.append)
+        bus.start()
+
+        start = time.perf_counter()
+        for value in range(10000):
+            bus.publish('task', value)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 1.0)
+
+        bus.flush(timeout=5)
+        self.assertEqual(fast[-1], 9999)
+        release.set()
+        bus.stop()
+        self.assertEqual(slow[-1], 9999)
+        self.assertLessEqual(len(slow), 2)
+
+    def test_unsubscribe_drops_pending_events(self):
+        """Removed subscribers receive nothing more."""
+        bus = ProgressBus()
+        received = []
+        bus.subscribe(received.append)
+        bus.start()
+        bus.unsubscribe(received.append)
+        bus.publish('a', 1)
+        bus.stop()
+        self.assertEqual(received, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
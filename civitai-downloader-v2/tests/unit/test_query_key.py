@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Canonical query key tests.
+Tests normalization, memoization and the key users (response cache, search cache, session ids).
+"""
+
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.api.cache import ResponseCache
+from src.api.params import SearchParams
+from src.api.query_key import QueryKey, digest_params
+from src.core.search.advanced_search import AdvancedSearchParams, ModelCategory, NSFWFilter
+from src.core.stream.intermediate_file_manager import IntermediateFileManager
+
+
+class TestQueryKey(unittest.TestCase):
+    """Test QueryKey normalization."""
+
+    def test_equivalent_params_share_key(self):
+        """List order, duplicates, enums and unset values do not change the key."""
+        a = QueryKey({'types': ['LORA', 'Checkpoint'], 'limit': 10, 'cursor': None, 'tag': []})
+        b = QueryKey({'limit': 10, 'types': ['Checkpoint', 'LORA', 'LORA']})
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(a.digest('models'), b.digest('models'))
+        self.assertEqual(QueryKey({'nsfw': NSFWFilter.SFW_ONLY}).params, {'nsfw': 'false'})
+
+        self.assertNotEqual(a, QueryKey({'types': ['LORA'], 'limit': 10}))
+        self.assertNotEqual(a.digest('models'), a.digest('model'))
+        self.assertEqual(len(a.digest()), 32)
+
+    def test_subset(self):
+        """Subsets only compare the selected parameters."""
+        a = QueryKey({'query': 'anime', 'tags': ['x'], 'page': 2})
+        b = QueryKey({'query': 'cat', 'tags': ['x']})
+        self.assertEqual(a.subset(['tags']), b.subset(['tags']))
+        self.assertIs(a.subset(['tags']), a.subset(('tags',)))
+
+    def test_dataclass_defaults_dropped_and_memoized(self):
+        """Fields at their default are dropped; the key is memoized until a field changes."""
+        params = AdvancedSearchParams(tags=['b', 'a'], categories=[ModelCategory.CHARACTER])
+        self.assertEqual(params.query_key().params, {'categories': ['character'], 'tags': ['a', 'b']})
+        self.assertEqual(params.query_key(), AdvancedSearchParams(
+            tags=['a', 'b'], categories=[ModelCategory.CHARACTER], limit=100, page=1).query_key())
+
+        key = params.query_key()
+        self.assertIs(params.query_key(), key)
+        params.page = 2
+        self.assertIsNot(params.query_key(), key)
+        self.assertEqual(params.query_key().params['page'], 2)
+
+        self.assertEqual(SearchParams(types=['LORA'], query='x').query_key(),
+                         QueryKey({'query': 'x', 'types': ['LORA']}))
+
+    def test_memo_is_not_a_field(self):
+        """Copies and saved field values of keyed params leave the memo out."""
+        params = AdvancedSearchParams(tags=['a'], limit=500)
+        params.query_key()
+        self.assertNotIn('_query_key', params.field_values())
+        self.assertEqual(params.field_values()['tags'], ['a'])
+
+        batch = replace(params, page=2, limit=50)
+        self.assertEqual((batch.page, batch.limit, batch.tags), (2, 50, ['a']))
+
+    def test_digest_params_matches_key(self):
+        """The plain dict fast path gives the same digest as QueryKey."""
+        for params in ({'limit': 100, 'types': ['LORA', 'Checkpoint'], 'cursor': None, 'nsfw': False},
+                       {'tags': ['b', 'a!', 'a', 'b', ''], 'query': ''},
+                       {'ids': [3, 1, 2], 'types': []},
+                       {'id': 5}):
+            self.assertEqual(digest_params(params, 'models'), QueryKey.of(params).digest('models'))
+
+
+class TestQueryKeyUsers(unittest.TestCase):
+    """Test that the caches and session ids use the canonical key."""
+
+    def test_response_cache_key(self):
+        """Equivalent request params hit the same response cache entry."""
+        cache = ResponseCache()
+        self.assertEqual(cache.generate_cache_key("models", {'ids': [3, 1, 2], 'limit': 3}),
+                         cache.generate_cache_key("models", {'limit': 3, 'ids': [1, 2, 3]}))
+        self.assertEqual(cache.generate_cache_key("models", SearchParams(limit=3)),
+                         cache.generate_cache_key("models", {'limit': 3}))
+
+    def test_session_id(self):
+        """Session ids hash the same normalized key for objects and dicts."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = IntermediateFileManager(temp_dir)
+            params = AdvancedSearchParams(model_types=['LORA', 'Checkpoint'])
+            session_id = manager.generate_session_id(params)
+            self.assertTrue(session_id.startswith("search_"))
+            self.assertEqual(session_id[-8:], manager.generate_session_id(
+                {'model_types': ['Checkpoint', 'LORA']})[-8:])
+
+
+if __name__ == '__main__':
+    unittest.main()
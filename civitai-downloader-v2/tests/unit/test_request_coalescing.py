@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Request coalescing tests.
+Tests for single-flight deduplication and batched model lookups in CivitaiAPIClient.
+"""
+
+import asyncio
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.api.client import CivitaiAPIClient
+
+
+def make_response(data):
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = data
+    response.content = b'{}'
+    response.headers = {}
+    return response
+
+
+class TestRequestCoalescing(unittest.IsolatedAsyncioTestCase):
+    """Test single-flight requests and the model batcher."""
+
+    async def asyncSetUp(self):
+        self.client = CivitaiAPIClient(api_key="test")
+        self.client.rate_limiter.wait = AsyncMock()
+        self.requests = []
+
+    async def fake_get(self, url, params=None, **kwargs):
+        self.requests.append(params)
+        await asyncio.sleep(0.01)
+        ids = params.get('ids')
+        if ids is None:
+            return make_response({"items": [{"id": 1}], "metadata": {}})
+        return make_response({"items": [{"id": i, "name": f"Model {i}"} for i in ids if i != 404],
+                              "metadata": {}})
+
+    async def test_identical_requests_share_one_call(self):
+        """Concurrent calls with the same cache key hit the network once."""
+        with patch.object(self.client, '_http_client') as http:
+            http.get = AsyncMock(side_effect=self.fake_get)
+            results = await asyncio.gather(*[self.client.get_models({"limit": 10}) for _ in range(5)])
+            await self.client.get_models({"limit": 20})
+
+        self.assertEqual(len(self.requests), 2)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(self.client._inflight, {})
+
+    async def test_errors_reach_every_waiter(self):
+        """A failed in-flight request raises for all of its waiters."""
+        with patch.object(self.client, '_http_client') as http:
+            http.get = AsyncMock(side_effect=RuntimeError("boom"))
+            results = await asyncio.gather(*[self.client.get_models({"limit": 10}) for _ in range(3)],
+                                           return_exceptions=True)
+        self.assertEqual(http.get.call_count, 1)
+        self.assertTrue(all(isinstance(result, Exception) for result in results))
+
+    async def test_get_model_batches_ids(self):
+        """Concurrent get_model calls are merged into ids= requests of at most 100 ids."""
+        with patch.object(self.client, '_http_client') as http:
+            http.get = AsyncMock(side_effect=self.fake_get)
+            ids = list(range(1, 151)) + [404]
+            models = await asyncio.gather(*[self.client.get_model(i) for i in ids])
+
+            self.assertEqual(len(self.requests), 2)
+            self.assertEqual(sorted(len(params['ids']) for params in self.requests), [51, 100])
+            self.assertEqual(models[0]['name'], 'Model 1')
+            self.assertIsNone(models[-1])
+
+            # Resolved models are served from the cache afterwards
+            self.assertEqual((await self.client.get_model(7))['id'], 7)
+            self.assertEqual(len(self.requests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
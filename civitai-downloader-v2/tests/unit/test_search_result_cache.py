@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Search result cache tests.
+Tests segment coverage, subset reuse from broader crawls and incremental re-crawls.
+"""
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.search.advanced_search import AdvancedSearchParams, ModelCategory, SortOption
+from src.core.search.result_cache import CacheSegment, search_dimensions
+from src.core.search.search_engine import AdvancedSearchEngine
+from src.data.model_store import ModelStore
+
+
+def make_model(model_id, model_type='LORA', base_model='Illustrious', tags=('style',)):
+    """Build a minimal API-shaped model."""
+    return {
+        'id': model_id,
+        'name': f'Model {model_id}',
+        'type': model_type,
+        'nsfw': False,
+        'tags': list(tags),
+        'createdAt': f'2025-01-{model_id:02d}T00:00:00Z',
+        'modelVersions': [{'id': model_id * 10, 'name': 'v1', 'baseModel': base_model, 'files': []}]
+    }
+
+
+def page(models, next_cursor=None):
+    return {'items': models, 'metadata': {'nextCursor': next_cursor}}
+
+
+class TestCacheSegment(unittest.TestCase):
+    """Test per-dimension coverage."""
+
+    def segment(self, **params):
+        return CacheSegment('key', search_dimensions(AdvancedSearchParams(**params)),
+                            True, 0, None, 0.0, 0.0)
+
+    def test_covers_narrower_searches(self):
+        """A segment covers searches that equal or narrow it in every dimension."""
+        broad = self.segment(model_types=['LORA'], base_model='Illustrious')
+        self.assertTrue(broad.covers(search_dimensions(AdvancedSearchParams(
+            model_types=['LORA'], base_model='Illustrious', categories=[ModelCategory.STYLE]))))
+        self.assertTrue(broad.covers(search_dimensions(AdvancedSearchParams(
+            model_types=['LORA'], base_model='Illustrious', tags=['anime'], limit=5))))
+
+        # Broader or different searches are not covered
+        self.assertFalse(broad.covers(search_dimensions(AdvancedSearchParams(model_types=['LORA']))))
+        self.assertFalse(broad.covers(search_dimensions(AdvancedSearchParams(
+            model_types=['LORA', 'Checkpoint'], base_model='Illustrious'))))
+        self.assertFalse(broad.covers(search_dimensions(AdvancedSearchParams(
+            model_types=['LORA'], base_model='Illustrious', query='cat'))))
+
+
+class TestSearchResultCache(unittest.IsolatedAsyncioTestCase):
+    """Test the search engine with the segment cache."""
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = ModelStore(Path(self.temp_dir.name) / "civitai.db")
+        self.engine = AdvancedSearchEngine(api_client=Mock(), model_store=self.store)
+        self.engine._execute_api_call = AsyncMock()
+
+    async def asyncTearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_narrower_search_served_from_broader_crawl(self):
+        """'LORA + Illustrious + style' is filtered locally from a 'LORA + Illustrious' crawl."""
+        models = [make_model(3, tags=('style',)), make_model(2, tags=('character',)),
+                  make_model(1, tags=('style', 'anime'))]
+        self.engine._execute_api_call.return_value = page(models)
+        broad = await self.engine._official_search(AdvancedSearchParams(
+            model_types=['LORA'], base_model='Illustrious', limit=10))
+        self.assertEqual([m['id'] for m in broad.models], [3, 2, 1])
+        self.engine._execute_api_call.reset_mock()
+
+        narrow = await self.engine._official_search(AdvancedSearchParams(
+            model_types=['LORA'], base_model='Illustrious', categories=[ModelCategory.STYLE], limit=10))
+        self.engine._execute_api_call.assert_not_called()
+        self.assertEqual(narrow.search_metadata['search_type'], 'cached')
+        self.assertEqual([m['id'] for m in narrow.models], [3, 1])
+        self.assertEqual(self.engine.result_cache.stats['subset_hits'], 1)
+
+        # A search the crawl does not cover goes to the API
+        self.engine._execute_api_call.return_value = page([])
+        await self.engine._official_search(AdvancedSearchParams(model_types=['LORA'], limit=10))
+        self.engine._execute_api_call.assert_called()
+
+    async def test_repeat_crawl_fetches_only_new_models(self):
+        """A stale segment is extended with new models; known pages are not fetched again."""
+        params = AdvancedSearchParams(model_types=['LORA'], limit=10)
+        self.engine._execute_api_call.return_value = page([make_model(2), make_model(1)])
+        await self.engine._official_search(params)
+
+        # Segment verified long ago: the new-model check finds model 3
+        segment = self.engine.result_cache.get_segment(params)
+        self.store.touch_search_segment(segment.key, time.time() - 7 * 3600)
+        self.engine._execute_api_call.reset_mock()
+        self.engine._execute_api_call.side_effect = [
+            page([make_model(3)]),                                   # new-model check
+            page([make_model(3), make_model(2)], next_cursor='c2'),  # crawl, stops at model 2
+        ]
+        result = await self.engine._official_search(params)
+
+        self.assertEqual(self.engine._execute_api_call.call_count, 2)
+        self.assertEqual([m['id'] for m in result.models], [3, 2, 1])
+        self.assertEqual(self.engine.result_cache.stats['incremental_crawls'], 1)
+        segment = self.engine.result_cache.get_segment(params)
+        self.assertEqual((segment.model_count, segment.latest_model_id, segment.complete), (3, 3, True))
+
+    async def test_other_sorts_and_pages_ignore_segment(self):
+        """Only first-page newest-first crawls are cut at, or merged with, a recorded segment."""
+        self.engine._execute_api_call.return_value = page([make_model(3), make_model(2), make_model(1)])
+        await self.engine._official_search(AdvancedSearchParams(model_types=['LORA'], limit=10))
+
+        self.engine._execute_api_call.return_value = page([make_model(5), make_model(1), make_model(4)])
+        result = await self.engine._official_search(AdvancedSearchParams(
+            model_types=['LORA'], sort_option=SortOption.MOST_DOWNLOADED, limit=10))
+        self.assertEqual([m['id'] for m in result.models], [5, 1, 4])
+
+        self.engine._execute_api_call.return_value = page([make_model(6), make_model(2)])
+        result = await self.engine._official_search(AdvancedSearchParams(
+            model_types=['LORA'], page=2, limit=10))
+        self.assertEqual([m['id'] for m in result.models], [6, 2])
+        self.assertEqual(self.engine.result_cache.stats['incremental_crawls'], 0)
+
+        segment = self.engine.result_cache.get_segment(AdvancedSearchParams(model_types=['LORA'], limit=10))
+        self.assertEqual(segment.model_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
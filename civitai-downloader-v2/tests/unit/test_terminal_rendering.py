@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Terminal rendering tests.
+Tests the diff-based renderer, ProgressTracker's incremental aggregates and
+the throttled ProgressDisplay/Dashboard frames.
+"""
+
+import io
+import random
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.ui.dashboard import Dashboard
+from src.ui.progress import ProgressDisplay, ProgressLevel, ProgressTracker
+from src.ui.renderer import TerminalRenderer
+
+
+class TestTerminalRenderer(unittest.TestCase):
+    """Test TerminalRenderer."""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.renderer = TerminalRenderer(stream=self.stream, max_fps=0)
+
+    def frame(self, lines):
+        self.stream.seek(0)
+        self.stream.truncate()
+        self.renderer.render(lines)
+        return self.stream.getvalue()
+
+    def test_repaints_only_changed_lines(self):
+        """Unchanged frames write nothing; changed lines are rewritten in place."""
+        self.assertEqual(self.frame(['a', 'b', 'c']), '\ra\nb\nc\n')
+        self.assertEqual(self.frame(['a', 'b', 'c']), '')
+        self.assertEqual(self.frame(['a', 'B', 'c']), '\033[2A\r\033[2KB\033[2B\r')
+        self.assertEqual(self.renderer.lines_written, 4)
+
+    def test_grow_and_shrink(self):
+        """Added lines are appended below the block; removed lines are cleared."""
+        self.frame(['a', 'b'])
+        self.assertEqual(self.frame(['a', 'b', 'c']), '\rc\n')
+        self.assertEqual(self.frame(['a']), '\033[2A\r\033[2K\033[1B\r\033[2K\033[1A\r')
+
+    def test_frame_rate_cap(self):
+        """Frames inside the minimum interval are skipped unless forced."""
+        renderer = TerminalRenderer(stream=self.stream, max_fps=1)
+        self.assertTrue(renderer.render(['a']))
+        self.assertFalse(renderer.render(['b']))
+        self.assertEqual(renderer.skipped_frames, 1)
+        self.assertTrue(renderer.render(['b'], force=True))
+
+
+class TestProgressAggregates(unittest.TestCase):
+    """Test ProgressTracker incremental aggregates."""
+
+    def recomputed(self, tracker):
+        running = [task for task in tracker.tasks.values() if task.status == "running"]
+        if not running:
+            return 100.0 if tracker.total_tasks else 0.0, 0
+        return sum(task.metrics.percentage for task in running) / len(running), len(running)
+
+    def test_aggregates_match_full_recompute(self):
+        """Random updates keep overall progress equal to a walk over all tasks."""
+        rng = random.Random(3)
+        tracker = ProgressTracker()
+        tracker.create_task("bulk", "Bulk", ProgressLevel.OPERATION, total=1000)
+        for i in range(200):
+            tracker.create_task(f"t{i}", f"Task {i}", ProgressLevel.TASK, total=100, parent_id="bulk")
+
+        for _ in range(2000):
+            task_id = f"t{rng.randrange(200)}"
+            action = rng.random()
+            if action < 0.8:
+                tracker.update_task(task_id, rng.randrange(101))
+            elif action < 0.9:
+                tracker.complete_task(task_id)
+            else:
+                tracker.fail_task(task_id, "boom")
+
+            if rng.random() < 0.05:
+                overall = tracker.get_overall_progress()
+                expected, active = self.recomputed(tracker)
+                self.assertAlmostEqual(overall['overall_percentage'], expected, places=6)
+                self.assertEqual(overall['active_tasks'], active)
+
+        children = tracker.get_child_tasks("bulk")
+        average = sum(child.metrics.percentage for child in children) / len(children)
+        self.assertEqual(tracker.get_task("bulk").metrics.current, int(average / 100.0 * 1000))
+
+    def test_running_index_and_version(self):
+        """Running tasks are indexed in start order; each change bumps the version."""
+        tracker = ProgressTracker()
+        for i in range(3):
+            tracker.create_task(f"t{i}", f"Task {i}", ProgressLevel.TASK)
+        version = tracker.version
+        tracker.get_task("t0").update(10)
+        tracker.complete_task("t1")
+        self.assertGreater(tracker.version, version)
+        self.assertEqual([task.task_id for task in tracker.get_running_tasks()], ["t0", "t2"])
+        self.assertEqual([task.task_id for task in tracker.get_running_tasks(1)], ["t0"])
+
+
+class TestThrottledDisplays(unittest.TestCase):
+    """Test ProgressDisplay and Dashboard frames."""
+
+    def test_progress_display_skips_unchanged_frames(self):
+        """Frames are built only after changes and list at most max_lines tasks."""
+        tracker = ProgressTracker()
+        for i in range(1000):
+            tracker.create_task(f"t{i}", f"Task {i}", ProgressLevel.TASK)
+        display = ProgressDisplay(tracker, max_fps=0, max_lines=5)
+        display.renderer.stream = io.StringIO()
+
+        display._update_display(None)
+        self.assertEqual(display.renderer.frames, 1)
+        self.assertEqual(len(display.renderer._lines), 5)
+        self.assertIn("996 more running", display.renderer._lines[-1])
+
+        display._update_display(None)
+        self.assertEqual(display.renderer.frames, 1)
+
+        tracker.update_task("t0", 50)
+        written = display.renderer.lines_written
+        display._update_display(None)
+        self.assertEqual(display.renderer.frames, 2)
+        # The task line and the overall percentage on the summary line
+        self.assertEqual(display.renderer.lines_written - written, 2)
+
+    def test_dashboard_repaints_changed_lines(self):
+        """A dashboard refresh without metric changes rewrites at most the clock line."""
+        dashboard = Dashboard()
+        dashboard.renderer = TerminalRenderer(stream=io.StringIO(), max_fps=0, full_screen=True)
+        dashboard._refresh_display()
+        first = dashboard.renderer.lines_written
+        self.assertGreater(first, 10)
+
+        dashboard._refresh_display()
+        self.assertLessEqual(dashboard.renderer.lines_written - first, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()